@@ -0,0 +1,311 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Sum
+from frappe.utils import cint, cstr, flt, getdate, now
+
+import erpnext
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+	get_accounting_dimensions,
+)
+from erpnext.accounts.utils import get_account_currency, get_fiscal_year, lock_company_ledger_index
+
+AMOUNT_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+KEY_FIELDS = (
+	"company",
+	"posting_date",
+	"account",
+	"account_currency",
+	"cost_center",
+	"project",
+	"finance_book",
+	"fiscal_year",
+	"is_opening",
+	"is_period_closing_voucher_entry",
+)
+
+
+class AccountDailyBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		credit: DF.Currency
+		credit_in_account_currency: DF.Currency
+		debit: DF.Currency
+		debit_in_account_currency: DF.Currency
+		finance_book: DF.Link | None
+		fiscal_year: DF.Link | None
+		is_opening: DF.Literal["No", "Yes"]
+		is_period_closing_voucher_entry: DF.Check
+		posting_date: DF.Date | None
+		project: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def is_account_daily_balance_enabled():
+	"""Whether daily balances are maintained as GL Entries are posted"""
+	return cint(frappe.db.get_single_value("Accounts Settings", "use_account_daily_balance"))
+
+
+def is_account_daily_balance_ready():
+	"""Whether daily balances can be read, which is once they have been rebuilt after being enabled"""
+	return is_account_daily_balance_enabled() and cint(
+		frappe.db.get_single_value("Accounts Settings", "account_daily_balance_ready")
+	)
+
+
+def update_account_daily_balance(gl_entries, sign=1):
+	"""
+	Add (`sign=1`) or remove (`sign=-1`) the amounts of `gl_entries` from the daily balances.
+	Called whenever active (is_cancelled = 0) GL Entries are posted, cancelled or deleted.
+	"""
+	if not gl_entries or not is_account_daily_balance_enabled():
+		return
+
+	balances = aggregate_gl_entries(gl_entries, get_accounting_dimensions())
+	if not balances:
+		return
+
+	# waits for a rebuild of the company to be committed
+	for company in sorted({balance.company for balance in balances.values()}):
+		lock_company_ledger_index(company, shared=True)
+
+	adb = frappe.qb.DocType("Account Daily Balance")
+	existing = set(
+		frappe.get_all("Account Daily Balance", filters={"name": ("in", list(balances))}, pluck="name")
+	)
+
+	for name, balance in balances.items():
+		if name in existing:
+			add_to_balance(adb, name, balance, sign)
+		else:
+			insert_balance(adb, name, balance, sign)
+
+
+def update_account_daily_balance_from_ledger(filters, sign=-1):
+	"""Apply the active GL Entries matching `filters` before they are cancelled or deleted in bulk"""
+	if not is_account_daily_balance_enabled():
+		return
+
+	gl_entries = frappe.get_all(
+		"GL Entry",
+		filters={**filters, "is_cancelled": 0},
+		fields=["voucher_type", *KEY_FIELDS[:-1], *AMOUNT_FIELDS, *get_accounting_dimensions()],
+	)
+	update_account_daily_balance(gl_entries, sign=sign)
+
+
+def add_to_balance(adb, name, balance, sign):
+	query = frappe.qb.update(adb).where(adb.name == name)
+	for fieldname in AMOUNT_FIELDS:
+		query = query.set(adb[fieldname], adb[fieldname] + sign * balance[fieldname])
+
+	query.run()
+
+
+def insert_balance(adb, name, balance, sign):
+	doc = frappe.new_doc("Account Daily Balance")
+	doc.update(balance)
+	doc.name = name
+	for fieldname in AMOUNT_FIELDS:
+		doc.set(fieldname, sign * balance[fieldname])
+
+	savepoint = "account_daily_balance"
+	try:
+		frappe.db.savepoint(savepoint)
+		doc.db_insert()
+	except frappe.DuplicateEntryError:
+		# inserted by a concurrent transaction
+		frappe.db.rollback(save_point=savepoint)
+		add_to_balance(adb, name, balance, sign)
+
+
+def aggregate_gl_entries(gl_entries, accounting_dimensions):
+	"""Group GL Entries by balance key, returning { name: balance }"""
+	balances = {}
+	fiscal_years = {}
+
+	for gle in gl_entries:
+		if not any(flt(gle.get(fieldname)) for fieldname in AMOUNT_FIELDS):
+			continue
+
+		key_values = get_key_values(gle, accounting_dimensions, fiscal_years)
+		name = get_balance_name(key_values, accounting_dimensions)
+
+		if name not in balances:
+			balances[name] = frappe._dict(key_values, **{fieldname: 0.0 for fieldname in AMOUNT_FIELDS})
+
+		for fieldname in AMOUNT_FIELDS:
+			balances[name][fieldname] += flt(gle.get(fieldname))
+
+	return balances
+
+
+def get_key_values(gle, accounting_dimensions, fiscal_years):
+	posting_date = getdate(gle.get("posting_date"))
+	fiscal_year = gle.get("fiscal_year")
+	if not fiscal_year:
+		if (posting_date, gle.get("company")) not in fiscal_years:
+			fiscal_years[(posting_date, gle.get("company"))] = get_fiscal_year(
+				posting_date, company=gle.get("company")
+			)[0]
+		fiscal_year = fiscal_years[(posting_date, gle.get("company"))]
+
+	key_values = {
+		"company": cstr(gle.get("company")),
+		"posting_date": posting_date,
+		"account": cstr(gle.get("account")),
+		"account_currency": cstr(
+			gle.get("account_currency")
+			or get_account_currency(gle.get("account"))
+			or erpnext.get_company_currency(gle.get("company"))
+		),
+		"cost_center": cstr(gle.get("cost_center")),
+		"project": cstr(gle.get("project")),
+		"finance_book": cstr(gle.get("finance_book")),
+		"fiscal_year": cstr(fiscal_year),
+		"is_opening": gle.get("is_opening") or "No",
+		"is_period_closing_voucher_entry": cint(
+			gle.get("is_period_closing_voucher_entry") or gle.get("voucher_type") == "Period Closing Voucher"
+		),
+	}
+	for dimension in accounting_dimensions:
+		key_values[dimension] = cstr(gle.get(dimension))
+
+	return key_values
+
+
+def get_balance_name(key_values, accounting_dimensions):
+	"""Balances are named by a hash of their key so that upserts need no lookup by value"""
+	key = [cstr(key_values[fieldname]) for fieldname in (*KEY_FIELDS, *accounting_dimensions)]
+	return hashlib.sha1("\x1f".join(key).encode()).hexdigest()
+
+
+def get_balances_from_ledger(company, accounting_dimensions):
+	"""Daily balances computed directly from GL Entry with a single grouped query"""
+	gle = frappe.qb.DocType("GL Entry")
+	group_by = [
+		gle.voucher_type,
+		*[gle[fieldname] for fieldname in KEY_FIELDS[:-1]],
+		*[gle[dimension] for dimension in accounting_dimensions],
+	]
+
+	gl_entries = (
+		frappe.qb.from_(gle)
+		.select(*group_by, *[Sum(gle[fieldname]).as_(fieldname) for fieldname in AMOUNT_FIELDS])
+		.where((gle.company == company) & (gle.is_cancelled == 0))
+		.groupby(*group_by)
+	).run(as_dict=True)
+
+	# voucher types other than Period Closing Voucher collapse into the same balance here
+	return aggregate_gl_entries(gl_entries, accounting_dimensions)
+
+
+def rebuild_account_daily_balance(company=None):
+	"""
+	Recompute daily balances from GL Entry, for one or all companies. Each company is rebuilt under
+	an exclusive lock and committed on its own. Once all of them are, the daily balances are
+	marked ready to be read.
+	"""
+	accounting_dimensions = get_accounting_dimensions()
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+
+	for company_name in companies:
+		rebuild_company_account_daily_balance(company_name, accounting_dimensions)
+
+	if not company and is_account_daily_balance_enabled():
+		frappe.db.set_single_value("Accounts Settings", "account_daily_balance_ready", 1)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def rebuild_company_account_daily_balance(company, accounting_dimensions):
+	if not frappe.flags.in_test:
+		# the ledger is read after the lock is taken, not from a snapshot of an earlier transaction
+		frappe.db.commit()
+
+	# waits for the postings updating daily balances of the company to be committed
+	lock_company_ledger_index(company)
+	frappe.db.delete("Account Daily Balance", {"company": company})
+
+	if balances := get_balances_from_ledger(company, accounting_dimensions):
+		timestamp = now()
+		fields = [*KEY_FIELDS, *accounting_dimensions, *AMOUNT_FIELDS]
+		frappe.db.bulk_insert(
+			"Account Daily Balance",
+			fields=["name", *fields, "creation", "modified", "owner", "modified_by"],
+			values=[
+				[
+					name,
+					*[balance[field] for field in fields],
+					timestamp,
+					timestamp,
+					frappe.session.user,
+					frappe.session.user,
+				]
+				for name, balance in balances.items()
+			],
+		)
+
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+
+def verify_account_daily_balance(company=None):
+	"""Return the balances that differ from the ones computed from GL Entry"""
+	accounting_dimensions = get_accounting_dimensions()
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+	mismatches = []
+
+	for company in companies:
+		precision = cint(frappe.db.get_default("currency_precision")) or 2
+		expected = get_balances_from_ledger(company, accounting_dimensions)
+		actual = {
+			d.name: d
+			for d in frappe.get_all(
+				"Account Daily Balance",
+				filters={"company": company},
+				fields=["name", *KEY_FIELDS, *accounting_dimensions, *AMOUNT_FIELDS],
+			)
+		}
+
+		for name in set(expected) | set(actual):
+			expected_balance = expected.get(name) or frappe._dict()
+			actual_balance = actual.get(name) or frappe._dict()
+			if any(
+				flt(expected_balance.get(fieldname), precision)
+				!= flt(actual_balance.get(fieldname), precision)
+				for fieldname in AMOUNT_FIELDS
+			):
+				mismatches.append(
+					frappe._dict(
+						name=name,
+						account=(expected_balance or actual_balance).get("account"),
+						posting_date=(expected_balance or actual_balance).get("posting_date"),
+						expected={
+							fieldname: flt(expected_balance.get(fieldname)) for fieldname in AMOUNT_FIELDS
+						},
+						actual={fieldname: flt(actual_balance.get(fieldname)) for fieldname in AMOUNT_FIELDS},
+					)
+				)
+
+	return mismatches
+
+
+def on_doctype_update():
+	frappe.db.add_index("Account Daily Balance", ["company", "account", "posting_date"])
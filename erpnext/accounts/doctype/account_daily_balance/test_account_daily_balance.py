@@ -0,0 +1,159 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.query_builder.functions import Sum
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import add_days, flt, today
+
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	is_account_daily_balance_ready,
+	rebuild_account_daily_balance,
+	verify_account_daily_balance,
+)
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.report.balance_sheet.balance_sheet import execute as balance_sheet
+from erpnext.accounts.report.general_ledger.general_ledger import execute as general_ledger
+from erpnext.accounts.report.trial_balance.trial_balance import execute as trial_balance
+from erpnext.accounts.utils import get_fiscal_year
+
+
+class UnitTestAccountDailyBalance(UnitTestCase):
+	"""
+	Unit tests for AccountDailyBalance.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
+
+
+class TestAccountDailyBalance(IntegrationTestCase):
+	def setUp(self):
+		frappe.db.set_single_value("Accounts Settings", "use_account_daily_balance", 1)
+		rebuild_account_daily_balance("_Test Company")
+		frappe.db.set_single_value("Accounts Settings", "account_daily_balance_ready", 1)
+
+	def tearDown(self):
+		frappe.db.set_single_value("Accounts Settings", "use_account_daily_balance", 0)
+		frappe.db.set_single_value("Accounts Settings", "account_daily_balance_ready", 0)
+		frappe.db.rollback()
+
+	def assertReportsUnchanged(self):
+		"""Trial Balance, Balance Sheet and General Ledger are the same with and without the daily balances"""
+		fiscal_year = get_fiscal_year(today(), company="_Test Company", as_dict=True)
+		reports = (
+			(
+				trial_balance,
+				{
+					"company": "_Test Company",
+					"fiscal_year": fiscal_year.name,
+					"from_date": fiscal_year.year_start_date,
+					"to_date": today(),
+				},
+			),
+			(
+				balance_sheet,
+				{
+					"company": "_Test Company",
+					"from_fiscal_year": fiscal_year.name,
+					"to_fiscal_year": fiscal_year.name,
+					"period_start_date": fiscal_year.year_start_date,
+					"period_end_date": fiscal_year.year_end_date,
+					"filter_based_on": "Fiscal Year",
+					"periodicity": "Monthly",
+				},
+			),
+			(
+				general_ledger,
+				{
+					"company": "_Test Company",
+					"from_date": fiscal_year.year_start_date,
+					"to_date": today(),
+					"group_by": "Group by Voucher (Consolidated)",
+				},
+			),
+		)
+
+		def get_outputs():
+			return [execute(frappe._dict(filters))[1] for execute, filters in reports]
+
+		frappe.db.set_single_value("Accounts Settings", "account_daily_balance_ready", 0)
+		expected = get_outputs()
+
+		frappe.db.set_single_value("Accounts Settings", "account_daily_balance_ready", 1)
+		self.assertEqual(get_outputs(), expected)
+
+	def test_not_read_until_ready(self):
+		frappe.db.set_single_value("Accounts Settings", "account_daily_balance_ready", 0)
+		account = "_Test Account Cost for Goods Sold - _TC"
+		opening = get_daily_balance(account)
+
+		# maintained, but GL Entries are read until the rebuild marks it ready
+		make_journal_entry(account, "_Test Bank - _TC", 100, "_Test Cost Center - _TC", submit=True)
+		self.assertEqual(get_daily_balance(account), opening + 100)
+		self.assertFalse(is_account_daily_balance_ready())
+
+		rebuild_account_daily_balance()
+		self.assertTrue(is_account_daily_balance_ready())
+		self.assertFalse(verify_account_daily_balance("_Test Company"))
+
+	def test_reports_with_and_without_daily_balances(self):
+		account = "_Test Account Cost for Goods Sold - _TC"
+		make_journal_entry(account, "_Test Bank - _TC", 100, "_Test Cost Center - _TC", submit=True)
+		make_journal_entry(
+			account,
+			"_Test Bank - _TC",
+			250,
+			"_Test Cost Center - _TC",
+			posting_date=add_days(today(), -1),
+			submit=True,
+		)
+		cancelled = make_journal_entry(
+			"_Test Bank - _TC", account, 40, "_Test Cost Center - _TC", submit=True
+		)
+		cancelled.cancel()
+
+		self.assertReportsUnchanged()
+
+	def test_balance_on_submit_and_cancel(self):
+		account = "_Test Account Cost for Goods Sold - _TC"
+		opening = get_daily_balance(account)
+
+		je = make_journal_entry(account, "_Test Bank - _TC", 100, "_Test Cost Center - _TC", submit=True)
+		self.assertEqual(get_daily_balance(account), opening + 100)
+
+		je.cancel()
+		self.assertEqual(get_daily_balance(account), opening)
+		self.assertFalse(verify_account_daily_balance("_Test Company"))
+
+	def test_verify_reports_mismatch(self):
+		make_journal_entry(
+			"_Test Account Cost for Goods Sold - _TC",
+			"_Test Bank - _TC",
+			100,
+			"_Test Cost Center - _TC",
+			submit=True,
+		)
+
+		frappe.db.set_value(
+			"Account Daily Balance",
+			{"account": "_Test Bank - _TC", "posting_date": today()},
+			"credit",
+			0,
+		)
+		mismatches = verify_account_daily_balance("_Test Company")
+		self.assertIn("_Test Bank - _TC", [d.account for d in mismatches])
+
+		rebuild_account_daily_balance("_Test Company")
+		self.assertFalse(verify_account_daily_balance("_Test Company"))
+
+
+def get_daily_balance(account):
+	adb = frappe.qb.DocType("Account Daily Balance")
+	balance = (
+		frappe.qb.from_(adb)
+		.select(Sum(adb.debit) - Sum(adb.credit))
+		.where((adb.account == account) & (adb.posting_date == today()))
+	).run()[0][0]
+
+	return flt(balance)
@@ -23,6 +23,7 @@ class AccountsSettings(Document):
 		from frappe.types import DF
 
 		acc_frozen_upto: DF.Date | None
+		account_daily_balance_ready: DF.Check
 		add_taxes_from_item_tax_template: DF.Check
 		allow_multi_currency_invoices_against_single_party_account: DF.Check
 		allow_stale: DF.Check
@@ -39,6 +40,7 @@ class AccountsSettings(Document):
 		credit_controller: DF.Link | None
 		delete_linked_ledger_entries: DF.Check
 		determine_address_tax_category_from: DF.Literal["Billing Address", "Shipping Address"]
+		enable_bulk_ledger_posting: DF.Check
 		enable_common_party_accounting: DF.Check
 		enable_fuzzy_matching: DF.Check
 		enable_immutable_ledger: DF.Check
@@ -49,6 +51,7 @@ class AccountsSettings(Document):
 		make_payment_via_journal_entry: DF.Check
 		merge_similar_account_heads: DF.Check
 		over_billing_allowance: DF.Currency
+		pos_closing_workers: DF.Int
 		post_change_gl_entries: DF.Check
 		receivable_payable_remarks_length: DF.Int
 		role_allowed_to_over_bill: DF.Link | None
@@ -61,6 +64,10 @@ class AccountsSettings(Document):
 		submit_journal_entries: DF.Check
 		unlink_advance_payment_on_cancelation_of_order: DF.Check
 		unlink_payment_on_cancellation_of_invoice: DF.Check
+		use_account_daily_balance: DF.Check
+		use_pricing_rule_index: DF.Check
+		use_voucher_outstanding: DF.Check
+		voucher_outstanding_ready: DF.Check
 	# end: auto-generated types
 
 	def validate(self):
@@ -87,6 +94,22 @@ class AccountsSettings(Document):
 		if old_doc.acc_frozen_upto != self.acc_frozen_upto:
 			self.validate_pending_reposts()
 
+		# only the rebuild marks the daily balances ready
+		self.account_daily_balance_ready = old_doc.account_daily_balance_ready
+		if self.use_account_daily_balance and not old_doc.use_account_daily_balance:
+			self.account_daily_balance_ready = 0
+			self.rebuild_account_daily_balance()
+		elif not self.use_account_daily_balance:
+			self.account_daily_balance_ready = 0
+
+		# only the rebuild marks the outstandings ready
+		self.voucher_outstanding_ready = old_doc.voucher_outstanding_ready
+		if self.use_voucher_outstanding and not old_doc.use_voucher_outstanding:
+			self.voucher_outstanding_ready = 0
+			self.rebuild_voucher_outstanding()
+		elif not self.use_voucher_outstanding:
+			self.voucher_outstanding_ready = 0
+
 		if clear_cache:
 			frappe.clear_cache()
 
@@ -111,6 +134,24 @@ class AccountsSettings(Document):
 				validate_fields_for_doctype=False,
 			)
 
+	def rebuild_account_daily_balance(self):
+		frappe.enqueue(
+			"erpnext.accounts.doctype.account_daily_balance.account_daily_balance.rebuild_account_daily_balance",
+			queue="long",
+			timeout=3600,
+			enqueue_after_commit=True,
+		)
+		frappe.msgprint(_("Account Daily Balances will be rebuilt in the background."), alert=True)
+
+	def rebuild_voucher_outstanding(self):
+		frappe.enqueue(
+			"erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding.rebuild_voucher_outstanding",
+			queue="long",
+			timeout=3600,
+			enqueue_after_commit=True,
+		)
+		frappe.msgprint(_("Voucher Outstandings will be rebuilt in the background."), alert=True)
+
 	def validate_pending_reposts(self):
 		if self.acc_frozen_upto:
 			check_pending_reposting(self.acc_frozen_upto)
@@ -270,6 +270,12 @@ class GLEntry(Document):
 		validate_party_frozen_disabled(self.party_type, self.party)
 
 	def validate_currency(self):
+		self.validate_account_currency()
+
+		if self.party_type and self.party:
+			validate_party_gle_currency(self.party_type, self.party, self.company, self.account_currency)
+
+	def validate_account_currency(self):
 		company_currency = erpnext.get_company_currency(self.company)
 		account_currency = get_account_currency(self.account)
 
@@ -284,9 +290,6 @@ class GLEntry(Document):
 				InvalidAccountCurrency,
 			)
 
-		if self.party_type and self.party:
-			validate_party_gle_currency(self.party_type, self.party, self.company, self.account_currency)
-
 	def validate_and_set_fiscal_year(self):
 		if not self.fiscal_year:
 			self.fiscal_year = get_fiscal_year(self.posting_date, company=self.company)[0]
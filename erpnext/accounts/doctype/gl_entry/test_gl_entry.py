@@ -8,6 +8,7 @@ from frappe.tests import IntegrationTestCase
 
 from erpnext.accounts.doctype.gl_entry.gl_entry import rename_gle_sle_docs
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 
 
 class TestGLEntry(IntegrationTestCase):
@@ -78,3 +79,64 @@ class TestGLEntry(IntegrationTestCase):
 			"SELECT current from tabSeries where name = %s", naming_series
 		)[0][0]
 		self.assertEqual(old_naming_series_current_value + 2, new_naming_series_current_value)
+
+	def test_bulk_ledger_posting(self):
+		gl_fields = [
+			"account",
+			"party_type",
+			"party",
+			"cost_center",
+			"debit",
+			"credit",
+			"debit_in_account_currency",
+			"credit_in_account_currency",
+			"against_voucher_type",
+			"fiscal_year",
+			"is_cancelled",
+			"docstatus",
+		]
+		ple_fields = ["account", "party_type", "party", "amount", "amount_in_account_currency", "delinked"]
+
+		def get_ledgers(voucher_no):
+			gl_entries = frappe.get_all(
+				"GL Entry",
+				filters={"voucher_type": "Sales Invoice", "voucher_no": voucher_no},
+				fields=gl_fields,
+				order_by="account, debit, credit, is_cancelled",
+			)
+			pl_entries = frappe.get_all(
+				"Payment Ledger Entry",
+				filters={"voucher_type": "Sales Invoice", "voucher_no": voucher_no},
+				fields=ple_fields,
+				order_by="account, amount, delinked",
+			)
+			return gl_entries, pl_entries
+
+		def post_and_cancel_invoice():
+			si = create_sales_invoice(qty=3, rate=100, do_not_submit=True)
+			si.append(
+				"items",
+				{
+					"item_code": "_Test Item",
+					"qty": 2,
+					"rate": 50,
+					"income_account": "Sales - _TC",
+					"cost_center": "_Test Cost Center - _TC",
+				},
+			)
+			si.submit()
+			outstanding = frappe.db.get_value("Sales Invoice", si.name, "outstanding_amount")
+			submitted = get_ledgers(si.name)
+			si.cancel()
+			return outstanding, submitted, get_ledgers(si.name)
+
+		frappe.db.set_single_value("Accounts Settings", "enable_bulk_ledger_posting", 0)
+		expected = post_and_cancel_invoice()
+
+		frappe.db.set_single_value("Accounts Settings", "enable_bulk_ledger_posting", 1)
+		try:
+			actual = post_and_cancel_invoice()
+		finally:
+			frappe.db.set_single_value("Accounts Settings", "enable_bulk_ledger_posting", 0)
+
+		self.assertEqual(actual, expected)
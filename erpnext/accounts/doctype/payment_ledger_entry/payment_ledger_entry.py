@@ -16,6 +16,9 @@ from erpnext.accounts.doctype.gl_entry.gl_entry import (
 	validate_balance_type,
 	validate_frozen_account,
 )
+from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+	update_voucher_outstanding_index,
+)
 from erpnext.accounts.utils import update_voucher_outstanding
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
@@ -168,6 +171,8 @@ class PaymentLedgerEntry(Document):
 				self.validate_allowed_dimensions()
 				validate_balance_type(self.account, adv_adj)
 
+		update_voucher_outstanding_index([self])
+
 		# update outstanding amount
 		if (
 			self.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
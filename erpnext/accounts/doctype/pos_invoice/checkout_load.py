@@ -0,0 +1,110 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""
+Load harness for the batched submission of POS Invoices by concurrent terminals, e.g.
+
+bench execute erpnext.accounts.doctype.pos_invoice.checkout_load.run_concurrent_checkout --kwargs "{'pos_profile': 'Main POS', 'item_code': 'Coffee', 'terminals': 8}"
+
+Every terminal is a thread with its own database connection, sending `batches` batches of
+`batch_size` invoices to `submit_pos_invoices` and committing each. Meant for test sites only, as
+the invoices are submitted for real.
+"""
+
+import threading
+import time
+
+import frappe
+from frappe.utils import flt
+
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_stock_availability, submit_pos_invoices
+from erpnext.accounts.doctype.sales_invoice.sales_invoice import get_bank_cash_account
+
+
+def run_concurrent_checkout(pos_profile, item_code, terminals=4, batches=5, batch_size=20, qty=1, rate=None):
+	"""
+	Submit the invoices from all the terminals at once and return the throughput, the slowest
+	batch and the stock left, which is negative if the terminals oversold the item
+	"""
+	profile = frappe.get_doc("POS Profile", pos_profile)
+	if rate is None:
+		rate = flt(
+			frappe.db.get_value("Item Price", {"item_code": item_code, "selling": 1}, "price_list_rate")
+		)
+
+	payment = next((d for d in profile.payments if d.default), profile.payments[0])
+	payment = frappe._dict(
+		mode_of_payment=payment.mode_of_payment,
+		account=get_bank_cash_account(payment.mode_of_payment, profile.company).get("account"),
+	)
+
+	site, user = frappe.local.site, frappe.session.user
+	results = []
+
+	def run_terminal():
+		frappe.init(site=site)
+		frappe.connect()
+		frappe.set_user(user)
+		try:
+			for _i in range(batches):
+				invoices = [make_invoice(profile, payment, item_code, qty, rate) for _j in range(batch_size)]
+				start = time.perf_counter()
+				result = submit_pos_invoices(invoices)
+				frappe.db.commit()
+				results.append((time.perf_counter() - start, result))
+		finally:
+			frappe.destroy()
+
+	threads = [threading.Thread(target=run_terminal) for _i in range(terminals)]
+	start = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	duration = time.perf_counter() - start
+
+	submitted = sum(len(result["submitted"]) for _duration, result in results)
+	stock_qty, is_stock_item = get_stock_availability(item_code, profile.warehouse)
+
+	return frappe._dict(
+		{
+			"batches": len(results),
+			"submitted": submitted,
+			"failed": sum(len(result["failed"]) for _duration, result in results),
+			"invoices_per_second": flt(submitted / duration, 1) if duration else 0.0,
+			"slowest_batch": flt(max((duration for duration, _result in results), default=0.0), 3),
+			"stock_qty": stock_qty if is_stock_item else None,
+		}
+	)
+
+
+def make_invoice(profile, payment, item_code, qty, rate):
+	"""POS Invoice as queued on a terminal of the POS Profile"""
+	return {
+		"offline_id": frappe.generate_hash(),
+		"pos_profile": profile.name,
+		"company": profile.company,
+		"customer": profile.customer,
+		"currency": profile.currency,
+		"is_pos": 1,
+		"update_stock": 1,
+		"items": [
+			{
+				"item_code": item_code,
+				"warehouse": profile.warehouse,
+				"qty": qty,
+				"rate": rate,
+				"income_account": profile.income_account,
+				"expense_account": profile.expense_account,
+				"cost_center": profile.cost_center,
+			}
+		],
+		"payments": [
+			{
+				"mode_of_payment": payment.mode_of_payment,
+				"account": payment.account,
+				"amount": flt(qty) * flt(rate),
+				"default": 1,
+			}
+		],
+	}
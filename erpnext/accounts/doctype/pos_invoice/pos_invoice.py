@@ -110,6 +110,7 @@ class POSInvoice(SalesInvoice):
 		loyalty_redemption_cost_center: DF.Link | None
 		naming_series: DF.Literal["ACC-PSINV-.YYYY.-"]
 		net_total: DF.Currency
+		offline_id: DF.Data | None
 		other_charges_calculation: DF.TextEditor | None
 		outstanding_amount: DF.Currency
 		packed_items: DF.Table[PackedItem]
@@ -335,7 +336,11 @@ class POSInvoice(SalesInvoice):
 				if is_negative_stock_allowed(item_code=d.item_code):
 					return
 
-				available_stock, is_stock_item = get_stock_availability(d.item_code, d.warehouse)
+				if (d.item_code, d.warehouse) in (self.flags.stock_availability or {}):
+					# read once for the whole batch, see `submit_pos_invoices`
+					available_stock, is_stock_item = self.flags.stock_availability[(d.item_code, d.warehouse)]
+				else:
+					available_stock, is_stock_item = get_stock_availability(d.item_code, d.warehouse)
 
 				item_code, warehouse, _qty = (
 					frappe.bold(d.item_code),
@@ -788,6 +793,222 @@ def get_pos_reserved_qty(item_code, warehouse):
 	return flt(reserved_qty[0].stock_qty) if reserved_qty else 0
 
 
+def get_stock_availability_for_items(item_codes, warehouse):
+	"""Same as `get_stock_availability` for many items at once, returns {item_code: (qty, is_stock_item)}"""
+	item_codes = list(set(item_codes))
+	availability, _bundle_items = get_stock_and_bundle_availability(item_codes, warehouse)
+
+	return {item_code: availability[item_code] for item_code in item_codes}
+
+
+def get_stock_and_bundle_availability(item_codes, warehouse):
+	"""
+	Availability of the items and of the components of the Product Bundles among them, along with
+	the bundles as {bundle: {"items": [components], "reserved_qty": qty}}.
+	"""
+	item_codes = list(set(item_codes))
+	if not item_codes:
+		return {}, {}
+
+	stock_items = dict(
+		frappe.get_all(
+			"Item", filters={"name": ("in", item_codes)}, fields=["name", "is_stock_item"], as_list=True
+		)
+	)
+
+	bundle_items = {}
+	if non_stock_items := [item_code for item_code in item_codes if not stock_items.get(item_code)]:
+		for bundle in frappe.get_all(
+			"Product Bundle", filters={"name": ("in", non_stock_items), "disabled": 0}, pluck="name"
+		):
+			bundle_items[bundle] = frappe._dict(items=[])
+
+	if bundle_items:
+		for row in frappe.get_all(
+			"Product Bundle Item",
+			filters={"parent": ("in", list(bundle_items)), "parenttype": "Product Bundle"},
+			fields=["parent", "item_code", "qty"],
+			order_by="idx",
+		):
+			bundle_items[row.parent]["items"].append(row)
+
+	components = {row.item_code for bundle in bundle_items.values() for row in bundle["items"]}
+	if missing_components := components - set(stock_items):
+		stock_items.update(
+			frappe.get_all(
+				"Item",
+				filters={"name": ("in", list(missing_components))},
+				fields=["name", "is_stock_item"],
+				as_list=True,
+			)
+		)
+
+	all_item_codes = list(set(item_codes) | components)
+	bin_qty = get_bin_qty_for_items(all_item_codes, warehouse)
+	pos_reserved_qty = get_pos_reserved_qty_for_items(all_item_codes, warehouse)
+
+	availability = {}
+	for item_code in all_item_codes:
+		if stock_items.get(item_code):
+			availability[item_code] = (
+				bin_qty.get(item_code, 0) - pos_reserved_qty.get(item_code, 0),
+				True,
+			)
+		elif item_code not in bundle_items:
+			# Is a service item or non_stock item
+			availability[item_code] = (0, False)
+
+	for item_code, bundle in bundle_items.items():
+		bundle.reserved_qty = pos_reserved_qty.get(item_code, 0)
+		availability[item_code] = (get_bundle_qty(bundle, availability), True)
+
+	return availability, bundle_items
+
+
+def get_bundle_qty(bundle, availability):
+	"""Bundles that can be made from the available qty of the components, less the reserved ones"""
+	bundle_bin_qty = 1000000
+	for item in bundle["items"]:
+		available_qty, is_stock_item = availability[item.item_code]
+		max_available_bundles = available_qty / item.qty
+		if bundle_bin_qty > max_available_bundles and is_stock_item:
+			bundle_bin_qty = max_available_bundles
+
+	return bundle_bin_qty - bundle.reserved_qty
+
+
+def get_bin_qty_for_items(item_codes, warehouse):
+	bins = frappe.get_all(
+		"Bin",
+		filters={"item_code": ("in", item_codes), "warehouse": warehouse},
+		fields=["item_code", "actual_qty"],
+	)
+
+	return {row.item_code: row.actual_qty or 0 for row in bins}
+
+
+def get_pos_reserved_qty_for_items(item_codes, warehouse):
+	p_inv = frappe.qb.DocType("POS Invoice")
+	p_item = frappe.qb.DocType("POS Invoice Item")
+
+	reserved_qty = (
+		frappe.qb.from_(p_inv)
+		.from_(p_item)
+		.select(p_item.item_code, Sum(p_item.stock_qty).as_("stock_qty"))
+		.where(
+			(p_inv.name == p_item.parent)
+			& (IfNull(p_inv.consolidated_invoice, "") == "")
+			& (p_item.docstatus == 1)
+			& (p_item.item_code.isin(item_codes))
+			& (p_item.warehouse == warehouse)
+		)
+		.groupby(p_item.item_code)
+	).run(as_dict=True)
+
+	return {row.item_code: flt(row.stock_qty) for row in reserved_qty}
+
+
+@frappe.whitelist(methods=["POST"])
+def submit_pos_invoices(invoices):
+	"""
+	Submit a batch of POS Invoices queued on a terminal, each with a unique `offline_id`.
+
+	The stock of all the items is read once and every invoice is validated against it. Each invoice
+	is submitted on its own savepoint, so the ones that fail are rolled back and reported without
+	affecting the rest of the batch. Invoices already submitted with the same `offline_id`, when a
+	batch is sent again, are not submitted twice.
+	"""
+	invoices = [frappe._dict(invoice) for invoice in frappe.parse_json(invoices)]
+
+	for invoice in invoices:
+		if not invoice.offline_id:
+			frappe.throw(_("Offline ID is required for every POS Invoice in the batch"))
+
+	submitted_invoices = dict(
+		frappe.get_all(
+			"POS Invoice",
+			filters={"offline_id": ("in", [invoice.offline_id for invoice in invoices]), "docstatus": 1},
+			fields=["offline_id", "name"],
+			as_list=True,
+		)
+	)
+	stock_availability, bundle_items = get_stock_availability_for_invoices(invoices)
+
+	submitted, failed = [], []
+	for invoice in invoices:
+		if invoice.offline_id in submitted_invoices:
+			submitted.append(
+				{"offline_id": invoice.offline_id, "name": submitted_invoices[invoice.offline_id]}
+			)
+			continue
+
+		try:
+			frappe.db.savepoint("submit_pos_invoice")
+			doc = frappe.get_doc({**invoice, "doctype": "POS Invoice"})
+			doc.flags.stock_availability = stock_availability
+			doc.submit()
+		except Exception as e:
+			frappe.db.rollback(save_point="submit_pos_invoice")
+			frappe.clear_messages()
+			failed.append({"offline_id": invoice.offline_id, "error": str(e)})
+		else:
+			# the submitted invoice reserves its qty for the ones after it
+			reserve_stock_availability(stock_availability, bundle_items, doc)
+			submitted_invoices[invoice.offline_id] = doc.name
+			submitted.append({"offline_id": invoice.offline_id, "name": doc.name})
+
+	return {"submitted": submitted, "failed": failed}
+
+
+def get_stock_availability_for_invoices(invoices):
+	"""
+	Available stock of the items of the invoices and of the components of their Product Bundles, as
+	{(item_code, warehouse): [qty, is_stock_item]}, along with the bundles as {(bundle, warehouse): bundle}.
+	"""
+	item_codes_by_warehouse = {}
+	for invoice in invoices:
+		default_warehouse = invoice.pos_profile and frappe.get_cached_value(
+			"POS Profile", invoice.pos_profile, "warehouse"
+		)
+		for row in invoice.get("items") or []:
+			warehouse = row.get("warehouse") or default_warehouse
+			if warehouse and row.get("item_code"):
+				item_codes_by_warehouse.setdefault(warehouse, set()).add(row.get("item_code"))
+
+	stock_availability, bundle_items = {}, {}
+	for warehouse, item_codes in item_codes_by_warehouse.items():
+		availability, bundles = get_stock_and_bundle_availability(item_codes, warehouse)
+		for item_code, item_availability in availability.items():
+			stock_availability[(item_code, warehouse)] = list(item_availability)
+		for item_code, bundle in bundles.items():
+			bundle_items[(item_code, warehouse)] = bundle
+
+	return stock_availability, bundle_items
+
+
+def reserve_stock_availability(stock_availability, bundle_items, doc):
+	"""
+	Take the qty of a submitted invoice from the stock snapshot of the batch. A Product Bundle takes
+	its qty from its components, and the qty of every bundle is then worked out again from them.
+	"""
+	warehouses = set()
+	for row in doc.items:
+		if (row.item_code, row.warehouse) in bundle_items:
+			for item in bundle_items[(row.item_code, row.warehouse)]["items"]:
+				stock_availability[(item.item_code, row.warehouse)][0] -= flt(row.stock_qty) * flt(item.qty)
+			warehouses.add(row.warehouse)
+		elif (row.item_code, row.warehouse) in stock_availability:
+			stock_availability[(row.item_code, row.warehouse)][0] -= flt(row.stock_qty)
+			warehouses.add(row.warehouse)
+
+	for (item_code, warehouse), bundle in bundle_items.items():
+		if warehouse in warehouses:
+			availability = {
+				item.item_code: stock_availability[(item.item_code, warehouse)] for item in bundle["items"]
+			}
+			stock_availability[(item_code, warehouse)][0] = get_bundle_qty(bundle, availability)
+
+
 @frappe.whitelist()
 def make_sales_return(source_name, target_doc=None):
 	from erpnext.controllers.sales_and_purchase_return import make_return_doc
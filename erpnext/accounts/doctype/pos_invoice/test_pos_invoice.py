@@ -933,6 +933,59 @@ class TestPOSInvoice(IntegrationTestCase):
 			frappe.db.rollback(save_point="before_test_delivered_serial_no_case")
 			frappe.set_user("Administrator")
 
+	@IntegrationTestCase.change_settings("Stock Settings", {"allow_negative_stock": 0})
+	def test_submit_pos_invoices(self):
+		from erpnext.accounts.doctype.pos_invoice.pos_invoice import submit_pos_invoices
+
+		item = make_item(properties={"is_stock_item": 1}).name
+		make_stock_entry(target="_Test Warehouse - _TC", item_code=item, qty=5, basic_rate=100)
+		pos_profile = make_pos_profile()
+
+		invoices = [make_pos_invoice_dict(pos_profile.name, item, qty=2) for _i in range(3)]
+		result = submit_pos_invoices(invoices)
+
+		# the third invoice is validated against the stock left by the first two
+		self.assertEqual(
+			[d["offline_id"] for d in result["submitted"]], [d["offline_id"] for d in invoices[:2]]
+		)
+		self.assertEqual([d["offline_id"] for d in result["failed"]], [invoices[2]["offline_id"]])
+		for row in result["submitted"]:
+			self.assertEqual(frappe.db.get_value("POS Invoice", row["name"], "docstatus"), 1)
+
+		# sending the batch again does not submit the invoices twice
+		retried = submit_pos_invoices(invoices)
+		self.assertEqual(retried["submitted"], result["submitted"])
+		self.assertEqual(len(retried["failed"]), 1)
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"allow_negative_stock": 0})
+	def test_submit_pos_invoices_of_product_bundle(self):
+		from erpnext.accounts.doctype.pos_invoice.pos_invoice import submit_pos_invoices
+		from erpnext.selling.doctype.product_bundle.test_product_bundle import make_product_bundle
+
+		component = make_item(properties={"is_stock_item": 1}).name
+		bundle = make_item(properties={"is_stock_item": 0}).name
+		make_product_bundle(bundle, [component], qty=2)
+		make_stock_entry(target="_Test Warehouse - _TC", item_code=component, qty=5, basic_rate=100)
+		pos_profile = make_pos_profile()
+
+		invoices = [
+			make_pos_invoice_dict(pos_profile.name, bundle, qty=2),
+			make_pos_invoice_dict(pos_profile.name, component, qty=2),
+			make_pos_invoice_dict(pos_profile.name, bundle, qty=1),
+			make_pos_invoice_dict(pos_profile.name, component, qty=1),
+		]
+		result = submit_pos_invoices(invoices)
+
+		# the bundles take 4 of the 5 components, leaving neither 2 components nor another bundle
+		self.assertEqual(
+			[d["offline_id"] for d in result["submitted"]],
+			[invoices[0]["offline_id"], invoices[3]["offline_id"]],
+		)
+		self.assertEqual(
+			[d["offline_id"] for d in result["failed"]],
+			[invoices[1]["offline_id"], invoices[2]["offline_id"]],
+		)
+
 
 def create_pos_invoice(**args):
 	args = frappe._dict(args)
@@ -1047,3 +1100,33 @@ def make_batch_item(item_name):
 
 	if not frappe.db.exists(item_name):
 		return make_item(item_name, dict(has_batch_no=1, create_new_batch=1, is_stock_item=1))
+
+
+def make_pos_invoice_dict(pos_profile, item_code, qty=1, rate=100):
+	"""POS Invoice as queued on a terminal, to be submitted with `submit_pos_invoices`"""
+	return {
+		"offline_id": frappe.generate_hash(),
+		"pos_profile": pos_profile,
+		"company": "_Test Company",
+		"customer": "_Test Customer",
+		"debit_to": "Debtors - _TC",
+		"currency": "INR",
+		"conversion_rate": 1,
+		"is_pos": 1,
+		"update_stock": 1,
+		"account_for_change_amount": "Cash - _TC",
+		"items": [
+			{
+				"item_code": item_code,
+				"warehouse": "_Test Warehouse - _TC",
+				"qty": qty,
+				"rate": rate,
+				"income_account": "Sales - _TC",
+				"expense_account": "Cost of Goods Sold - _TC",
+				"cost_center": "_Test Cost Center - _TC",
+			}
+		],
+		"payments": [
+			{"mode_of_payment": "Cash", "account": "Cash - _TC", "amount": qty * rate, "default": 1}
+		],
+	}
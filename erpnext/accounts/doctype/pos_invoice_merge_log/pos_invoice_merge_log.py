@@ -168,9 +168,11 @@ class POSInvoiceMergeLog(Document):
 		return credit_note.name
 
 	def merge_pos_invoice_into(self, invoice, data):
+		# rows are merged through dicts keyed on the fields they are grouped by, so every row of the
+		# POS invoices is matched in constant time instead of scanning the rows merged so far
 		items, payments, taxes = [], [], []
-
-		loyalty_amount_sum, loyalty_points_sum = 0, 0
+		item_map, payment_map, tax_map = {}, {}, {}
+		item_wise_tax_details = {}
 
 		rounding_adjustment, base_rounding_adjustment = 0, 0
 		rounded_total, base_rounded_total = 0, 0
@@ -187,69 +189,69 @@ class POSInvoiceMergeLog(Document):
 				loyalty_amount_sum += doc.loyalty_amount
 
 			for item in doc.get("items"):
-				found = False
-				for i in items:
-					if (
-						i.item_code == item.item_code
-						and not i.serial_and_batch_bundle
-						and not i.serial_no
-						and not i.batch_no
-						and i.uom == item.uom
-						and i.net_rate == item.net_rate
-						and i.warehouse == item.warehouse
-					):
-						found = True
-						i.qty = i.qty + item.qty
-						i.amount = i.amount + item.net_amount
-						i.net_amount = i.amount
-						i.base_amount = i.base_amount + item.base_net_amount
-						i.base_net_amount = i.base_amount
-
-				if not found:
-					item.rate = item.net_rate
-					item.amount = item.net_amount
-					item.base_amount = item.base_net_amount
-					item.price_list_rate = 0
-					si_item = map_child_doc(item, invoice, {"doctype": "Sales Invoice Item"})
-					if item.serial_and_batch_bundle:
-						si_item.serial_and_batch_bundle = item.serial_and_batch_bundle
-					items.append(si_item)
+				key = (item.item_code, item.uom, item.net_rate, item.warehouse)
+				if i := item_map.get(key):
+					i.qty = i.qty + item.qty
+					i.amount = i.amount + item.net_amount
+					i.net_amount = i.amount
+					i.base_amount = i.base_amount + item.base_net_amount
+					i.base_net_amount = i.base_amount
+					continue
+
+				item.rate = item.net_rate
+				item.amount = item.net_amount
+				item.base_amount = item.base_net_amount
+				item.price_list_rate = 0
+				si_item = map_child_doc(item, invoice, {"doctype": "Sales Invoice Item"})
+				if item.serial_and_batch_bundle:
+					si_item.serial_and_batch_bundle = item.serial_and_batch_bundle
+				items.append(si_item)
+
+				# rows with serial or batch nos are kept as is, other rows are merged into them
+				if not (si_item.serial_and_batch_bundle or si_item.serial_no or si_item.batch_no):
+					item_map[key] = si_item
 
 			for tax in doc.get("taxes"):
-				found = False
-				for t in taxes:
-					if t.account_head == tax.account_head and t.cost_center == tax.cost_center:
-						t.tax_amount = flt(t.tax_amount) + flt(tax.tax_amount_after_discount_amount)
-						t.base_tax_amount = flt(t.base_tax_amount) + flt(
-							tax.base_tax_amount_after_discount_amount
-						)
-						update_item_wise_tax_detail(t, tax)
-						found = True
-				if not found:
-					tax.charge_type = "Actual"
-					tax.idx = idx
-					idx += 1
-					tax.included_in_print_rate = 0
-					tax.tax_amount = tax.tax_amount_after_discount_amount
-					tax.base_tax_amount = tax.base_tax_amount_after_discount_amount
-					tax.item_wise_tax_detail = tax.item_wise_tax_detail
-					taxes.append(tax)
+				key = (tax.account_head, tax.cost_center)
+				if t := tax_map.get(key):
+					t.tax_amount = flt(t.tax_amount) + flt(tax.tax_amount_after_discount_amount)
+					t.base_tax_amount = flt(t.base_tax_amount) + flt(
+						tax.base_tax_amount_after_discount_amount
+					)
+					if key not in item_wise_tax_details:
+						item_wise_tax_details[key] = json.loads(t.item_wise_tax_detail) or {}
+					merge_item_wise_tax_detail(
+						item_wise_tax_details[key], json.loads(tax.item_wise_tax_detail)
+					)
+					continue
+
+				tax.charge_type = "Actual"
+				tax.idx = idx
+				idx += 1
+				tax.included_in_print_rate = 0
+				tax.tax_amount = tax.tax_amount_after_discount_amount
+				tax.base_tax_amount = tax.base_tax_amount_after_discount_amount
+				taxes.append(tax)
+				tax_map[key] = tax
 
 			for payment in doc.get("payments"):
-				found = False
-				for pay in payments:
-					if pay.account == payment.account and pay.mode_of_payment == payment.mode_of_payment:
-						pay.amount = flt(pay.amount) + flt(payment.amount)
-						pay.base_amount = flt(pay.base_amount) + flt(payment.base_amount)
-						found = True
-				if not found:
-					payments.append(payment)
+				key = (payment.account, payment.mode_of_payment)
+				if pay := payment_map.get(key):
+					pay.amount = flt(pay.amount) + flt(payment.amount)
+					pay.base_amount = flt(pay.base_amount) + flt(payment.base_amount)
+					continue
+
+				payments.append(payment)
+				payment_map[key] = payment
 
 			rounding_adjustment += doc.rounding_adjustment
 			rounded_total += doc.rounded_total
 			base_rounding_adjustment += doc.base_rounding_adjustment
 			base_rounded_total += doc.base_rounded_total
 
+		for key, item_wise_tax_detail in item_wise_tax_details.items():
+			tax_map[key].item_wise_tax_detail = json.dumps(item_wise_tax_detail, separators=(",", ":"))
+
 		if loyalty_points_sum:
 			invoice.redeem_loyalty_points = 1
 			invoice.loyalty_points = loyalty_points_sum
@@ -335,6 +337,12 @@ def update_item_wise_tax_detail(consolidate_tax_row, tax_row):
 	if not consolidated_tax_detail:
 		consolidated_tax_detail = {}
 
+	merge_item_wise_tax_detail(consolidated_tax_detail, tax_row_detail)
+
+	consolidate_tax_row.item_wise_tax_detail = json.dumps(consolidated_tax_detail, separators=(",", ":"))
+
+
+def merge_item_wise_tax_detail(consolidated_tax_detail, tax_row_detail):
 	for item_code, tax_data in tax_row_detail.items():
 		if consolidated_tax_detail.get(item_code):
 			consolidated_tax_data = consolidated_tax_detail.get(item_code)
@@ -344,8 +352,6 @@ def update_item_wise_tax_detail(consolidate_tax_row, tax_row):
 		else:
 			consolidated_tax_detail.update({item_code: [tax_data[0], tax_data[1]]})
 
-	consolidate_tax_row.item_wise_tax_detail = json.dumps(consolidated_tax_detail, separators=(",", ":"))
-
 
 def get_all_unconsolidated_invoices():
 	filters = {
@@ -380,16 +386,63 @@ def get_invoice_customer_map(pos_invoices):
 	return pos_invoice_customer_map
 
 
+def get_pending_invoices(invoices):
+	"""Invoices not consolidated yet, so that a consolidation that failed midway resumes from there"""
+	consolidated_invoices = set(
+		frappe.get_all(
+			"POS Invoice",
+			filters={
+				"name": ("in", [d.pos_invoice for d in invoices]),
+				"consolidated_invoice": ("is", "set"),
+			},
+			pluck="name",
+		)
+		if invoices
+		else []
+	)
+
+	return [d for d in invoices if d.pos_invoice not in consolidated_invoices]
+
+
+def split_invoice_customer_map(invoice_by_customer, workers):
+	"""Split the customers across the workers, balancing the number of invoices each worker merges"""
+	batches = [{} for _i in range(max(cint(workers), 1))]
+	invoice_counts = [0] * len(batches)
+
+	for customer, invoices in sorted(invoice_by_customer.items(), key=lambda d: len(d[1]), reverse=True):
+		batch_no = invoice_counts.index(min(invoice_counts))
+		batches[batch_no][customer] = invoices
+		invoice_counts[batch_no] += len(invoices)
+
+	return [batch for batch in batches if batch]
+
+
+def get_pos_closing_workers():
+	return max(cint(frappe.db.get_single_value("Accounts Settings", "pos_closing_workers")), 1)
+
+
 def consolidate_pos_invoices(pos_invoices=None, closing_entry=None):
 	invoices = pos_invoices or (closing_entry and closing_entry.get("pos_transactions"))
 	if frappe.flags.in_test and not invoices:
 		invoices = get_all_unconsolidated_invoices()
 
+	if closing_entry:
+		check_merge_jobs(closing_entry)
+		invoices = get_pending_invoices(invoices)
+
 	invoice_by_customer = get_invoice_customer_map(invoices)
 
 	if len(invoices) >= 10 and closing_entry:
 		closing_entry.set_status(update=True, status="Queued")
-		enqueue_job(create_merge_logs, invoice_by_customer=invoice_by_customer, closing_entry=closing_entry)
+		batches = split_invoice_customer_map(invoice_by_customer, get_pos_closing_workers())
+		for job_no, batch in enumerate(batches):
+			enqueue_job(
+				create_merge_logs,
+				job_no=job_no,
+				invoice_by_customer=batch,
+				closing_entry=closing_entry,
+				commit_each=True,
+			)
 	else:
 		create_merge_logs(invoice_by_customer, closing_entry)
 
@@ -459,7 +512,7 @@ def split_invoices(invoices):
 	return _invoices
 
 
-def create_merge_logs(invoice_by_customer, closing_entry=None):
+def create_merge_logs(invoice_by_customer, closing_entry=None, commit_each=False):
 	try:
 		for customer, invoices in invoice_by_customer.items():
 			for _invoices in split_invoices(invoices):
@@ -475,10 +528,13 @@ def create_merge_logs(invoice_by_customer, closing_entry=None):
 				merge_log.set("pos_invoices", _invoices)
 				merge_log.save(ignore_permissions=True)
 				merge_log.submit()
+
+				if commit_each and not frappe.flags.in_test:
+					# checkpoint, a failure later on does not roll back the merge logs created so far
+					frappe.db.commit()
+
 		if closing_entry:
-			closing_entry.set_status(update=True, status="Submitted")
-			closing_entry.db_set("error_message", "")
-			closing_entry.update_opening_entry()
+			complete_closing_entry(closing_entry)
 
 	except Exception as e:
 		frappe.db.rollback()
@@ -497,6 +553,18 @@ def create_merge_logs(invoice_by_customer, closing_entry=None):
 		frappe.publish_realtime("closing_process_complete", user=frappe.session.user)
 
 
+def complete_closing_entry(closing_entry):
+	# when the invoices are merged by several jobs, the closing entry is completed by the job that
+	# finds all of them consolidated, the lock makes sure the jobs check one after the other
+	frappe.db.get_value("POS Closing Entry", closing_entry.name, "name", for_update=True)
+	if get_pending_invoices(closing_entry.get("pos_transactions")):
+		return
+
+	closing_entry.set_status(update=True, status="Submitted")
+	closing_entry.db_set("error_message", "")
+	closing_entry.update_opening_entry()
+
+
 def cancel_merge_logs(merge_logs, closing_entry=None):
 	try:
 		for log in merge_logs:
@@ -524,12 +592,30 @@ def cancel_merge_logs(merge_logs, closing_entry=None):
 		frappe.publish_realtime("closing_process_complete", user=frappe.session.user)
 
 
-def enqueue_job(job, **kwargs):
+def check_merge_jobs(closing_entry):
+	job_ids = [get_merge_job_id(closing_entry, job_no) for job_no in range(get_pos_closing_workers())]
+	if any(is_job_enqueued(job_id) for job_id in job_ids):
+		frappe.throw(
+			_("POS Invoices of {0} are already being consolidated in a background process").format(
+				frappe.bold(closing_entry.name)
+			)
+		)
+
+
+def get_merge_job_id(closing_entry, job_no=0):
+	job_id = "pos_invoice_merge::" + str(closing_entry.get("name"))
+	if job_no:
+		job_id += f"::{job_no}"
+
+	return job_id
+
+
+def enqueue_job(job, job_no=0, **kwargs):
 	check_scheduler_status()
 
 	closing_entry = kwargs.get("closing_entry") or {}
 
-	job_id = "pos_invoice_merge::" + str(closing_entry.get("name"))
+	job_id = get_merge_job_id(closing_entry, job_no)
 	if not is_job_enqueued(job_id):
 		enqueue(
 			job,
@@ -541,6 +627,9 @@ def enqueue_job(job, **kwargs):
 			now=frappe.conf.developer_mode or frappe.flags.in_test,
 		)
 
+		if job_no:
+			return
+
 		if job == create_merge_logs:
 			msg = _("POS Invoices will be consolidated in a background process")
 		else:
@@ -5,12 +5,14 @@ import json
 import frappe
 from frappe.tests import IntegrationTestCase, UnitTestCase
 
+from erpnext.accounts.doctype.pos_closing_entry.pos_closing_entry import make_closing_entry_from_opening
 from erpnext.accounts.doctype.pos_closing_entry.test_pos_closing_entry import init_user_and_profile
 from erpnext.accounts.doctype.pos_invoice.pos_invoice import make_sales_return
 from erpnext.accounts.doctype.pos_invoice.test_pos_invoice import create_pos_invoice
 from erpnext.accounts.doctype.pos_invoice_merge_log.pos_invoice_merge_log import (
 	consolidate_pos_invoices,
 )
+from erpnext.accounts.doctype.pos_opening_entry.test_pos_opening_entry import create_opening_entry
 from erpnext.stock.doctype.serial_and_batch_bundle.test_serial_and_batch_bundle import (
 	get_serial_nos_from_bundle,
 )
@@ -455,3 +457,90 @@ class TestPOSInvoiceMergeLog(IntegrationTestCase):
 			frappe.set_user("Administrator")
 			frappe.db.sql("delete from `tabPOS Profile`")
 			frappe.db.sql("delete from `tabPOS Invoice`")
+
+	@IntegrationTestCase.change_settings("Accounts Settings", {"pos_closing_workers": 2})
+	def test_consolidation_across_workers(self):
+		frappe.db.sql("delete from `tabPOS Invoice`")
+
+		try:
+			make_stock_entry(item_code="_Test Item", to_warehouse="_Test Warehouse - _TC", qty=12, rate=100)
+			test_user, pos_profile = init_user_and_profile()
+			opening_entry = create_opening_entry(pos_profile, test_user.name)
+
+			for customer in ("_Test Customer", "_Test Customer 2"):
+				for _i in range(6):
+					make_paid_pos_invoice(customer=customer, rate=100)
+
+			closing_entry = make_closing_entry_from_opening(opening_entry)
+			closing_entry.submit()
+
+			closing_entry.reload()
+			self.assertEqual(closing_entry.status, "Submitted")
+
+			merge_logs = frappe.get_all(
+				"POS Invoice Merge Log",
+				filters={"pos_closing_entry": closing_entry.name},
+				fields=["customer", "consolidated_invoice"],
+			)
+			self.assertEqual(len(merge_logs), 2)
+
+			for merge_log in merge_logs:
+				# the six invoices of the customer are merged into a single row
+				consolidated_invoice = frappe.get_doc("Sales Invoice", merge_log.consolidated_invoice)
+				self.assertEqual(len(consolidated_invoice.items), 1)
+				self.assertEqual(consolidated_invoice.items[0].qty, 6)
+				self.assertEqual(consolidated_invoice.grand_total, 600)
+				self.assertEqual(consolidated_invoice.payments[0].amount, 600)
+
+		finally:
+			frappe.set_user("Administrator")
+			frappe.db.sql("delete from `tabPOS Profile`")
+			frappe.db.sql("delete from `tabPOS Invoice`")
+
+	def test_consolidation_resumes_from_consolidated_invoices(self):
+		frappe.db.sql("delete from `tabPOS Invoice`")
+
+		try:
+			test_user, pos_profile = init_user_and_profile()
+			opening_entry = create_opening_entry(pos_profile, test_user.name)
+
+			pos_inv = make_paid_pos_invoice(rate=300)
+			pos_inv2 = make_paid_pos_invoice(customer="_Test Customer 2", rate=200)
+
+			closing_entry = make_closing_entry_from_opening(opening_entry)
+			closing_entry.insert()
+
+			# the invoices of the first customer were consolidated before the closing failed
+			consolidate_pos_invoices(
+				pos_invoices=[frappe._dict(pos_invoice=pos_inv.name, customer=pos_inv.customer, is_return=0)]
+			)
+			pos_inv.load_from_db()
+			consolidated_invoice = pos_inv.consolidated_invoice
+
+			closing_entry.retry()
+
+			merge_logs = frappe.get_all(
+				"POS Invoice Merge Log", filters={"pos_closing_entry": closing_entry.name}, pluck="customer"
+			)
+			self.assertEqual(merge_logs, ["_Test Customer 2"])
+
+			pos_inv.load_from_db()
+			self.assertEqual(pos_inv.consolidated_invoice, consolidated_invoice)
+			pos_inv2.load_from_db()
+			self.assertTrue(pos_inv2.consolidated_invoice)
+			self.assertEqual(
+				frappe.db.get_value("POS Closing Entry", closing_entry.name, "status"), "Submitted"
+			)
+
+		finally:
+			frappe.set_user("Administrator")
+			frappe.db.sql("delete from `tabPOS Profile`")
+			frappe.db.sql("delete from `tabPOS Invoice`")
+
+
+def make_paid_pos_invoice(rate, **args):
+	pos_inv = create_pos_invoice(rate=rate, do_not_submit=1, **args)
+	pos_inv.append("payments", {"mode_of_payment": "Cash", "account": "Cash - _TC", "amount": rate})
+	pos_inv.submit()
+
+	return pos_inv
@@ -168,10 +168,16 @@ class POSProfile(Document):
 			frappe.throw(msg.format(", ".join(invalid_modes)), title=_("Missing Account"))
 
 	def on_update(self):
+		from erpnext.selling.page.point_of_sale.point_of_sale import clear_item_catalog
+
 		self.set_defaults()
+		clear_item_catalog(self.name)
 
 	def on_trash(self):
+		from erpnext.selling.page.point_of_sale.point_of_sale import clear_item_catalog
+
 		self.set_defaults(include_current_pos=False)
+		clear_item_catalog(self.name)
 
 	def set_defaults(self, include_current_pos=True):
 		frappe.defaults.clear_default("is_pos")
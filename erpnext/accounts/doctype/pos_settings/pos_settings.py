@@ -2,6 +2,8 @@
 # For license information, please see license.txt
 
 
+import frappe
+from frappe import _
 from frappe.model.document import Document
 
 
@@ -23,3 +25,22 @@ class POSSettings(Document):
 
 	def validate(self):
 		pass
+
+	def on_update(self):
+		from erpnext.stock.doctype.item_search_token.item_search_token import is_item_search_index_enabled
+
+		if is_item_search_index_enabled() and self.has_search_fields_changed():
+			# the search fields are indexed along with the other values of the items
+			frappe.enqueue(
+				"erpnext.stock.doctype.item_search_token.item_search_token.rebuild_item_search_index",
+				queue="long",
+				timeout=3600,
+				enqueue_after_commit=True,
+			)
+			frappe.msgprint(_("The item search index will be rebuilt in the background."), alert=True)
+
+	def has_search_fields_changed(self):
+		doc_before_save = self.get_doc_before_save()
+		old_fields = {d.fieldname for d in doc_before_save.pos_search_fields} if doc_before_save else set()
+
+		return old_fields != {d.fieldname for d in self.pos_search_fields}
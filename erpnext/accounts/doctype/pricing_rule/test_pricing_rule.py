@@ -1393,6 +1393,56 @@ class TestPricingRule(IntegrationTestCase):
 		debit_note.delete()
 		pi.cancel()
 
+	def test_pricing_rule_index(self):
+		"Rules matched from the cached index should be the same as the ones queried"
+		from erpnext.accounts.doctype.pricing_rule.utils import (
+			_get_pricing_rules,
+			clear_pricing_rule_index,
+		)
+
+		make_pricing_rule(title="_Test Index Item Rule", selling=1, priority=2, discount_percentage=5)
+		make_pricing_rule(
+			title="_Test Index Item Group Rule",
+			apply_on="Item Group",
+			item_group="All Item Groups",
+			selling=1,
+			discount_percentage=10,
+		)
+		make_pricing_rule(
+			title="_Test Index Customer Rule",
+			applicable_for="Customer",
+			customer="_Test Customer",
+			selling=1,
+			priority=20,
+			discount_percentage=15,
+		)
+		make_pricing_rule(title="_Test Index Buying Rule", buying=1, discount_percentage=20)
+
+		args = frappe._dict(
+			{
+				"item_code": "_Test Item",
+				"item_group": "_Test Item Group",
+				"company": "_Test Company",
+				"customer": "_Test Customer",
+				"customer_group": "_Test Customer Group",
+				"territory": "_Test Territory",
+				"transaction_type": "selling",
+				"transaction_date": frappe.utils.nowdate(),
+				"doctype": "Sales Order Item",
+			}
+		)
+
+		for apply_on in ("Item Code", "Item Group", "Brand"):
+			with self.change_settings("Accounts Settings", {"use_pricing_rule_index": 0}):
+				expected = _get_pricing_rules(apply_on, args.copy(), {})
+
+			clear_pricing_rule_index()
+			with self.change_settings("Accounts Settings", {"use_pricing_rule_index": 1}):
+				actual = _get_pricing_rules(apply_on, args.copy(), {})
+
+			self.assertEqual([d.name for d in actual], [d.name for d in expected])
+			self.assertEqual(actual, expected)
+
 
 EXTRA_TEST_RECORD_DEPENDENCIES = ["UTM Campaign"]
 
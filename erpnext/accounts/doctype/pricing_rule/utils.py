@@ -7,10 +7,11 @@
 import copy
 import json
 import math
+from functools import partial
 
 import frappe
 from frappe import _, bold
-from frappe.utils import cint, flt, fmt_money, get_link_to_form, getdate, today
+from frappe.utils import cint, cstr, flt, fmt_money, get_link_to_form, getdate, today
 
 from erpnext.setup.doctype.item_group.item_group import get_child_item_groups
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
@@ -28,7 +29,7 @@ def get_pricing_rules(args, doc=None):
 	pricing_rules = []
 	values = {}
 
-	if not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
+	if not has_pricing_rules(args.transaction_type):
 		return
 
 	for apply_on in ["Item Code", "Item Group", "Brand"]:
@@ -105,6 +106,9 @@ def _get_pricing_rules(apply_on, args, values):
 	if not args.get(apply_on_field):
 		return []
 
+	if is_pricing_rule_index_enabled():
+		return _get_pricing_rules_from_index(apply_on, args)
+
 	child_doc = f"`tabPricing Rule {apply_on}`"
 
 	conditions = item_variant_condition = item_conditions = ""
@@ -173,6 +177,159 @@ def _get_pricing_rules(apply_on, args, values):
 	return pricing_rules
 
 
+def is_pricing_rule_index_enabled():
+	return cint(frappe.db.get_single_value("Accounts Settings", "use_pricing_rule_index", cache=True))
+
+
+def has_pricing_rules(transaction_type):
+	if is_pricing_rule_index_enabled():
+		return any(rule.get(transaction_type) for rule in get_pricing_rule_index().rules.values())
+
+	return frappe.db.exists("Pricing Rule", {"disable": 0, transaction_type: 1})
+
+
+def get_pricing_rule_index():
+	return frappe.cache().get_value("pricing_rule_index", build_pricing_rule_index)
+
+
+def clear_pricing_rule_index():
+	"""
+	Remove the index, and again once the transaction ends, as it may be rebuilt from the
+	uncommitted rules in the meantime.
+	"""
+	frappe.cache().delete_value("pricing_rule_index")
+	frappe.db.after_commit.add(partial(frappe.cache().delete_value, "pricing_rule_index"))
+	frappe.db.after_rollback.add(partial(frappe.cache().delete_value, "pricing_rule_index"))
+
+
+def build_pricing_rule_index():
+	"""
+	Index of the enabled pricing rules, with their Item Code / Item Group / Brand rows
+	keyed by value and the rules that apply on other items keyed by that other value.
+
+	        {
+	                "rules": {name: pricing_rule},
+	                "rows": {apply_on: {value: [row, ...]}},
+	                "rows_by_rule": {apply_on: {name: [row, ...]}},
+	                "other": {apply_on: {other value: [name, ...]}},
+	        }
+	"""
+	rules = {
+		rule.name: rule
+		for rule in frappe.db.sql("select * from `tabPricing Rule` where disable = 0", as_dict=1)
+	}
+	index = frappe._dict(rules=rules, rows={}, rows_by_rule={}, other={})
+
+	for apply_on in apply_on_table:
+		apply_on_field = frappe.scrub(apply_on)
+		rows, rows_by_rule, other = {}, {}, {}
+
+		for row in frappe.get_all(
+			f"Pricing Rule {apply_on}",
+			filters={"parenttype": "Pricing Rule", "parent": ("in", list(rules) or [""])},
+			fields=["name", "parent", apply_on_field, "uom"],
+			order_by="idx",
+		):
+			rows.setdefault(cstr(row.get(apply_on_field)), []).append(row)
+			rows_by_rule.setdefault(row.parent, []).append(row)
+
+		for rule in rules.values():
+			if rule.apply_rule_on_other is not None and rule.get(f"other_{apply_on_field}"):
+				other.setdefault(rule.get(f"other_{apply_on_field}"), []).append(rule.name)
+
+		index.rows[apply_on] = rows
+		index.rows_by_rule[apply_on] = rows_by_rule
+		index.other[apply_on] = other
+
+	return index
+
+
+def _get_pricing_rules_from_index(apply_on, args):
+	"""Same result as the query in `_get_pricing_rules`, matched against the cached index"""
+	apply_on_field = frappe.scrub(apply_on)
+	index = get_pricing_rule_index()
+	value = args.get(apply_on_field)
+
+	def match_uom(row):
+		return not args.get("uom") or cstr(row.uom) in (args.get("uom"), "")
+
+	rows = {}
+	if apply_on_field == "item_group":
+		for item_group in _get_tree_values(args, "Item Group"):
+			rows.update((row.name, row) for row in index.rows[apply_on].get(item_group, []) if match_uom(row))
+	else:
+		rows.update(
+			(row.name, row)
+			for row in index.rows[apply_on].get(value, [])
+			if apply_on_field == "brand" or match_uom(row)
+		)
+
+	if apply_on_field == "item_code":
+		if "variant_of" not in args:
+			args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+
+		if args.variant_of:
+			rows.update((row.name, row) for row in index.rows[apply_on].get(args.variant_of, []))
+
+	for rule_name in index.other[apply_on].get(value, []):
+		rows.update((row.name, row) for row in index.rows_by_rule[apply_on].get(rule_name, []))
+
+	if not args.price_list:
+		args.price_list = None
+
+	pricing_rules = []
+	for row in rows.values():
+		rule = index.rules[row.parent]
+		if match_pricing_rule(rule, args):
+			pricing_rule = frappe._dict(rule)
+			pricing_rule.update({apply_on_field: row.get(apply_on_field), "uom": row.uom})
+			pricing_rules.append(pricing_rule)
+
+	return sorted(pricing_rules, key=lambda d: (cstr(d.priority), d.name), reverse=True)
+
+
+def match_pricing_rule(rule, args):
+	"""Document level conditions of a pricing rule, as applied by `get_other_conditions`"""
+	if not rule.get(args.transaction_type):
+		return False
+
+	if cstr(rule.for_price_list) not in (args.price_list, ""):
+		return False
+
+	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
+		if cstr(rule.get(field)) not in ((args.get(field), "") if args.get(field) else ("",)):
+			return False
+
+	for parenttype in ["Customer Group", "Territory", "Supplier Group", "Warehouse"]:
+		if args.get(frappe.scrub(parenttype)) and cstr(rule.get(frappe.scrub(parenttype))) not in (
+			[*_get_tree_values(args, parenttype), ""]
+		):
+			return False
+
+	if args.get("transaction_date") and not (
+		getdate(rule.valid_from or "2000-01-01")
+		<= getdate(args.transaction_date)
+		<= getdate(rule.valid_upto or "2500-12-31")
+	):
+		return False
+
+	if args.get("doctype") in [
+		"Quotation",
+		"Quotation Item",
+		"Sales Order",
+		"Sales Order Item",
+		"Delivery Note",
+		"Delivery Note Item",
+		"Sales Invoice",
+		"Sales Invoice Item",
+		"POS Invoice",
+		"POS Invoice Item",
+	]:
+		return bool(cint(rule.selling))
+
+	return bool(cint(rule.buying))
+
+
 def apply_multiple_pricing_rules(pricing_rules):
 	for d in pricing_rules:
 		if not d.apply_multiple_pricing_rules:
@@ -191,29 +348,7 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 		if key in frappe.flags.tree_conditions:
 			return frappe.flags.tree_conditions[key]
 
-		try:
-			lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
-		except TypeError:
-			frappe.throw(_("Invalid {0}").format(args.get(field)))
-
-		parent_groups = frappe.db.sql_list(
-			"""select name from `tab{}`
-			where lft<={} and rgt>={}""".format(parenttype, "%s", "%s"),
-			(lft, rgt),
-		)
-
-		if parenttype in ["Customer Group", "Item Group", "Territory"]:
-			parent_field = f"parent_{frappe.scrub(parenttype)}"
-			root_name = frappe.db.get_list(
-				parenttype,
-				{"is_group": 1, parent_field: ("is", "not set")},
-				"name",
-				as_list=1,
-				ignore_permissions=True,
-			)
-
-			if root_name and root_name[0][0]:
-				parent_groups.append(root_name[0][0])
+		parent_groups = _get_tree_values(args, parenttype)
 
 		if parent_groups:
 			if allow_blank:
@@ -226,6 +361,44 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 	return condition
 
 
+def _get_tree_values(args, parenttype):
+	"""Ancestors of the tree node in args (including itself) that pricing rules can be set for"""
+	field = frappe.scrub(parenttype)
+	if not frappe.flags.tree_values:
+		frappe.flags.tree_values = {}
+
+	key = (parenttype, args.get(field))
+	if key in frappe.flags.tree_values:
+		return list(frappe.flags.tree_values[key])
+
+	try:
+		lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
+	except TypeError:
+		frappe.throw(_("Invalid {0}").format(args.get(field)))
+
+	parent_groups = frappe.db.sql_list(
+		"""select name from `tab{}`
+		where lft<={} and rgt>={}""".format(parenttype, "%s", "%s"),
+		(lft, rgt),
+	)
+
+	if parenttype in ["Customer Group", "Item Group", "Territory"]:
+		parent_field = f"parent_{frappe.scrub(parenttype)}"
+		root_name = frappe.db.get_list(
+			parenttype,
+			{"is_group": 1, parent_field: ("is", "not set")},
+			"name",
+			as_list=1,
+			ignore_permissions=True,
+		)
+
+		if root_name and root_name[0][0]:
+			parent_groups.append(root_name[0][0])
+
+	frappe.flags.tree_values[key] = parent_groups
+	return list(parent_groups)
+
+
 def get_other_conditions(conditions, values, args):
 	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
 		if args.get(field):
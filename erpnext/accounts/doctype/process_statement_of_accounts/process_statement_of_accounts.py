@@ -8,7 +8,8 @@ import frappe
 from frappe import _
 from frappe.desk.reportview import get_match_cond
 from frappe.model.document import Document
-from frappe.utils import add_days, add_months, format_date, getdate, today
+from frappe.utils import add_days, add_months, create_batch, format_date, getdate, today
+from frappe.utils.background_jobs import is_job_enqueued
 from frappe.utils.jinja import validate_template
 from frappe.utils.pdf import get_pdf
 from frappe.www.printview import get_print_style
@@ -19,7 +20,24 @@ from erpnext.accounts.report.accounts_receivable.accounts_receivable import exec
 from erpnext.accounts.report.accounts_receivable_summary.accounts_receivable_summary import (
 	execute as get_ageing,
 )
-from erpnext.accounts.report.general_ledger.general_ledger import execute as get_soa
+from erpnext.accounts.report.general_ledger.general_ledger import (
+	get_columns as get_gl_columns,
+)
+from erpnext.accounts.report.general_ledger.general_ledger import (
+	get_data_with_opening_closing,
+	get_gl_entries,
+	get_result_as_list,
+	get_supplier_invoice_details,
+	prepare_filters,
+	set_account_currency,
+)
+from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
+
+# customers whose statements are built from one run of the report
+STATEMENT_BATCH_SIZE = 500
+# background jobs sending the statements of a document
+STATEMENT_WORKERS = 4
+STATEMENT_PROGRESS_KEY = "statement_of_accounts"
 
 
 class ProcessStatementOfAccounts(Document):
@@ -115,50 +133,144 @@ def get_report_pdf(doc, consolidated=True):
 		return statement_dict
 
 
-def get_statement_dict(doc, get_statement_dict=False):
+def get_statement_dict(doc, get_statement_dict=False, customers=None):
+	"""
+	Statements of the customers of the document (or the given ones), in batches of customers whose
+	ledger or receivables are read by a single run of the report and split per customer.
+	"""
 	statement_dict = {}
-	ageing = ""
+	entries = doc.customers
+	if customers is not None:
+		customers = set(customers)
+		entries = [entry for entry in entries if entry.customer in customers]
+
+	for batch in create_batch(entries, STATEMENT_BATCH_SIZE):
+		statement_dict.update(get_batch_statement_dict(doc, batch, get_statement_dict))
+
+	return statement_dict
+
+
+def get_batch_statement_dict(doc, entries, get_statement_dict=False):
+	ageing_map = get_ageing_map(doc, [entry.customer for entry in entries]) if doc.include_ageing else {}
+
+	if doc.report == "General Ledger":
+		statements = get_gl_statements(doc, entries)
+	else:
+		statements = get_ar_statements(doc, entries)
+
+	statement_dict = {}
+	for entry in entries:
+		if entry.customer not in statements:
+			continue
+
+		filters, col, res = statements[entry.customer]
+		ageing = ageing_map.get(entry.customer, []) if doc.include_ageing else ""
 
-	for entry in doc.customers:
-		if doc.include_ageing:
-			ageing = set_ageing(doc, entry)
+		statement_dict[entry.customer] = (
+			[res, ageing] if get_statement_dict else get_html(doc, filters, entry, col, res, ageing)
+		)
+
+	return statement_dict
+
+
+def get_report_filters(doc):
+	filters = get_common_filters(doc)
+	if doc.ignore_exchange_rate_revaluation_journals:
+		filters.update({"ignore_err": True})
 
-		tax_id = frappe.get_doc("Customer", entry.customer).tax_id
+	if doc.ignore_cr_dr_notes:
+		filters.update({"ignore_cr_dr_notes": True})
+
+	return filters
+
+
+def get_gl_statements(doc, entries):
+	"""
+	General Ledger of each customer, as {customer: (filters, columns, data)}. Customers are grouped
+	by presentation currency and the GL Entries of each group are read at once.
+	"""
+	customers = [entry.customer for entry in entries]
+	tax_ids = dict(
+		frappe.get_all("Customer", filters={"name": ("in", customers)}, fields=["name", "tax_id"], as_list=1)
+	)
+
+	currency_groups = {}
+	for entry in entries:
 		presentation_currency = (
 			get_party_account_currency("Customer", entry.customer, doc.company)
 			or doc.currency
 			or get_company_currency(doc.company)
 		)
+		currency_groups.setdefault(presentation_currency, []).append(entry)
+
+	statements = {}
+	for presentation_currency, group in currency_groups.items():
+		filters = get_report_filters(doc)
+		filters.update(get_gl_filters(doc, group[0], None, presentation_currency))
+		filters.update({"party": list({entry.customer for entry in group}), "party_name": None})
+
+		filters, account_details = prepare_filters(filters)
+		# converted to the presentation currency for each customer, as the currencies of the
+		# entries of one customer must not change the amounts of another
+		gl_entries = get_gl_entries(frappe._dict(filters, presentation_currency=None), [])
+		currency_map = get_currency(filters)
+		columns = get_gl_columns(filters)
+
+		party_gl_entries = {}
+		for gle in gl_entries:
+			party_gl_entries.setdefault(gle.party, []).append(gle)
+
+		inv_details = get_supplier_invoice_details([gle.against_voucher for gle in gl_entries])
+
+		for entry in group:
+			party_filters = frappe._dict(filters.copy())
+			party_filters.update(
+				get_gl_filters(doc, entry, tax_ids.get(entry.customer), presentation_currency)
+			)
+			# the currencies the report sets for a single customer
+			set_account_currency(party_filters)
 
-		filters = get_common_filters(doc)
-		if doc.ignore_exchange_rate_revaluation_journals:
-			filters.update({"ignore_err": True})
-
-		if doc.ignore_cr_dr_notes:
-			filters.update({"ignore_cr_dr_notes": True})
-
-		if doc.report == "General Ledger":
-			filters.update(get_gl_filters(doc, entry, tax_id, presentation_currency))
-			col, res = get_soa(filters)
+			party_entries = convert_to_presentation_currency(
+				party_gl_entries.get(entry.customer, []), currency_map
+			)
+			data = get_data_with_opening_closing(party_filters, account_details, [], party_entries)
+			res = get_result_as_list(data, party_filters, inv_details)
 			for x in [0, -2, -1]:
 				res[x]["account"] = res[x]["account"].replace("'", "")
+
 			if len(res) == 3:
 				continue
-		else:
-			filters.update(get_ar_filters(doc, entry))
-			ar_res = get_ar_soa(filters)
-			col, res = ar_res[0], ar_res[1]
-			if not res:
-				continue
 
-		statement_dict[entry.customer] = (
-			[res, ageing] if get_statement_dict else get_html(doc, filters, entry, col, res, ageing)
-		)
+			statements[entry.customer] = (party_filters, columns, res)
 
-	return statement_dict
+	return statements
 
 
-def set_ageing(doc, entry):
+def get_ar_statements(doc, entries):
+	"""Accounts Receivable of each customer, as {customer: (filters, columns, data)}"""
+	filters = get_report_filters(doc)
+	filters.update(get_ar_filters(doc, entries[0]))
+	filters.update({"party": list({entry.customer for entry in entries}), "customer_name": None})
+
+	ar_res = get_ar_soa(filters)
+	col = ar_res[0]
+
+	party_rows = {}
+	for row in ar_res[1]:
+		party_rows.setdefault(row.get("party"), []).append(row)
+
+	statements = {}
+	for entry in entries:
+		if res := party_rows.get(entry.customer):
+			party_filters = frappe._dict(filters.copy())
+			party_filters.update(get_ar_filters(doc, entry))
+			statements[entry.customer] = (party_filters, col, res)
+
+	return statements
+
+
+def get_ageing_map(doc, customers):
+	"""Ageing summary of each customer, as {customer: [row]}, from one run of the report"""
 	ageing_filters = frappe._dict(
 		{
 			"company": doc.company,
@@ -169,15 +281,21 @@ def set_ageing(doc, entry):
 			"range3": 90,
 			"range4": 120,
 			"party_type": "Customer",
-			"party": [entry.customer],
+			"party": customers,
 		}
 	)
-	col1, ageing = get_ageing(ageing_filters)
+	_columns, ageing = get_ageing(ageing_filters)
+
+	ageing_map = {}
+	for row in ageing:
+		row["ageing_based_on"] = doc.ageing_based_on
+		ageing_map.setdefault(row.get("party"), [row])
 
-	if ageing:
-		ageing[0]["ageing_based_on"] = doc.ageing_based_on
+	return ageing_map
 
-	return ageing
+
+def set_ageing(doc, entry):
+	return get_ageing_map(doc, [entry.customer]).get(entry.customer, [])
 
 
 def get_common_filters(doc):
@@ -312,9 +430,9 @@ def get_customers_based_on_sales_person(sales_person):
 		return []
 
 
-def get_recipients_and_cc(customer, doc):
+def get_recipients_and_cc(customer, doc, entries=None):
 	recipients = []
-	for clist in doc.customers:
+	for clist in entries if entries is not None else doc.customers:
 		if clist.customer == customer:
 			recipients.append(clist.billing_email)
 			if doc.primary_mandatory and clist.primary_email:
@@ -329,11 +447,10 @@ def get_recipients_and_cc(customer, doc):
 	return recipients, cc
 
 
-def get_context(customer, doc):
-	template_doc = copy.deepcopy(doc)
-	del template_doc.customers
-	template_doc.from_date = format_date(template_doc.from_date)
-	template_doc.to_date = format_date(template_doc.to_date)
+def get_context(customer, doc, template_doc=None):
+	if not template_doc:
+		template_doc = get_template_doc(doc)
+
 	return {
 		"doc": template_doc,
 		"customer": frappe.get_doc("Customer", customer),
@@ -341,6 +458,14 @@ def get_context(customer, doc):
 	}
 
 
+def get_template_doc(doc):
+	template_doc = copy.deepcopy(doc)
+	del template_doc.customers
+	template_doc.from_date = format_date(template_doc.from_date)
+	template_doc.to_date = format_date(template_doc.to_date)
+	return template_doc
+
+
 @frappe.whitelist()
 def fetch_customers(customer_collection, collection_name, primary_mandatory):
 	customer_list = []
@@ -439,58 +564,159 @@ def download_statements(document_name):
 
 @frappe.whitelist()
 def send_emails(document_name, from_scheduler=False, posting_date=None):
+	"""
+	Email the statements of the customers, a batch of customers at a time. Batches are shared by up
+	to `STATEMENT_WORKERS` background jobs and checkpointed once sent, so that sending again after a
+	failure goes on with the customers not done yet.
+	"""
 	doc = frappe.get_doc("Process Statement Of Accounts", document_name)
-	report = get_report_pdf(doc, consolidated=False)
+	progress_key = get_statement_progress_key(doc)
 
-	if report:
-		for customer, report_pdf in report.items():
-			context = get_context(customer, doc)
-			filename = frappe.render_template(doc.pdf_name, context)
-			attachments = [{"fname": filename + ".pdf", "fcontent": report_pdf}]
+	options = frappe.cache.get_value(f"{progress_key}:options") or {}
+	options = frappe._dict(
+		from_scheduler=from_scheduler or options.get("from_scheduler"),
+		posting_date=posting_date or options.get("posting_date"),
+	)
+	frappe.cache.set_value(f"{progress_key}:options", options)
 
-			recipients, cc = get_recipients_and_cc(customer, doc)
-			if not recipients:
-				continue
+	done = get_statement_progress(progress_key, "done")
+	customers = list(dict.fromkeys(entry.customer for entry in doc.customers if entry.customer not in done))
+	batches = list(create_batch(customers, STATEMENT_BATCH_SIZE))
 
-			subject = frappe.render_template(doc.subject, context)
-			message = frappe.render_template(doc.body, context)
+	workers = min(STATEMENT_WORKERS, len(batches))
+	if workers <= 1 or frappe.flags.in_test:
+		send_statement_batches(document_name, batches)
+		return complete_statement_emails(document_name, options)
 
-			if doc.sender:
-				sender_email = frappe.db.get_value("Email Account", doc.sender, "email_id")
-			else:
-				sender_email = frappe.session.user
-
-			frappe.enqueue(
-				queue="short",
-				method=frappe.sendmail,
-				recipients=recipients,
-				sender=sender_email,
-				cc=cc,
-				subject=subject,
-				message=message,
-				now=True,
-				reference_doctype="Process Statement Of Accounts",
-				reference_name=document_name,
-				attachments=attachments,
+	job_ids = [f"{progress_key}::{worker}" for worker in range(STATEMENT_WORKERS)]
+	if any(is_job_enqueued(job_id) for job_id in job_ids):
+		# the statements are still being sent by an earlier call
+		return True
+
+	for worker in range(workers):
+		frappe.enqueue(
+			send_statement_batches,
+			queue="long",
+			timeout=24 * 60 * 60,
+			job_id=job_ids[worker],
+			document_name=document_name,
+			batches=batches[worker::workers],
+			options=options,
+		)
+
+	return True
+
+
+def send_statement_batches(document_name, batches, options=None):
+	doc = frappe.get_doc("Process Statement Of Accounts", document_name)
+
+	for customers in batches:
+		try:
+			send_statement_batch(doc, customers)
+			if not frappe.flags.in_test:
+				frappe.db.commit()
+
+		except Exception:
+			if frappe.flags.in_test:
+				raise
+
+			frappe.db.rollback()
+			frappe.log_error(
+				f"Statements of {doc.name} failed for customers {customers[0]} to {customers[-1]}"
 			)
 
-		if doc.enable_auto_email and from_scheduler:
-			new_to_date = getdate(posting_date or today())
-			if doc.frequency == "Weekly":
-				new_to_date = add_days(new_to_date, 7)
-			else:
-				new_to_date = add_months(new_to_date, 1 if doc.frequency == "Monthly" else 3)
-			new_from_date = add_months(new_to_date, -1 * doc.filter_duration)
-			doc.add_comment("Comment", "Emails sent on: " + frappe.utils.format_datetime(frappe.utils.now()))
-			if doc.report == "General Ledger":
-				doc.db_set("to_date", new_to_date, commit=True)
-				doc.db_set("from_date", new_from_date, commit=True)
-			else:
-				doc.db_set("posting_date", new_to_date, commit=True)
-		return True
+	if options is not None:
+		# the last job to finish completes the run
+		complete_statement_emails(document_name, options)
+
+
+def send_statement_batch(doc, customers):
+	progress_key = get_statement_progress_key(doc)
+	entries = [entry for entry in doc.customers if entry.customer in set(customers)]
+	statement_dict = get_statement_dict(doc, customers=customers)
+
+	template_doc = get_template_doc(doc)
+	if doc.sender:
+		sender_email = frappe.db.get_value("Email Account", doc.sender, "email_id")
 	else:
+		sender_email = frappe.session.user
+
+	for customer, statement_html in statement_dict.items():
+		recipients, cc = get_recipients_and_cc(customer, doc, entries)
+		if not recipients:
+			continue
+
+		context = get_context(customer, doc, template_doc)
+		filename = frappe.render_template(doc.pdf_name, context)
+		report_pdf = get_pdf(statement_html, {"orientation": doc.orientation})
+
+		frappe.sendmail(
+			recipients=recipients,
+			sender=sender_email,
+			cc=cc,
+			subject=frappe.render_template(doc.subject, context),
+			message=frappe.render_template(doc.body, context),
+			reference_doctype="Process Statement Of Accounts",
+			reference_name=doc.name,
+			attachments=[{"fname": filename + ".pdf", "fcontent": report_pdf}],
+		)
+
+	# checkpoint, the customers are skipped when sending again
+	frappe.cache.sadd(f"{progress_key}:done", *customers)
+	if statement_dict:
+		frappe.cache.sadd(f"{progress_key}:found", *statement_dict)
+
+
+def complete_statement_emails(document_name, options):
+	"""
+	Once every customer is done, clear the progress and, for scheduled statements, move the
+	statement period forward. Returns whether any customer had a statement, whether or not it
+	had recipients to be sent to.
+	"""
+	# serializes the jobs finishing together
+	frappe.db.get_value("Process Statement Of Accounts", document_name, "name", for_update=True)
+
+	doc = frappe.get_doc("Process Statement Of Accounts", document_name)
+	progress_key = get_statement_progress_key(doc)
+
+	done = get_statement_progress(progress_key, "done")
+	if any(entry.customer not in done for entry in doc.customers):
+		return False
+
+	found = get_statement_progress(progress_key, "found")
+	clear_statement_progress(progress_key)
+	if not found:
 		return False
 
+	if doc.enable_auto_email and options.get("from_scheduler"):
+		new_to_date = getdate(options.get("posting_date") or today())
+		if doc.frequency == "Weekly":
+			new_to_date = add_days(new_to_date, 7)
+		else:
+			new_to_date = add_months(new_to_date, 1 if doc.frequency == "Monthly" else 3)
+		new_from_date = add_months(new_to_date, -1 * doc.filter_duration)
+		doc.add_comment("Comment", "Emails sent on: " + frappe.utils.format_datetime(frappe.utils.now()))
+		if doc.report == "General Ledger":
+			doc.db_set("to_date", new_to_date, commit=True)
+			doc.db_set("from_date", new_from_date, commit=True)
+		else:
+			doc.db_set("posting_date", new_to_date, commit=True)
+
+	return True
+
+
+def get_statement_progress_key(doc):
+	period = doc.to_date if doc.report == "General Ledger" else doc.posting_date
+	return f"{STATEMENT_PROGRESS_KEY}::{doc.name}::{period}"
+
+
+def get_statement_progress(progress_key, status):
+	return {frappe.safe_decode(d) for d in frappe.cache.smembers(f"{progress_key}:{status}")}
+
+
+def clear_statement_progress(progress_key):
+	frappe.cache.delete_value([f"{progress_key}:{key}" for key in ("done", "found", "options")])
+
 
 @frappe.whitelist()
 def send_auto_email():
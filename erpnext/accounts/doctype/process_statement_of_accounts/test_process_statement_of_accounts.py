@@ -7,10 +7,16 @@ from frappe.tests import IntegrationTestCase
 from frappe.utils import add_days, getdate, today
 
 from erpnext.accounts.doctype.process_statement_of_accounts.process_statement_of_accounts import (
+	clear_statement_progress,
+	get_common_filters,
+	get_gl_filters,
 	get_statement_dict,
+	get_statement_progress,
+	get_statement_progress_key,
 	send_emails,
 )
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.report.general_ledger.general_ledger import execute as get_soa
 from erpnext.accounts.test.accounts_mixin import AccountsTestMixin
 
 
@@ -49,6 +55,74 @@ class TestProcessStatementOfAccounts(AccountsTestMixin, IntegrationTestCase):
 		self.assertEqual(receivable_entries[1].voucher_no, self.si.name)
 		self.assertEqual(receivable_entries[1].balance, 100)
 
+	def test_batched_statements_match_general_ledger(self):
+		process_soa = create_process_soa(
+			name="_Test Process SOA for GL",
+			customers=[{"customer": "_Test Customer"}, {"customer": "Other Customer"}],
+		)
+		statement_dict = get_statement_dict(process_soa, get_statement_dict=True)
+
+		# the ledger read once for both customers matches the report run for each of them
+		for entry in process_soa.customers:
+			filters = get_common_filters(process_soa)
+			filters.update(get_gl_filters(process_soa, entry, None, "INR"))
+			_columns, expected = get_soa(filters)
+
+			self.assertEqual(
+				[(row.get("voucher_no"), row.get("debit"), row.get("balance")) for row in expected],
+				[
+					(row.get("voucher_no"), row.get("debit"), row.get("balance"))
+					for row in statement_dict[entry.customer][0]
+				],
+			)
+
+	def test_statements_in_different_account_currencies(self):
+		if not frappe.db.exists("Customer", "_Test SOA Customer"):
+			frappe.get_doc(
+				{
+					"doctype": "Customer",
+					"customer_name": "_Test SOA Customer",
+					"customer_type": "Individual",
+					"accounts": [{"company": "_Test Company", "account": "_Test Receivable USD - _TC"}],
+				}
+			).insert()
+
+		usd_invoice = create_sales_invoice(
+			customer="_Test Customer USD",
+			debit_to="_Test Receivable USD - _TC",
+			currency="USD",
+			conversion_rate=50,
+		)
+		# presented in USD too, from an entry in INR
+		create_sales_invoice(customer="_Test SOA Customer")
+
+		process_soa = create_process_soa(
+			name="_Test Process SOA for GL",
+			customers=[{"customer": "_Test Customer USD"}, {"customer": "_Test SOA Customer"}],
+		)
+		statement_dict = get_statement_dict(process_soa, get_statement_dict=True)
+
+		# the INR entry of one customer does not convert the USD entries of the other
+		row = next(
+			row
+			for row in statement_dict["_Test Customer USD"][0]
+			if row.get("voucher_no") == usd_invoice.name
+		)
+		self.assertEqual(row.debit, 100)
+
+		for entry in process_soa.customers:
+			filters = get_common_filters(process_soa)
+			filters.update(get_gl_filters(process_soa, entry, None, "USD"))
+			_columns, expected = get_soa(filters)
+
+			self.assertEqual(
+				[(row.get("voucher_no"), row.get("debit"), row.get("balance")) for row in expected],
+				[
+					(row.get("voucher_no"), row.get("debit"), row.get("balance"))
+					for row in statement_dict[entry.customer][0]
+				],
+			)
+
 	def test_process_soa_for_ar(self):
 		"""Tests the utils for Statement of Accounts(Accounts Receivable)"""
 		process_soa = create_process_soa(name="_Test Process SOA for AR", report="Accounts Receivable")
@@ -85,6 +159,35 @@ class TestProcessStatementOfAccounts(AccountsTestMixin, IntegrationTestCase):
 		process_soa.load_from_db()
 		self.assertEqual(process_soa.posting_date, getdate(add_days(today(), 7)))
 
+	def test_send_emails_resumes_after_sent_customers(self):
+		process_soa = create_process_soa(
+			name="_Test Process SOA",
+			report="Accounts Receivable",
+			customers=[
+				{"customer": "_Test Customer", "billing_email": "test_customer@example.com"},
+				{"customer": "Other Customer", "billing_email": "other_customer@example.com"},
+			],
+		)
+		progress_key = get_statement_progress_key(process_soa)
+		clear_statement_progress(progress_key)
+
+		# as if an earlier call had sent the first statement before failing
+		frappe.cache.sadd(f"{progress_key}:done", "_Test Customer")
+		self.assertTrue(send_emails(process_soa.name))
+
+		recipients = frappe.get_all(
+			"Email Queue Recipient",
+			filters={
+				"parent": (
+					"in",
+					frappe.get_all("Email Queue", filters={"reference_name": process_soa.name}, pluck="name"),
+				)
+			},
+			pluck="recipient",
+		)
+		self.assertEqual(recipients, ["other_customer@example.com"])
+		self.assertFalse(get_statement_progress(progress_key, "done"))
+
 	def check_ageing_summary(self, ageing, expected_ageing):
 		for age_range in expected_ageing:
 			self.assertEqual(expected_ageing[age_range], ageing.get(age_range))
@@ -10,6 +10,9 @@ from frappe.utils import cint, cstr, flt, formatdate, get_link_to_form, getdate,
 
 import erpnext
 from erpnext.accounts.deferred_revenue import validate_service_stop_date
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	update_account_daily_balance_from_ledger,
+)
 from erpnext.accounts.doctype.gl_entry.gl_entry import update_outstanding_amt
 from erpnext.accounts.doctype.repost_accounting_ledger.repost_accounting_ledger import (
 	validate_docs_for_deferred_accounting,
@@ -825,6 +828,14 @@ class PurchaseInvoice(BuyingController):
 				rows.add(d.name)
 
 		if rows:
+			update_account_daily_balance_from_ledger(
+				{
+					"voucher_type": "Purchase Receipt",
+					"voucher_no": ("in", list(purchase_receipts)),
+					"voucher_detail_no": ("in", list(rows)),
+				}
+			)
+
 			# cancel gl entries
 			gle = qb.DocType("GL Entry")
 			gle_update_query = (
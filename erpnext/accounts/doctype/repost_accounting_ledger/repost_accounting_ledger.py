@@ -6,6 +6,13 @@ from frappe import _, qb
 from frappe.model.document import Document
 from frappe.utils.data import comma_and
 
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	update_account_daily_balance_from_ledger,
+)
+from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+	update_voucher_outstanding_from_ledger,
+)
+
 
 class RepostAccountingLedger(Document):
 	# begin: auto-generated types
@@ -154,9 +161,15 @@ def start_repost(account_repost_doc=str) -> None:
 				doc = frappe.get_doc(x.voucher_type, x.voucher_no)
 
 				if repost_doc.delete_cancelled_entries:
+					update_account_daily_balance_from_ledger(
+						{"voucher_type": doc.doctype, "voucher_no": doc.name}
+					)
 					frappe.db.delete(
 						"GL Entry", filters={"voucher_type": doc.doctype, "voucher_no": doc.name}
 					)
+					update_voucher_outstanding_from_ledger(
+						{"voucher_type": doc.doctype, "voucher_no": doc.name}
+					)
 					frappe.db.delete(
 						"Payment Ledger Entry", filters={"voucher_type": doc.doctype, "voucher_no": doc.name}
 					)
@@ -0,0 +1,190 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import add_days, flt, today
+
+from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+	aggregate_pl_entries,
+	get_voucher_outstanding_conditions,
+	rebuild_voucher_outstanding,
+	verify_voucher_outstanding,
+)
+from erpnext.accounts.report.accounts_receivable.accounts_receivable import (
+	ReceivablePayableReport,
+	execute,
+)
+from erpnext.accounts.utils import get_outstanding_invoices
+
+
+class UnitTestVoucherOutstanding(UnitTestCase):
+	"""
+	Unit tests for VoucherOutstanding.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_aggregate_by_against_voucher(self):
+		entry = frappe._dict(
+			company="_Test Company",
+			account="Debtors - _TC",
+			account_type="Receivable",
+			party_type="Customer",
+			party="_Test Customer",
+			voucher_type="Payment Entry",
+			voucher_no="PE-1",
+			against_voucher_type="Sales Invoice",
+			against_voucher_no="SI-1",
+		)
+		outstandings = aggregate_pl_entries(
+			[
+				entry.copy().update(voucher_type="Sales Invoice", voucher_no="SI-1", amount=100),
+				entry.copy().update(amount=-60),
+				entry.copy().update(amount=-40, delinked=1),
+			]
+		)
+
+		(outstanding,) = outstandings.values()
+		self.assertEqual(outstanding.voucher_no, "SI-1")
+		self.assertEqual(outstanding.outstanding, 40)
+
+
+class TestVoucherOutstanding(IntegrationTestCase):
+	def setUp(self):
+		frappe.db.set_single_value("Accounts Settings", "use_voucher_outstanding", 1)
+		rebuild_voucher_outstanding("_Test Company")
+		frappe.db.set_single_value("Accounts Settings", "voucher_outstanding_ready", 1)
+
+	def tearDown(self):
+		frappe.db.set_single_value("Accounts Settings", "use_voucher_outstanding", 0)
+		frappe.db.set_single_value("Accounts Settings", "voucher_outstanding_ready", 0)
+		frappe.db.rollback()
+
+	def assertReportUnchanged(self, report_date=None):
+		"""Accounts Receivable is the same whether or not it reads the open vouchers from the index"""
+		filters = {"company": "_Test Company", "report_date": report_date or today()}
+		self.assertTrue(ReceivablePayableReport(filters).use_voucher_outstanding())
+
+		frappe.db.set_single_value("Accounts Settings", "voucher_outstanding_ready", 0)
+		self.assertFalse(ReceivablePayableReport(filters).use_voucher_outstanding())
+		expected = get_report_rows(filters)
+
+		frappe.db.set_single_value("Accounts Settings", "voucher_outstanding_ready", 1)
+		self.assertEqual(get_report_rows(filters), expected)
+
+		return expected
+
+	def test_not_read_until_ready(self):
+		frappe.db.set_single_value("Accounts Settings", "voucher_outstanding_ready", 0)
+		si = create_sales_invoice(rate=500)
+
+		# maintained, but the Payment Ledger is read until the rebuild marks it ready
+		self.assertEqual(get_outstanding(si.name), 500)
+		self.assertIsNone(get_voucher_outstanding_conditions([]))
+
+		rebuild_voucher_outstanding()
+		self.assertTrue(frappe.db.get_single_value("Accounts Settings", "voucher_outstanding_ready"))
+		self.assertEqual(get_voucher_outstanding_conditions([]), [])
+
+	def test_report_on_back_dated_report_date(self):
+		si = create_sales_invoice(rate=500, posting_date=add_days(today(), -10))
+		paid_before = create_sales_invoice(rate=300, posting_date=add_days(today(), -10))
+		for invoice, posting_date in ((si, today()), (paid_before, add_days(today(), -8))):
+			pe = get_payment_entry("Sales Invoice", invoice.name)
+			pe.posting_date = posting_date
+			pe.submit()
+
+		# settled now, but still open on the report date
+		rows = self.assertReportUnchanged(add_days(today(), -5))
+		self.assertIn((si.name, 500.0), [(row[0], row[1]) for row in rows])
+		self.assertNotIn(paid_before.name, [row[0] for row in rows])
+
+	def test_report_with_return_updating_its_own_outstanding(self):
+		si = create_sales_invoice(qty=5, rate=100)
+		credit_note = create_sales_invoice(
+			qty=-2, rate=100, is_return=1, return_against=si.name, do_not_submit=True
+		)
+		credit_note.update_outstanding_for_self = 1
+		credit_note.submit()
+
+		pe = get_payment_entry("Sales Invoice", si.name)
+		pe.paid_amount = pe.received_amount = 200
+		pe.references[0].allocated_amount = 200
+		pe.submit()
+
+		rows = self.assertReportUnchanged()
+		self.assertIn(credit_note.name, [row[0] for row in rows])
+		self.assertIn((si.name, 300.0), [(row[0], row[1]) for row in rows])
+
+	def test_report_after_unreconcile(self):
+		si = create_sales_invoice(rate=500)
+		pe = get_payment_entry("Sales Invoice", si.name)
+		pe.submit()
+		self.assertEqual(get_outstanding(si.name), 0)
+
+		unreconcile = frappe.get_doc(
+			{
+				"doctype": "Unreconcile Payment",
+				"company": si.company,
+				"voucher_type": pe.doctype,
+				"voucher_no": pe.name,
+			}
+		)
+		unreconcile.add_references()
+		unreconcile.save().submit()
+		self.assertEqual(get_outstanding(si.name), 500)
+
+		rows = self.assertReportUnchanged()
+		self.assertIn((si.name, 500.0), [(row[0], row[1]) for row in rows])
+		self.assertIn((pe.name, -500.0), [(row[0], row[1]) for row in rows])
+		self.assertFalse(verify_voucher_outstanding("_Test Company"))
+
+	def test_outstanding_on_payment_and_cancel(self):
+		si = create_sales_invoice(rate=500)
+		self.assertEqual(get_outstanding(si.name), 500)
+
+		pe = get_payment_entry("Sales Invoice", si.name)
+		pe.paid_amount = pe.received_amount = 200
+		pe.references[0].allocated_amount = 200
+		pe.submit()
+		self.assertEqual(get_outstanding(si.name), 300)
+
+		invoices = get_outstanding_invoices("Customer", si.customer, [si.debit_to])
+		self.assertIn((si.name, 300), [(d.voucher_no, d.outstanding_amount) for d in invoices])
+
+		pe.cancel()
+		self.assertEqual(get_outstanding(si.name), 500)
+
+		si.reload()
+		si.cancel()
+		self.assertEqual(get_outstanding(si.name), 0)
+		self.assertFalse(verify_voucher_outstanding("_Test Company"))
+
+	def test_verify_reports_mismatch(self):
+		si = create_sales_invoice(rate=500)
+
+		frappe.db.set_value("Voucher Outstanding", {"voucher_no": si.name}, "outstanding", 0)
+		mismatches = verify_voucher_outstanding("_Test Company")
+		self.assertIn(si.name, [d.voucher_no for d in mismatches])
+
+		rebuild_voucher_outstanding("_Test Company")
+		self.assertFalse(verify_voucher_outstanding("_Test Company"))
+
+
+def get_report_rows(filters):
+	return sorted(
+		(row.voucher_no, flt(row.outstanding), flt(row.invoiced), flt(row.paid), flt(row.credit_note))
+		for row in execute(filters)[1]
+	)
+
+
+def get_outstanding(voucher_no):
+	return flt(
+		frappe.db.get_value(
+			"Voucher Outstanding",
+			{"voucher_type": "Sales Invoice", "voucher_no": voucher_no},
+			"outstanding_in_account_currency",
+		)
+	)
@@ -0,0 +1,346 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe import qb
+from frappe.model.document import Document
+from frappe.query_builder.functions import Max, Sum
+from frappe.utils import cint, cstr, flt, now
+
+from erpnext.accounts.utils import lock_company_ledger_index
+
+AMOUNT_FIELDS = ("outstanding", "outstanding_in_account_currency")
+KEY_FIELDS = ("company", "account", "account_type", "party_type", "party", "voucher_type", "voucher_no")
+
+# Payment Ledger Entry fields having the same meaning on Voucher Outstanding, voucher_type and
+# voucher_no are not among them as the outstanding is kept against the voucher of the entries
+PARTY_FIELDS = ("company", "account", "account_type", "party_type", "party", "account_currency")
+PL_ENTRY_FIELDS = (
+	*PARTY_FIELDS,
+	"voucher_type",
+	"voucher_no",
+	"against_voucher_type",
+	"against_voucher_no",
+	"amount",
+	"amount_in_account_currency",
+)
+
+
+class VoucherOutstanding(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		account_type: DF.Literal["Receivable", "Payable"]
+		company: DF.Link | None
+		outstanding: DF.Currency
+		outstanding_in_account_currency: DF.Currency
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		voucher_no: DF.DynamicLink | None
+		voucher_type: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def is_voucher_outstanding_enabled():
+	"""Whether outstandings are maintained as Payment Ledger Entries are posted"""
+	return cint(frappe.db.get_single_value("Accounts Settings", "use_voucher_outstanding"))
+
+
+def is_voucher_outstanding_ready():
+	"""Whether outstandings can be read, which is once they have been rebuilt after being enabled"""
+	return is_voucher_outstanding_enabled() and cint(
+		frappe.db.get_single_value("Accounts Settings", "voucher_outstanding_ready")
+	)
+
+
+def update_voucher_outstanding_index(pl_entries, sign=1):
+	"""
+	Add (`sign=1`) or remove (`sign=-1`) the amounts of `pl_entries` from the outstanding of the
+	vouchers they are against. Called whenever active (delinked = 0) Payment Ledger Entries are
+	posted, delinked, moved to another voucher or deleted.
+	"""
+	if not pl_entries or not is_voucher_outstanding_enabled():
+		return
+
+	outstandings = aggregate_pl_entries(pl_entries)
+	if not outstandings:
+		return
+
+	# waits for a rebuild of the company to be committed
+	for company in sorted({outstanding.company for outstanding in outstandings.values()}):
+		lock_company_ledger_index(company, shared=True)
+
+	vo = qb.DocType("Voucher Outstanding")
+	existing = set(
+		frappe.get_all("Voucher Outstanding", filters={"name": ("in", list(outstandings))}, pluck="name")
+	)
+
+	for name, outstanding in outstandings.items():
+		if name in existing:
+			add_to_outstanding(vo, name, outstanding, sign)
+		else:
+			insert_outstanding(vo, name, outstanding, sign)
+
+
+def update_voucher_outstanding_from_ledger(filters, sign=-1):
+	"""
+	Apply the active Payment Ledger Entries matching `filters` before they are delinked, moved or
+	deleted in bulk. The entries are locked so that concurrent postings against the same vouchers
+	are applied one after the other, and are returned to the caller.
+	"""
+	if not is_voucher_outstanding_enabled():
+		return []
+
+	pl_entries = frappe.get_all(
+		"Payment Ledger Entry",
+		filters={**filters, "delinked": 0},
+		fields=list(PL_ENTRY_FIELDS),
+		for_update=True,
+	)
+	update_voucher_outstanding_index(pl_entries, sign=sign)
+
+	return pl_entries
+
+
+def add_to_outstanding(vo, name, outstanding, sign):
+	query = qb.update(vo).where(vo.name == name)
+	for fieldname in AMOUNT_FIELDS:
+		query = query.set(vo[fieldname], vo[fieldname] + sign * outstanding[fieldname])
+
+	query.run()
+
+
+def insert_outstanding(vo, name, outstanding, sign):
+	doc = frappe.new_doc("Voucher Outstanding")
+	doc.update(outstanding)
+	doc.name = name
+	for fieldname in AMOUNT_FIELDS:
+		doc.set(fieldname, sign * outstanding[fieldname])
+
+	savepoint = "voucher_outstanding"
+	try:
+		frappe.db.savepoint(savepoint)
+		doc.db_insert()
+	except frappe.DuplicateEntryError:
+		# inserted by a concurrent transaction
+		frappe.db.rollback(save_point=savepoint)
+		add_to_outstanding(vo, name, outstanding, sign)
+
+
+def aggregate_pl_entries(pl_entries):
+	"""Group Payment Ledger Entries by the voucher they are against, returning { name: outstanding }"""
+	outstandings = {}
+
+	for ple in pl_entries:
+		if ple.get("delinked") or not ple.get("against_voucher_no"):
+			continue
+
+		key_values = {
+			**{fieldname: cstr(ple.get(fieldname)) for fieldname in PARTY_FIELDS},
+			"voucher_type": ple.get("against_voucher_type"),
+			"voucher_no": ple.get("against_voucher_no"),
+		}
+		name = get_outstanding_name(key_values)
+
+		if name not in outstandings:
+			outstandings[name] = frappe._dict(key_values, **{fieldname: 0.0 for fieldname in AMOUNT_FIELDS})
+
+		outstandings[name].outstanding += flt(ple.get("amount"))
+		outstandings[name].outstanding_in_account_currency += flt(ple.get("amount_in_account_currency"))
+
+	return outstandings
+
+
+def get_outstanding_name(key_values):
+	"""Outstandings are named by a hash of their key so that upserts need no lookup by value"""
+	key = [cstr(key_values[fieldname]) for fieldname in KEY_FIELDS]
+	return hashlib.sha1("\x1f".join(key).encode()).hexdigest()
+
+
+def get_voucher_outstanding_conditions(conditions):
+	"""
+	Payment Ledger Entry `conditions` applied to Voucher Outstanding instead, None if the index is
+	not ready or a condition is on a field that is not kept on it.
+	"""
+	if not is_voucher_outstanding_ready():
+		return None
+
+	ple = qb.DocType("Payment Ledger Entry")
+	vo = qb.DocType("Voucher Outstanding")
+
+	for condition in conditions:
+		if any(field.name not in PARTY_FIELDS for field in condition.fields_()):
+			return None
+
+	return [condition.replace_table(ple, vo) for condition in conditions]
+
+
+def get_open_voucher_queries(company, account_type, report_date):
+	"""
+	Queries for the vouchers that had an outstanding on `report_date`: the ones open now, the ones
+	with entries posted after it, and the invoices returned against by open credit or debit notes,
+	since payments against a return are shown against the original invoice.
+	"""
+	vo = qb.DocType("Voucher Outstanding")
+	ple = qb.DocType("Payment Ledger Entry")
+	invoice = qb.DocType("Sales Invoice" if account_type == "Receivable" else "Purchase Invoice")
+
+	open_vouchers = (
+		qb.from_(vo)
+		.select(vo.voucher_no)
+		.where(
+			(vo.company == company)
+			& (vo.account_type == account_type)
+			& ((vo.outstanding != 0) | (vo.outstanding_in_account_currency != 0))
+		)
+	)
+	settled_later = (
+		qb.from_(ple)
+		.select(ple.against_voucher_no)
+		.distinct()
+		.where(
+			(ple.company == company)
+			& (ple.account_type == account_type)
+			& (ple.delinked == 0)
+			& (ple.posting_date > report_date)
+		)
+	)
+	returned_against = (
+		qb.from_(invoice)
+		.select(invoice.return_against)
+		.where((invoice.is_return == 1) & (invoice.docstatus == 1) & (invoice.name.isin(open_vouchers)))
+	)
+
+	return open_vouchers, settled_later, returned_against
+
+
+def get_outstandings_from_ledger(company):
+	"""Outstandings computed directly from Payment Ledger Entry with a single grouped query"""
+	ple = qb.DocType("Payment Ledger Entry")
+	group_by = [
+		*[ple[fieldname] for fieldname in PARTY_FIELDS[:-1]],
+		ple.against_voucher_type,
+		ple.against_voucher_no,
+	]
+
+	pl_entries = (
+		qb.from_(ple)
+		.select(
+			*group_by,
+			Max(ple.account_currency).as_("account_currency"),
+			Sum(ple.amount).as_("amount"),
+			Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
+		)
+		.where((ple.company == company) & (ple.delinked == 0))
+		.groupby(*group_by)
+	).run(as_dict=True)
+
+	return aggregate_pl_entries(pl_entries)
+
+
+def rebuild_voucher_outstanding(company=None):
+	"""
+	Recompute voucher outstandings from Payment Ledger Entry, for one or all companies. Each
+	company is rebuilt under an exclusive lock and committed on its own. Once all of them are,
+	the outstandings are marked ready to be read.
+	"""
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+
+	for company_name in companies:
+		rebuild_company_voucher_outstanding(company_name)
+
+	if not company and is_voucher_outstanding_enabled():
+		frappe.db.set_single_value("Accounts Settings", "voucher_outstanding_ready", 1)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def rebuild_company_voucher_outstanding(company):
+	if not frappe.flags.in_test:
+		# the ledger is read after the lock is taken, not from a snapshot of an earlier transaction
+		frappe.db.commit()
+
+	# waits for the postings updating outstandings of the company to be committed
+	lock_company_ledger_index(company)
+	frappe.db.delete("Voucher Outstanding", {"company": company})
+
+	fields = [*KEY_FIELDS, "account_currency", *AMOUNT_FIELDS]
+	if outstandings := get_outstandings_from_ledger(company):
+		timestamp = now()
+		frappe.db.bulk_insert(
+			"Voucher Outstanding",
+			fields=["name", *fields, "creation", "modified", "owner", "modified_by"],
+			values=[
+				[
+					name,
+					*[outstanding[field] for field in fields],
+					timestamp,
+					timestamp,
+					frappe.session.user,
+					frappe.session.user,
+				]
+				for name, outstanding in outstandings.items()
+			],
+		)
+
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+
+def verify_voucher_outstanding(company=None):
+	"""Return the outstandings that differ from the ones computed from Payment Ledger Entry"""
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+	precision = cint(frappe.db.get_default("currency_precision")) or 2
+	mismatches = []
+
+	for company in companies:
+		expected = get_outstandings_from_ledger(company)
+		actual = {
+			d.name: d
+			for d in frappe.get_all(
+				"Voucher Outstanding",
+				filters={"company": company},
+				fields=["name", *KEY_FIELDS, *AMOUNT_FIELDS],
+			)
+		}
+
+		for name in set(expected) | set(actual):
+			expected_outstanding = expected.get(name) or frappe._dict()
+			actual_outstanding = actual.get(name) or frappe._dict()
+			if any(
+				flt(expected_outstanding.get(fieldname), precision)
+				!= flt(actual_outstanding.get(fieldname), precision)
+				for fieldname in AMOUNT_FIELDS
+			):
+				mismatches.append(
+					frappe._dict(
+						name=name,
+						voucher_type=(expected_outstanding or actual_outstanding).get("voucher_type"),
+						voucher_no=(expected_outstanding or actual_outstanding).get("voucher_no"),
+						party=(expected_outstanding or actual_outstanding).get("party"),
+						expected={
+							fieldname: flt(expected_outstanding.get(fieldname)) for fieldname in AMOUNT_FIELDS
+						},
+						actual={
+							fieldname: flt(actual_outstanding.get(fieldname)) for fieldname in AMOUNT_FIELDS
+						},
+					)
+				)
+
+	return mismatches
+
+
+def on_doctype_update():
+	frappe.db.add_index("Voucher Outstanding", ["voucher_no", "voucher_type"])
+	frappe.db.add_index("Voucher Outstanding", ["company", "party_type", "party"])
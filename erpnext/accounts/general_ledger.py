@@ -11,6 +11,10 @@ from frappe.utils import cint, flt, formatdate, get_link_to_form, getdate, now
 from frappe.utils.dashboard import cache_source
 
 import erpnext
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	update_account_daily_balance,
+	update_account_daily_balance_from_ledger,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
@@ -19,7 +23,19 @@ from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_f
 )
 from erpnext.accounts.doctype.accounting_period.accounting_period import ClosedAccountingPeriod
 from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
-from erpnext.accounts.utils import create_payment_ledger_entry
+from erpnext.accounts.doctype.gl_entry.gl_entry import (
+	update_outstanding_amt,
+	validate_balance_type,
+	validate_frozen_account,
+)
+from erpnext.accounts.party import validate_party_gle_currency
+from erpnext.accounts.utils import (
+	bulk_insert_ledger_entries,
+	create_payment_ledger_entry,
+	get_first_entry_per_key,
+	get_fiscal_year,
+	is_bulk_ledger_posting_enabled,
+)
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
 
@@ -230,7 +246,7 @@ def get_cost_center_allocation_data(company, posting_date, cost_center):
 
 
 def merge_similar_entries(gl_map, precision=None):
-	merged_gl_map = []
+	merged_gl_map = {}
 	accounting_dimensions = get_accounting_dimensions()
 	merge_properties = get_merge_properties(accounting_dimensions)
 
@@ -238,24 +254,12 @@ def merge_similar_entries(gl_map, precision=None):
 		entry.merge_key = get_merge_key(entry, merge_properties)
 		# if there is already an entry in this account then just add it
 		# to that entry
-		same_head = check_if_in_list(entry, merged_gl_map)
+		same_head = merged_gl_map.get(entry.merge_key)
 		if same_head:
-			same_head.debit = flt(same_head.debit) + flt(entry.debit)
-			same_head.debit_in_account_currency = flt(same_head.debit_in_account_currency) + flt(
-				entry.debit_in_account_currency
-			)
-			same_head.debit_in_transaction_currency = flt(same_head.debit_in_transaction_currency) + flt(
-				entry.debit_in_transaction_currency
-			)
-			same_head.credit = flt(same_head.credit) + flt(entry.credit)
-			same_head.credit_in_account_currency = flt(same_head.credit_in_account_currency) + flt(
-				entry.credit_in_account_currency
-			)
-			same_head.credit_in_transaction_currency = flt(same_head.credit_in_transaction_currency) + flt(
-				entry.credit_in_transaction_currency
-			)
+			for fieldname in MERGE_AMOUNT_FIELDS:
+				same_head[fieldname] = flt(same_head.get(fieldname)) + flt(entry.get(fieldname))
 		else:
-			merged_gl_map.append(entry)
+			merged_gl_map[entry.merge_key] = entry
 
 	company = gl_map[0].company if gl_map else erpnext.get_default_company()
 	company_currency = erpnext.get_company_currency(company)
@@ -264,21 +268,41 @@ def merge_similar_entries(gl_map, precision=None):
 		precision = get_field_precision(frappe.get_meta("GL Entry").get_field("debit"), company_currency)
 
 	# filter zero debit and credit entries
-	merged_gl_map = filter(
-		lambda x: flt(x.debit, precision) != 0
+	exchange_gain_or_loss_journals = {}
+	merged_gl_map = [
+		x
+		for x in merged_gl_map.values()
+		if flt(x.debit, precision) != 0
 		or flt(x.credit, precision) != 0
 		or (
 			x.voucher_type == "Journal Entry"
-			and frappe.get_cached_value("Journal Entry", x.voucher_no, "voucher_type")
-			== "Exchange Gain Or Loss"
-		),
-		merged_gl_map,
-	)
-	merged_gl_map = list(merged_gl_map)
+			and is_exchange_gain_or_loss_journal(x.voucher_no, exchange_gain_or_loss_journals)
+		)
+	]
 
 	return merged_gl_map
 
 
+MERGE_AMOUNT_FIELDS = (
+	"debit",
+	"debit_in_account_currency",
+	"debit_in_transaction_currency",
+	"credit",
+	"credit_in_account_currency",
+	"credit_in_transaction_currency",
+)
+
+
+def is_exchange_gain_or_loss_journal(voucher_no, cache):
+	"""Check the Journal Entry's voucher type, looking it up only once per voucher"""
+	if voucher_no not in cache:
+		cache[voucher_no] = (
+			frappe.get_cached_value("Journal Entry", voucher_no, "voucher_type") == "Exchange Gain Or Loss"
+		)
+
+	return cache[voucher_no]
+
+
 def get_merge_properties(dimensions=None):
 	merge_properties = [
 		"account",
@@ -298,17 +322,7 @@ def get_merge_properties(dimensions=None):
 
 
 def get_merge_key(entry, merge_properties):
-	merge_key = []
-	for fieldname in merge_properties:
-		merge_key.append(entry.get(fieldname, ""))
-
-	return tuple(merge_key)
-
-
-def check_if_in_list(gle, gl_map):
-	for e in gl_map:
-		if e.merge_key == gle.merge_key:
-			return e
+	return tuple(entry.get(fieldname, "") for fieldname in merge_properties)
 
 
 def toggle_debit_credit_if_negative(gl_map):
@@ -387,7 +401,14 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 
 	for entry in gl_map:
 		validate_allowed_dimensions(entry, dimension_filter_map)
-		make_entry(entry, adv_adj, update_outstanding, from_repost)
+
+	if gl_map and is_bulk_ledger_posting_enabled(gl_map[0]["voucher_type"]):
+		make_entries_in_bulk(gl_map, adv_adj, update_outstanding, from_repost)
+	else:
+		for entry in gl_map:
+			make_entry(entry, adv_adj, update_outstanding, from_repost)
+
+	update_account_daily_balance(gl_map)
 
 
 def make_entry(args, adv_adj, update_outstanding, from_repost=False):
@@ -404,6 +425,101 @@ def make_entry(args, adv_adj, update_outstanding, from_repost=False):
 		validate_expense_against_budget(args)
 
 
+def make_entries_in_bulk(gl_map, adv_adj, update_outstanding, from_repost=False):
+	"""
+	Bulk counterpart of calling `make_entry` for every row in `gl_map`.
+
+	Checks that only depend on the account, party or voucher run once per distinct value
+	and all GL Entries are written with a single multi-row insert.
+	"""
+	gl_entries = []
+	for args in gl_map:
+		gle = frappe.new_doc("GL Entry")
+		gle.update(args)
+		gle.flags.from_repost = from_repost
+		gle.flags.adv_adj = adv_adj
+		gle.flags.update_outstanding = update_outstanding or "Yes"
+		gl_entries.append(gle)
+
+	validate_gl_entries_in_bulk(gl_entries, from_repost)
+	bulk_insert_ledger_entries(gl_entries)
+
+	if from_repost or gl_entries[0].voucher_type == "Period Closing Voucher":
+		return
+
+	for gle in get_first_entry_per_key(gl_entries, ("account", "company")):
+		gle.validate_account_details(adv_adj)
+
+	for gle in gl_entries:
+		gle.validate_dimensions_for_pl_and_bs()
+
+	for gle in get_first_entry_per_key(gl_entries, ("account",)):
+		validate_balance_type(gle.account, adv_adj)
+		validate_frozen_account(gle.account, adv_adj)
+
+	update_outstanding_in_bulk(gl_entries, update_outstanding or "Yes")
+
+	budget_fields = ["account", "cost_center", "project", *get_accounting_dimensions()]
+	for args in get_first_entry_per_key(gl_map, budget_fields):
+		validate_expense_against_budget(args)
+
+
+def validate_gl_entries_in_bulk(gl_entries, from_repost=False):
+	fiscal_years = {}
+	for gle in gl_entries:
+		gle.flags.ignore_submit_comment = True
+		if not gle.fiscal_year:
+			key = (gle.posting_date, gle.company)
+			if key not in fiscal_years:
+				fiscal_years[key] = get_fiscal_year(gle.posting_date, company=gle.company)[0]
+			gle.fiscal_year = fiscal_years[key]
+
+		gle.pl_must_have_cost_center()
+
+	if from_repost or gl_entries[0].voucher_type == "Period Closing Voucher":
+		return
+
+	for gle in gl_entries:
+		gle.check_mandatory()
+		gle.validate_cost_center()
+		gle.check_pl_account()
+		gle.validate_account_currency()
+
+	for gle in get_first_entry_per_key(gl_entries, ("party_type", "party")):
+		gle.validate_party()
+
+	party_entries = [gle for gle in gl_entries if gle.party_type and gle.party]
+	for gle in get_first_entry_per_key(party_entries, ("party_type", "party", "company", "account_currency")):
+		validate_party_gle_currency(gle.party_type, gle.party, gle.company, gle.account_currency)
+
+
+def update_outstanding_in_bulk(gl_entries, update_outstanding):
+	if update_outstanding != "Yes" or frappe.flags.is_reverse_depr_entry:
+		return
+
+	if (
+		gl_entries[0].voucher_type == "Journal Entry"
+		and frappe.get_cached_value("Journal Entry", gl_entries[0].voucher_no, "voucher_type")
+		== "Exchange Gain Or Loss"
+	):
+		return
+
+	to_update = [
+		gle
+		for gle in gl_entries
+		if gle.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
+		and gle.against_voucher
+		and frappe.get_cached_value("Account", gle.account, "account_type") not in ["Receivable", "Payable"]
+	]
+
+	for gle in get_first_entry_per_key(
+		to_update, ("account", "party_type", "party", "against_voucher_type", "against_voucher")
+	):
+		update_outstanding_amt(
+			gle.account, gle.party_type, gle.party, gle.against_voucher_type, gle.against_voucher
+		)
+
+
 def validate_cwip_accounts(gl_map):
 	"""Validate that CWIP account are not used in Journal Entry"""
 	if gl_map and gl_map[0].voucher_type != "Journal Entry":
@@ -653,6 +769,17 @@ def make_reverse_gl_entries(
 
 		is_opening = any(d.get("is_opening") == "Yes" for d in gl_entries)
 		validate_against_pcv(is_opening, gl_entries[0]["posting_date"], gl_entries[0]["company"])
+		if not immutable_ledger_enabled:
+			if partial_cancel:
+				update_account_daily_balance(gl_entries, sign=-1)
+			else:
+				update_account_daily_balance_from_ledger(
+					{
+						"voucher_type": gl_entries[0]["voucher_type"],
+						"voucher_no": gl_entries[0]["voucher_no"],
+					}
+				)
+
 		if partial_cancel:
 			# Partial cancel is only used by `Advance` in separate account feature.
 			# Only cancel GL entries for unlinked reference using `voucher_detail_no`
@@ -683,6 +810,7 @@ def make_reverse_gl_entries(
 			if not immutable_ledger_enabled:
 				set_as_cancel(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 
+		reverse_gl_entries = []
 		for entry in gl_entries:
 			new_gle = copy.deepcopy(entry)
 			new_gle["name"] = None
@@ -705,8 +833,17 @@ def make_reverse_gl_entries(
 				new_gle["posting_date"] = frappe.form_dict.get("posting_date") or getdate()
 
 			if new_gle["debit"] or new_gle["credit"]:
+				reverse_gl_entries.append(new_gle)
+
+		if reverse_gl_entries and is_bulk_ledger_posting_enabled(reverse_gl_entries[0]["voucher_type"]):
+			make_entries_in_bulk(reverse_gl_entries, adv_adj, "Yes")
+		else:
+			for new_gle in reverse_gl_entries:
 				make_entry(new_gle, adv_adj, "Yes")
 
+		if immutable_ledger_enabled:
+			update_account_daily_balance(reverse_gl_entries)
+
 
 def check_freezing_date(posting_date, adv_adj=False):
 	"""
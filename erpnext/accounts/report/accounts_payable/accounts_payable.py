@@ -2,12 +2,11 @@
 # License: GNU General Public License v3. See license.txt
 
 
-from erpnext.accounts.report.accounts_receivable.accounts_receivable import ReceivablePayableReport
+from erpnext.accounts.report.accounts_receivable.accounts_receivable import (
+	ReceivablePayableReport,
+	get_report_args,
+)
 
 
 def execute(filters=None):
-	args = {
-		"account_type": "Payable",
-		"naming_by": ["Buying Settings", "supp_master_name"],
-	}
-	return ReceivablePayableReport(filters).run(args)
+	return ReceivablePayableReport(filters).run(get_report_args("Payable"))
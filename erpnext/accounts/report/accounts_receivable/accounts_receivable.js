@@ -187,6 +187,54 @@ frappe.query_reports["Accounts Receivable"] = {
 			var filters = report.get_values();
 			frappe.set_route("query-report", "Accounts Receivable Summary", { company: filters.company });
 		});
+
+		report.page.add_inner_button(__("Export in Background"), function () {
+			frappe.prompt(
+				{
+					fieldname: "file_format",
+					label: __("File Format"),
+					fieldtype: "Select",
+					options: ["CSV", "Excel"],
+					default: "CSV",
+					reqd: 1,
+				},
+				(values) => {
+					frappe.call({
+						method: "erpnext.accounts.report.accounts_receivable.accounts_receivable.export_receivable_payable",
+						args: {
+							filters: report.get_filter_values(true),
+							account_type: "Receivable",
+							file_format: values.file_format,
+						},
+						callback: function () {
+							frappe.show_alert({
+								message: __("Export started, you will be notified once it is ready"),
+								indicator: "blue",
+							});
+						},
+					});
+				},
+				__("Export in Background"),
+				__("Export")
+			);
+		});
+
+		frappe.realtime.off("receivable_payable_export_complete");
+		frappe.realtime.on("receivable_payable_export_complete", function (data) {
+			frappe.msgprint(
+				__("The export is ready. {0}", [
+					`<a href="${encodeURI(data.file_url)}">${__("Download")}</a>`,
+				])
+			);
+		});
+
+		frappe.realtime.off("receivable_payable_export_failed");
+		frappe.realtime.on("receivable_payable_export_failed", function () {
+			frappe.msgprint({
+				message: __("The export failed, see the Error Log for details."),
+				indicator: "red",
+			});
+		});
 	},
 };
 
@@ -2,18 +2,26 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import csv
+import json
+import os
 from collections import OrderedDict
 
 import frappe
+import openpyxl
 from frappe import _, qb, query_builder, scrub
 from frappe.query_builder import Criterion
-from frappe.query_builder.functions import Date, Substring, Sum
+from frappe.query_builder.functions import Count, Date, Substring, Sum
 from frappe.utils import cint, cstr, flt, getdate, nowdate
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
+from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+	get_open_voucher_queries,
+	is_voucher_outstanding_ready,
+)
 from erpnext.accounts.utils import get_currency_precision, get_party_types_from_account_type
 
 #  This report gives a summary of all Outstanding Invoices considering the following
@@ -33,11 +41,14 @@ from erpnext.accounts.utils import get_currency_precision, get_party_types_from_
 
 
 def execute(filters=None):
-	args = {
-		"account_type": "Receivable",
-		"naming_by": ["Selling Settings", "cust_master_name"],
-	}
-	return ReceivablePayableReport(filters).run(args)
+	return ReceivablePayableReport(filters).run(get_report_args("Receivable"))
+
+
+def get_report_args(account_type):
+	if account_type == "Receivable":
+		return {"account_type": "Receivable", "naming_by": ["Selling Settings", "cust_master_name"]}
+
+	return {"account_type": "Payable", "naming_by": ["Buying Settings", "supp_master_name"]}
 
 
 class ReceivablePayableReport:
@@ -45,6 +56,8 @@ class ReceivablePayableReport:
 		self.filters = frappe._dict(filters or {})
 		self.qb_selection_filter = []
 		self.ple = qb.DocType("Payment Ledger Entry")
+		# parties of the batch being processed when streaming, see ReceivablePayableStream
+		self.parties = None
 		self.filters.report_date = getdate(self.filters.report_date or nowdate())
 		self.age_as_on = (
 			getdate(nowdate()) if self.filters.report_date > getdate(nowdate()) else self.filters.report_date
@@ -56,13 +69,16 @@ class ReceivablePayableReport:
 		self.range_numbers = [num for num in range(1, len(self.ranges) + 2)]
 
 	def run(self, args):
+		self.setup(args)
+		self.get_data()
+		self.get_chart_data()
+		return self.columns, self.data, None, self.chart, None, self.skip_total_row
+
+	def setup(self, args):
 		self.filters.update(args)
 		self.set_defaults()
 		self.party_naming_by = frappe.db.get_single_value(args.get("naming_by")[0], args.get("naming_by")[1])
 		self.get_columns()
-		self.get_data()
-		self.get_chart_data()
-		return self.columns, self.data, None, self.chart, None, self.skip_total_row
 
 	def set_defaults(self):
 		if not self.filters.get("company"):
@@ -92,6 +108,15 @@ class ReceivablePayableReport:
 	def get_data(self):
 		self.get_ple_entries()
 		self.get_sales_invoices_or_customers_based_on_sales_person()
+
+		# Get Exchange Rate Revaluations
+		self.get_exchange_rate_revaluations()
+
+		self.data = []
+		self.build_voucher_balance()
+		self.build_data()
+
+	def build_voucher_balance(self):
 		self.voucher_balance = OrderedDict()
 		self.init_voucher_balance()  # invoiced, paid, credit_note, outstanding
 
@@ -107,16 +132,9 @@ class ReceivablePayableReport:
 		# Get return entries
 		self.get_return_entries()
 
-		# Get Exchange Rate Revaluations
-		self.get_exchange_rate_revaluations()
-
-		self.data = []
-
 		for ple in self.ple_entries:
 			self.update_voucher_balance(ple)
 
-		self.build_data()
-
 	def build_voucher_dict(self, ple):
 		return frappe._dict(
 			voucher_type=ple.voucher_type,
@@ -295,6 +313,14 @@ class ReceivablePayableReport:
 			self.update_sub_total_row(sub_total_row, "Total")
 
 	def build_data(self):
+		self.build_rows()
+
+		if self.filters.get("group_by_party"):
+			self.append_subtotal_row(self.previous_party)
+			if self.data:
+				self.data.append(self.total_row_map.get("Total", {}))
+
+	def build_rows(self):
 		# set outstanding for all the accumulated balances
 		# as we can use this to filter out invoices without outstanding
 		for _key, row in self.voucher_balance.items():
@@ -342,11 +368,6 @@ class ReceivablePayableReport:
 				else:
 					self.append_row(row)
 
-		if self.filters.get("group_by_party"):
-			self.append_subtotal_row(self.previous_party)
-			if self.data:
-				self.data.append(self.total_row_map.get("Total", {}))
-
 	def append_row(self, row):
 		self.allocate_future_payments(row)
 		self.set_invoice_details(row)
@@ -416,14 +437,23 @@ class ReceivablePayableReport:
 
 	def get_invoice_details(self):
 		self.invoice_details = frappe._dict()
+		values = {"report_date": self.filters.report_date}
+
+		# when streaming, only the vouchers of the parties being processed
+		voucher_condition = parent_condition = ""
+		if self.parties is not None:
+			values["vouchers"] = list({row.voucher_no for row in self.voucher_balance.values()}) or [""]
+			voucher_condition = "and name in %(vouchers)s"
+			parent_condition = "and parent in %(vouchers)s"
+
 		if self.account_type == "Receivable":
 			si_list = frappe.db.sql(
-				"""
+				f"""
 				select name, due_date, po_no
 				from `tabSales Invoice`
-				where posting_date <= %s
+				where posting_date <= %(report_date)s {voucher_condition}
 			""",
-				self.filters.report_date,
+				values,
 				as_dict=1,
 			)
 			for d in si_list:
@@ -432,11 +462,12 @@ class ReceivablePayableReport:
 			# Get Sales Team
 			if self.filters.show_sales_person:
 				sales_team = frappe.db.sql(
-					"""
+					f"""
 					select parent, sales_person
 					from `tabSales Team`
-					where parenttype = 'Sales Invoice'
+					where parenttype = 'Sales Invoice' {parent_condition}
 				""",
+					values,
 					as_dict=1,
 				)
 				for d in sales_team:
@@ -446,24 +477,24 @@ class ReceivablePayableReport:
 
 		if self.account_type == "Payable":
 			for pi in frappe.db.sql(
-				"""
+				f"""
 				select name, due_date, bill_no, bill_date
 				from `tabPurchase Invoice`
-				where posting_date <= %s
+				where posting_date <= %(report_date)s {voucher_condition}
 			""",
-				self.filters.report_date,
+				values,
 				as_dict=1,
 			):
 				self.invoice_details.setdefault(pi.name, pi)
 
 		# Invoices booked via Journal Entries
 		journal_entries = frappe.db.sql(
-			"""
+			f"""
 			select name, due_date, bill_no, bill_date
 			from `tabJournal Entry`
-			where posting_date <= %s
+			where posting_date <= %(report_date)s {voucher_condition}
 		""",
-			self.filters.report_date,
+			values,
 			as_dict=1,
 		)
 
@@ -598,7 +629,7 @@ class ReceivablePayableReport:
 		pe_ref = frappe.qb.DocType("Payment Entry Reference")
 		ifelse = query_builder.CustomFunction("IF", ["condition", "then", "else"])
 
-		return (
+		query = (
 			frappe.qb.from_(pe)
 			.inner_join(pe_ref)
 			.on(pe_ref.parent == pe.name)
@@ -620,7 +651,12 @@ class ReceivablePayableReport:
 				& (pe.posting_date > self.filters.report_date)
 				& (pe.party_type.isin(self.party_type))
 			)
-		).run(as_dict=True)
+		)
+
+		if self.parties is not None:
+			query = query.where(pe.party.isin(self.parties))
+
+		return query.run(as_dict=True)
 
 	def get_future_payments_from_journal_entry(self):
 		je = frappe.qb.DocType("Journal Entry")
@@ -645,6 +681,9 @@ class ReceivablePayableReport:
 			)
 		)
 
+		if self.parties is not None:
+			query = query.where(jea.party.isin(self.parties))
+
 		if self.filters.get("party"):
 			if self.account_type == "Payable":
 				query = query.select(
@@ -718,6 +757,10 @@ class ReceivablePayableReport:
 			party_field = scrub(party_type)
 			if self.filters.get(party_field):
 				or_filters.update({party_field: self.filters.get(party_field)})
+
+		if self.parties is not None:
+			filters["customer" if self.account_type == "Receivable" else "supplier"] = ("in", self.parties)
+
 		self.return_entries = frappe._dict(
 			frappe.get_all(
 				doctype, filters=filters, or_filters=or_filters, fields=["name", "return_against"], as_list=1
@@ -758,7 +801,9 @@ class ReceivablePayableReport:
 
 	def get_ple_entries(self):
 		# get all the GL entries filtered by the given filters
+		self.ple_entries = self.get_ple_query().run(as_dict=True)
 
+	def get_ple_conditions(self):
 		self.prepare_conditions()
 
 		if self.filters.show_future_payments:
@@ -772,6 +817,25 @@ class ReceivablePayableReport:
 		else:
 			self.qb_selection_filter.append(self.ple.posting_date.lte(self.filters.report_date))
 
+		conditions = [self.ple.delinked == 0, *self.qb_selection_filter]
+		if self.or_filters:
+			conditions.append(Criterion.any(self.or_filters))
+
+		if self.use_voucher_outstanding():
+			conditions.append(
+				Criterion.any(
+					[
+						self.ple.against_voucher_no.isin(vouchers)
+						for vouchers in get_open_voucher_queries(
+							self.filters.company, self.account_type, self.filters.report_date
+						)
+					]
+				)
+			)
+
+		return conditions
+
+	def get_ple_query(self, order_by_party=False):
 		ple = qb.DocType("Payment Ledger Entry")
 		query = (
 			qb.from_(ple)
@@ -791,9 +855,7 @@ class ReceivablePayableReport:
 				ple.amount,
 				ple.amount_in_account_currency,
 			)
-			.where(ple.delinked == 0)
-			.where(Criterion.all(self.qb_selection_filter))
-			.where(Criterion.any(self.or_filters))
+			.where(Criterion.all(self.get_ple_conditions()))
 		)
 
 		if self.filters.get("show_remarks"):
@@ -804,12 +866,27 @@ class ReceivablePayableReport:
 			else:
 				query = query.select(ple.remarks)
 
-		if self.filters.get("group_by_party"):
+		if order_by_party or self.filters.get("group_by_party"):
 			query = query.orderby(self.ple.party, self.ple.posting_date)
 		else:
 			query = query.orderby(self.ple.posting_date, self.ple.party)
 
-		self.ple_entries = query.run(as_dict=True)
+		return query
+
+	def use_voucher_outstanding(self):
+		"""
+		Only the entries against vouchers that were open on the report date need to be read, unless
+		a filter on cost center, finance book or dimension can leave part of a voucher open.
+		"""
+		if not self.filters.company or not is_voucher_outstanding_ready():
+			return False
+
+		if self.filters.cost_center or self.filters.finance_book:
+			return False
+
+		return not any(
+			self.filters.get(dimension.fieldname) for dimension in get_accounting_dimensions(as_list=False)
+		)
 
 	def get_sales_invoices_or_customers_based_on_sales_person(self):
 		if self.filters.get("sales_person"):
@@ -1182,3 +1259,361 @@ def get_customer_group_with_children(customer_groups):
 			frappe.throw(_("Customer Group: {0} does not exist").format(d))
 
 	return list(set(all_customer_groups))
+
+
+STREAMING_PARTY_BATCH_SIZE = 500
+STREAMING_PAGE_LENGTH = 100
+STREAMING_WORKERS = 4
+EXPORT_KEY = "receivable_payable_export"
+EXPORT_KEY_EXPIRY = 24 * 60 * 60
+
+
+class ReceivablePayableStream(ReceivablePayableReport):
+	"""
+	Accounts Receivable/Payable computed a batch of parties at a time, for debtor and creditor books
+	too large to be built in memory.
+
+	Payment Ledger Entries are read ordered by party. Balances, invoice details, future payments,
+	return entries and ageing are computed for the parties of a batch only, so memory is bound by
+	the batch. Rows are ordered by party, and party ranges can be processed by separate workers.
+	Entries without a party are processed in a batch of their own, ahead of the first party.
+	"""
+
+	def __init__(self, filters, args):
+		super().__init__(filters)
+		self.setup(args)
+		self.previous_party = ""
+		self.total_row_map = {}
+
+		self.ple_query = self.get_ple_query(order_by_party=True)
+		self.parties_condition = Criterion.all(self.get_ple_conditions())
+		self.parties_query = (
+			qb.from_(self.ple)
+			.select(self.ple.party)
+			.distinct()
+			.where(self.parties_condition & self.ple.party.isnotnull())
+			.orderby(self.ple.party)
+		)
+
+		self.get_sales_invoices_or_customers_based_on_sales_person()
+		self.get_exchange_rate_revaluations()
+
+	def get_page(self, cursor=None, page_length=STREAMING_PAGE_LENGTH):
+		"""
+		Rows of the next `page_length` parties after `cursor`, along with the cursor of the next
+		page. The cursor is None for the first page, and the returned one is None after the last.
+		"""
+		state = frappe._dict(frappe.parse_json(cursor)) if cursor else frappe._dict()
+		self.previous_party = state.previous_party or ""
+		self.total_row_map = state.total_row_map or {}
+
+		rows = [] if cursor else self.get_no_party_rows()
+		parties = next(self.iter_party_batches(state.after, batch_size=page_length), [])
+		rows += self.get_batch_rows(parties) if parties else []
+
+		if len(parties) == page_length:
+			state.update(
+				after=parties[-1], previous_party=self.previous_party, total_row_map=self.total_row_map
+			)
+			return frappe._dict(result=rows, cursor=frappe.as_json(state, indent=None))
+
+		return frappe._dict(result=rows + self.get_total_rows(), cursor=None)
+
+	def iter_rows(self, after=None, up_to=None):
+		"""All the rows of the parties after `after` and up to `up_to`, totals included"""
+		yield from self.iter_batch_rows(after, up_to)
+		yield from self.get_total_rows()
+
+	def iter_batch_rows(self, after=None, up_to=None):
+		"""Rows of the parties after `after` and up to `up_to`, those of no party first"""
+		if after is None:
+			yield from self.get_no_party_rows()
+
+		for parties in self.iter_party_batches(after, up_to):
+			yield from self.get_batch_rows(parties)
+
+	def iter_party_batches(self, after=None, up_to=None, batch_size=STREAMING_PARTY_BATCH_SIZE):
+		"""Parties having entries, in order, after the `after` party and up to the `up_to` one"""
+		while True:
+			query = self.parties_query.limit(batch_size)
+			if after is not None:
+				query = query.where(self.ple.party > after)
+			if up_to is not None:
+				query = query.where(self.ple.party <= up_to)
+
+			parties = [d[0] for d in query.run()]
+			if not parties:
+				break
+
+			yield parties
+
+			after = parties[-1]
+			if len(parties) < batch_size:
+				break
+
+	def get_no_party_rows(self):
+		"""Rows of the entries without a party, if any"""
+		no_party_condition = self.parties_condition & self.ple.party.isnull()
+		if not qb.from_(self.ple).select(self.ple.name).where(no_party_condition).limit(1).run():
+			return []
+
+		return self.get_batch_rows(None)
+
+	def get_batch_rows(self, parties):
+		"""Rows of the `parties`, or of the entries without a party if `parties` is None"""
+		if parties is None:
+			# there are no future payments or return entries to look up for entries without a party
+			self.parties = [""]
+			party_condition = self.ple.party.isnull()
+		else:
+			self.parties = parties
+			party_condition = self.ple.party.isin(parties)
+
+		self.ple_entries = self.ple_query.where(party_condition).run(as_dict=True)
+		self.invoices = set()
+		self.party_details = {}
+		self.data = []
+
+		self.build_voucher_balance()
+		self.build_rows()
+
+		if self.filters.get("group_by_party"):
+			# only the grand total and the subtotal of the last party are still to be appended
+			self.total_row_map = {
+				party: row
+				for party, row in self.total_row_map.items()
+				if party in ("Total", self.previous_party)
+			}
+
+		return self.data
+
+	def get_total_rows(self):
+		self.data = []
+		# the previous party is only reset from "" once a row is appended, it is None for no party
+		if self.filters.get("group_by_party") and self.previous_party != "":
+			self.append_subtotal_row(self.previous_party)
+			self.data.append(self.total_row_map.get("Total", {}))
+
+		return self.data
+
+	def get_party_ranges(self, workers=STREAMING_WORKERS):
+		"""(after, up_to) party ranges of about the same number of parties, one per worker"""
+		count = (
+			qb.from_(self.ple)
+			.select(Count(self.ple.party).distinct())
+			.where(self.parties_condition)
+			.run()[0][0]
+		)
+		workers = min(workers, count)
+		boundaries = []
+		for worker in range(1, workers):
+			boundary = self.parties_query.offset(worker * count // workers - 1).limit(1).run()[0][0]
+			if boundary not in boundaries:
+				boundaries.append(boundary)
+
+		return list(zip([None, *boundaries], [*boundaries, None], strict=True))
+
+	def get_export_columns(self):
+		return [column for column in self.columns if not column.get("hidden")]
+
+
+@frappe.whitelist()
+def get_receivable_payable_page(
+	filters, account_type="Receivable", cursor=None, page_length=STREAMING_PAGE_LENGTH
+):
+	validate_report_permission(account_type)
+	stream = ReceivablePayableStream(frappe.parse_json(filters), get_report_args(account_type))
+	page = stream.get_page(cursor, cint(page_length))
+	page.columns = stream.columns
+
+	return page
+
+
+@frappe.whitelist()
+def export_receivable_payable(filters, account_type="Receivable", file_format="CSV"):
+	"""
+	Export the report to a private file in the background. Party ranges are written to separate
+	part files by up to `STREAMING_WORKERS` jobs, and the last job to finish merges them.
+	"""
+	validate_report_permission(account_type)
+	if file_format not in ("CSV", "Excel"):
+		frappe.throw(_("File Format should be CSV or Excel"))
+
+	filters = frappe.parse_json(filters)
+	stream = ReceivablePayableStream(filters, get_report_args(account_type))
+	ranges = stream.get_party_ranges()
+
+	export_key = f"{EXPORT_KEY}::{frappe.generate_hash(length=10)}"
+	frappe.cache.sadd(f"{export_key}:pending", *range(len(ranges)))
+	frappe.cache.sadd(f"{export_key}:merge", "merge")
+	expire_export_keys(export_key)
+
+	for part, (after, up_to) in enumerate(ranges):
+		kwargs = dict(
+			export_key=export_key,
+			filters=filters,
+			account_type=account_type,
+			file_format=file_format,
+			user=frappe.session.user,
+			part=part,
+			parts=len(ranges),
+			after=after,
+			up_to=up_to,
+		)
+		frappe.enqueue(
+			build_receivable_payable_export_part,
+			queue="long",
+			timeout=3600,
+			now=frappe.flags.in_test,
+			**kwargs,
+		)
+
+
+def build_receivable_payable_export_part(
+	export_key, filters, account_type, file_format, user, part, parts, after=None, up_to=None
+):
+	"""Write the rows of a party range to a part file, keeping its grand total aside"""
+	try:
+		stream = ReceivablePayableStream(filters, get_report_args(account_type))
+		with open(get_export_part_path(export_key, part), "w") as f:
+			for row in stream.iter_batch_rows(after, up_to):
+				f.write(frappe.as_json(row, indent=None) + "\n")
+
+			# the grand total is the last of the total rows, it is summed over the parts
+			*subtotal_rows, total_row = stream.get_total_rows() or [None]
+			for row in subtotal_rows:
+				f.write(frappe.as_json(row, indent=None) + "\n")
+
+		frappe.cache.hset(f"{export_key}:totals", str(part), total_row)
+		expire_export_keys(export_key)
+
+	except Exception:
+		frappe.log_error(f"Accounts {account_type} export failed for parties {after} to {up_to}")
+		fail_receivable_payable_export(export_key, parts, user)
+		if frappe.flags.in_test:
+			raise
+
+		return
+
+	# a part failed while this one was being written, its cleanup may have missed this part file
+	if frappe.cache.get_value(f"{export_key}:failed"):
+		remove_export_parts(export_key, [part])
+		return
+
+	frappe.cache.srem(f"{export_key}:pending", part)
+	if frappe.cache.smembers(f"{export_key}:pending"):
+		return
+
+	# of the jobs finishing together, only the one popping the claim merges the parts
+	if not frappe.cache.spop(f"{export_key}:merge"):
+		return
+
+	try:
+		file_url = merge_receivable_payable_export(stream, export_key, file_format, parts)
+	except Exception:
+		frappe.log_error(f"Accounts {account_type} export failed to merge its parts")
+		fail_receivable_payable_export(export_key, parts, user, claimed=True)
+		if frappe.flags.in_test:
+			raise
+
+	else:
+		frappe.publish_realtime("receivable_payable_export_complete", {"file_url": file_url}, user=user)
+
+
+def merge_receivable_payable_export(stream, export_key, file_format, parts):
+	columns = stream.get_export_columns()
+	extension = "csv" if file_format == "CSV" else "xlsx"
+	file_name = f"accounts-{scrub(stream.account_type)}-{frappe.generate_hash(length=10)}.{extension}"
+	path = frappe.get_site_path("private", "files", file_name)
+
+	total_row = None
+	for part in range(parts):
+		if part_total := frappe.cache.hget(f"{export_key}:totals", str(part)):
+			if total_row is None:
+				total_row = {
+					"party": "Total",
+					"bold": 1,
+					**{field: 0.0 for field in stream.get_currency_fields()},
+				}
+			for field in stream.get_currency_fields():
+				total_row[field] += flt(part_total.get(field))
+			total_row["currency"] = part_total.get("currency", "")
+
+	def iter_rows():
+		for part in range(parts):
+			with open(get_export_part_path(export_key, part)) as f:
+				for line in f:
+					yield frappe._dict(json.loads(line))
+
+		if total_row:
+			yield frappe._dict(total_row)
+
+	header = [column["label"] for column in columns]
+	rows = ([row.get(column["fieldname"]) for column in columns] for row in iter_rows())
+
+	if file_format == "CSV":
+		with open(path, "w", newline="") as f:
+			writer = csv.writer(f)
+			writer.writerow(header)
+			writer.writerows(rows)
+	else:
+		workbook = openpyxl.Workbook(write_only=True)
+		sheet = workbook.create_sheet(_("Accounts {0}").format(_(stream.account_type)))
+		sheet.append(header)
+		for row in rows:
+			sheet.append(row)
+
+		workbook.save(path)
+
+	remove_export_parts(export_key, range(parts))
+	frappe.cache.delete_value([f"{export_key}:{key}" for key in ("pending", "merge", "totals")])
+
+	file_doc = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+		}
+	)
+	file_doc.insert(ignore_permissions=True)
+
+	return file_doc.file_url
+
+
+def fail_receivable_payable_export(export_key, parts, user, claimed=False):
+	"""
+	Remove the parts written so far and the keys of the export. The user is notified by the job
+	holding the merge claim, so only once however many parts fail.
+	"""
+	frappe.cache.set_value(f"{export_key}:failed", 1, expires_in_sec=EXPORT_KEY_EXPIRY)
+	notify = claimed or frappe.cache.spop(f"{export_key}:merge")
+
+	remove_export_parts(export_key, range(parts))
+	frappe.cache.delete_value([f"{export_key}:{key}" for key in ("pending", "merge", "totals")])
+
+	if notify:
+		frappe.publish_realtime("receivable_payable_export_failed", user=user)
+
+
+def expire_export_keys(export_key):
+	"""Keys of an export left behind by a job that never finished expire on their own"""
+	for key in ("pending", "merge", "totals"):
+		frappe.cache.expire(frappe.cache.make_key(f"{export_key}:{key}"), EXPORT_KEY_EXPIRY)
+
+
+def remove_export_parts(export_key, parts):
+	for part in parts:
+		path = get_export_part_path(export_key, part)
+		if os.path.exists(path):
+			os.remove(path)
+
+
+def get_export_part_path(export_key, part):
+	return frappe.get_site_path("private", "files", f"{export_key.split('::')[-1]}-{part}.jsonl")
+
+
+def validate_report_permission(account_type):
+	report = "Accounts Receivable" if account_type == "Receivable" else "Accounts Payable"
+	if not frappe.get_cached_doc("Report", report).is_permitted():
+		frappe.throw(_("You don't have access to the {0} report").format(_(report)), frappe.PermissionError)
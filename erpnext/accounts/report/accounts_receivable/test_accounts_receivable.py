@@ -1,3 +1,6 @@
+import os
+from unittest.mock import patch
+
 import frappe
 from frappe import qb
 from frappe.tests import IntegrationTestCase
@@ -5,7 +8,13 @@ from frappe.utils import add_days, flt, getdate, today
 
 from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.accounts_receivable.accounts_receivable import execute
+from erpnext.accounts.report.accounts_receivable.accounts_receivable import (
+	ReceivablePayableStream,
+	execute,
+	export_receivable_payable,
+	get_export_part_path,
+	get_report_args,
+)
 from erpnext.accounts.test.accounts_mixin import AccountsTestMixin
 from erpnext.selling.doctype.sales_order.test_sales_order import make_sales_order
 
@@ -443,6 +452,118 @@ class TestAccountsReceivable(AccountsTestMixin, IntegrationTestCase):
 			],
 		)
 
+	def test_streaming_by_party(self):
+		self.create_sales_invoice()
+		first_customer = self.customer
+		self.create_customer("_Test AR Streaming Customer")
+		si = self.create_sales_invoice(no_payment_schedule=True)
+		self.create_payment_entry(si.name)
+		self.customer = first_customer
+
+		filters = {
+			"company": self.company,
+			"report_date": today(),
+			"range": "30, 60, 90, 120",
+			"group_by_party": True,
+		}
+
+		def get_values(rows):
+			return [
+				(row.get("party"), row.get("voucher_no"), flt(row.get("outstanding")), flt(row.get("range1")))
+				for row in rows
+			]
+
+		expected = get_values(execute(filters)[1])
+		self.assertEqual(len(expected), 7)
+
+		# a page per party, the running subtotals are carried by the cursor
+		rows, cursor = [], None
+		while True:
+			stream = ReceivablePayableStream(filters, get_report_args("Receivable"))
+			page = stream.get_page(cursor, page_length=1)
+			rows += page.result
+			if not (cursor := page.cursor):
+				break
+		self.assertEqual(get_values(rows), expected)
+
+		# party ranges processed separately cover every party once
+		stream = ReceivablePayableStream(filters, get_report_args("Receivable"))
+		ranges = stream.get_party_ranges(workers=2)
+		self.assertEqual(len(ranges), 2)
+
+		rows = []
+		for after, up_to in ranges:
+			rows += stream.iter_batch_rows(after, up_to)
+		rows += stream.get_total_rows()
+		self.assertEqual(get_values(rows), expected)
+
+	def test_party_ranges_of_fewer_parties_than_workers(self):
+		self.create_sales_invoice()
+		first_customer = self.customer
+		self.create_customer("_Test AR Streaming Customer")
+		self.create_sales_invoice()
+		self.customer = first_customer
+
+		filters = {"company": self.company, "report_date": today(), "range": "30, 60, 90, 120"}
+		expected = sorted(row.voucher_no for row in execute(filters)[1])
+
+		# two parties and the default number of workers, a range per party
+		stream = ReceivablePayableStream(filters, get_report_args("Receivable"))
+		ranges = stream.get_party_ranges()
+		self.assertEqual(len(ranges), 2)
+
+		rows = [row for after, up_to in ranges for row in stream.iter_batch_rows(after, up_to)]
+		self.assertEqual(sorted(row.voucher_no for row in rows), expected)
+
+	def test_streaming_entries_without_party(self):
+		self.create_sales_invoice()
+		si = self.create_sales_invoice()
+
+		ple = qb.DocType("Payment Ledger Entry")
+		qb.update(ple).set(ple.party, None).where(ple.voucher_no == si.name).run()
+
+		for group_by_party in (False, True):
+			filters = {
+				"company": self.company,
+				"report_date": today(),
+				"range": "30, 60, 90, 120",
+				"group_by_party": group_by_party,
+			}
+
+			def get_values(rows):
+				return sorted(
+					(row.get("party") or "", row.get("voucher_no") or "", flt(row.get("outstanding")))
+					for row in rows
+				)
+
+			expected = get_values(execute(filters)[1])
+			self.assertIn(("", si.name, 100.0), expected)
+
+			stream = ReceivablePayableStream(filters, get_report_args("Receivable"))
+			self.assertEqual(get_values(stream.get_page().result), expected)
+
+			stream = ReceivablePayableStream(filters, get_report_args("Receivable"))
+			self.assertEqual(get_values(stream.iter_rows()), expected)
+
+	def test_failed_export_is_cleaned_up(self):
+		self.create_sales_invoice()
+		filters = {"company": self.company, "report_date": today(), "range": "30, 60, 90, 120"}
+
+		with (
+			patch.object(ReceivablePayableStream, "get_batch_rows", side_effect=frappe.ValidationError),
+			patch("frappe.generate_hash", return_value="testexport"),
+			patch("frappe.log_error"),
+			patch("frappe.publish_realtime") as publish_realtime,
+			self.assertRaises(frappe.ValidationError),
+		):
+			export_receivable_payable(frappe.as_json(filters))
+
+		export_key = "receivable_payable_export::testexport"
+		self.assertFalse(os.path.exists(get_export_part_path(export_key, 0)))
+		self.assertFalse(frappe.cache.smembers(f"{export_key}:pending"))
+		self.assertFalse(frappe.cache.smembers(f"{export_key}:merge"))
+		publish_realtime.assert_called_once_with("receivable_payable_export_failed", user=frappe.session.user)
+
 	def test_future_payments(self):
 		sr = self.create_sales_invoice(do_not_submit=True)
 		sr.is_return = 1
@@ -10,6 +10,9 @@ import frappe
 from frappe import _
 from frappe.utils import add_days, add_months, cint, cstr, flt, formatdate, get_first_day, getdate
 
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	is_account_daily_balance_ready,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
@@ -481,7 +484,7 @@ def set_gl_entries_by_account(
 				ignore_opening_entries = True
 
 		gl_entries += get_accounting_entries(
-			"GL Entry",
+			"Account Daily Balance" if is_account_daily_balance_ready() else "GL Entry",
 			from_date,
 			to_date,
 			accounts_list,
@@ -523,11 +526,14 @@ def get_accounting_entries(
 		.where(gl_entry.company == filters.company)
 	)
 
-	if doctype == "GL Entry":
+	if doctype in ("GL Entry", "Account Daily Balance"):
+		# Account Daily Balance holds pre-aggregated, active GL Entries with the same columns
 		query = query.select(gl_entry.posting_date, gl_entry.is_opening, gl_entry.fiscal_year)
-		query = query.where(gl_entry.is_cancelled == 0)
 		query = query.where(gl_entry.posting_date <= to_date)
 
+		if doctype == "GL Entry":
+			query = query.where(gl_entry.is_cancelled == 0)
+
 		if ignore_opening_entries:
 			query = query.where(gl_entry.is_opening == "No")
 	else:
@@ -552,7 +558,7 @@ def apply_additional_conditions(doctype, query, from_date, ignore_closing_entrie
 		else:
 			query = query.where(gl_entry.is_period_closing_voucher_entry == 0)
 
-	if from_date and doctype == "GL Entry":
+	if from_date and doctype in ("GL Entry", "Account Daily Balance"):
 		query = query.where(gl_entry.posting_date >= from_date)
 
 	if filters:
@@ -215,6 +215,46 @@ frappe.query_reports["General Ledger"] = {
 			fieldtype: "Check",
 		},
 	],
+	onload: function (report) {
+		report.page.add_inner_button(__("Export in Background"), function () {
+			frappe.prompt(
+				{
+					fieldname: "file_format",
+					label: __("File Format"),
+					fieldtype: "Select",
+					options: ["CSV", "Excel"],
+					default: "CSV",
+					reqd: 1,
+				},
+				(values) => {
+					frappe.call({
+						method: "erpnext.accounts.report.general_ledger.general_ledger.export_general_ledger",
+						args: {
+							filters: report.get_filter_values(true),
+							file_format: values.file_format,
+						},
+						callback: function () {
+							frappe.show_alert({
+								message: __("Export started, you will be notified once it is ready"),
+								indicator: "blue",
+							});
+						},
+					});
+				},
+				__("Export in Background"),
+				__("Export")
+			);
+		});
+
+		frappe.realtime.off("general_ledger_export_complete");
+		frappe.realtime.on("general_ledger_export_complete", function (data) {
+			frappe.msgprint(
+				__("The General Ledger export is ready. {0}", [
+					`<a href="${encodeURI(data.file_url)}">${__("Download")}</a>`,
+				])
+			);
+		});
+	},
 };
 
 erpnext.utils.add_dimensions("General Ledger", 15);
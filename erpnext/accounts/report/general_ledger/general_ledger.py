@@ -3,12 +3,14 @@
 
 
 import copy
+import csv
 from collections import OrderedDict
 
 import frappe
+import openpyxl
 from frappe import _, _dict
 from frappe.query_builder import Criterion
-from frappe.utils import cstr, getdate
+from frappe.utils import cint, cstr, flt, getdate
 
 from erpnext import get_company_currency, get_default_company
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
@@ -24,6 +26,16 @@ def execute(filters=None):
 	if not filters:
 		return [], []
 
+	filters, account_details = prepare_filters(filters)
+
+	columns = get_columns(filters)
+
+	res = get_result(filters, account_details)
+
+	return columns, res
+
+
+def prepare_filters(filters):
 	account_details = {}
 
 	if filters and filters.get("print_in_account_currency") and not filters.get("account"):
@@ -44,11 +56,7 @@ def execute(filters=None):
 
 	filters = set_account_currency(filters)
 
-	columns = get_columns(filters)
-
-	res = get_result(filters, account_details)
-
-	return columns, res
+	return filters, account_details
 
 
 def validate_filters(filters, account_details):
@@ -152,14 +160,6 @@ def get_result(filters, account_details):
 
 def get_gl_entries(filters, accounting_dimensions):
 	currency_map = get_currency(filters)
-	select_fields = """, debit, credit, debit_in_account_currency,
-		credit_in_account_currency """
-
-	if filters.get("show_remarks"):
-		if remarks_length := frappe.db.get_single_value("Accounts Settings", "general_ledger_remarks_length"):
-			select_fields += f",substr(remarks, 1, {remarks_length}) as 'remarks'"
-		else:
-			select_fields += """,remarks"""
 
 	order_by_statement = "order by posting_date, account, creation"
 
@@ -171,10 +171,32 @@ def get_gl_entries(filters, accounting_dimensions):
 	if filters.get("group_by") == "Group by Account":
 		order_by_statement = "order by account, posting_date, creation"
 
-	if filters.get("include_default_book_entries"):
-		filters["company_fb"] = frappe.get_cached_value(
-			"Company", filters.get("company"), "default_finance_book"
-		)
+	gl_entries = frappe.db.sql(
+		f"""
+		select {get_select_fields(filters, accounting_dimensions)}
+		from `tabGL Entry`
+		where company=%(company)s {get_conditions(filters)}
+		{order_by_statement}
+	""",
+		filters,
+		as_dict=1,
+	)
+
+	if filters.get("presentation_currency"):
+		return convert_to_presentation_currency(gl_entries, currency_map)
+	else:
+		return gl_entries
+
+
+def get_select_fields(filters, accounting_dimensions):
+	select_fields = """, debit, credit, debit_in_account_currency,
+		credit_in_account_currency """
+
+	if filters.get("show_remarks"):
+		if remarks_length := frappe.db.get_single_value("Accounts Settings", "general_ledger_remarks_length"):
+			select_fields += f",substr(remarks, 1, {remarks_length}) as 'remarks'"
+		else:
+			select_fields += """,remarks"""
 
 	dimension_fields = ""
 	if accounting_dimensions:
@@ -186,26 +208,12 @@ def get_gl_entries(filters, accounting_dimensions):
 			"debit_in_transaction_currency, credit_in_transaction_currency, transaction_currency,"
 		)
 
-	gl_entries = frappe.db.sql(
-		f"""
-		select
+	return f"""
 			name as gl_entry, posting_date, account, party_type, party,
 			voucher_type, voucher_subtype, voucher_no, {dimension_fields}
 			cost_center, project, {transaction_currency_fields}
 			against_voucher_type, against_voucher, account_currency,
-			against, is_opening, creation {select_fields}
-		from `tabGL Entry`
-		where company=%(company)s {get_conditions(filters)}
-		{order_by_statement}
-	""",
-		filters,
-		as_dict=1,
-	)
-
-	if filters.get("presentation_currency"):
-		return convert_to_presentation_currency(gl_entries, currency_map)
-	else:
-		return gl_entries
+			against, is_opening, creation {select_fields}"""
 
 
 def get_conditions(filters):
@@ -281,6 +289,10 @@ def get_conditions(filters):
 		conditions.append("project in %(project)s")
 
 	if filters.get("include_default_book_entries"):
+		filters["company_fb"] = frappe.get_cached_value(
+			"Company", filters.get("company"), "default_finance_book"
+		)
+
 		if filters.get("finance_book"):
 			if filters.get("company_fb") and cstr(filters.get("finance_book")) != cstr(
 				filters.get("company_fb")
@@ -540,9 +552,10 @@ def get_account_type_map(company):
 	return account_type_map
 
 
-def get_result_as_list(data, filters):
+def get_result_as_list(data, filters, inv_details=None):
 	balance, _balance_in_account_currency = 0, 0
-	inv_details = get_supplier_invoice_details()
+	if inv_details is None:
+		inv_details = get_supplier_invoice_details()
 
 	for d in data:
 		if not d.get("posting_date"):
@@ -557,11 +570,18 @@ def get_result_as_list(data, filters):
 	return data
 
 
-def get_supplier_invoice_details():
+def get_supplier_invoice_details(invoices=None):
 	inv_details = {}
+	if invoices is not None:
+		invoices = [invoice for invoice in set(invoices) if invoice]
+		if not invoices:
+			return inv_details
+
 	for d in frappe.db.sql(
-		""" select name, bill_no from `tabPurchase Invoice`
-		where docstatus = 1 and bill_no is not null and bill_no != '' """,
+		f""" select name, bill_no from `tabPurchase Invoice`
+		where docstatus = 1 and bill_no is not null and bill_no != ''
+		{"and name in %(invoices)s" if invoices else ""} """,
+		{"invoices": invoices},
 		as_dict=1,
 	):
 		inv_details[d.name] = d.bill_no
@@ -694,3 +714,253 @@ def get_columns(filters):
 		columns.extend([{"label": _("Remarks"), "fieldname": "remarks", "width": 400}])
 
 	return columns
+
+
+AMOUNT_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+STREAMING_CHUNK_SIZE = 5000
+STREAMING_PAGE_LENGTH = 500
+
+
+class GeneralLedgerStream:
+	"""
+	General Ledger as a stream of GL Entries, for ledgers too large to be built in memory.
+
+	The opening balance is computed with a single aggregate query. Entries of the period are
+	read in chunks ordered by posting date, creation and name, keeping the running balance.
+	Rows are single GL Entries, without grouping or consolidation.
+	"""
+
+	def __init__(self, filters):
+		self.filters, _account_details = prepare_filters(_dict(filters))
+		self.accounting_dimensions = []
+		if self.filters.get("include_dimensions"):
+			self.accounting_dimensions = get_accounting_dimensions()
+
+		conditions = get_conditions(self.filters)
+		if self.filters.get("show_opening_entries"):
+			opening = "posting_date < %(from_date)s"
+		else:
+			opening = "(posting_date < %(from_date)s or is_opening = 'Yes')"
+
+		self.opening_conditions = f"{conditions} and {opening}"
+		self.period_conditions = f"{conditions} and not {opening}"
+
+		self.currency_map, self.account_currencies = None, None
+		if self.filters.get("presentation_currency"):
+			self.currency_map = get_currency(self.filters)
+			self.account_currencies = frappe.db.sql_list(
+				f"""select distinct account_currency from `tabGL Entry`
+				where company=%(company)s {conditions}""",
+				self.filters,
+			)
+
+	def get_page(self, cursor=None, page_length=STREAMING_PAGE_LENGTH):
+		"""
+		Rows of the ledger after `cursor`, along with the cursor of the next page.
+		The cursor is None for the first page, and the returned one is None after the last.
+		"""
+		state = _dict(frappe.parse_json(cursor)) if cursor else self.get_initial_state()
+		state.opening, state.total = _dict(state.opening), _dict(state.total)
+
+		rows = [] if cursor else [self.get_opening_row(state)]
+		entries = list(self.iter_entries(state.after, limit=page_length + 1))
+
+		for gle in entries[:page_length]:
+			rows.append(self.process_entry(gle, state))
+
+		if len(entries) > page_length:
+			return _dict(result=rows, cursor=frappe.as_json(state, indent=None))
+
+		rows.extend(self.get_total_rows(state))
+		return _dict(result=rows, cursor=None)
+
+	def iter_rows(self):
+		"""All the rows of the ledger, opening and closing included"""
+		state = self.get_initial_state()
+		yield self.get_opening_row(state)
+
+		for gle in self.iter_entries():
+			yield self.process_entry(gle, state)
+
+		yield from self.get_total_rows(state)
+
+	def get_initial_state(self):
+		totals = get_totals_dict()
+		opening, total = totals.opening, totals.total
+
+		opening_balances = frappe.db.sql(
+			f"""
+			select account_currency, sum(debit) as debit, sum(credit) as credit,
+				sum(debit_in_account_currency) as debit_in_account_currency,
+				sum(credit_in_account_currency) as credit_in_account_currency
+			from `tabGL Entry`
+			where company=%(company)s {self.opening_conditions}
+			group by account_currency
+		""",
+			self.filters,
+			as_dict=1,
+		)
+
+		if self.currency_map:
+			opening_balances = convert_to_presentation_currency(
+				opening_balances, self.currency_map, self.account_currencies
+			)
+
+		for balance in opening_balances:
+			for fieldname in AMOUNT_FIELDS:
+				opening[fieldname] += flt(balance[fieldname])
+
+		return _dict(after=None, opening=opening, total=total)
+
+	def iter_entries(self, after=None, limit=None):
+		"""GL Entries of the period after the `after` (posting date, creation, name) position"""
+		select_fields = get_select_fields(self.filters, self.accounting_dimensions)
+		fetched = 0
+
+		while limit is None or fetched < limit:
+			chunk_size = STREAMING_CHUNK_SIZE if limit is None else min(STREAMING_CHUNK_SIZE, limit - fetched)
+
+			keyset_condition = ""
+			if after:
+				keyset_condition = """and (posting_date, creation, name) >
+					(%(after_posting_date)s, %(after_creation)s, %(after_name)s)"""
+
+			gl_entries = frappe.db.sql(
+				f"""
+				select {select_fields}
+				from `tabGL Entry`
+				where company=%(company)s {self.period_conditions} {keyset_condition}
+				order by posting_date, creation, name
+				limit {cint(chunk_size)}
+			""",
+				{
+					**self.filters,
+					"after_posting_date": after and after[0],
+					"after_creation": after and after[1],
+					"after_name": after and after[2],
+				},
+				as_dict=1,
+			)
+
+			if not gl_entries:
+				break
+
+			if self.currency_map:
+				gl_entries = convert_to_presentation_currency(
+					gl_entries, self.currency_map, self.account_currencies
+				)
+
+			bill_nos = get_supplier_invoice_details([gle.against_voucher for gle in gl_entries])
+			for gle in gl_entries:
+				gle.bill_no = bill_nos.get(gle.against_voucher, "")
+				yield gle
+
+			fetched += len(gl_entries)
+			last = gl_entries[-1]
+			after = (str(last.posting_date), str(last.creation), last.gl_entry)
+
+			if len(gl_entries) < chunk_size:
+				break
+
+	def process_entry(self, gle, state):
+		gle.voucher_subtype = _(gle.voucher_subtype)
+		gle.against_voucher_type = _(gle.against_voucher_type)
+		gle.remarks = _(gle.remarks)
+		gle.party_type = _(gle.party_type)
+
+		for fieldname in AMOUNT_FIELDS:
+			state.total[fieldname] += flt(gle[fieldname])
+
+		gle.balance = get_balance(state.opening, 0, "debit", "credit") + get_balance(
+			state.total, 0, "debit", "credit"
+		)
+		gle.account_currency = self.filters.account_currency
+		state.after = (str(gle.posting_date), str(gle.creation), gle.gl_entry)
+
+		return gle
+
+	def get_opening_row(self, state):
+		return self.get_summary_row(state.opening)
+
+	def get_total_rows(self, state):
+		closing = get_totals_dict().closing
+		for fieldname in AMOUNT_FIELDS:
+			closing[fieldname] = flt(state.opening[fieldname]) + flt(state.total[fieldname])
+
+		return [self.get_summary_row(state.total), self.get_summary_row(closing)]
+
+	def get_summary_row(self, totals):
+		row = _dict(totals)
+		row.balance = get_balance(row, 0, "debit", "credit")
+		row.account_currency = self.filters.account_currency
+		row.bill_no = ""
+		return row
+
+	def export(self, file_format="CSV"):
+		"""Write the ledger to a private file row by row, returning its url"""
+		columns = [column for column in get_columns(self.filters) if not column.get("hidden")]
+		file_name = (
+			f"general-ledger-{frappe.generate_hash(length=10)}.{'csv' if file_format == 'CSV' else 'xlsx'}"
+		)
+		path = frappe.get_site_path("private", "files", file_name)
+
+		header = [column["label"] for column in columns]
+		rows = ([row.get(column["fieldname"]) for column in columns] for row in self.iter_rows())
+
+		if file_format == "CSV":
+			with open(path, "w", newline="") as f:
+				writer = csv.writer(f)
+				writer.writerow(header)
+				writer.writerows(rows)
+		else:
+			workbook = openpyxl.Workbook(write_only=True)
+			sheet = workbook.create_sheet(_("General Ledger"))
+			sheet.append(header)
+			for row in rows:
+				sheet.append(row)
+
+			workbook.save(path)
+
+		file_doc = frappe.get_doc(
+			{
+				"doctype": "File",
+				"file_name": file_name,
+				"file_url": f"/private/files/{file_name}",
+				"is_private": 1,
+			}
+		)
+		file_doc.insert(ignore_permissions=True)
+
+		return file_doc.file_url
+
+
+@frappe.whitelist()
+def get_general_ledger_page(filters, cursor=None, page_length=STREAMING_PAGE_LENGTH):
+	validate_report_permission()
+	return GeneralLedgerStream(frappe.parse_json(filters)).get_page(cursor, cint(page_length))
+
+
+@frappe.whitelist()
+def export_general_ledger(filters, file_format="CSV"):
+	validate_report_permission()
+	if file_format not in ("CSV", "Excel"):
+		frappe.throw(_("File Format should be CSV or Excel"))
+
+	frappe.enqueue(
+		build_general_ledger_export,
+		queue="long",
+		timeout=3600,
+		filters=frappe.parse_json(filters),
+		file_format=file_format,
+		user=frappe.session.user,
+	)
+
+
+def build_general_ledger_export(filters, file_format, user):
+	file_url = GeneralLedgerStream(filters).export(file_format)
+	frappe.publish_realtime("general_ledger_export_complete", {"file_url": file_url}, user=user)
+
+
+def validate_report_permission():
+	if not frappe.get_cached_doc("Report", "General Ledger").is_permitted():
+		frappe.throw(_("You don't have access to the General Ledger report"), frappe.PermissionError)
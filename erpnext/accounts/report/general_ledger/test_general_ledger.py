@@ -4,10 +4,14 @@
 import frappe
 from frappe import qb
 from frappe.tests import IntegrationTestCase
-from frappe.utils import flt, today
+from frappe.utils import add_days, flt, today
 
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.general_ledger.general_ledger import execute
+from erpnext.accounts.report.general_ledger.general_ledger import (
+	GeneralLedgerStream,
+	execute,
+)
 from erpnext.controllers.sales_and_purchase_return import make_return_doc
 
 
@@ -332,3 +336,43 @@ class TestGeneralLedger(IntegrationTestCase):
 		)
 		actual = set([x.voucher_no for x in data if x.voucher_no])
 		self.assertEqual(expected, actual)
+
+	def test_streaming_ledger(self):
+		account = "_Test Bank - _TC"
+		make_journal_entry(account, "Cash - _TC", 100, posting_date=add_days(today(), -10), submit=True)
+		for amount in (200, -50, 300):
+			make_journal_entry(account, "Cash - _TC", amount, posting_date=today(), submit=True)
+
+		filters = frappe._dict(
+			{
+				"company": self.company,
+				"from_date": add_days(today(), -1),
+				"to_date": today(),
+				"account": [account],
+				"group_by": "Group by Voucher (Consolidated)",
+			}
+		)
+		expected = execute(filters.copy())[1]
+
+		rows = list(GeneralLedgerStream(filters.copy()).iter_rows())
+		entries = [row for row in rows if row.get("gl_entry")]
+
+		self.assertEqual(rows[0].balance, 100)
+		self.assertEqual([row.balance for row in entries], [300, 250, 550])
+		self.assertEqual(
+			[(row.voucher_no, row.debit, row.credit) for row in entries],
+			[(row.voucher_no, row.debit, row.credit) for row in expected if row.get("voucher_no")],
+		)
+		for summary_row, expected_row in zip(rows[-2:], expected[-2:], strict=True):
+			self.assertEqual(summary_row.debit, expected_row["debit"])
+			self.assertEqual(summary_row.credit, expected_row["credit"])
+
+		# pages continue from the cursor of the previous one
+		paged_rows, cursor = [], None
+		while True:
+			page = GeneralLedgerStream(filters.copy()).get_page(cursor, page_length=1)
+			paged_rows += page.result
+			if not (cursor := page.cursor):
+				break
+
+		self.assertEqual([row.balance for row in paged_rows], [row.balance for row in rows])
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from erpnext.accounts.general_ledger import merge_similar_entries
+
+
+class TestMergeSimilarEntries(IntegrationTestCase):
+	def test_merge_similar_entries(self):
+		gl_map = [
+			make_gle(
+				"Sales - _TC", credit=100, credit_in_account_currency=100, credit_in_transaction_currency=2
+			),
+			make_gle(
+				"Debtors - _TC", debit=100, debit_in_account_currency=100, debit_in_transaction_currency=2
+			),
+			make_gle(
+				"Sales - _TC", credit=50, credit_in_account_currency=50, credit_in_transaction_currency=1
+			),
+			make_gle(
+				"Debtors - _TC", debit=50, debit_in_account_currency=50, debit_in_transaction_currency=1
+			),
+			make_gle("_Test Write Off - _TC"),
+		]
+
+		merged = merge_similar_entries(gl_map)
+
+		# zero value entries are dropped and the order of first occurrence is retained
+		self.assertEqual([d.account for d in merged], ["Sales - _TC", "Debtors - _TC"])
+		self.assertEqual(
+			(
+				merged[0].credit,
+				merged[0].credit_in_account_currency,
+				merged[0].credit_in_transaction_currency,
+			),
+			(150, 150, 3),
+		)
+		self.assertEqual(
+			(merged[1].debit, merged[1].debit_in_account_currency, merged[1].debit_in_transaction_currency),
+			(150, 150, 3),
+		)
+
+	def test_merge_many_entries(self):
+		gl_map = make_gl_map(10_000)
+		merged = merge_similar_entries(gl_map)
+
+		# each merge key is kept once, in the order it first occurs
+		self.assertEqual(len(merged), 1_000)
+		self.assertEqual([d.voucher_detail_no for d in merged], [f"row-{i}" for i in range(1_000)])
+		self.assertTrue(all(d.debit == 10 for d in merged))
+
+	def test_merge_queries_per_voucher(self):
+		"The voucher type of a Journal Entry is looked up once per voucher, not once per row"
+
+		def count_queries(size):
+			gl_map = [
+				make_gle(
+					"Sales - _TC",
+					voucher_type="Journal Entry",
+					voucher_no="_T-Journal Entry-BENCH",
+					voucher_detail_no=f"row-{i}",
+				)
+				for i in range(size)
+			]
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+				self.assertEqual(merge_similar_entries(gl_map), [])
+
+			return sql.call_count
+
+		# settings and meta are cached by the first merge
+		count_queries(1)
+		self.assertEqual(count_queries(1_000), count_queries(2))
+
+
+def make_gle(account, **amounts):
+	return frappe._dict(
+		{
+			"company": "_Test Company",
+			"account": account,
+			"cost_center": "_Test Cost Center - _TC",
+			"voucher_type": "Sales Invoice",
+			"voucher_no": "_T-Sales Invoice-BENCH",
+			**amounts,
+		}
+	)
+
+
+def make_gl_map(size):
+	"""Build `size` rows spread over at most 1000 distinct merge keys"""
+	return [make_gle("Sales - _TC", voucher_detail_no=f"row-{i % 1_000}", debit=1) for i in range(size)]
@@ -909,6 +909,20 @@ def update_accounting_ledgers_after_reference_removal(
 	gle_update_query.run()
 
 	# Payment Ledger
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		update_voucher_outstanding_from_ledger,
+		update_voucher_outstanding_index,
+	)
+
+	filters = {"against_voucher_type": ref_type, "against_voucher_no": ref_no}
+	if payment_name:
+		filters["voucher_no"] = payment_name
+
+	# the entries are now against the payment itself
+	pl_entries = update_voucher_outstanding_from_ledger(filters)
+	for entry in pl_entries:
+		entry.against_voucher_type, entry.against_voucher_no = entry.voucher_type, entry.voucher_no
+
 	ple = qb.DocType("Payment Ledger Entry")
 	ple_update_query = (
 		qb.update(ple)
@@ -925,6 +939,8 @@ def update_accounting_ledgers_after_reference_removal(
 		ple_update_query = ple_update_query.where(ple.voucher_no == payment_name)
 	ple_update_query.run()
 
+	update_voucher_outstanding_index(pl_entries)
+
 
 def remove_ref_from_advance_section(ref_doc: object = None):
 	# TODO: this might need some testing
@@ -1450,11 +1466,23 @@ def repost_gle_for_stock_vouchers(
 
 
 def _delete_pl_entries(voucher_type, voucher_no):
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		update_voucher_outstanding_from_ledger,
+	)
+
+	update_voucher_outstanding_from_ledger({"voucher_type": voucher_type, "voucher_no": voucher_no})
+
 	ple = qb.DocType("Payment Ledger Entry")
 	qb.from_(ple).delete().where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no)).run()
 
 
 def _delete_gl_entries(voucher_type, voucher_no):
+	from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+		update_account_daily_balance_from_ledger,
+	)
+
+	update_account_daily_balance_from_ledger({"voucher_type": voucher_type, "voucher_no": voucher_no})
+
 	gle = qb.DocType("GL Entry")
 	qb.from_(gle).delete().where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no)).run()
 
@@ -1802,6 +1830,17 @@ def create_payment_ledger_entry(
 	if gl_entries:
 		ple_map = get_payment_ledger_entries(gl_entries, cancel=cancel)
 
+		if ple_map and is_bulk_ledger_posting_enabled(gl_entries[0].voucher_type):
+			make_payment_ledger_entries_in_bulk(
+				ple_map,
+				cancel=cancel,
+				adv_adj=adv_adj,
+				update_outstanding=update_outstanding,
+				from_repost=from_repost,
+				partial_cancel=partial_cancel,
+			)
+			return
+
 		for entry in ple_map:
 			ple = frappe.get_doc(entry)
 
@@ -1815,6 +1854,124 @@ def create_payment_ledger_entry(
 			ple.submit()
 
 
+def is_bulk_ledger_posting_enabled(voucher_type):
+	"""Check if ledger entries of `voucher_type` should be validated and inserted as a set"""
+	if not cint(frappe.db.get_single_value("Accounts Settings", "enable_bulk_ledger_posting")):
+		return False
+
+	return voucher_type in frappe.get_hooks("bulk_ledger_posting_doctypes")
+
+
+def bulk_insert_ledger_entries(entries):
+	"""
+	Insert submitted ledger documents (GL Entry / Payment Ledger Entry) with a single multi-row query.
+	All `entries` must belong to the same doctype and must already be validated.
+	"""
+	if not entries:
+		return
+
+	for entry in entries:
+		entry.docstatus = 1
+		entry.set_new_name()
+		entry.set_user_and_timestamp()
+
+	values = [entry.get_valid_dict(convert_dates_to_str=True) for entry in entries]
+	fields = list(values[0])
+
+	frappe.db.bulk_insert(
+		entries[0].doctype,
+		fields=fields,
+		values=[[row.get(field) for field in fields] for row in values],
+	)
+
+
+def make_payment_ledger_entries_in_bulk(
+	ple_map, cancel=0, adv_adj=0, update_outstanding="Yes", from_repost=0, partial_cancel=False
+):
+	"""
+	Bulk counterpart of submitting each Payment Ledger Entry in `ple_map`.
+
+	Account, dimension and balance checks run once per distinct account and outstanding
+	is recalculated once per distinct against voucher.
+	"""
+	from erpnext.accounts.doctype.gl_entry.gl_entry import validate_balance_type, validate_frozen_account
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		update_voucher_outstanding_index,
+	)
+
+	pl_entries = []
+	for entry in ple_map:
+		ple = frappe.get_doc(entry)
+		ple.flags.adv_adj = adv_adj
+		ple.flags.from_repost = from_repost
+		ple.flags.update_outstanding = update_outstanding
+		pl_entries.append(ple)
+
+	if cancel:
+		delinked = set()
+		for ple in pl_entries:
+			key = (
+				ple.company,
+				ple.account_type,
+				ple.account,
+				ple.party_type,
+				ple.party,
+				ple.voucher_type,
+				ple.voucher_no,
+				ple.against_voucher_type,
+				ple.against_voucher_no,
+				ple.voucher_detail_no if partial_cancel else None,
+			)
+			if key not in delinked:
+				delinked.add(key)
+				delink_original_entry(ple, partial_cancel=partial_cancel)
+
+	for ple in get_first_entry_per_key(pl_entries, ("account", "account_type", "company")):
+		ple.validate_account()
+
+	bulk_insert_ledger_entries(pl_entries)
+	update_voucher_outstanding_index(pl_entries)
+
+	if not from_repost:
+		for ple in get_first_entry_per_key(pl_entries, ("account",)):
+			validate_frozen_account(ple.account, adv_adj)
+
+		active_entries = [ple for ple in pl_entries if not ple.delinked]
+		for ple in get_first_entry_per_key(active_entries, ("account", "company")):
+			ple.validate_account_details()
+
+		for ple in active_entries:
+			ple.validate_dimensions_for_pl_and_bs()
+			ple.validate_allowed_dimensions()
+
+		for ple in get_first_entry_per_key(active_entries, ("account",)):
+			validate_balance_type(ple.account, adv_adj)
+
+	if update_outstanding == "Yes" and not frappe.flags.is_reverse_depr_entry:
+		to_update = [
+			ple
+			for ple in pl_entries
+			if ple.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
+		]
+		for ple in get_first_entry_per_key(
+			to_update, ("against_voucher_type", "against_voucher_no", "account", "party_type", "party")
+		):
+			update_voucher_outstanding(
+				ple.against_voucher_type, ple.against_voucher_no, ple.account, ple.party_type, ple.party
+			)
+
+
+def get_first_entry_per_key(entries, fields):
+	"""Return the first entry for every distinct combination of values in `fields`"""
+	unique_entries = {}
+	for entry in entries:
+		key = tuple(entry.get(field) for field in fields)
+		if key not in unique_entries:
+			unique_entries[key] = entry
+
+	return list(unique_entries.values())
+
+
 def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, party):
 	ple = frappe.qb.DocType("Payment Ledger Entry")
 	vouchers = [frappe._dict({"voucher_type": voucher_type, "voucher_no": voucher_no})]
@@ -1855,32 +2012,55 @@ def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, pa
 
 
 def delink_original_entry(pl_entry, partial_cancel=False):
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		update_voucher_outstanding_from_ledger,
+	)
+
 	if pl_entry:
+		filters = {
+			fieldname: pl_entry.get(fieldname)
+			for fieldname in (
+				"company",
+				"account_type",
+				"account",
+				"party_type",
+				"party",
+				"voucher_type",
+				"voucher_no",
+				"against_voucher_type",
+				"against_voucher_no",
+			)
+		}
+		if partial_cancel:
+			filters["voucher_detail_no"] = pl_entry.voucher_detail_no
+
+		update_voucher_outstanding_from_ledger(filters)
+
 		ple = qb.DocType("Payment Ledger Entry")
 		query = (
 			qb.update(ple)
 			.set(ple.delinked, True)
 			.set(ple.modified, now())
 			.set(ple.modified_by, frappe.session.user)
-			.where(
-				(ple.company == pl_entry.company)
-				& (ple.account_type == pl_entry.account_type)
-				& (ple.account == pl_entry.account)
-				& (ple.party_type == pl_entry.party_type)
-				& (ple.party == pl_entry.party)
-				& (ple.voucher_type == pl_entry.voucher_type)
-				& (ple.voucher_no == pl_entry.voucher_no)
-				& (ple.against_voucher_type == pl_entry.against_voucher_type)
-				& (ple.against_voucher_no == pl_entry.against_voucher_no)
-			)
+			.where(Criterion.all([ple[fieldname] == value for fieldname, value in filters.items()]))
 		)
 
-		if partial_cancel:
-			query = query.where(ple.voucher_detail_no == pl_entry.voucher_detail_no)
-
 		query.run()
 
 
+def lock_company_ledger_index(company, shared=False):
+	"""
+	Lock the Company row for the ledger indexes kept per company. Postings updating an index take
+	a shared lock, a rebuild of the index takes an exclusive one, so that the two never overlap.
+	"""
+	if not shared:
+		frappe.db.get_value("Company", company, "name", for_update=True)
+		return
+
+	share_mode = "for share" if frappe.db.db_type == "postgres" else "lock in share mode"
+	frappe.db.sql(f"select name from `tabCompany` where name = %s {share_mode}", company)
+
+
 class QueryPaymentLedger:
 	"""
 	Helper Class for Querying Payment Ledger Entry
@@ -1913,8 +2093,12 @@ class QueryPaymentLedger:
 		"""
 		Database query to fetch voucher amount and voucher outstanding using Common Table Expression
 		"""
+		from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+			get_voucher_outstanding_conditions,
+		)
 
 		ple = self.ple
+		vo = qb.DocType("Voucher Outstanding")
 
 		filter_on_voucher_no = []
 		filter_on_against_voucher_no = []
@@ -1933,6 +2117,32 @@ class QueryPaymentLedger:
 			filter_on_voucher_no.append(ple.voucher_no.like(f"%{self.voucher_no}%"))
 			filter_on_against_voucher_no.append(ple.against_voucher_no.like(f"%{self.voucher_no}%"))
 
+		# outstanding is read from Voucher Outstanding when it is kept and the common filter only
+		# uses fields it has, otherwise it is summed up from the Payment Ledger
+		filter_on_voucher_outstanding = get_voucher_outstanding_conditions(self.common_filter)
+		if filter_on_voucher_outstanding is not None:
+			if self.vouchers:
+				filter_on_voucher_outstanding.append(vo.voucher_type.isin(voucher_types))
+				filter_on_voucher_outstanding.append(vo.voucher_no.isin(voucher_nos))
+
+			if self.voucher_no:
+				filter_on_voucher_outstanding.append(vo.voucher_no.like(f"%{self.voucher_no}%"))
+
+			# only read the ledger of the vouchers still open
+			if self.get_invoices or self.get_payments:
+				open_vouchers = (
+					qb.from_(vo)
+					.select(vo.voucher_no)
+					.where(Criterion.all(filter_on_voucher_outstanding))
+					.where(
+						vo.outstanding_in_account_currency > 0
+						if self.get_invoices
+						else vo.outstanding_in_account_currency < 0
+					)
+				)
+				filter_on_voucher_no.append(ple.voucher_no.isin(open_vouchers))
+				filter_on_against_voucher_no.append(ple.against_voucher_no.isin(open_vouchers))
+
 		# build outstanding amount filter
 		filter_on_outstanding_amount = []
 		if self.min_outstanding:
@@ -2003,25 +2213,40 @@ class QueryPaymentLedger:
 		)
 
 		# build query for voucher outstanding
-		query_voucher_outstanding = (
-			qb.from_(ple)
-			.select(
-				ple.account,
-				ple.against_voucher_type.as_("voucher_type"),
-				ple.against_voucher_no.as_("voucher_no"),
-				ple.party_type,
-				ple.party,
-				ple.posting_date,
-				ple.due_date,
-				ple.account_currency.as_("currency"),
-				Sum(ple.amount).as_("amount"),
-				Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
+		if filter_on_voucher_outstanding is not None:
+			query_voucher_outstanding = (
+				qb.from_(vo)
+				.select(
+					vo.account,
+					vo.voucher_type,
+					vo.voucher_no,
+					vo.party_type,
+					vo.party,
+					vo.outstanding.as_("amount"),
+					vo.outstanding_in_account_currency.as_("amount_in_account_currency"),
+				)
+				.where(Criterion.all(filter_on_voucher_outstanding))
+			)
+		else:
+			query_voucher_outstanding = (
+				qb.from_(ple)
+				.select(
+					ple.account,
+					ple.against_voucher_type.as_("voucher_type"),
+					ple.against_voucher_no.as_("voucher_no"),
+					ple.party_type,
+					ple.party,
+					ple.posting_date,
+					ple.due_date,
+					ple.account_currency.as_("currency"),
+					Sum(ple.amount).as_("amount"),
+					Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
+				)
+				.where(ple.delinked == 0)
+				.where(Criterion.all(filter_on_against_voucher_no))
+				.where(Criterion.all(self.common_filter))
+				.groupby(ple.against_voucher_type, ple.against_voucher_no, ple.party_type, ple.party)
 			)
-			.where(ple.delinked == 0)
-			.where(Criterion.all(filter_on_against_voucher_no))
-			.where(Criterion.all(self.common_filter))
-			.groupby(ple.against_voucher_type, ple.against_voucher_no, ple.party_type, ple.party)
-		)
 
 		# build CTE for combining voucher amount and outstanding
 		self.cte_query_voucher_amount_and_outstanding = (
@@ -2,10 +2,169 @@
 # GPL v3 License. See license.txt
 
 import click
+from frappe.commands import get_site, pass_context
 
 
 def call_command(cmd, context):
 	return click.Context(cmd, obj=context).forward(cmd)
 
 
-commands = []
+@click.command("rebuild-account-daily-balance")
+@click.option("--company", help="Only rebuild the balances of this company")
+@pass_context
+def rebuild_account_daily_balance(context, company=None):
+	"Rebuild Account Daily Balance from GL Entries"
+	import frappe
+
+	from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+		rebuild_account_daily_balance,
+	)
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		rebuild_account_daily_balance(company)
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+@click.command("verify-account-daily-balance")
+@click.option("--company", help="Only verify the balances of this company")
+@pass_context
+def verify_account_daily_balance(context, company=None):
+	"List Account Daily Balances that do not match the GL Entries"
+	import frappe
+
+	from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+		verify_account_daily_balance,
+	)
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		mismatches = verify_account_daily_balance(company)
+		for d in mismatches:
+			click.echo(f"{d.posting_date} {d.account}: expected {d.expected}, found {d.actual}")
+
+		click.secho(f"{len(mismatches)} mismatched balance(s)", fg="red" if mismatches else "green")
+	finally:
+		frappe.destroy()
+
+
+@click.command("rebuild-batch-running-balance")
+@click.option("--item-code", help="Only rebuild the balances of this item")
+@click.option("--warehouse", help="Only rebuild the balances in this warehouse")
+@pass_context
+def rebuild_batch_running_balance(context, item_code=None, warehouse=None):
+	"Rebuild Batch Running Balance from Serial and Batch Entries"
+	import frappe
+
+	from erpnext.stock.doctype.batch_running_balance.batch_running_balance import (
+		rebuild_batch_running_balance,
+	)
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		rebuild_batch_running_balance(item_code, warehouse)
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+@click.command("verify-batch-running-balance")
+@click.option("--item-code", help="Only verify the balances of this item")
+@click.option("--warehouse", help="Only verify the balances in this warehouse")
+@pass_context
+def verify_batch_running_balance(context, item_code=None, warehouse=None):
+	"List Batch Running Balances that do not match the Serial and Batch Entries"
+	import frappe
+
+	from erpnext.stock.doctype.batch_running_balance.batch_running_balance import (
+		verify_batch_running_balance,
+	)
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		mismatches = verify_batch_running_balance(item_code, warehouse)
+		for d in mismatches:
+			click.echo(
+				f"{d.serial_and_batch_bundle} {d.batch_no} ({d.warehouse}): expected {d.expected}, found {d.actual}"
+			)
+
+		click.secho(f"{len(mismatches)} mismatched balance(s)", fg="red" if mismatches else "green")
+	finally:
+		frappe.destroy()
+
+
+@click.command("rebuild-item-search-index")
+@pass_context
+def rebuild_item_search_index(context):
+	"Rebuild the Item Search Tokens of every item"
+	import frappe
+
+	from erpnext.stock.doctype.item_search_token.item_search_token import rebuild_item_search_index
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		rebuild_item_search_index()
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+@click.command("rebuild-voucher-outstanding")
+@click.option("--company", help="Only rebuild the outstandings of this company")
+@pass_context
+def rebuild_voucher_outstanding(context, company=None):
+	"Rebuild Voucher Outstanding from Payment Ledger Entries"
+	import frappe
+
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		rebuild_voucher_outstanding,
+	)
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		rebuild_voucher_outstanding(company)
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+@click.command("verify-voucher-outstanding")
+@click.option("--company", help="Only verify the outstandings of this company")
+@pass_context
+def verify_voucher_outstanding(context, company=None):
+	"List Voucher Outstandings that do not match the Payment Ledger Entries"
+	import frappe
+
+	from erpnext.accounts.doctype.voucher_outstanding.voucher_outstanding import (
+		verify_voucher_outstanding,
+	)
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		mismatches = verify_voucher_outstanding(company)
+		for d in mismatches:
+			click.echo(f"{d.voucher_type} {d.voucher_no} {d.party}: expected {d.expected}, found {d.actual}")
+
+		click.secho(f"{len(mismatches)} mismatched outstanding(s)", fg="red" if mismatches else "green")
+	finally:
+		frappe.destroy()
+
+
+commands = [
+	rebuild_account_daily_balance,
+	verify_account_daily_balance,
+	rebuild_batch_running_balance,
+	verify_batch_running_balance,
+	rebuild_item_search_index,
+	rebuild_voucher_outstanding,
+	verify_voucher_outstanding,
+]
@@ -10,10 +10,14 @@ from frappe import qb, scrub
 from frappe.desk.reportview import get_filters_cond, get_match_cond
 from frappe.query_builder import Criterion, CustomFunction
 from frappe.query_builder.functions import Concat, Locate, Sum
-from frappe.utils import nowdate, today, unique
+from frappe.utils import cint, nowdate, today, unique
 from pypika import Order
 
 import erpnext
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	get_item_search_condition,
+	is_item_search_index_ready,
+)
 from erpnext.stock.get_item_details import _get_item_tax_template
 
 
@@ -202,6 +206,32 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 		# scan description only if items are less than 50000
 		description_cond = "or tabItem.description LIKE %(txt)s"
 
+	search_cond = f"""({searchfields} or tabItem.item_code IN (select parent from `tabItem Barcode` where barcode LIKE %(txt)s)
+			{description_cond})"""
+
+	if is_item_search_index_ready():
+		items = get_item_query_results(
+			doctype,
+			txt,
+			columns,
+			get_item_search_condition(txt).replace("%", "%%"),
+			filters,
+			conditions,
+			start,
+			page_len,
+			as_dict,
+		)
+
+		# the index matches the start of words, text found only inside a word is searched for as before
+		if items or cint(start):
+			return items
+
+	return get_item_query_results(
+		doctype, txt, columns, search_cond, filters, conditions, start, page_len, as_dict
+	)
+
+
+def get_item_query_results(doctype, txt, columns, search_cond, filters, conditions, start, page_len, as_dict):
 	return frappe.db.sql(
 		"""select
 			tabItem.name {columns}
@@ -210,8 +240,7 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			and tabItem.disabled=0
 			and tabItem.has_variants=0
 			and (tabItem.end_of_life > %(today)s or ifnull(tabItem.end_of_life, '0000-00-00')='0000-00-00')
-			and ({scond} or tabItem.item_code IN (select parent from `tabItem Barcode` where barcode LIKE %(txt)s)
-				{description_cond})
+			and {search_cond}
 			{fcond} {mcond}
 		order by
 			if(locate(%(_txt)s, name), locate(%(_txt)s, name), 99999),
@@ -220,10 +249,9 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			name, item_name
 		limit %(start)s, %(page_len)s """.format(
 			columns=columns,
-			scond=searchfields,
+			search_cond=search_cond,
 			fcond=get_filters_cond(doctype, filters, conditions).replace("%", "%%"),
 			mcond=get_match_cond(doctype).replace("%", "%%"),
-			description_cond=description_cond,
 		),
 		{
 			"today": nowdate(),
@@ -31,6 +31,7 @@ class calculate_taxes_and_totals:
 		)
 
 		self._items = self.filter_rows() if self.doc.doctype == "Quotation" else self.doc.get("items")
+		self._item_tax_maps = {}
 
 		get_round_off_applicable_accounts(self.doc.company, frappe.flags.round_off_applicable_accounts)
 		self.calculate()
@@ -296,7 +297,14 @@ class calculate_taxes_and_totals:
 				self._set_in_company_currency(item, ["net_rate", "net_amount"])
 
 	def _load_item_tax_rate(self, item_tax_rate):
-		return json.loads(item_tax_rate) if item_tax_rate else {}
+		if not item_tax_rate:
+			return {}
+
+		# parsed once per document, the maps are only read
+		if item_tax_rate not in self._item_tax_maps:
+			self._item_tax_maps[item_tax_rate] = json.loads(item_tax_rate)
+
+		return self._item_tax_maps[item_tax_rate]
 
 	def get_current_tax_fraction(self, tax, item_tax_map):
 		"""
@@ -363,81 +371,209 @@ class calculate_taxes_and_totals:
 			self._calculate()
 
 	def calculate_taxes(self):
+		"""
+		Compute the taxes one tax row at a time, over the amounts of all the items.
+
+		Item tax maps are parsed once and precisions resolved once per tax row. A tax row
+		only needs the per item amounts of the previous rows, kept as lists indexed by item.
+		"""
 		rounding_adjustment_computed = self.doc.get("is_consolidated") and self.doc.get("rounding_adjustment")
 		if not rounding_adjustment_computed:
 			self.doc.rounding_adjustment = 0
 
-		# maintain actual tax rate based on idx
-		actual_tax_dict = dict(
-			[
-				[tax.idx, flt(tax.tax_amount, tax.precision("tax_amount"))]
-				for tax in self.doc.get("taxes")
-				if tax.charge_type == "Actual"
-			]
-		)
+		taxes = self.doc.get("taxes")
+		if not (self._items and taxes):
+			return
 
-		for n, item in enumerate(self._items):
-			item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
-			for i, tax in enumerate(self.doc.get("taxes")):
-				# tax_amount represents the amount of tax for the current step
-				current_tax_amount = self.get_current_tax_amount(item, tax, item_tax_map)
-				if frappe.flags.round_row_wise_tax:
-					current_tax_amount = flt(current_tax_amount, tax.precision("tax_amount"))
+		discount_on_grand_total = self.discount_amount_applied and self.doc.apply_discount_on == "Grand Total"
+		item_tax_maps = [self._load_item_tax_rate(item.item_tax_rate) for item in self._items]
+		net_amounts = [item.net_amount for item in self._items]
 
-				# Adjust divisional loss to the last item
-				if tax.charge_type == "Actual":
-					actual_tax_dict[tax.idx] -= current_tax_amount
-					if n == len(self._items) - 1:
-						current_tax_amount += actual_tax_dict[tax.idx]
+		# per item amounts of each tax row, for the rows based on previous rows
+		tax_amounts_by_row, grand_totals_by_row = [], []
 
-				# accumulate tax amount into tax.tax_amount
-				if tax.charge_type != "Actual" and not (
-					self.discount_amount_applied and self.doc.apply_discount_on == "Grand Total"
-				):
-					tax.tax_amount += current_tax_amount
+		for i, tax in enumerate(taxes):
+			tax_amount_precision = tax.precision("tax_amount")
+			tax_rates = self.get_item_tax_rates(tax, item_tax_maps)
+			tax_amounts = self.get_current_tax_amounts(
+				tax, tax_rates, net_amounts, tax_amounts_by_row, grand_totals_by_row, tax_amount_precision
+			)
+
+			if not (self.doc.get("is_consolidated") or tax.get("dont_recompute_tax")):
+				self.set_item_wise_tax_for_items(tax, tax_rates, tax_amounts, tax_amount_precision)
 
-				# store tax_amount for current item as it will be used for
-				# charge type = 'On Previous Row Amount'
-				tax.tax_amount_for_current_item = current_tax_amount
+			if frappe.flags.round_row_wise_tax:
+				tax_amounts = [flt(amount, tax_amount_precision) for amount in tax_amounts]
+
+			# Adjust divisional loss to the last item
+			if tax.charge_type == "Actual":
+				remaining_tax_amount = flt(tax.tax_amount, tax_amount_precision)
+				for amount in tax_amounts:
+					remaining_tax_amount -= amount
+
+				tax_amounts[-1] += remaining_tax_amount
+
+			for amount in tax_amounts:
+				# accumulate tax amount into tax.tax_amount
+				if tax.charge_type != "Actual" and not discount_on_grand_total:
+					tax.tax_amount += amount
 
 				# set tax after discount
-				tax.tax_amount_after_discount_amount += current_tax_amount
+				tax.tax_amount_after_discount_amount += amount
+
+			# note: grand_total_for_current_item contains the contribution of
+			# item's amount, previously applied tax and the current tax on that item
+			previous_grand_totals = grand_totals_by_row[i - 1] if i else net_amounts
+			grand_totals = [
+				flt(previous_grand_total + self.get_tax_amount_if_for_valuation_or_deduction(amount, tax))
+				for previous_grand_total, amount in zip(previous_grand_totals, tax_amounts, strict=True)
+			]
+
+			tax_amounts_by_row.append(tax_amounts)
+			grand_totals_by_row.append(grand_totals)
+
+			# values of the last item, as left by an item by item computation
+			tax.tax_amount_for_current_item = tax_amounts[-1]
+			tax.grand_total_for_current_item = grand_totals[-1]
+
+			self.round_off_totals(tax)
+			self._set_in_company_currency(tax, ["tax_amount", "tax_amount_after_discount_amount"])
 
-				current_tax_amount = self.get_tax_amount_if_for_valuation_or_deduction(
-					current_tax_amount, tax
+			self.round_off_base_values(tax)
+			self.set_cumulative_total(i, tax)
+
+			self._set_in_company_currency(tax, ["total"])
+
+			# adjust Discount Amount loss in last tax iteration
+			if (
+				i == (len(taxes) - 1)
+				and self.discount_amount_applied
+				and self.doc.discount_amount
+				and self.doc.apply_discount_on == "Grand Total"
+				and not rounding_adjustment_computed
+			):
+				self.doc.rounding_adjustment = flt(
+					self.doc.grand_total - flt(self.doc.discount_amount) - tax.total,
+					self.doc.precision("rounding_adjustment"),
 				)
 
-				# note: grand_total_for_current_item contains the contribution of
-				# item's amount, previously applied tax and the current tax on that item
-				if i == 0:
-					tax.grand_total_for_current_item = flt(item.net_amount + current_tax_amount)
-				else:
-					tax.grand_total_for_current_item = flt(
-						self.doc.get("taxes")[i - 1].grand_total_for_current_item + current_tax_amount
-					)
+	def get_item_tax_rates(self, tax, item_tax_maps):
+		rate_precision = None
+		tax_rates = []
+		for item_tax_map in item_tax_maps:
+			if tax.account_head in item_tax_map:
+				if rate_precision is None:
+					rate_precision = self.doc.precision("rate", tax)
 
-				# set precision in the last item iteration
-				if n == len(self._items) - 1:
-					self.round_off_totals(tax)
-					self._set_in_company_currency(tax, ["tax_amount", "tax_amount_after_discount_amount"])
+				tax_rates.append(flt(item_tax_map.get(tax.account_head), rate_precision))
+			else:
+				tax_rates.append(tax.rate)
+
+		return tax_rates
+
+	def get_current_tax_amounts(
+		self,
+		tax,
+		tax_rates,
+		net_amounts,
+		tax_amounts_by_row,
+		grand_totals_by_row,
+		tax_amount_precision,
+		items=None,
+	):
+		"""Tax amounts of the tax row for each item, of all the items unless `items` are given"""
+		if items is None:
+			items = self._items
 
-					self.round_off_base_values(tax)
-					self.set_cumulative_total(i, tax)
+		if tax.charge_type == "Actual":
+			# distribute the tax amount proportionally to each item row
+			actual = flt(tax.tax_amount, tax_amount_precision)
 
-					self._set_in_company_currency(tax, ["total"])
+			if tax.get("is_tax_withholding_account") and items[0].meta.get_field("apply_tds"):
+				if not self.doc.tax_withholding_net_total:
+					return [0.0] * len(items)
 
-					# adjust Discount Amount loss in last tax iteration
-					if (
-						i == (len(self.doc.get("taxes")) - 1)
-						and self.discount_amount_applied
-						and self.doc.discount_amount
-						and self.doc.apply_discount_on == "Grand Total"
-						and not rounding_adjustment_computed
-					):
-						self.doc.rounding_adjustment = flt(
-							self.doc.grand_total - flt(self.doc.discount_amount) - tax.total,
-							self.doc.precision("rounding_adjustment"),
-						)
+				return [
+					item.net_amount * actual / self.doc.tax_withholding_net_total
+					if item.get("apply_tds")
+					else 0.0
+					for item in items
+				]
+
+			if not self.doc.net_total:
+				return [0.0] * len(items)
+
+			return [net_amount * actual / self.doc.net_total for net_amount in net_amounts]
+
+		elif tax.charge_type == "On Net Total":
+			return [
+				(tax_rate / 100.0) * net_amount
+				for tax_rate, net_amount in zip(tax_rates, net_amounts, strict=True)
+			]
+
+		elif tax.charge_type in ("On Previous Row Amount", "On Previous Row Total"):
+			if tax.charge_type == "On Previous Row Amount":
+				previous_row_amounts = tax_amounts_by_row[cint(tax.row_id) - 1]
+			else:
+				previous_row_amounts = grand_totals_by_row[cint(tax.row_id) - 1]
+
+			return [
+				(tax_rate / 100.0) * amount
+				for tax_rate, amount in zip(tax_rates, previous_row_amounts, strict=True)
+			]
+
+		elif tax.charge_type == "On Item Quantity":
+			return [tax_rate * item.qty for tax_rate, item in zip(tax_rates, items, strict=True)]
+
+		return [0.0] * len(items)
+
+	def get_current_tax_amount(self, item, tax, item_tax_map):
+		"""Tax amount of the tax row for one item, from the amounts of the previous rows for the item"""
+		tax_rate = self._get_tax_rate(tax, item_tax_map)
+		taxes = self.doc.get("taxes")
+
+		[current_tax_amount] = self.get_current_tax_amounts(
+			tax,
+			[tax_rate],
+			[item.net_amount],
+			[[row.tax_amount_for_current_item] for row in taxes],
+			[[row.grand_total_for_current_item] for row in taxes],
+			tax.precision("tax_amount"),
+			items=[item],
+		)
+
+		if not (self.doc.get("is_consolidated") or tax.get("dont_recompute_tax")):
+			self.set_item_wise_tax(item, tax, tax_rate, current_tax_amount)
+
+		return current_tax_amount
+
+	def set_item_wise_tax_for_items(self, tax, tax_rates, tax_amounts, tax_amount_precision, items=None):
+		"""Store the tax breakup of the tax row for each item, of all the items unless `items` are given"""
+		round_row_wise_tax = frappe.flags.round_row_wise_tax
+		conversion_rate = self.doc.conversion_rate
+		item_wise_tax_detail = tax.item_wise_tax_detail
+
+		for item, tax_rate, current_tax_amount in zip(
+			self._items if items is None else items, tax_rates, tax_amounts, strict=True
+		):
+			key = item.item_code or item.item_name
+			item_wise_tax_amount = current_tax_amount * conversion_rate
+			if round_row_wise_tax:
+				item_wise_tax_amount = flt(item_wise_tax_amount, tax_amount_precision)
+				if item_wise_tax_detail.get(key):
+					item_wise_tax_amount += flt(item_wise_tax_detail[key][1], tax_amount_precision)
+				item_wise_tax_detail[key] = [tax_rate, flt(item_wise_tax_amount, tax_amount_precision)]
+			else:
+				if item_wise_tax_detail.get(key):
+					item_wise_tax_amount += item_wise_tax_detail[key][1]
+
+				item_wise_tax_detail[key] = [tax_rate, item_wise_tax_amount]
+
+	def set_item_wise_tax(self, item, tax, tax_rate, current_tax_amount):
+		# store tax breakup for each item
+		self.set_item_wise_tax_for_items(
+			tax, [tax_rate], [current_tax_amount], tax.precision("tax_amount"), items=[item]
+		)
 
 	def get_tax_amount_if_for_valuation_or_deduction(self, tax_amount, tax):
 		# if just for valuation, do not add the tax amount in total
@@ -462,60 +598,6 @@ class calculate_taxes_and_totals:
 		else:
 			tax.total = flt(self.doc.get("taxes")[row_idx - 1].total + tax_amount, tax.precision("total"))
 
-	def get_current_tax_amount(self, item, tax, item_tax_map):
-		tax_rate = self._get_tax_rate(tax, item_tax_map)
-		current_tax_amount = 0.0
-
-		if tax.charge_type == "Actual":
-			# distribute the tax amount proportionally to each item row
-			actual = flt(tax.tax_amount, tax.precision("tax_amount"))
-
-			if tax.get("is_tax_withholding_account") and item.meta.get_field("apply_tds"):
-				if not item.get("apply_tds") or not self.doc.tax_withholding_net_total:
-					current_tax_amount = 0.0
-				else:
-					current_tax_amount = item.net_amount * actual / self.doc.tax_withholding_net_total
-			else:
-				current_tax_amount = (
-					item.net_amount * actual / self.doc.net_total if self.doc.net_total else 0.0
-				)
-
-		elif tax.charge_type == "On Net Total":
-			current_tax_amount = (tax_rate / 100.0) * item.net_amount
-		elif tax.charge_type == "On Previous Row Amount":
-			current_tax_amount = (tax_rate / 100.0) * self.doc.get("taxes")[
-				cint(tax.row_id) - 1
-			].tax_amount_for_current_item
-		elif tax.charge_type == "On Previous Row Total":
-			current_tax_amount = (tax_rate / 100.0) * self.doc.get("taxes")[
-				cint(tax.row_id) - 1
-			].grand_total_for_current_item
-		elif tax.charge_type == "On Item Quantity":
-			current_tax_amount = tax_rate * item.qty
-
-		if not (self.doc.get("is_consolidated") or tax.get("dont_recompute_tax")):
-			self.set_item_wise_tax(item, tax, tax_rate, current_tax_amount)
-
-		return current_tax_amount
-
-	def set_item_wise_tax(self, item, tax, tax_rate, current_tax_amount):
-		# store tax breakup for each item
-		key = item.item_code or item.item_name
-		item_wise_tax_amount = current_tax_amount * self.doc.conversion_rate
-		if frappe.flags.round_row_wise_tax:
-			item_wise_tax_amount = flt(item_wise_tax_amount, tax.precision("tax_amount"))
-			if tax.item_wise_tax_detail.get(key):
-				item_wise_tax_amount += flt(tax.item_wise_tax_detail[key][1], tax.precision("tax_amount"))
-			tax.item_wise_tax_detail[key] = [
-				tax_rate,
-				flt(item_wise_tax_amount, tax.precision("tax_amount")),
-			]
-		else:
-			if tax.item_wise_tax_detail.get(key):
-				item_wise_tax_amount += tax.item_wise_tax_detail[key][1]
-
-			tax.item_wise_tax_detail[key] = [tax_rate, item_wise_tax_amount]
-
 	def round_off_totals(self, tax):
 		if tax.account_head in frappe.flags.round_off_applicable_accounts:
 			tax.tax_amount = round(tax.tax_amount, 0)
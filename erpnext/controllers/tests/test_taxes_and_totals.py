@@ -0,0 +1,338 @@
+import json
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import flt
+
+from erpnext.controllers.taxes_and_totals import calculate_taxes_and_totals
+
+ITEMS = [
+	{"item_code": "_Test Item", "qty": 3, "rate": 33.33},
+	{"item_code": "_Test Item 2", "qty": 7, "rate": 12.7},
+	{"item_code": "_Test Item", "qty": 1.5, "rate": 999.99},
+	{
+		"item_code": "_Test Item Home Desktop 100",
+		"qty": 11,
+		"rate": 0.37,
+		"item_tax_rate": json.dumps({"_Test Account VAT - _TC": 5, "_Test Account Service Tax - _TC": 0}),
+	},
+	{"item_code": "_Test FG Item", "qty": 2, "rate": 1234.56},
+	{
+		"item_code": "_Test Item 2",
+		"qty": 13,
+		"rate": 7.77,
+		"item_tax_rate": json.dumps({"_Test Account VAT - _TC": 12.5}),
+	},
+]
+
+TAX_FIELDS = (
+	"tax_amount",
+	"tax_amount_after_discount_amount",
+	"total",
+	"base_tax_amount",
+	"base_tax_amount_after_discount_amount",
+	"base_total",
+	"tax_amount_for_current_item",
+	"grand_total_for_current_item",
+)
+DOC_FIELDS = (
+	"net_total",
+	"total_taxes_and_charges",
+	"grand_total",
+	"base_grand_total",
+	"rounding_adjustment",
+	"rounded_total",
+	"discount_amount",
+)
+
+
+class ItemWiseTaxesAndTotals(calculate_taxes_and_totals):
+	"""Taxes computed item by item for every tax row, to compare the tax row wise engine against"""
+
+	def calculate_taxes(self):
+		rounding_adjustment_computed = self.doc.get("is_consolidated") and self.doc.get("rounding_adjustment")
+		if not rounding_adjustment_computed:
+			self.doc.rounding_adjustment = 0
+
+		actual_tax_dict = dict(
+			[
+				[tax.idx, flt(tax.tax_amount, tax.precision("tax_amount"))]
+				for tax in self.doc.get("taxes")
+				if tax.charge_type == "Actual"
+			]
+		)
+
+		for n, item in enumerate(self._items):
+			item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
+			for i, tax in enumerate(self.doc.get("taxes")):
+				current_tax_amount = self.get_current_tax_amount(item, tax, item_tax_map)
+				if frappe.flags.round_row_wise_tax:
+					current_tax_amount = flt(current_tax_amount, tax.precision("tax_amount"))
+
+				if tax.charge_type == "Actual":
+					actual_tax_dict[tax.idx] -= current_tax_amount
+					if n == len(self._items) - 1:
+						current_tax_amount += actual_tax_dict[tax.idx]
+
+				if tax.charge_type != "Actual" and not (
+					self.discount_amount_applied and self.doc.apply_discount_on == "Grand Total"
+				):
+					tax.tax_amount += current_tax_amount
+
+				tax.tax_amount_for_current_item = current_tax_amount
+				tax.tax_amount_after_discount_amount += current_tax_amount
+
+				current_tax_amount = self.get_tax_amount_if_for_valuation_or_deduction(
+					current_tax_amount, tax
+				)
+
+				if i == 0:
+					tax.grand_total_for_current_item = flt(item.net_amount + current_tax_amount)
+				else:
+					tax.grand_total_for_current_item = flt(
+						self.doc.get("taxes")[i - 1].grand_total_for_current_item + current_tax_amount
+					)
+
+				if n == len(self._items) - 1:
+					self.round_off_totals(tax)
+					self._set_in_company_currency(tax, ["tax_amount", "tax_amount_after_discount_amount"])
+
+					self.round_off_base_values(tax)
+					self.set_cumulative_total(i, tax)
+
+					self._set_in_company_currency(tax, ["total"])
+
+					if (
+						i == (len(self.doc.get("taxes")) - 1)
+						and self.discount_amount_applied
+						and self.doc.discount_amount
+						and self.doc.apply_discount_on == "Grand Total"
+						and not rounding_adjustment_computed
+					):
+						self.doc.rounding_adjustment = flt(
+							self.doc.grand_total - flt(self.doc.discount_amount) - tax.total,
+							self.doc.precision("rounding_adjustment"),
+						)
+
+
+def make_transaction(doctype, taxes, **kwargs):
+	doc = frappe.new_doc(doctype)
+	doc.update({"company": "_Test Company", "currency": "INR", "conversion_rate": 1, **kwargs})
+
+	for item in ITEMS:
+		doc.append("items", {**item, "uom": "_Test UOM", "conversion_factor": 1})
+
+	for tax in taxes:
+		doc.append(
+			"taxes",
+			{"cost_center": "_Test Cost Center - _TC", "description": tax["account_head"], **tax},
+		)
+
+	return doc
+
+
+class TestTaxesAndTotals(IntegrationTestCase):
+	def assertSameTaxes(self, taxes, doctype="Sales Invoice", **kwargs):
+		expected = make_transaction(doctype, taxes, **kwargs)
+		ItemWiseTaxesAndTotals(expected)
+
+		actual = make_transaction(doctype, taxes, **kwargs)
+		calculate_taxes_and_totals(actual)
+
+		for fieldname in DOC_FIELDS:
+			self.assertEqual(actual.get(fieldname), expected.get(fieldname), fieldname)
+
+		for actual_item, expected_item in zip(actual.items, expected.items, strict=True):
+			self.assertEqual(actual_item.net_amount, expected_item.net_amount)
+			self.assertEqual(actual_item.net_rate, expected_item.net_rate)
+
+		for actual_tax, expected_tax in zip(actual.taxes, expected.taxes, strict=True):
+			for fieldname in TAX_FIELDS:
+				self.assertEqual(actual_tax.get(fieldname), expected_tax.get(fieldname), fieldname)
+
+			self.assertEqual(actual_tax.item_wise_tax_detail, expected_tax.item_wise_tax_detail)
+
+		return actual
+
+	def test_on_net_total(self):
+		self.assertSameTaxes(
+			[
+				{"charge_type": "On Net Total", "account_head": "_Test Account VAT - _TC", "rate": 18},
+				{
+					"charge_type": "On Net Total",
+					"account_head": "_Test Account Service Tax - _TC",
+					"rate": 7.5,
+				},
+			]
+		)
+
+	def test_actual(self):
+		self.assertSameTaxes(
+			[
+				{
+					"charge_type": "Actual",
+					"account_head": "_Test Account Shipping Charges - _TC",
+					"tax_amount": 100.03,
+				},
+				{"charge_type": "On Net Total", "account_head": "_Test Account VAT - _TC", "rate": 10},
+			]
+		)
+
+	def test_on_previous_row_amount(self):
+		self.assertSameTaxes(
+			[
+				{
+					"charge_type": "On Net Total",
+					"account_head": "_Test Account Excise Duty - _TC",
+					"rate": 12,
+				},
+				{
+					"charge_type": "On Previous Row Amount",
+					"account_head": "_Test Account Education Cess - _TC",
+					"rate": 2,
+					"row_id": 1,
+				},
+				{
+					"charge_type": "On Previous Row Amount",
+					"account_head": "_Test Account S&H Education Cess - _TC",
+					"rate": 1,
+					"row_id": 1,
+				},
+			]
+		)
+
+	def test_on_previous_row_total(self):
+		self.assertSameTaxes(
+			[
+				{
+					"charge_type": "On Net Total",
+					"account_head": "_Test Account Excise Duty - _TC",
+					"rate": 12,
+				},
+				{
+					"charge_type": "Actual",
+					"account_head": "_Test Account Shipping Charges - _TC",
+					"tax_amount": 33.33,
+				},
+				{
+					"charge_type": "On Previous Row Total",
+					"account_head": "_Test Account VAT - _TC",
+					"rate": 12.5,
+					"row_id": 2,
+				},
+			]
+		)
+
+	def test_on_item_quantity(self):
+		self.assertSameTaxes(
+			[
+				{"charge_type": "On Item Quantity", "account_head": "_Test Account VAT - _TC", "rate": 0.13},
+				{
+					"charge_type": "On Previous Row Total",
+					"account_head": "_Test Account Service Tax - _TC",
+					"rate": 3,
+					"row_id": 1,
+				},
+			]
+		)
+
+	def test_inclusive_taxes(self):
+		self.assertSameTaxes(
+			[
+				{
+					"charge_type": "On Net Total",
+					"account_head": "_Test Account Excise Duty - _TC",
+					"rate": 12,
+					"included_in_print_rate": 1,
+				},
+				{
+					"charge_type": "On Previous Row Amount",
+					"account_head": "_Test Account Education Cess - _TC",
+					"rate": 2,
+					"row_id": 1,
+					"included_in_print_rate": 1,
+				},
+				{
+					"charge_type": "On Previous Row Total",
+					"account_head": "_Test Account VAT - _TC",
+					"rate": 12.5,
+					"row_id": 2,
+					"included_in_print_rate": 1,
+				},
+			]
+		)
+
+	def test_purchase_deductions_and_valuation(self):
+		self.assertSameTaxes(
+			[
+				{
+					"charge_type": "On Net Total",
+					"account_head": "_Test Account VAT - _TC",
+					"rate": 15,
+					"category": "Total",
+					"add_deduct_tax": "Add",
+				},
+				{
+					"charge_type": "Actual",
+					"account_head": "_Test Account Shipping Charges - _TC",
+					"tax_amount": 75.5,
+					"category": "Valuation and Total",
+					"add_deduct_tax": "Add",
+				},
+				{
+					"charge_type": "On Previous Row Total",
+					"account_head": "_Test Account Customs Duty - _TC",
+					"rate": 4,
+					"row_id": 2,
+					"category": "Valuation",
+					"add_deduct_tax": "Add",
+				},
+				{
+					"charge_type": "On Net Total",
+					"account_head": "_Test Account Discount - _TC",
+					"rate": 2.5,
+					"category": "Total",
+					"add_deduct_tax": "Deduct",
+				},
+			],
+			doctype="Purchase Invoice",
+		)
+
+	def test_discount_on_grand_total(self):
+		self.assertSameTaxes(
+			[
+				{"charge_type": "On Net Total", "account_head": "_Test Account VAT - _TC", "rate": 18},
+				{
+					"charge_type": "Actual",
+					"account_head": "_Test Account Shipping Charges - _TC",
+					"tax_amount": 40,
+				},
+				{
+					"charge_type": "On Previous Row Total",
+					"account_head": "_Test Account Service Tax - _TC",
+					"rate": 1.5,
+					"row_id": 2,
+				},
+			],
+			apply_discount_on="Grand Total",
+			additional_discount_percentage=7.5,
+		)
+
+	@IntegrationTestCase.change_settings("Accounts Settings", {"round_row_wise_tax": 1})
+	def test_round_row_wise_tax(self):
+		self.assertSameTaxes(
+			[
+				{"charge_type": "On Net Total", "account_head": "_Test Account VAT - _TC", "rate": 18.333},
+				{
+					"charge_type": "Actual",
+					"account_head": "_Test Account Shipping Charges - _TC",
+					"tax_amount": 10.01,
+				},
+				{
+					"charge_type": "On Previous Row Amount",
+					"account_head": "_Test Account Service Tax - _TC",
+					"rate": 3.7,
+					"row_id": 1,
+				},
+			]
+		)
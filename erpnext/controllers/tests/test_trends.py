@@ -0,0 +1,85 @@
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import today
+
+from erpnext.accounts.utils import get_fiscal_year
+from erpnext.controllers.trends import get_columns, get_data, get_trends_cube_key
+from erpnext.selling.doctype.sales_order.test_sales_order import make_sales_order
+from erpnext.stock.doctype.item.test_item import make_item
+
+
+class TestTrends(IntegrationTestCase):
+	def setUp(self):
+		self.item = make_item("_Test Trends Item", {"is_stock_item": 1}).name
+		frappe.cache.delete_keys("trends_cube:")
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_filters(self, period, group_by=None):
+		return frappe._dict(
+			{
+				"company": "_Test Company",
+				"fiscal_year": get_fiscal_year(today(), company="_Test Company")[0],
+				"period": period,
+				"based_on": "Item",
+				"group_by": group_by,
+			}
+		)
+
+	def get_item_rows(self, filters):
+		conditions = get_columns(filters, "Sales Order")
+		data = get_data(filters, conditions)
+
+		# the item row and the rows grouped under it, which leave the item column blank
+		start = next(i for i, row in enumerate(data) if row[0] == self.item)
+		rows = [data[start]]
+		for row in data[start + 1 :]:
+			if row[0]:
+				break
+			rows.append(row)
+
+		self.assertEqual(len(rows[0]), len(conditions["columns"]))
+		return rows
+
+	def test_grouped_trends(self):
+		make_sales_order(item_code=self.item, customer="_Test Customer", qty=5, rate=100)
+		make_sales_order(item_code=self.item, customer="_Test Customer", qty=3, rate=100)
+		make_sales_order(item_code=self.item, customer="_Test Customer 1", qty=2, rate=50)
+
+		filters = self.get_filters("Monthly", group_by="Customer")
+		item_row, *customer_rows = self.get_item_rows(filters)
+
+		self.assertEqual(item_row[2], "")
+		self.assertEqual(item_row[-2:], [10, 900])
+		self.assertEqual(
+			{row[2]: row[-2:] for row in customer_rows},
+			{"_Test Customer": [8, 800], "_Test Customer 1": [2, 100]},
+		)
+
+		# the same cube is pivoted for every period
+		self.assertTrue(frappe.cache.get_value(get_trends_cube_key(filters, {"trans": "Sales Order"})))
+		for period, period_count in (("Quarterly", 4), ("Half-Yearly", 2), ("Yearly", 1)):
+			item_row, *customer_rows = self.get_item_rows(self.get_filters(period, group_by="Customer"))
+			self.assertEqual(len(item_row), 3 + 2 * period_count + 2)
+			self.assertEqual(sum(value or 0 for value in item_row[3:-2:2]), 10)
+			self.assertEqual(sum(value or 0 for value in item_row[4:-2:2]), 900)
+
+	def test_trends_without_group_by(self):
+		make_sales_order(item_code=self.item, qty=4, rate=25)
+
+		(item_row,) = self.get_item_rows(self.get_filters("Quarterly"))
+		self.assertEqual(item_row[-2:], [4, 100])
+		self.assertEqual([value for value in item_row[2:-2] if value is not None], [4, 100])
+
+	def test_trends_after_submit_and_cancel(self):
+		make_sales_order(item_code=self.item, qty=4, rate=25)
+		filters = self.get_filters("Yearly")
+		self.assertEqual(self.get_item_rows(filters)[0][-2:], [4, 100])
+
+		# the cached cube is not read once the transactions have changed
+		so = make_sales_order(item_code=self.item, qty=1, rate=25)
+		self.assertEqual(self.get_item_rows(filters)[0][-2:], [5, 125])
+
+		so.cancel()
+		self.assertEqual(self.get_item_rows(filters)[0][-2:], [4, 100])
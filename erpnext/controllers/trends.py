@@ -1,11 +1,18 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
+import hashlib
 
 import frappe
 from frappe import _
+from frappe.query_builder.functions import Max
 from frappe.utils import getdate
 
+PERIOD_MONTHS = {"Monthly": 1, "Quarterly": 3, "Half-Yearly": 6, "Yearly": 12}
+
+# seconds for which the monthly cube of a report is reused across period switches
+TRENDS_CUBE_EXPIRY = 5 * 60
+
 
 def get_columns(filters, trans):
 	validate_filters(filters)
@@ -57,20 +64,67 @@ def validate_filters(filters):
 
 
 def get_data(filters, conditions):
+	"""
+	Pivot the cached monthly cube of the transaction into the columns of the selected period.
+
+	When grouped, every based on row is followed by one row per value of the group by column, with
+	the based on columns left blank.
+	"""
 	data = []
-	inc, cond = "", ""
-	query_details = conditions["based_on_select"] + conditions["period_wise_select"]
-
-	posting_date = "t1.transaction_date"
-	if conditions.get("trans") in [
-		"Sales Invoice",
-		"Purchase Invoice",
-		"Purchase Receipt",
-		"Delivery Note",
-	]:
-		posting_date = "t1.posting_date"
-		if filters.period_based_on and conditions.get("trans") in ["Sales Invoice", "Purchase Invoice"]:
-			posting_date = "t1." + filters.period_based_on
+	cube = get_trends_cube(filters, conditions)
+	parent_key, parent_row = None, None
+
+	for key, group_value, *values in cube.rows:
+		based_on_width = len(values) - 2 * cube.months - 2
+		based_on_values = values[:based_on_width]
+		period_values = get_period_values(values[based_on_width:-2], values[-2:], filters.get("period"))
+
+		if not filters.get("group_by"):
+			data.append(based_on_values + period_values)
+			continue
+
+		if parent_row is None or key != parent_key:
+			parent_key, parent_row = key, [*based_on_values, "", *period_values]
+			data.append(parent_row)
+		else:
+			for i, value in enumerate(period_values, based_on_width + 1):
+				parent_row[i] = sum_values([parent_row[i], value])
+
+		data.append(["" for _i in range(based_on_width)] + [group_value] + period_values)
+
+	return data
+
+
+def get_trends_cube(filters, conditions):
+	"""
+	Monthly quantities and amounts of the transaction per based on and group by value.
+
+	The cube does not depend on the period, so it is cached for a few minutes and switching the
+	period on the same filters does not query the transactions again. The last modified time of
+	the transactions is part of the cache key, so a submission or cancellation is never missed.
+	"""
+	cache_key = get_trends_cube_key(filters, conditions)
+	cube = frappe.cache.get_value(cache_key)
+	if cube is None:
+		cube = build_trends_cube(filters, conditions)
+		frappe.cache.set_value(cache_key, cube, expires_in_sec=TRENDS_CUBE_EXPIRY)
+
+	return cube
+
+
+def get_trends_cube_key(filters, conditions):
+	key = {k: v for k, v in filters.items() if k != "period"}
+	key["trans"] = conditions["trans"]
+	# every submission, cancellation or status change modifies the transaction
+	transaction = frappe.qb.DocType(conditions["trans"])
+	key["modified"] = str(frappe.qb.from_(transaction).select(Max(transaction.modified)).run()[0][0])
+
+	return "trends_cube:" + hashlib.sha1(frappe.as_json(key).encode()).hexdigest()
+
+
+def build_trends_cube(filters, conditions):
+	cond = ""
+	trans_date = get_trans_date(filters, conditions["trans"])
 
 	if conditions["based_on_select"] in ["t1.project,", "t2.project,"]:
 		cond = " and " + conditions["based_on_select"][:-1] + " IS Not NULL"
@@ -86,131 +140,81 @@ def get_data(filters, conditions):
 		"Fiscal Year", filters.get("fiscal_year"), ["year_start_date", "year_end_date"]
 	)
 
-	if filters.get("group_by"):
-		sel_col = ""
-		ind = conditions["columns"].index(conditions["grbc"][0])
+	month_ranges = get_period_date_ranges("Monthly", filters.get("fiscal_year"))
+	month_select = ""
+	for dt in month_ranges:
+		month_select = get_period_wise_query(dt, trans_date, month_select)
+
+	group_by = conditions["group_by"]
+	sel_col = get_group_by_column(filters, conditions["trans"])
+	if sel_col:
+		group_by += ", " + sel_col
+
+	rows = frappe.db.sql(
+		""" select {}, {}, {} {} SUM(t2.stock_qty), SUM(t2.base_net_amount)
+				from `tab{}` t1, `tab{} Item` t2 {}
+				where t2.parent = t1.name and t1.company = %s and t1.{} between %s and %s and
+				t1.docstatus = 1 {} {}
+				group by {}
+				order by {}
+			""".format(
+			conditions["group_by"],
+			sel_col or "NULL",
+			conditions["based_on_select"],
+			month_select,
+			conditions["trans"],
+			conditions["trans"],
+			conditions["addl_tables"],
+			trans_date,
+			conditions.get("addl_tables_relational_cond", ""),
+			cond,
+			group_by,
+			group_by,
+		),
+		(filters.get("company"), year_start_date, year_end_date),
+		as_list=1,
+	)
 
-		if filters.get("group_by") == "Item":
-			sel_col = "t2.item_code"
-		elif filters.get("group_by") == "Customer":
-			sel_col = "t1.party_name" if conditions.get("trans") == "Quotation" else "t1.customer"
-		elif filters.get("group_by") == "Supplier":
-			sel_col = "t1.supplier"
+	return frappe._dict(months=len(month_ranges), rows=rows)
 
-		if filters.get("based_on") in ["Item", "Customer", "Supplier"]:
-			inc = 2
-		else:
-			inc = 1
-		data1 = frappe.db.sql(
-			""" select {} from `tab{}` t1, `tab{} Item` t2 {}
-					where t2.parent = t1.name and t1.company = {} and {} between {} and {} and
-					t1.docstatus = 1 {} {}
-					group by {}
-				""".format(
-				query_details,
-				conditions["trans"],
-				conditions["trans"],
-				conditions["addl_tables"],
-				"%s",
-				posting_date,
-				"%s",
-				"%s",
-				conditions.get("addl_tables_relational_cond"),
-				cond,
-				conditions["group_by"],
-			),
-			(filters.get("company"), year_start_date, year_end_date),
-			as_list=1,
-		)
 
-		for d in range(len(data1)):
-			# to add blanck column
-			dt = data1[d]
-			dt.insert(ind, "")
-			data.append(dt)
-
-			# to get distinct value of col specified by group_by in filter
-			row = frappe.db.sql(
-				"""select DISTINCT({}) from `tab{}` t1, `tab{} Item` t2 {}
-						where t2.parent = t1.name and t1.company = {} and {} between {} and {}
-						and t1.docstatus = 1 and {} = {} {} {}
-					""".format(
-					sel_col,
-					conditions["trans"],
-					conditions["trans"],
-					conditions["addl_tables"],
-					"%s",
-					posting_date,
-					"%s",
-					"%s",
-					conditions["group_by"],
-					"%s",
-					conditions.get("addl_tables_relational_cond"),
-					cond,
-				),
-				(filters.get("company"), year_start_date, year_end_date, data1[d][0]),
-				as_list=1,
-			)
-
-			for i in range(len(row)):
-				des = ["" for q in range(len(conditions["columns"]))]
-
-				# get data for group_by filter
-				row1 = frappe.db.sql(
-					""" select {} , {} from `tab{}` t1, `tab{} Item` t2 {}
-							where t2.parent = t1.name and t1.company = {} and {} between {} and {}
-							and t1.docstatus = 1 and {} = {} and {} = {} {} {}
-						""".format(
-						sel_col,
-						conditions["period_wise_select"],
-						conditions["trans"],
-						conditions["trans"],
-						conditions["addl_tables"],
-						"%s",
-						posting_date,
-						"%s",
-						"%s",
-						sel_col,
-						"%s",
-						conditions["group_by"],
-						"%s",
-						conditions.get("addl_tables_relational_cond"),
-						cond,
-					),
-					(filters.get("company"), year_start_date, year_end_date, row[i][0], data1[d][0]),
-					as_list=1,
-				)
-
-				des[ind] = row[i][0]
-
-				for j in range(1, len(conditions["columns"]) - inc):
-					des[j + inc] = row1[0][j]
-
-				data.append(des)
-	else:
-		data = frappe.db.sql(
-			""" select {} from `tab{}` t1, `tab{} Item` t2 {}
-					where t2.parent = t1.name and t1.company = {} and {} between {} and {} and
-					t1.docstatus = 1 {} {}
-					group by {}
-				""".format(
-				query_details,
-				conditions["trans"],
-				conditions["trans"],
-				conditions["addl_tables"],
-				"%s",
-				posting_date,
-				"%s",
-				"%s",
-				cond,
-				conditions.get("addl_tables_relational_cond", ""),
-				conditions["group_by"],
-			),
-			(filters.get("company"), year_start_date, year_end_date),
-			as_list=1,
-		)
+def get_trans_date(filters, trans):
+	if trans in ["Purchase Receipt", "Delivery Note", "Purchase Invoice", "Sales Invoice"]:
+		if filters.period_based_on and trans in ["Purchase Invoice", "Sales Invoice"]:
+			return filters.period_based_on
+
+		return "posting_date"
+
+	return "transaction_date"
 
-	return data
+
+def get_group_by_column(filters, trans):
+	if filters.get("group_by") == "Item":
+		return "t2.item_code"
+	elif filters.get("group_by") == "Customer":
+		return "t1.party_name" if trans == "Quotation" else "t1.customer"
+	elif filters.get("group_by") == "Supplier":
+		return "t1.supplier"
+
+
+def get_period_values(month_values, totals, period):
+	"""Roll the monthly (qty, amount) pairs up into the pairs of the period, followed by the totals"""
+	if period == "Yearly":
+		return [*totals, *totals]
+
+	values = []
+	step = 2 * PERIOD_MONTHS[period]
+	for start in range(0, len(month_values), step):
+		period_values = month_values[start : start + step]
+		values += [sum_values(period_values[0::2]), sum_values(period_values[1::2])]
+
+	return values + list(totals)
+
+
+def sum_values(values):
+	# keeps NULL for periods without transactions, as the SQL sum did
+	values = [value for value in values if value is not None]
+	return sum(values) if values else None
 
 
 def get_mon(dt):
@@ -222,12 +226,7 @@ def period_wise_columns_query(filters, trans):
 	pwc = []
 	bet_dates = get_period_date_ranges(filters.get("period"), filters.get("fiscal_year"))
 
-	if trans in ["Purchase Receipt", "Delivery Note", "Purchase Invoice", "Sales Invoice"]:
-		trans_date = "posting_date"
-		if filters.period_based_on and trans in ["Purchase Invoice", "Sales Invoice"]:
-			trans_date = filters.period_based_on
-	else:
-		trans_date = "transaction_date"
+	trans_date = get_trans_date(filters, trans)
 
 	if filters.get("period") != "Yearly":
 		for dt in bet_dates:
@@ -277,7 +276,7 @@ def get_period_date_ranges(period, fiscal_year=None, year_start_date=None):
 			"Fiscal Year", fiscal_year, ["year_start_date", "year_end_date"]
 		)
 
-	increment = {"Monthly": 1, "Quarterly": 3, "Half-Yearly": 6, "Yearly": 12}.get(period)
+	increment = PERIOD_MONTHS.get(period)
 
 	period_date_ranges = []
 	for _i in range(1, 13, increment):
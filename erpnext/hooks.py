@@ -320,6 +320,10 @@ doc_events = {
 	tuple(period_closing_doctypes): {
 		"validate": "erpnext.accounts.doctype.accounting_period.accounting_period.validate_accounting_period_on_doc_save",
 	},
+	("Item Barcode", "Item Supplier", "Item Variant Attribute"): {
+		"on_update": "erpnext.stock.doctype.item_search_token.item_search_token.update_item_search_index_of_row",
+		"after_delete": "erpnext.stock.doctype.item_search_token.item_search_token.update_item_search_index_of_row",
+	},
 	"Stock Entry": {
 		"on_submit": "erpnext.stock.doctype.material_request.material_request.update_completed_and_requested_qty",
 		"on_cancel": "erpnext.stock.doctype.material_request.material_request.update_completed_and_requested_qty",
@@ -456,6 +460,7 @@ scheduler_events = {
 		"erpnext.manufacturing.doctype.bom_update_tool.bom_update_tool.auto_update_latest_price_in_all_boms",
 		"erpnext.crm.utils.open_leads_opportunities_based_on_todays_event",
 		"erpnext.assets.doctype.asset.depreciation.post_depreciation_entries",
+		"erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot.create_stock_balance_snapshots",
 	],
 	"monthly_long": [
 		"erpnext.accounts.deferred_revenue.process_deferred_accounting",
@@ -491,6 +496,18 @@ advance_payment_payable_doctypes = ["Purchase Order"]
 
 invoice_doctypes = ["Sales Invoice", "Purchase Invoice"]
 
+# Voucher types whose GL and Payment Ledger Entries can be posted in bulk
+# when "Enable Bulk Ledger Posting" is set in Accounts Settings
+bulk_ledger_posting_doctypes = [
+	"Sales Invoice",
+	"Purchase Invoice",
+	"Journal Entry",
+	"Payment Entry",
+	"Delivery Note",
+	"Purchase Receipt",
+	"Stock Entry",
+]
+
 bank_reconciliation_doctypes = [
 	"Payment Entry",
 	"Journal Entry",
@@ -542,6 +559,7 @@ accounting_dimension_doctypes = [
 	"Subcontracting Receipt",
 	"Subcontracting Receipt Item",
 	"Account Closing Balance",
+	"Account Daily Balance",
 	"Supplier Quotation",
 	"Supplier Quotation Item",
 	"Payment Reconciliation",
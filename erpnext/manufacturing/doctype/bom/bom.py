@@ -14,6 +14,7 @@ from frappe.utils import cint, cstr, flt, parse_json, today
 from frappe.website.website_generator import WebsiteGenerator
 
 import erpnext
+from erpnext.manufacturing.doctype.bom.bom_graph import get_bom_node, get_child_boms, invalidate_bom_graph
 from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.item.item import get_item_details
 from erpnext.stock.get_item_details import get_conversion_factor, get_price_list_rate
@@ -45,12 +46,12 @@ class BOMTree:
 			self.__create_tree()
 
 	def __create_tree(self):
-		bom = frappe.get_cached_doc("BOM", self.name)
+		bom = get_bom_node(self.name)
 		self.item_code = bom.item
 		self.bom_qty = bom.quantity
 
 		for item in bom.get("items", []):
-			qty = item.stock_qty / bom.quantity  # quantity per unit
+			qty = item.qty_per_unit
 			exploded_qty = self.exploded_qty * qty
 			if item.bom_no:
 				child = BOMTree(item.bom_no, exploded_qty=exploded_qty, qty=qty)
@@ -269,7 +270,7 @@ class BOM(WebsiteGenerator):
 		context.parents = [{"name": "boms", "title": _("All BOMs")}]
 
 	def on_update(self):
-		frappe.cache().hdel("bom_children", self.name)
+		invalidate_bom_graph(self.name, structure_changed=True)
 		self.check_recursion()
 
 	def on_submit(self):
@@ -279,6 +280,7 @@ class BOM(WebsiteGenerator):
 	def on_cancel(self):
 		self.db_set("is_active", 0)
 		self.db_set("is_default", 0)
+		invalidate_bom_graph(self.name, structure_changed=True)
 
 		# check if used in any other bom
 		self.validate_bom_links()
@@ -302,6 +304,7 @@ class BOM(WebsiteGenerator):
 		doc.set_status(save=True)
 
 	def on_update_after_submit(self):
+		invalidate_bom_graph(self.name, structure_changed=True)
 		self.validate_bom_links()
 		self.manage_default_bom()
 
@@ -696,17 +699,6 @@ class BOM(WebsiteGenerator):
 			self.append("items", row)
 
 	def traverse_tree(self, bom_list=None):
-		def _get_children(bom_no):
-			children = frappe.cache().hget("bom_children", bom_no)
-			if children is None:
-				children = frappe.db.sql_list(
-					"""SELECT `bom_no` FROM `tabBOM Item`
-					WHERE `parent`=%s AND `bom_no`!='' AND `parenttype`='BOM'""",
-					bom_no,
-				)
-				frappe.cache().hset("bom_children", bom_no, children)
-			return children
-
 		count = 0
 		if not bom_list:
 			bom_list = []
@@ -715,7 +707,7 @@ class BOM(WebsiteGenerator):
 			bom_list.append(self.name)
 
 		while count < len(bom_list):
-			for child_bom in _get_children(bom_list[count]):
+			for child_bom in get_child_boms(bom_list[count]):
 				if child_bom not in bom_list:
 					bom_list.append(child_bom)
 			count += 1
@@ -730,6 +722,7 @@ class BOM(WebsiteGenerator):
 		if save_updates:
 			# not via doc event, table is not regenerated and needs updation
 			self.calculate_exploded_cost()
+			invalidate_bom_graph(self.name)
 
 		old_cost = self.total_cost
 
@@ -920,32 +913,11 @@ class BOM(WebsiteGenerator):
 
 	def get_child_exploded_items(self, bom_no, stock_qty):
 		"""Add all items from Flat BOM of child BOM"""
-		# Did not use qty_consumed_per_unit in the query, as it leads to rounding loss
-		child_fb_items = frappe.db.sql(
-			"""
-			SELECT
-				bom_item.item_code,
-				bom_item.item_name,
-				bom_item.description,
-				bom_item.source_warehouse,
-				bom_item.operation,
-				bom_item.stock_uom,
-				bom_item.stock_qty,
-				bom_item.rate,
-				bom_item.include_item_in_manufacturing,
-				bom_item.sourced_by_supplier,
-				bom_item.stock_qty / ifnull(bom.quantity, 1) AS qty_consumed_per_unit
-			FROM `tabBOM Explosion Item` bom_item, `tabBOM` bom
-			WHERE
-				bom_item.parent = bom.name
-				AND bom.name = %s
-				AND bom.docstatus = 1
-		""",
-			bom_no,
-			as_dict=1,
-		)
+		child_bom = get_bom_node(bom_no)
+		if not child_bom or child_bom.docstatus != 1:
+			return
 
-		for d in child_fb_items:
+		for d in child_bom.exploded_items:
 			self.add_to_cur_exploded_items(
 				frappe._dict(
 					{
@@ -955,7 +927,7 @@ class BOM(WebsiteGenerator):
 						"operation": d["operation"],
 						"description": d["description"],
 						"stock_uom": d["stock_uom"],
-						"stock_qty": d["qty_consumed_per_unit"] * stock_qty,
+						"stock_qty": d["qty_per_unit"] * stock_qty,
 						"rate": flt(d["rate"]),
 						"include_item_in_manufacturing": d.get("include_item_in_manufacturing", 0),
 						"sourced_by_supplier": d.get("sourced_by_supplier", 0),
@@ -969,6 +941,7 @@ class BOM(WebsiteGenerator):
 
 		if save:
 			frappe.db.sql("""delete from `tabBOM Explosion Item` where parent=%s""", self.name)
+			invalidate_bom_graph(self.name)
 
 		for d in sorted(self.cur_exploded_items, key=itemgetter(0)):
 			ch = self.append("exploded_items", {})
@@ -1144,91 +1117,94 @@ def get_bom_items_as_dict(
 ):
 	item_dict = {}
 
-	group_by_cond = "group by item_code, stock_uom"
-	if frappe.get_cached_value("BOM", bom, "track_semi_finished_goods"):
+	bom_node = get_bom_node(bom)
+	if not bom_node or bom_node.docstatus == 2:
+		return item_dict
+
+	if bom_node.track_semi_finished_goods:
 		fetch_exploded = 0
-		group_by_cond = "group by item_code, operation_row_id, stock_uom"
-
-	# Did not use qty_consumed_per_unit in the query, as it leads to rounding loss
-	query = """select
-				bom_item.item_code,
-				bom_item.idx,
-				item.item_name,
-				sum(bom_item.{qty_field}/ifnull(bom.quantity, 1)) * %(qty)s as qty,
-				item.image,
-				bom.project,
-				bom_item.rate,
-				sum(bom_item.{qty_field}/ifnull(bom.quantity, 1)) * bom_item.rate * %(qty)s as amount,
-				item.stock_uom,
-				item.item_group,
-				item.allow_alternative_item,
-				item_default.default_warehouse,
-				item_default.expense_account as expense_account,
-				item_default.buying_cost_center as cost_center
-				{select_columns}
-			from
-				`tab{table}` bom_item
-				JOIN `tabBOM` bom ON bom_item.parent = bom.name
-				JOIN `tabItem` item ON item.name = bom_item.item_code
-				LEFT JOIN `tabItem Default` item_default
-					ON item_default.parent = item.name and item_default.company = %(company)s
-			where
-				bom_item.docstatus < 2
-				and bom.name = %(bom)s
-				and item.is_stock_item in (1, {is_stock_item})
-				{where_conditions}
-				{group_by_cond}
-				order by idx"""
-
-	is_stock_item = 0 if include_non_stock_items else 1
-	if cint(fetch_exploded):
-		query = query.format(
-			table="BOM Explosion Item",
-			where_conditions="",
-			is_stock_item=is_stock_item,
-			qty_field="stock_qty",
-			group_by_cond=group_by_cond,
-			select_columns=""", bom_item.source_warehouse, bom_item.operation,
-				bom_item.include_item_in_manufacturing, bom_item.description, bom_item.rate, bom_item.sourced_by_supplier,
-				(Select idx from `tabBOM Item` where item_code = bom_item.item_code and parent = %(parent)s limit 1) as idx""",
-		)
 
-		items = frappe.db.sql(
-			query, {"parent": bom, "qty": qty, "bom": bom, "company": company}, as_dict=True
-		)
+	if cint(fetch_exploded):
+		bom_items = bom_node.exploded_items
 	elif fetch_scrap_items:
-		query = query.format(
-			table="BOM Scrap Item",
-			where_conditions="",
-			select_columns=", item.description",
-			is_stock_item=is_stock_item,
-			qty_field="stock_qty",
-			group_by_cond=group_by_cond,
-		)
-
-		items = frappe.db.sql(query, {"qty": qty, "bom": bom, "company": company}, as_dict=True)
+		bom_items = bom_node.scrap_items
 	else:
-		query = query.format(
-			table="BOM Item",
-			where_conditions="",
-			is_stock_item=is_stock_item,
-			qty_field="stock_qty" if fetch_qty_in_stock_uom else "qty",
-			select_columns=""", bom_item.uom, bom_item.conversion_factor, bom_item.source_warehouse,
-				bom_item.operation, bom_item.include_item_in_manufacturing, bom_item.sourced_by_supplier,
-				bom_item.description, bom_item.base_rate as rate, bom_item.operation_row_id """,
-			group_by_cond=group_by_cond,
-		)
-		items = frappe.db.sql(query, {"qty": qty, "bom": bom, "company": company}, as_dict=True)
+		bom_items = bom_node.items
+
+	item_details = get_item_details_for_bom_items({d.item_code for d in bom_items}, company)
+	qty = flt(qty)
+
+	# rows of the same item are added up, with the details of the first one
+	for bom_item in bom_items:
+		item = item_details.get(bom_item.item_code)
+		if not item or not (item.is_stock_item or include_non_stock_items):
+			continue
+
+		# Did not use qty_consumed_per_unit, as it leads to rounding loss
+		qty_per_unit = bom_item.qty_per_unit
+		if not (fetch_qty_in_stock_uom or cint(fetch_exploded) or fetch_scrap_items):
+			qty_per_unit = flt(bom_item.qty) / (flt(bom_node.quantity) or 1.0)
 
-	for item in items:
-		key = item.item_code
-		if item.operation_row_id:
-			key = (item.item_code, item.operation_row_id)
+		key = bom_item.item_code
+		if bom_node.track_semi_finished_goods and bom_item.operation_row_id:
+			key = (bom_item.item_code, bom_item.operation_row_id)
 
 		if key in item_dict:
-			item_dict[key]["qty"] += flt(item.qty)
+			item_dict[key].qty += qty_per_unit * qty
+			item_dict[key].amount += qty_per_unit * flt(bom_item.rate) * qty
+			continue
+
+		row = frappe._dict(
+			{
+				"item_code": bom_item.item_code,
+				"idx": bom_item.idx,
+				"item_name": item.item_name,
+				"qty": qty_per_unit * qty,
+				"image": item.image,
+				"project": bom_node.project,
+				"rate": bom_item.rate,
+				"amount": qty_per_unit * flt(bom_item.rate) * qty,
+				"stock_uom": item.stock_uom,
+				"item_group": item.item_group,
+				"allow_alternative_item": item.allow_alternative_item,
+				"default_warehouse": item.default_warehouse,
+				"expense_account": item.expense_account,
+				"cost_center": item.cost_center,
+			}
+		)
+
+		if cint(fetch_exploded):
+			row.update(
+				{
+					"source_warehouse": bom_item.source_warehouse,
+					"operation": bom_item.operation,
+					"include_item_in_manufacturing": bom_item.include_item_in_manufacturing,
+					"description": bom_item.description,
+					"sourced_by_supplier": bom_item.sourced_by_supplier,
+					# position of the item in the BOM, if it is not from a sub assembly
+					"idx": next((d.idx for d in bom_node.items if d.item_code == bom_item.item_code), None),
+				}
+			)
+		elif fetch_scrap_items:
+			row.description = item.description
 		else:
-			item_dict[key] = item
+			row.update(
+				{
+					"uom": bom_item.uom,
+					"conversion_factor": bom_item.conversion_factor,
+					"source_warehouse": bom_item.source_warehouse,
+					"operation": bom_item.operation,
+					"include_item_in_manufacturing": bom_item.include_item_in_manufacturing,
+					"sourced_by_supplier": bom_item.sourced_by_supplier,
+					"description": bom_item.description,
+					"rate": bom_item.base_rate,
+					"operation_row_id": bom_item.operation_row_id,
+				}
+			)
+
+		item_dict[key] = row
+
+	item_dict = dict(sorted(item_dict.items(), key=lambda d: (d[1].idx is not None, d[1].idx or 0)))
 
 	for item, item_details in item_dict.items():
 		for d in [
@@ -1236,13 +1212,49 @@ def get_bom_items_as_dict(
 			["Cost Center", "cost_center", "cost_center"],
 			["Warehouse", "default_warehouse", ""],
 		]:
-			company_in_record = frappe.db.get_value(d[0], item_details.get(d[1]), "company")
+			company_in_record = item_details.get(d[1]) and frappe.get_cached_value(
+				d[0], item_details.get(d[1]), "company"
+			)
 			if not item_details.get(d[1]) or (company_in_record and company != company_in_record):
 				item_dict[item][d[1]] = frappe.get_cached_value("Company", company, d[2]) if d[2] else None
 
 	return item_dict
 
 
+def get_item_details_for_bom_items(item_codes, company):
+	if not item_codes:
+		return {}
+
+	item = frappe.qb.DocType("Item")
+	item_default = frappe.qb.DocType("Item Default")
+
+	items = (
+		frappe.qb.from_(item)
+		.left_join(item_default)
+		.on((item_default.parent == item.name) & (item_default.company == company))
+		.select(
+			item.name,
+			item.item_name,
+			item.image,
+			item.description,
+			item.stock_uom,
+			item.item_group,
+			item.allow_alternative_item,
+			item.is_stock_item,
+			item_default.default_warehouse,
+			item_default.expense_account,
+			item_default.buying_cost_center.as_("cost_center"),
+		)
+		.where(item.name.isin(list(item_codes)))
+	).run(as_dict=True)
+
+	item_details = {}
+	for row in items:
+		item_details.setdefault(row.name, row)
+
+	return item_details
+
+
 @frappe.whitelist()
 def get_bom_items(bom, company, qty=1, fetch_exploded=1):
 	items = get_bom_items_as_dict(bom, company, qty, fetch_exploded, include_non_stock_items=True).values()
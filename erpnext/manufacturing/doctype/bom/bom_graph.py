@@ -0,0 +1,206 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""
+Site wide cache of the BOM structure.
+
+Every BOM is cached as a node holding its items (the edges to the sub assembly BOMs), its exploded
+items and its scrap items, each with the quantity required to make one unit of the BOM. Nodes are
+built on first use and removed whenever the BOM is saved, submitted, cancelled or its cost or
+exploded items are updated, so explosions of the same BOM do not query the database again.
+"""
+
+from collections import defaultdict
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import flt
+
+BOM_GRAPH_KEY = "bom_graph"
+BOM_DEPENDENCE_MAP_KEY = "bom_dependence_map"
+
+BOM_FIELDS = ["name", "item", "quantity", "docstatus", "is_active", "project", "track_semi_finished_goods"]
+BOM_ITEM_FIELDS = [
+	"item_code",
+	"item_name",
+	"bom_no",
+	"idx",
+	"qty",
+	"uom",
+	"stock_qty",
+	"stock_uom",
+	"conversion_factor",
+	"rate",
+	"base_rate",
+	"source_warehouse",
+	"operation",
+	"operation_row_id",
+	"include_item_in_manufacturing",
+	"sourced_by_supplier",
+	"description",
+	"image",
+]
+BOM_EXPLOSION_ITEM_FIELDS = [
+	"item_code",
+	"item_name",
+	"idx",
+	"stock_qty",
+	"stock_uom",
+	"rate",
+	"source_warehouse",
+	"operation",
+	"include_item_in_manufacturing",
+	"sourced_by_supplier",
+	"description",
+	"image",
+]
+BOM_SCRAP_ITEM_FIELDS = ["item_code", "item_name", "idx", "stock_qty", "stock_uom", "rate"]
+
+
+def get_bom_node(bom_no: str) -> frappe._dict | None:
+	"""Cached node of the BOM, None if the BOM does not exist"""
+	if not bom_no:
+		return None
+
+	return frappe.cache.hget(BOM_GRAPH_KEY, bom_no, generator=partial(build_bom_node, bom_no))
+
+
+def build_bom_node(bom_no: str) -> frappe._dict | None:
+	node = frappe.db.get_value("BOM", bom_no, BOM_FIELDS, as_dict=True)
+	if not node:
+		return None
+
+	# quantities per unit are computed here once, instead of dividing in every explosion
+	quantity = flt(node.quantity) or 1.0
+	for key, doctype, fields in (
+		("items", "BOM Item", BOM_ITEM_FIELDS),
+		("exploded_items", "BOM Explosion Item", BOM_EXPLOSION_ITEM_FIELDS),
+		("scrap_items", "BOM Scrap Item", BOM_SCRAP_ITEM_FIELDS),
+	):
+		rows = frappe.get_all(
+			doctype,
+			filters={"parent": bom_no, "parenttype": "BOM"},
+			fields=fields,
+			order_by="idx",
+		)
+		for row in rows:
+			row.qty_per_unit = flt(row.stock_qty) / quantity
+
+		node[key] = rows
+
+	node.child_boms = list(dict.fromkeys(row.bom_no for row in node["items"] if row.bom_no))
+	return node
+
+
+def get_child_boms(bom_no: str) -> list[str]:
+	"""Sub assembly BOMs used in the BOM, in the order of its items"""
+	node = get_bom_node(bom_no)
+	return node.child_boms if node else []
+
+
+def get_bom_level(bom_no: str, _path: tuple = ()) -> int:
+	"""
+	Level of the BOM in the graph, 0 for BOMs made only of raw materials and one more than the
+	highest of its sub assembly BOMs otherwise.
+	"""
+	node = get_bom_node(bom_no)
+	if not node:
+		return 0
+
+	if node.get("level") is not None:
+		return node.level
+
+	if bom_no in _path:
+		frappe.throw(_("BOM recursion: {0} cannot be child of {1}").format(bom_no, _path[-1]))
+
+	node.level = max(
+		(get_bom_level(child_bom, (*_path, bom_no)) + 1 for child_bom in node.child_boms), default=0
+	)
+	frappe.cache.hset(BOM_GRAPH_KEY, bom_no, node)
+
+	return node.level
+
+
+def get_bom_dependence_map() -> tuple[defaultdict, defaultdict]:
+	"""Child to parents and parent to children maps of the active submitted BOMs"""
+	return frappe.cache.get_value(BOM_DEPENDENCE_MAP_KEY, generator=build_bom_dependence_map)
+
+
+def build_bom_dependence_map() -> tuple[defaultdict, defaultdict]:
+	bom = frappe.qb.DocType("BOM")
+	bom_item = frappe.qb.DocType("BOM Item")
+
+	bom_items = (
+		frappe.qb.from_(bom_item)
+		.join(bom)
+		.on(bom_item.parent == bom.name)
+		.select(bom_item.bom_no, bom_item.parent)
+		.where(
+			(bom_item.bom_no.isnotnull())
+			& (bom_item.bom_no != "")
+			& (bom.docstatus == 1)
+			& (bom.is_active == 1)
+			& (bom_item.parenttype == "BOM")
+		)
+	).run(as_dict=True)
+
+	child_parent_map = defaultdict(list)
+	parent_child_map = defaultdict(list)
+	for row in bom_items:
+		child_parent_map[row.bom_no].append(row.parent)
+		parent_child_map[row.parent].append(row.bom_no)
+
+	return child_parent_map, parent_child_map
+
+
+def invalidate_bom_graph(bom_no: str, structure_changed: bool = False) -> None:
+	"""
+	Remove the node of the BOM. If its items or status changed, the BOMs using it are removed as
+	well, since their levels depend on it, along with the dependence map.
+
+	The nodes are removed again once the transaction ends, as they may be rebuilt from uncommitted
+	or not yet committed data in the meantime.
+	"""
+	bom_nos = [bom_no]
+	if structure_changed:
+		bom_nos.extend(get_parent_boms(bom_no))
+
+	delete_nodes(bom_nos, structure_changed)
+	frappe.db.after_commit.add(partial(delete_nodes, bom_nos, structure_changed))
+	frappe.db.after_rollback.add(partial(delete_nodes, bom_nos, structure_changed))
+
+
+def delete_nodes(bom_nos: list[str], structure_changed: bool = False) -> None:
+	frappe.cache.hdel(BOM_GRAPH_KEY, bom_nos)
+	if structure_changed:
+		frappe.cache.delete_value(BOM_DEPENDENCE_MAP_KEY)
+
+
+def get_parent_boms(bom_no: str) -> list[str]:
+	"""All the BOMs using the BOM, directly or through other sub assemblies"""
+	parent_boms = []
+	bom_nos = [bom_no]
+	while bom_nos:
+		bom_nos = [
+			parent
+			for parent in frappe.get_all(
+				"BOM Item",
+				filters={"bom_no": ("in", bom_nos), "parenttype": "BOM", "docstatus": ("<", 2)},
+				pluck="parent",
+				distinct=True,
+			)
+			if parent != bom_no and parent not in parent_boms
+		]
+		parent_boms.extend(bom_nos)
+
+	return parent_boms
+
+
+def clear_bom_graph() -> None:
+	"""Remove the whole graph, for updates that change the items of many BOMs at once"""
+	keys = [BOM_GRAPH_KEY, BOM_DEPENDENCE_MAP_KEY]
+
+	frappe.cache.delete_value(keys)
+	frappe.db.after_commit.add(partial(frappe.cache.delete_value, keys))
+	frappe.db.after_rollback.add(partial(frappe.cache.delete_value, keys))
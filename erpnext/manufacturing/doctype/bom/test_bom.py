@@ -12,7 +12,12 @@ from frappe.utils import cstr, flt
 from erpnext.controllers.tests.test_subcontracting_controller import (
 	set_backflush_based_on,
 )
-from erpnext.manufacturing.doctype.bom.bom import BOMRecursionError, item_query, make_variant_bom
+from erpnext.manufacturing.doctype.bom.bom import (
+	BOMRecursionError,
+	get_bom_items_as_dict,
+	item_query,
+	make_variant_bom,
+)
 from erpnext.manufacturing.doctype.bom_update_log.test_bom_update_log import (
 	update_cost_in_all_boms_in_test,
 )
@@ -352,6 +357,48 @@ class TestBOM(IntegrationTestCase):
 		for reqd_item, created_item in zip(reqd_order, created_order, strict=False):
 			self.assertEqual(reqd_item, created_item.item_code)
 
+	@timeout
+	def test_bom_graph_cache(self):
+		from erpnext.manufacturing.doctype.bom.bom_graph import (
+			BOM_GRAPH_KEY,
+			get_bom_level,
+			get_bom_node,
+		)
+
+		bom_tree = {
+			"Assembly": {
+				"SubAssembly1": {"ChildPart1": {}, "ChildPart2": {}},
+				"SubAssembly2": {"SubSubAssy1": {"ChildPart3": {}}},
+				"ChildPart4": {},
+			}
+		}
+		parent_bom = create_nested_bom(bom_tree, prefix="_Test BOM Graph ")
+		sub_assembly_bom = frappe.db.get_value(
+			"BOM", {"item": "_Test BOM Graph SubAssembly2", "docstatus": 1}
+		)
+
+		self.assertEqual(get_bom_level(parent_bom.name), 2)
+		self.assertEqual(get_bom_level(sub_assembly_bom), 1)
+		self.assertTrue(frappe.cache.hget(BOM_GRAPH_KEY, parent_bom.name))
+
+		node = get_bom_node(parent_bom.name)
+		self.assertEqual(len(node.child_boms), 2)
+		self.assertEqual(
+			sorted(d.item_code for d in node.exploded_items),
+			["_Test BOM Graph ChildPart" + str(i) for i in range(1, 5)],
+		)
+
+		# the exploded quantities are the same as from the flat BOM
+		items = get_bom_items_as_dict(parent_bom.name, "_Test Company", qty=3, include_non_stock_items=True)
+		self.assertEqual(len(items), 4)
+		self.assertEqual(sum(d.qty for d in items.values()), 12)
+
+		# updating the BOM removes it from the graph
+		parent_bom.reload()
+		parent_bom.is_active = 0
+		parent_bom.save()
+		self.assertFalse(frappe.cache.hget(BOM_GRAPH_KEY, parent_bom.name))
+
 	@timeout
 	def test_generated_variant_bom(self):
 		from erpnext.controllers.item_variant import create_variant
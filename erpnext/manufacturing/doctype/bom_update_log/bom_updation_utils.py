@@ -12,6 +12,8 @@ if TYPE_CHECKING:
 import frappe
 from frappe import _
 
+from erpnext.manufacturing.doctype.bom.bom_graph import clear_bom_graph, get_bom_dependence_map
+
 
 def replace_bom(boms: dict, log_name: str) -> None:
 	"Replace current BOM with new BOM in parent BOMs."
@@ -22,7 +24,7 @@ def replace_bom(boms: dict, log_name: str) -> None:
 	unit_cost = get_bom_unit_cost(new_bom)
 	update_new_bom_in_bom_items(unit_cost, current_bom, new_bom)
 
-	frappe.cache().delete_key("bom_children")
+	clear_bom_graph()
 	parent_boms = get_ancestor_boms(new_bom)
 
 	for bom in parent_boms:
@@ -177,30 +179,7 @@ def _generate_dependence_map() -> defaultdict:
 	Generate and return the reverse as well.
 	"""
 
-	bom = frappe.qb.DocType("BOM")
-	bom_item = frappe.qb.DocType("BOM Item")
-
-	bom_items = (
-		frappe.qb.from_(bom_item)
-		.join(bom)
-		.on(bom_item.parent == bom.name)
-		.select(bom_item.bom_no, bom_item.parent)
-		.where(
-			(bom_item.bom_no.isnotnull())
-			& (bom_item.bom_no != "")
-			& (bom.docstatus == 1)
-			& (bom.is_active == 1)
-			& (bom_item.parenttype == "BOM")
-		)
-	).run(as_dict=True)
-
-	child_parent_map = defaultdict(list)
-	parent_child_map = defaultdict(list)
-	for row in bom_items:
-		child_parent_map[row.bom_no].append(row.parent)
-		parent_child_map[row.parent].append(row.bom_no)
-
-	return child_parent_map, parent_child_map
+	return get_bom_dependence_map()
 
 
 def set_values_in_log(log_name: str, values: dict[str, Any], commit: bool = False) -> None:
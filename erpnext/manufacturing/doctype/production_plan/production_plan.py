@@ -25,6 +25,7 @@ from pypika.terms import ExistsCriterion
 
 from erpnext.manufacturing.doctype.bom.bom import get_children as get_bom_children
 from erpnext.manufacturing.doctype.bom.bom import validate_bom_no
+from erpnext.manufacturing.doctype.bom.bom_graph import get_bom_node
 from erpnext.manufacturing.doctype.work_order.work_order import get_item_details
 from erpnext.setup.doctype.item_group.item_group import get_item_group_defaults
 from erpnext.stock.get_item_details import get_conversion_factor
@@ -1191,50 +1192,14 @@ def get_subitems(
 	include_subcontracted_items,
 	parent_qty,
 	planned_qty=1,
+	bom_tree_items=None,
 ):
-	bom_item = frappe.qb.DocType("BOM Item")
-	bom = frappe.qb.DocType("BOM")
-	item = frappe.qb.DocType("Item")
-	item_default = frappe.qb.DocType("Item Default")
-	item_uom = frappe.qb.DocType("UOM Conversion Detail")
+	if bom_tree_items is None:
+		bom_tree_items = get_bom_tree_items([bom_no], company, explode=data.get("include_exploded_items"))
 
-	items = (
-		frappe.qb.from_(bom_item)
-		.join(bom)
-		.on(bom.name == bom_item.parent)
-		.join(item)
-		.on(bom_item.item_code == item.name)
-		.left_join(item_default)
-		.on((item.name == item_default.parent) & (item_default.company == company))
-		.left_join(item_uom)
-		.on((item.name == item_uom.parent) & (item_uom.uom == item.purchase_uom))
-		.select(
-			bom_item.item_code,
-			item.default_material_request_type,
-			item.item_name,
-			IfNull(parent_qty * Sum(bom_item.stock_qty / IfNull(bom.quantity, 1)) * planned_qty, 0).as_(
-				"qty"
-			),
-			item.is_sub_contracted_item.as_("is_sub_contracted"),
-			bom_item.source_warehouse,
-			item.default_bom.as_("default_bom"),
-			bom_item.description.as_("description"),
-			bom_item.stock_uom.as_("stock_uom"),
-			item.min_order_qty.as_("min_order_qty"),
-			item.safety_stock.as_("safety_stock"),
-			item_default.default_warehouse,
-			item.purchase_uom,
-			item_uom.conversion_factor,
-		)
-		.where(
-			(bom.name == bom_no)
-			& (bom_item.docstatus < 2)
-			& (item.is_stock_item.isin([0, 1]) if include_non_stock_items else item.is_stock_item == 1)
-		)
-		.groupby(bom_item.item_code)
-	).run(as_dict=True)
+	for d in get_bom_items(bom_tree_items, bom_no, include_non_stock_items):
+		d.qty = parent_qty * d.qty * planned_qty
 
-	for d in items:
 		if not data.get("include_exploded_items") or not d.default_bom:
 			if d.item_code in item_details:
 				item_details[d.item_code].qty = item_details[d.item_code].qty + d.qty
@@ -1258,10 +1223,102 @@ def get_subitems(
 						include_non_stock_items,
 						include_subcontracted_items,
 						d.qty,
+						bom_tree_items=bom_tree_items,
 					)
 	return item_details
 
 
+def get_bom_tree_items(bom_nos, company, explode=True):
+	"""
+	Item details of the items of the BOMs, along with those of the default BOMs of their
+	sub-assemblies if `explode`, as { item_code: details }. The BOMs are read from the site wide
+	BOM graph, the items of one level of the BOM tree per query.
+	"""
+	bom_tree_items = {}
+	loaded_boms = set()
+	pending = set(filter(None, bom_nos))
+
+	while pending:
+		loaded_boms.update(pending)
+		item_codes = {
+			row.item_code
+			for bom_no in pending
+			for row in (get_bom_node(bom_no) or {}).get("items", [])
+			if row.item_code not in bom_tree_items
+		}
+		bom_tree_items.update(get_bom_tree_item_details(item_codes, company))
+
+		if not explode:
+			break
+
+		pending = {
+			bom_tree_items[item_code].default_bom
+			for item_code in item_codes
+			if item_code in bom_tree_items and bom_tree_items[item_code].default_bom
+		} - loaded_boms
+
+	return bom_tree_items
+
+
+def get_bom_tree_item_details(item_codes, company):
+	if not item_codes:
+		return {}
+
+	item = frappe.qb.DocType("Item")
+	item_default = frappe.qb.DocType("Item Default")
+	item_uom = frappe.qb.DocType("UOM Conversion Detail")
+
+	items = (
+		frappe.qb.from_(item)
+		.left_join(item_default)
+		.on((item.name == item_default.parent) & (item_default.company == company))
+		.left_join(item_uom)
+		.on((item.name == item_uom.parent) & (item_uom.uom == item.purchase_uom))
+		.select(
+			item.name.as_("item_code"),
+			item.is_stock_item,
+			item.default_material_request_type,
+			item.item_name,
+			item.is_sub_contracted_item.as_("is_sub_contracted"),
+			item.default_bom.as_("default_bom"),
+			item.min_order_qty.as_("min_order_qty"),
+			item.safety_stock.as_("safety_stock"),
+			item_default.default_warehouse,
+			item.purchase_uom,
+			item_uom.conversion_factor,
+		)
+		.where(item.name.isin(list(item_codes)))
+	).run(as_dict=True)
+
+	return {d.item_code: d for d in items}
+
+
+def get_bom_items(bom_tree_items, bom_no, include_non_stock_items):
+	"""BOM Items of the BOM grouped by item code, with their stock qty per unit of the BOM"""
+	node = get_bom_node(bom_no)
+	if not node:
+		return []
+
+	items = {}
+	for row in sorted(node["items"], key=lambda row: row.item_code):
+		item_details = bom_tree_items.get(row.item_code)
+		if not item_details or (not include_non_stock_items and not item_details.is_stock_item):
+			continue
+
+		if row.item_code in items:
+			items[row.item_code].qty += row.qty_per_unit
+		else:
+			items[row.item_code] = frappe._dict(
+				item_details,
+				qty=row.qty_per_unit,
+				source_warehouse=row.source_warehouse,
+				description=row.description,
+				stock_uom=row.stock_uom,
+			)
+
+	return list(items.values())
+
+
 def get_material_request_items(
 	doc,
 	row,
@@ -1298,7 +1355,7 @@ def get_material_request_items(
 
 			required_qty = required_qty / row["conversion_factor"]
 
-	if frappe.db.get_value("UOM", row["purchase_uom"], "must_be_whole_number"):
+	if frappe.get_cached_value("UOM", row["purchase_uom"], "must_be_whole_number"):
 		required_qty = ceil(required_qty)
 
 	if include_safety_stock:
@@ -1445,6 +1502,75 @@ def get_bin_details(row, company, for_warehouse=None, all_warehouse=False):
 	return query.run(as_dict=True)
 
 
+def get_bin_warehouse(row, for_warehouse=None):
+	return for_warehouse or row.get("source_warehouse") or row.get("default_warehouse")
+
+
+def get_bin_details_for_items(rows, company, for_warehouse=None):
+	"""
+	Same as `get_bin_details(row, company, for_warehouse)[0]` for each row, with a single query
+	for all of them. Returns { (item_code, warehouse): bin details }.
+	"""
+	scopes = {(row.item_code, get_bin_warehouse(row, for_warehouse)) for row in rows}
+	if not scopes:
+		return {}
+
+	bins = {}
+	for d in frappe.get_all(
+		"Bin",
+		filters={
+			"item_code": ("in", list({item_code for item_code, warehouse in scopes})),
+			"warehouse": ("in", frappe.get_all("Warehouse", filters={"company": company}, pluck="name")),
+		},
+		fields=[
+			"item_code",
+			"warehouse",
+			"projected_qty",
+			"actual_qty",
+			"ordered_qty",
+			"reserved_qty_for_production",
+			"planned_qty",
+		],
+		order_by="item_code, warehouse",
+	):
+		bins.setdefault(d.item_code, []).append(d)
+
+	scope_warehouses = {warehouse for item_code, warehouse in scopes if warehouse}
+	warehouse_bounds = {
+		d.name: (d.lft, d.rgt)
+		for d in frappe.get_all(
+			"Warehouse",
+			filters={
+				"name": ("in", list(scope_warehouses | {d.warehouse for rows in bins.values() for d in rows}))
+			},
+			fields=["name", "lft", "rgt"],
+		)
+	}
+
+	bin_details = {}
+	for item_code, warehouse in scopes:
+		for d in bins.get(item_code, []):
+			if warehouse:
+				lft, rgt = warehouse_bounds.get(warehouse, (None, None))
+				bin_lft, bin_rgt = warehouse_bounds[d.warehouse]
+				if lft is None or not (bin_lft >= lft and bin_rgt <= rgt):
+					continue
+
+			bin_details[(item_code, warehouse)] = frappe._dict(
+				{
+					"warehouse": d.warehouse,
+					"projected_qty": flt(d.projected_qty),
+					"actual_qty": flt(d.actual_qty),
+					"ordered_qty": flt(d.ordered_qty),
+					"reserved_qty_for_production": flt(d.reserved_qty_for_production),
+					"planned_qty": flt(d.planned_qty),
+				}
+			)
+			break
+
+	return bin_details
+
+
 @frappe.whitelist()
 def get_so_details(sales_order):
 	return frappe.db.get_value(
@@ -1519,10 +1645,29 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 		for d in doc.get("sub_assembly_items"):
 			sub_assembly_items.setdefault((d.get("production_item"), d.get("bom_no")), d.get("qty"))
 
+	subitem_boms = []
 	for data in po_items:
 		if not data.get("include_exploded_items") and doc.get("sub_assembly_items"):
 			data["include_exploded_items"] = 1
 
+		if data.get("required_qty"):
+			bom_no = data.get("bom")
+			include_subcontracted_items = 1 if data.get("include_exploded_items") else 0
+		else:
+			bom_no = data.get("bom_no")
+			include_subcontracted_items = doc.get("include_subcontracted_items")
+
+		if not data.get("include_exploded_items") or not (
+			doc.get("skip_available_sub_assembly_item") or include_subcontracted_items
+		):
+			subitem_boms.append(bom_no)
+
+	# the items of the BOM trees of all the plan items are loaded together, one level at a time
+	bom_tree_items = get_bom_tree_items(
+		subitem_boms, company, explode=any(data.get("include_exploded_items") for data in po_items)
+	)
+
+	for data in po_items:
 		planned_qty = data.get("required_qty") or data.get("planned_qty")
 		ignore_existing_ordered_qty = data.get("ignore_existing_ordered_qty") or ignore_existing_ordered_qty
 		warehouse = doc.get("for_warehouse")
@@ -1575,6 +1720,7 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 						include_subcontracted_items,
 						1,
 						planned_qty=planned_qty,
+						bom_tree_items=bom_tree_items,
 					)
 		elif data.get("item_code"):
 			item_master = frappe.get_doc("Item", data["item_code"]).as_dict()
@@ -1612,12 +1758,17 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 			else:
 				so_item_details[sales_order][item_code] = details
 
+	bin_details = get_bin_details_for_items(
+		[details for item_dict in so_item_details.values() for details in item_dict.values()],
+		doc.company,
+		warehouse,
+	)
+
 	mr_items = []
 	for sales_order in so_item_details:
 		item_dict = so_item_details[sales_order]
 		for details in item_dict.values():
-			bin_dict = get_bin_details(details, doc.company, warehouse)
-			bin_dict = bin_dict[0] if bin_dict else {}
+			bin_dict = bin_details.get((details.item_code, get_bin_warehouse(details, warehouse)), {})
 
 			if details.qty > 0:
 				items = get_material_request_items(
@@ -6,6 +6,7 @@ from frappe.utils import add_to_date, flt, getdate, now_datetime, nowdate
 
 from erpnext.controllers.item_variant import create_variant
 from erpnext.manufacturing.doctype.production_plan.production_plan import (
+	get_bom_tree_items,
 	get_items_for_material_requests,
 	get_non_completed_production_plans,
 	get_sales_orders,
@@ -1717,6 +1718,42 @@ class TestProductionPlan(IntegrationTestCase):
 			self.assertEqual(row.production_item, sf_item)
 			self.assertEqual(row.qty, 5.0)
 
+	def test_mr_items_for_deep_bom(self):
+		from erpnext.manufacturing.doctype.bom.test_bom import create_nested_bom
+
+		depth, planned_qty = 6, 3
+		parent_bom = create_nested_bom(make_deep_bom_tree("MRP Deep", depth), prefix="_Test ")
+
+		leaf_item = "_Test MRP Deep" + "-1" * depth
+		make_stock_entry(item_code=leaf_item, qty=5, target="_Test Warehouse - _TC", rate=100)
+
+		plan = create_production_plan(
+			item_code=parent_bom.item,
+			planned_qty=planned_qty,
+			ignore_existing_ordered_qty=1,
+			skip_getting_mr_items=1,
+			do_not_save=1,
+		)
+		plan.for_warehouse = "_Test Warehouse - _TC"
+
+		mr_items = get_items_for_material_requests(plan.as_dict())
+
+		# the BOMs are read from the cached BOM graph, only the items are queried, one level at a time
+		with self.assertQueryCount(depth):
+			bom_tree_items = get_bom_tree_items([parent_bom.name], plan.company)
+		self.assertEqual(len(bom_tree_items), 2 ** (depth + 1) - 1)
+
+		quantities = {row["item_code"]: row["quantity"] for row in mr_items}
+		self.assertEqual(len(quantities), 2**depth + 1)
+
+		# every BOM consumes one unit of the common raw material
+		self.assertEqual(quantities.pop("_Test MRP Deep RM"), planned_qty * (2**depth - 1))
+		for qty in quantities.values():
+			self.assertEqual(qty, planned_qty)
+
+		row = next(row for row in mr_items if row["item_code"] == leaf_item)
+		self.assertEqual(row["actual_qty"], 5)
+
 
 def create_production_plan(**args):
 	"""
@@ -1822,3 +1859,15 @@ def make_bom(**args):
 			bom.submit()
 
 	return bom
+
+
+def make_deep_bom_tree(name, depth):
+	"""Sub-assemblies made of two sub-assemblies and a common raw material, down to `depth` levels"""
+	if not depth:
+		return {name: {}}
+
+	tree = {"MRP Deep RM": {}}
+	for i in (1, 2):
+		tree.update(make_deep_bom_tree(f"{name}-{i}", depth - 1))
+
+	return {name: tree}
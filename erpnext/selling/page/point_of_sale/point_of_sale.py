@@ -3,15 +3,27 @@
 
 
 import json
+from datetime import timedelta
 
 import frappe
-from frappe.utils import cint
+from frappe.utils import cint, create_batch, get_datetime, now_datetime
 from frappe.utils.nestedset import get_root_of
 
-from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_stock_availability
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import (
+	get_stock_availability,
+	get_stock_availability_for_items,
+)
 from erpnext.accounts.doctype.pos_profile.pos_profile import get_child_nodes, get_item_groups
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	get_item_search_condition,
+	is_item_search_index_ready,
+)
 from erpnext.stock.utils import scan_barcode
 
+ITEM_CATALOG_KEY = "pos_item_catalog"
+# seconds of changes looked up again on every update of an item catalog
+ITEM_CATALOG_SYNC_OVERLAP = 60
+
 
 def search_by_term(search_term, warehouse, price_list):
 	result = search_for_serial_or_batch_or_barcode_number(search_term) or {}
@@ -24,7 +36,7 @@ def search_by_term(search_term, warehouse, price_list):
 	if not result:
 		return
 
-	item_doc = frappe.get_doc("Item", item_code)
+	item_doc = frappe.get_cached_doc("Item", item_code)
 
 	if not item_doc:
 		return
@@ -159,30 +171,28 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	if not items_data:
 		return result
 
+	# the details of the whole page are fetched at once, instead of item by item
+	item_codes = [item.item_code for item in items_data]
+	item_uoms = get_item_uoms(item_codes)
+	item_prices = get_item_prices(item_codes, price_list)
+	stock_availability = get_stock_availability_for_items(item_codes, warehouse)
+
 	for item in items_data:
-		uoms = frappe.get_doc("Item", item.item_code).get("uoms", [])
+		uoms = item_uoms.get(item.item_code, {})
 
-		item.actual_qty, _ = get_stock_availability(item.item_code, warehouse)
+		item.actual_qty, _ = stock_availability.get(item.item_code, (0, False))
 		item.uom = item.stock_uom
 
-		item_price = frappe.get_all(
-			"Item Price",
-			fields=["price_list_rate", "currency", "uom", "batch_no"],
-			filters={
-				"price_list": price_list,
-				"item_code": item.item_code,
-				"selling": True,
-			},
-		)
+		item_price = item_prices.get(item.item_code, [])
 
 		if not item_price:
 			result.append(item)
 
 		for price in item_price:
-			uom = next(filter(lambda x: x.uom == price.uom, uoms), {})
+			conversion_factor = uoms.get(price.uom)
 
-			if price.uom != item.stock_uom and uom and uom.conversion_factor:
-				item.actual_qty = item.actual_qty // uom.conversion_factor
+			if price.uom != item.stock_uom and conversion_factor:
+				item.actual_qty = item.actual_qty // conversion_factor
 
 			result.append(
 				{
@@ -196,12 +206,255 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	return {"items": result}
 
 
+def get_item_uoms(item_codes):
+	"""UOM conversion factors of the items, as {item_code: {uom: conversion_factor}}"""
+	item_uoms = {}
+	if not item_codes:
+		return item_uoms
+
+	for row in frappe.get_all(
+		"UOM Conversion Detail",
+		filters={"parent": ("in", item_codes), "parenttype": "Item"},
+		fields=["parent", "uom", "conversion_factor"],
+		order_by="idx",
+	):
+		item_uoms.setdefault(row.parent, {}).setdefault(row.uom, row.conversion_factor)
+
+	return item_uoms
+
+
+def get_item_prices(item_codes, price_list):
+	"""Selling prices of the items in the price list, as {item_code: [prices]}"""
+	item_prices = {}
+	if not item_codes:
+		return item_prices
+
+	for price in frappe.get_all(
+		"Item Price",
+		fields=["item_code", "price_list_rate", "currency", "uom", "batch_no"],
+		filters={
+			"price_list": price_list,
+			"item_code": ("in", item_codes),
+			"selling": True,
+		},
+	):
+		item_prices.setdefault(price.pop("item_code"), []).append(price)
+
+	return item_prices
+
+
+@frappe.whitelist()
+def get_item_catalog(pos_profile, price_list=None, since=None):
+	"""
+	Items of the POS Profile with their UOMs, barcodes, prices and stock, for the terminal to search and
+	browse locally. When `since` (the `timestamp` of the previous call) is given, only the items
+	changed after it are returned, along with the codes of the ones that are not sold anymore.
+	"""
+	frappe.has_permission("POS Profile", "read", pos_profile, throw=True)
+	price_list = price_list or frappe.db.get_value("POS Profile", pos_profile, "selling_price_list")
+	catalog = update_item_catalog(pos_profile, price_list)
+	key = get_item_catalog_key(pos_profile, price_list)
+
+	since = since and get_datetime(since)
+	if not since or since < catalog.created:
+		# the cached catalog was taken again since, so the terminal has to replace its copy
+		return {
+			"items": list(frappe.cache.hgetall(f"{key}:items").values()),
+			"removed": [],
+			"timestamp": catalog.timestamp,
+			"full": 1,
+		}
+
+	items, removed = [], []
+	for item_code, (synced, is_removed) in frappe.cache.hgetall(f"{key}:synced").items():
+		if synced <= since:
+			continue
+
+		if is_removed:
+			removed.append(item_code)
+		else:
+			items.append(frappe.cache.hget(f"{key}:items", item_code))
+
+	return {"items": items, "removed": removed, "timestamp": catalog.timestamp, "full": 0}
+
+
+def update_item_catalog(pos_profile, price_list):
+	"""
+	Update the cached catalog of the POS Profile and price list with the items changed since it was
+	last updated. Items are cached one per hash field, so only the ones that differ are written again,
+	along with the time they were updated or removed at.
+	"""
+	key = get_item_catalog_key(pos_profile, price_list)
+	timestamp = now_datetime()
+
+	catalog = frappe.cache.get_value(key)
+	rebuild = not catalog
+	if rebuild:
+		frappe.cache.delete_value([f"{key}:items", f"{key}:synced"])
+		catalog = frappe._dict({"created": timestamp})
+		items, removed = get_catalog_items(pos_profile, price_list), set()
+	else:
+		# changes committed late, by transactions started before the last update, are caught again
+		since = catalog.timestamp - timedelta(seconds=ITEM_CATALOG_SYNC_OVERLAP)
+		changed_items = get_changed_catalog_items(pos_profile, price_list, since)
+		items = get_catalog_items(pos_profile, price_list, changed_items) if changed_items else []
+		removed = set(changed_items) - {item.item_code for item in items}
+
+	for item in items:
+		if not rebuild and frappe.cache.hget(f"{key}:items", item.item_code) == item:
+			continue
+
+		frappe.cache.hset(f"{key}:items", item.item_code, item)
+		frappe.cache.hset(f"{key}:synced", item.item_code, (timestamp, False))
+
+	for item_code in removed:
+		if frappe.cache.hget(f"{key}:items", item_code) is not None:
+			frappe.cache.hdel(f"{key}:items", item_code)
+			frappe.cache.hset(f"{key}:synced", item_code, (timestamp, True))
+
+	catalog.timestamp = timestamp
+	frappe.cache.set_value(key, catalog)
+
+	return catalog
+
+
+def get_catalog_items(pos_profile, price_list, item_codes=None):
+	"""Items sold in the POS Profile with their details, fetched a thousand items at a time"""
+	pos_profile = frappe.get_cached_doc("POS Profile", pos_profile)
+
+	item = frappe.qb.DocType("Item")
+	query = (
+		frappe.qb.from_(item)
+		.select(
+			item.name.as_("item_code"),
+			item.item_name,
+			item.description,
+			item.stock_uom,
+			item.image.as_("item_image"),
+			item.is_stock_item,
+			item.item_group,
+		)
+		.where(
+			(item.disabled == 0)
+			& (item.has_variants == 0)
+			& (item.is_sales_item == 1)
+			& (item.is_fixed_asset == 0)
+		)
+		.orderby(item.name)
+	)
+
+	if item_codes:
+		query = query.where(item.name.isin(list(item_codes)))
+
+	if item_groups := {
+		d.name for row in pos_profile.item_groups for d in get_child_nodes("Item Group", row.item_group)
+	}:
+		query = query.where(item.item_group.isin(list(item_groups)))
+
+	items = query.run(as_dict=True)
+
+	for batch in create_batch(items, 1000):
+		item_codes = [item.item_code for item in batch]
+		item_uoms = get_item_uoms(item_codes)
+		item_barcodes = get_item_barcodes(item_codes)
+		item_prices = get_item_prices(item_codes, price_list)
+		stock_availability = get_stock_availability_for_items(item_codes, pos_profile.warehouse)
+
+		for item in batch:
+			item.actual_qty, _ = stock_availability.get(item.item_code, (0, False))
+			item.uoms = [
+				{"uom": uom, "conversion_factor": conversion_factor}
+				for uom, conversion_factor in item_uoms.get(item.item_code, {}).items()
+			]
+			item.barcodes = item_barcodes.get(item.item_code, [])
+			item.prices = item_prices.get(item.item_code, [])
+
+	return items
+
+
+def get_changed_catalog_items(pos_profile, price_list, since):
+	"""Items whose details, prices or stock in the warehouse of the POS Profile changed after `since`"""
+	warehouse = frappe.get_cached_value("POS Profile", pos_profile, "warehouse")
+
+	changed_items = set(frappe.get_all("Item", filters={"modified": (">", since)}, pluck="name"))
+	changed_items.update(
+		frappe.get_all(
+			"Item Price", filters={"price_list": price_list, "modified": (">", since)}, pluck="item_code"
+		)
+	)
+	changed_items.update(
+		frappe.get_all("Bin", filters={"warehouse": warehouse, "modified": (">", since)}, pluck="item_code")
+	)
+
+	# submitted, cancelled and consolidated POS invoices change the reserved qty
+	p_inv = frappe.qb.DocType("POS Invoice")
+	p_item = frappe.qb.DocType("POS Invoice Item")
+	changed_items.update(
+		(
+			frappe.qb.from_(p_inv)
+			.join(p_item)
+			.on(p_inv.name == p_item.parent)
+			.select(p_item.item_code)
+			.distinct()
+			.where((p_inv.modified > since) & (p_inv.docstatus > 0) & (p_item.warehouse == warehouse))
+		).run(pluck=True)
+	)
+
+	for row in frappe.get_all(
+		"Deleted Document",
+		filters={"deleted_doctype": ("in", ["Item", "Item Price"]), "creation": (">", since)},
+		fields=["deleted_doctype", "deleted_name", "data"],
+	):
+		if row.deleted_doctype == "Item":
+			changed_items.add(row.deleted_name)
+		else:
+			changed_items.add(frappe.parse_json(row.data).get("item_code"))
+
+	# the availability of product bundles follows their items
+	changed_items.update(frappe.get_all("Product Bundle", filters={"modified": (">", since)}, pluck="name"))
+	if changed_items:
+		changed_items.update(
+			frappe.get_all(
+				"Product Bundle Item",
+				filters={"item_code": ("in", list(changed_items)), "parenttype": "Product Bundle"},
+				pluck="parent",
+			)
+		)
+
+	changed_items.discard(None)
+	return list(changed_items)
+
+
+def get_item_barcodes(item_codes):
+	item_barcodes = {}
+	for row in frappe.get_all(
+		"Item Barcode",
+		filters={"parent": ("in", item_codes), "parenttype": "Item"},
+		fields=["parent", "barcode", "uom"],
+		order_by="idx",
+	):
+		item_barcodes.setdefault(row.pop("parent"), []).append(row)
+
+	return item_barcodes
+
+
+def get_item_catalog_key(pos_profile, price_list):
+	return f"{ITEM_CATALOG_KEY}::{pos_profile}::{price_list}"
+
+
+def clear_item_catalog(pos_profile):
+	frappe.cache.delete_keys(f"{ITEM_CATALOG_KEY}::{pos_profile}::")
+
+
 @frappe.whitelist()
 def search_for_serial_or_batch_or_barcode_number(search_value: str) -> dict[str, str | None]:
 	return scan_barcode(search_value)
 
 
 def get_conditions(search_term):
+	if is_item_search_index_ready():
+		return get_item_search_condition(search_term, "item.name")
+
 	condition = "("
 	condition += """item.name like {search_term}
 		or item.item_name like {search_term}""".format(search_term=frappe.db.escape("%" + search_term + "%"))
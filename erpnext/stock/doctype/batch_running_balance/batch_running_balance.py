@@ -0,0 +1,662 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import datetime
+from contextlib import contextmanager
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Order
+from frappe.query_builder.functions import CombineDatetime, Sum
+from frappe.utils import cint, flt, get_datetime, get_time, getdate, now
+
+BALANCE_FIELDS = ("qty_after_transaction", "stock_value")
+ENTRY_FIELDS = (
+	"item_code",
+	"warehouse",
+	"batch_no",
+	"posting_datetime",
+	"bundle_creation",
+	"serial_and_batch_bundle",
+	"voucher_type",
+	"voucher_no",
+	"voucher_detail_no",
+	"qty",
+	"stock_value_difference",
+)
+
+
+class BatchRunningBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		batch_no: DF.Link | None
+		bundle_creation: DF.Datetime | None
+		item_code: DF.Link | None
+		posting_datetime: DF.Datetime | None
+		qty: DF.Float
+		qty_after_transaction: DF.Float
+		serial_and_batch_bundle: DF.Link | None
+		stock_value: DF.Float
+		stock_value_difference: DF.Float
+		voucher_detail_no: DF.Data | None
+		voucher_no: DF.DynamicLink | None
+		voucher_type: DF.Link | None
+		warehouse: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def is_batch_running_balance_enabled():
+	"""Whether running balances are maintained as bundles are submitted and cancelled"""
+	return cint(frappe.db.get_single_value("Stock Settings", "use_batch_running_balance", cache=True))
+
+
+def is_batch_running_balance_ready():
+	"""
+	Whether running balances can be read, which is once they have been rebuilt after being enabled,
+	and not while their recomputation is deferred
+	"""
+	if frappe.flags.deferred_batch_running_balances is not None:
+		return False
+
+	return is_batch_running_balance_enabled() and cint(
+		frappe.db.get_single_value("Stock Settings", "batch_running_balance_ready")
+	)
+
+
+@contextmanager
+def deferred_batch_running_balance():
+	"""
+	Defer the balances of the later entries of the batches changed inside the block, and recompute
+	them in one pass per batch when it exits.
+
+	A repost replays every later bundle of a batch, each of which would otherwise update the balances
+	of all the entries after it, so a repost of n entries updated n² rows. Balances are summed from
+	the bundles in the meantime.
+	"""
+	if frappe.flags.deferred_batch_running_balances is not None:
+		# recomputed when the outer block exits
+		yield
+		return
+
+	frappe.flags.deferred_batch_running_balances = {}
+	try:
+		yield
+		deferred = frappe.flags.deferred_batch_running_balances
+		frappe.flags.deferred_batch_running_balances = None
+		for entry in deferred.values():
+			recompute_balances(entry)
+
+	finally:
+		frappe.flags.deferred_batch_running_balances = None
+
+
+def lock_item(item_code, shared=False):
+	"""
+	Lock the Item row. Bundles updating the running balances of the item take a shared lock, a
+	rebuild of the item takes an exclusive one, so that the two never overlap.
+	"""
+	if not shared:
+		frappe.db.get_value("Item", item_code, "name", for_update=True)
+		return
+
+	share_mode = "for share" if frappe.db.db_type == "postgres" else "lock in share mode"
+	frappe.db.sql(f"select name from `tabItem` where name = %s {share_mode}", item_code)
+
+
+def get_posting_datetime(posting_date, posting_time):
+	if isinstance(posting_time, datetime.timedelta):
+		posting_time = (datetime.datetime.min + posting_time).time()
+
+	return datetime.datetime.combine(getdate(posting_date), get_time(posting_time))
+
+
+def update_batch_running_balance(serial_and_batch_bundle):
+	"""
+	Bring the running balance of the batches in the bundle in line with its entries.
+	Called whenever a bundle is submitted, cancelled or its values are changed by a repost.
+	"""
+	if not serial_and_batch_bundle or not is_batch_running_balance_enabled():
+		return
+
+	bundle = frappe.db.get_value(
+		"Serial and Batch Bundle",
+		serial_and_batch_bundle,
+		[
+			"name",
+			"item_code",
+			"warehouse",
+			"posting_date",
+			"posting_time",
+			"creation",
+			"docstatus",
+			"is_cancelled",
+			"type_of_transaction",
+			"voucher_type",
+			"voucher_no",
+			"voucher_detail_no",
+		],
+		as_dict=True,
+	)
+
+	if bundle:
+		# waits for a rebuild of the item to be committed
+		lock_item(bundle.item_code, shared=True)
+
+	entries = get_bundle_entries(bundle) if bundle else {}
+	existing = {
+		d.batch_no: d
+		for d in frappe.get_all(
+			"Batch Running Balance",
+			filters={"serial_and_batch_bundle": serial_and_batch_bundle},
+			fields=["name", *ENTRY_FIELDS],
+		)
+	}
+
+	for batch_no in set(entries) | set(existing):
+		entry, balance = entries.get(batch_no), existing.get(batch_no)
+		if entry and balance and get_sort_key(entry) == get_sort_key(balance):
+			adjust_balance(
+				balance,
+				entry.qty - balance.qty,
+				entry.stock_value_difference - balance.stock_value_difference,
+			)
+			continue
+
+		if balance:
+			remove_balance(balance)
+
+		if entry:
+			insert_balance(entry)
+
+
+def get_bundle_entries(bundle):
+	"""Qty and value of the bundle per batch, for the batches valued batch wise"""
+	if (
+		bundle.docstatus != 1
+		or bundle.is_cancelled
+		or bundle.type_of_transaction not in ("Inward", "Outward")
+		or bundle.voucher_type == "Pick List"
+	):
+		return {}
+
+	child = frappe.qb.DocType("Serial and Batch Entry")
+	batch = frappe.qb.DocType("Batch")
+
+	entries = (
+		frappe.qb.from_(child)
+		.inner_join(batch)
+		.on(child.batch_no == batch.name)
+		.select(
+			child.batch_no,
+			Sum(child.qty).as_("qty"),
+			Sum(child.stock_value_difference).as_("stock_value_difference"),
+		)
+		.where((child.parent == bundle.name) & (batch.use_batchwise_valuation == 1))
+		.groupby(child.batch_no)
+	).run(as_dict=True)
+
+	posting_datetime = get_posting_datetime(bundle.posting_date, bundle.posting_time)
+
+	return {
+		d.batch_no: frappe._dict(
+			item_code=bundle.item_code,
+			warehouse=bundle.warehouse,
+			batch_no=d.batch_no,
+			posting_datetime=posting_datetime,
+			bundle_creation=get_datetime(bundle.creation),
+			serial_and_batch_bundle=bundle.name,
+			voucher_type=bundle.voucher_type,
+			voucher_no=bundle.voucher_no,
+			voucher_detail_no=bundle.voucher_detail_no,
+			qty=flt(d.qty),
+			stock_value_difference=flt(d.stock_value_difference),
+		)
+		for d in entries
+	}
+
+
+def get_sort_key(entry):
+	return (get_datetime(entry.posting_datetime), get_datetime(entry.bundle_creation))
+
+
+def adjust_balance(balance, qty, stock_value):
+	"""Change the qty and value of the entry by the given amounts, along with the balance of the later ones"""
+	if not qty and not stock_value:
+		return
+
+	brb = frappe.qb.DocType("Batch Running Balance")
+	(
+		frappe.qb.update(brb)
+		.set(brb.qty, brb.qty + qty)
+		.set(brb.stock_value_difference, brb.stock_value_difference + stock_value)
+		.where(brb.name == balance.name)
+	).run()
+
+	shift_balances(balance, qty, stock_value, include_current=True)
+
+
+def remove_balance(balance):
+	shift_balances(balance, -flt(balance.qty), -flt(balance.stock_value_difference))
+	frappe.db.delete("Batch Running Balance", {"name": balance.name})
+
+
+def insert_balance(entry):
+	previous = get_previous_balance(entry)
+
+	shift_balances(entry, entry.qty, entry.stock_value_difference)
+
+	doc = frappe.new_doc("Batch Running Balance")
+	doc.update(entry)
+	doc.qty_after_transaction = flt(previous.get("qty_after_transaction")) + entry.qty
+	doc.stock_value = flt(previous.get("stock_value")) + entry.stock_value_difference
+	doc.db_insert()
+
+
+def get_previous_balance(entry):
+	brb = frappe.qb.DocType("Batch Running Balance")
+	balance = (
+		frappe.qb.from_(brb)
+		.select(*[brb[field] for field in BALANCE_FIELDS])
+		.where(
+			(brb.item_code == entry.item_code)
+			& (brb.warehouse == entry.warehouse)
+			& (brb.batch_no == entry.batch_no)
+			& get_before_condition(brb, entry)
+		)
+		.orderby(brb.posting_datetime, order=Order.desc)
+		.orderby(brb.bundle_creation, order=Order.desc)
+		.orderby(brb.serial_and_batch_bundle, order=Order.desc)
+		.limit(1)
+	).run(as_dict=True)
+
+	return balance[0] if balance else {}
+
+
+def get_before_condition(brb, entry):
+	return (brb.posting_datetime < entry.posting_datetime) | (
+		(brb.posting_datetime == entry.posting_datetime)
+		& (
+			(brb.bundle_creation < entry.bundle_creation)
+			| (
+				(brb.bundle_creation == entry.bundle_creation)
+				& (brb.serial_and_batch_bundle < entry.serial_and_batch_bundle)
+			)
+		)
+	)
+
+
+def shift_balances(entry, qty, stock_value, include_current=False):
+	"""Add to the running balance of the entries of the batch after `entry`"""
+	deferred = frappe.flags.deferred_batch_running_balances
+	if deferred is not None:
+		# the batch is recomputed from its earliest changed entry, the current one included
+		key = (entry.item_code, entry.warehouse, entry.batch_no)
+		if key not in deferred or get_entry_position(entry) < get_entry_position(deferred[key]):
+			deferred[key] = frappe._dict({field: entry.get(field) for field in ENTRY_FIELDS})
+		return
+
+	if not qty and not stock_value:
+		return
+
+	brb = frappe.qb.DocType("Batch Running Balance")
+	after_condition = (brb.posting_datetime > entry.posting_datetime) | (
+		(brb.posting_datetime == entry.posting_datetime)
+		& (
+			(brb.bundle_creation > entry.bundle_creation)
+			| (
+				(brb.bundle_creation == entry.bundle_creation)
+				& (
+					(brb.serial_and_batch_bundle >= entry.serial_and_batch_bundle)
+					if include_current
+					else (brb.serial_and_batch_bundle > entry.serial_and_batch_bundle)
+				)
+			)
+		)
+	)
+
+	(
+		frappe.qb.update(brb)
+		.set(brb.qty_after_transaction, brb.qty_after_transaction + qty)
+		.set(brb.stock_value, brb.stock_value + stock_value)
+		.where(
+			(brb.item_code == entry.item_code)
+			& (brb.warehouse == entry.warehouse)
+			& (brb.batch_no == entry.batch_no)
+			& after_condition
+		)
+	).run()
+
+
+def get_entry_position(entry):
+	return (*get_sort_key(entry), entry.serial_and_batch_bundle)
+
+
+def recompute_balances(entry):
+	"""Running balances of the entries of the batch from `entry` on, in posting order"""
+	previous = get_previous_balance(entry)
+	qty_after_transaction = flt(previous.get("qty_after_transaction"))
+	stock_value = flt(previous.get("stock_value"))
+
+	brb = frappe.qb.DocType("Batch Running Balance")
+	balances = (
+		frappe.qb.from_(brb)
+		.select(brb.name, brb.qty, brb.stock_value_difference, *[brb[field] for field in BALANCE_FIELDS])
+		.where(
+			(brb.item_code == entry.item_code)
+			& (brb.warehouse == entry.warehouse)
+			& (brb.batch_no == entry.batch_no)
+			& get_before_condition(brb, entry).negate()
+		)
+		.orderby(brb.posting_datetime)
+		.orderby(brb.bundle_creation)
+		.orderby(brb.serial_and_batch_bundle)
+	).run(as_dict=True)
+
+	for balance in balances:
+		qty_after_transaction += flt(balance.qty)
+		stock_value += flt(balance.stock_value_difference)
+
+		if qty_after_transaction != flt(balance.qty_after_transaction) or stock_value != flt(
+			balance.stock_value
+		):
+			frappe.db.set_value(
+				"Batch Running Balance",
+				balance.name,
+				{"qty_after_transaction": qty_after_transaction, "stock_value": stock_value},
+				update_modified=False,
+			)
+
+
+def get_batch_running_balances(sle, batch_nos):
+	"""
+	Qty and value of the batches in the warehouse before `sle`, leaving out the entries of its
+	own voucher. Same result as summing the Serial and Batch Entries, read from the latest balance
+	of each batch.
+	"""
+	brb = frappe.qb.DocType("Batch Running Balance")
+
+	before_condition = None
+	if sle.posting_date and sle.posting_time:
+		posting_datetime = get_posting_datetime(sle.posting_date, sle.posting_time)
+		before_condition = brb.posting_datetime < posting_datetime
+		if sle.creation:
+			before_condition |= (brb.posting_datetime == posting_datetime) & (
+				brb.bundle_creation < get_datetime(sle.creation)
+			)
+
+	# the latest balance of each batch in a single query, each part being an index lookup
+	query = None
+	for batch_no in batch_nos:
+		batch_query = (
+			frappe.qb.from_(brb)
+			.select(brb.batch_no, *[brb[field] for field in BALANCE_FIELDS])
+			.where(
+				(brb.item_code == sle.item_code)
+				& (brb.warehouse == sle.warehouse)
+				& (brb.batch_no == batch_no)
+			)
+			.orderby(brb.posting_datetime, order=Order.desc)
+			.orderby(brb.bundle_creation, order=Order.desc)
+			.orderby(brb.serial_and_batch_bundle, order=Order.desc)
+			.limit(1)
+		)
+
+		if before_condition:
+			batch_query = batch_query.where(before_condition)
+
+		query = batch_query if query is None else query.union_all(batch_query)
+
+	balances = {
+		balance.batch_no: frappe._dict(
+			batch_no=balance.batch_no,
+			incoming_rate=flt(balance.stock_value),
+			qty=flt(balance.qty_after_transaction),
+		)
+		for balance in (query.run(as_dict=True) if query else [])
+	}
+
+	if not balances:
+		return []
+
+	# the entries of the voucher itself are not part of its balance
+	if sle.voucher_detail_no:
+		voucher_condition = (brb.voucher_detail_no == sle.voucher_detail_no) | brb.voucher_detail_no.isnull()
+	elif sle.voucher_no:
+		voucher_condition = brb.voucher_no == sle.voucher_no
+	else:
+		voucher_condition = None
+
+	if voucher_condition:
+		query = (
+			frappe.qb.from_(brb)
+			.select(
+				brb.batch_no,
+				Sum(brb.qty).as_("qty"),
+				Sum(brb.stock_value_difference).as_("stock_value_difference"),
+			)
+			.where(
+				(brb.item_code == sle.item_code)
+				& (brb.warehouse == sle.warehouse)
+				& (brb.batch_no.isin(list(balances)))
+				& voucher_condition
+			)
+			.groupby(brb.batch_no)
+		)
+
+		if before_condition:
+			query = query.where(before_condition)
+
+		for row in query.run(as_dict=True):
+			balances[row.batch_no].qty -= flt(row.qty)
+			balances[row.batch_no].incoming_rate -= flt(row.stock_value_difference)
+
+	return list(balances.values())
+
+
+def get_entries_from_ledger(item_code=None, warehouse=None):
+	"""Qty and value per bundle and batch from the Serial and Batch Entries, in posting order"""
+	parent = frappe.qb.DocType("Serial and Batch Bundle")
+	child = frappe.qb.DocType("Serial and Batch Entry")
+	batch = frappe.qb.DocType("Batch")
+
+	posting_datetime = CombineDatetime(parent.posting_date, parent.posting_time)
+	query = (
+		frappe.qb.from_(parent)
+		.inner_join(child)
+		.on(parent.name == child.parent)
+		.inner_join(batch)
+		.on(child.batch_no == batch.name)
+		.select(
+			parent.item_code,
+			parent.warehouse,
+			child.batch_no,
+			posting_datetime.as_("posting_datetime"),
+			parent.creation.as_("bundle_creation"),
+			parent.name.as_("serial_and_batch_bundle"),
+			parent.voucher_type,
+			parent.voucher_no,
+			parent.voucher_detail_no,
+			Sum(child.qty).as_("qty"),
+			Sum(child.stock_value_difference).as_("stock_value_difference"),
+		)
+		.where(
+			(batch.use_batchwise_valuation == 1)
+			& (parent.docstatus == 1)
+			& (parent.is_cancelled == 0)
+			& (parent.type_of_transaction.isin(["Inward", "Outward"]))
+			& (parent.voucher_type != "Pick List")
+		)
+		.groupby(parent.name, child.batch_no)
+		.orderby(parent.item_code)
+		.orderby(parent.warehouse)
+		.orderby(child.batch_no)
+		.orderby(posting_datetime)
+		.orderby(parent.creation)
+		.orderby(parent.name)
+	)
+
+	if item_code:
+		query = query.where(parent.item_code == item_code)
+
+	if warehouse:
+		query = query.where(parent.warehouse == warehouse)
+
+	balances = {}
+	for entry in query.run(as_dict=True):
+		key = (entry.item_code, entry.warehouse, entry.batch_no)
+		balance = balances.setdefault(key, {"qty_after_transaction": 0.0, "stock_value": 0.0})
+		balance["qty_after_transaction"] += flt(entry.qty)
+		balance["stock_value"] += flt(entry.stock_value_difference)
+
+		entry.update(balance)
+		yield entry
+
+
+def rebuild_batch_running_balance(item_code=None, warehouse=None):
+	"""
+	Recompute the running balances from the Serial and Batch Entries. Each item is rebuilt under an
+	exclusive lock and committed on its own. Once all of them are, the running balances are
+	marked ready to be read.
+	"""
+	if item_code:
+		item_codes = [item_code]
+	else:
+		item_codes = frappe.get_all(
+			"Batch",
+			filters={"use_batchwise_valuation": 1},
+			pluck="item",
+			distinct=True,
+			order_by="item",
+		)
+
+		# items no longer having batch-wise valued batches
+		filters = {"item_code": ("not in", item_codes)} if item_codes else {}
+		if warehouse:
+			filters["warehouse"] = warehouse
+
+		frappe.db.delete("Batch Running Balance", filters)
+
+	for item in item_codes:
+		rebuild_item_batch_running_balance(item, warehouse)
+
+	if not item_code and not warehouse and is_batch_running_balance_enabled():
+		frappe.db.set_single_value("Stock Settings", "batch_running_balance_ready", 1)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def rebuild_item_batch_running_balance(item_code, warehouse=None):
+	if not frappe.flags.in_test:
+		# the ledger is read after the lock is taken, not from a snapshot of an earlier transaction
+		frappe.db.commit()
+
+	# waits for the bundles of the item updating running balances to be committed
+	lock_item(item_code)
+
+	filters = {"item_code": item_code}
+	if warehouse:
+		filters["warehouse"] = warehouse
+
+	frappe.db.delete("Batch Running Balance", filters)
+
+	fields = [*ENTRY_FIELDS, *BALANCE_FIELDS]
+	timestamp = now()
+	values = []
+
+	def insert_values():
+		frappe.db.bulk_insert(
+			"Batch Running Balance",
+			fields=["name", *fields, "creation", "modified", "owner", "modified_by"],
+			values=values,
+		)
+		values.clear()
+
+	for entry in get_entries_from_ledger(item_code, warehouse):
+		values.append(
+			[
+				frappe.generate_hash(),
+				*[entry[field] for field in fields],
+				timestamp,
+				timestamp,
+				frappe.session.user,
+				frappe.session.user,
+			]
+		)
+
+		if len(values) >= 10000:
+			insert_values()
+
+	if values:
+		insert_values()
+
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+
+def verify_batch_running_balance(item_code=None, warehouse=None):
+	"""Return the running balances that differ from the ones computed from the Serial and Batch Entries"""
+	filters = {}
+	if item_code:
+		filters["item_code"] = item_code
+
+	if warehouse:
+		filters["warehouse"] = warehouse
+
+	precision = cint(frappe.db.get_default("float_precision")) or 3
+	actual = {
+		(d.serial_and_batch_bundle, d.batch_no): d
+		for d in frappe.get_all(
+			"Batch Running Balance",
+			filters=filters,
+			fields=["serial_and_batch_bundle", "batch_no", "item_code", "warehouse", *BALANCE_FIELDS],
+		)
+	}
+
+	mismatches = []
+	for entry in get_entries_from_ledger(item_code, warehouse):
+		balance = actual.pop((entry.serial_and_batch_bundle, entry.batch_no), None) or frappe._dict()
+		if any(
+			flt(entry[fieldname], precision) != flt(balance.get(fieldname), precision)
+			for fieldname in BALANCE_FIELDS
+		):
+			mismatches.append(
+				frappe._dict(
+					serial_and_batch_bundle=entry.serial_and_batch_bundle,
+					item_code=entry.item_code,
+					warehouse=entry.warehouse,
+					batch_no=entry.batch_no,
+					expected={fieldname: flt(entry[fieldname]) for fieldname in BALANCE_FIELDS},
+					actual={fieldname: flt(balance.get(fieldname)) for fieldname in BALANCE_FIELDS},
+				)
+			)
+
+	# balances of bundles that are no longer submitted
+	for (serial_and_batch_bundle, batch_no), balance in actual.items():
+		mismatches.append(
+			frappe._dict(
+				serial_and_batch_bundle=serial_and_batch_bundle,
+				item_code=balance.item_code,
+				warehouse=balance.warehouse,
+				batch_no=batch_no,
+				expected={fieldname: 0.0 for fieldname in BALANCE_FIELDS},
+				actual={fieldname: flt(balance.get(fieldname)) for fieldname in BALANCE_FIELDS},
+			)
+		)
+
+	return mismatches
+
+
+def on_doctype_update():
+	frappe.db.add_index(
+		"Batch Running Balance",
+		["item_code", "warehouse", "batch_no", "posting_datetime", "bundle_creation"],
+		index_name="item_warehouse_batch_posting_index",
+	)
@@ -0,0 +1,187 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import add_days, flt, today
+
+from erpnext.stock.doctype.batch_running_balance.batch_running_balance import (
+	deferred_batch_running_balance,
+	is_batch_running_balance_ready,
+	rebuild_batch_running_balance,
+	update_batch_running_balance,
+	verify_batch_running_balance,
+)
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.serial_and_batch_bundle.test_serial_and_batch_bundle import (
+	get_batch_from_bundle,
+)
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+
+
+class UnitTestBatchRunningBalance(UnitTestCase):
+	"""
+	Unit tests for BatchRunningBalance.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
+
+
+class TestBatchRunningBalance(IntegrationTestCase):
+	def setUp(self):
+		self.item = make_item(
+			"_Test Batch Running Balance Item",
+			properties={
+				"is_stock_item": 1,
+				"has_batch_no": 1,
+				"create_new_batch": 1,
+				"batch_number_series": "TEST-BRB-.#####",
+				"valuation_method": "FIFO",
+			},
+		).name
+		self.warehouse = "_Test Warehouse - _TC"
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def make_entries(self):
+		se = make_stock_entry(
+			item_code=self.item,
+			to_warehouse=self.warehouse,
+			qty=10,
+			rate=100,
+			posting_date=add_days(today(), -5),
+		)
+		self.batch_no = get_batch_from_bundle(se.items[0].serial_and_batch_bundle)
+
+		make_stock_entry(
+			item_code=self.item,
+			to_warehouse=self.warehouse,
+			qty=10,
+			rate=200,
+			batch_no=self.batch_no,
+			posting_date=add_days(today(), -3),
+		)
+
+		return make_stock_entry(
+			item_code=self.item,
+			from_warehouse=self.warehouse,
+			qty=5,
+			batch_no=self.batch_no,
+		)
+
+	def mark_ready(self):
+		frappe.db.set_single_value("Stock Settings", "batch_running_balance_ready", 1)
+
+	def get_stock_value_difference(self, voucher_no):
+		return flt(
+			frappe.db.get_value(
+				"Stock Ledger Entry", {"voucher_no": voucher_no, "is_cancelled": 0}, "stock_value_difference"
+			),
+			2,
+		)
+
+	def get_latest_balance(self):
+		return frappe.get_all(
+			"Batch Running Balance",
+			filters={"batch_no": self.batch_no, "warehouse": self.warehouse},
+			fields=["qty_after_transaction", "stock_value"],
+			order_by="posting_datetime desc, bundle_creation desc",
+			limit=1,
+		)[0]
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_batch_running_balance": 1})
+	def test_outgoing_rate_from_running_balance(self):
+		self.mark_ready()
+		outward = self.make_entries()
+		self.assertEqual(self.get_stock_value_difference(outward.name), -750)
+
+		balance = self.get_latest_balance()
+		self.assertEqual(balance.qty_after_transaction, 15)
+		self.assertEqual(flt(balance.stock_value, 2), 2250)
+		self.assertFalse(verify_batch_running_balance(self.item))
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_batch_running_balance": 1})
+	def test_backdated_entry_and_cancel(self):
+		self.mark_ready()
+		outward = self.make_entries()
+
+		backdated = make_stock_entry(
+			item_code=self.item,
+			to_warehouse=self.warehouse,
+			qty=10,
+			rate=400,
+			batch_no=self.batch_no,
+			posting_date=add_days(today(), -4),
+		)
+
+		# the repost revalues the outward entry with the new batch rate
+		self.assertEqual(self.get_stock_value_difference(outward.name), flt(-5 * 7000 / 30, 2))
+		self.assertFalse(verify_batch_running_balance(self.item))
+
+		backdated.cancel()
+		self.assertEqual(self.get_stock_value_difference(outward.name), -750)
+		self.assertFalse(verify_batch_running_balance(self.item))
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_batch_running_balance": 1})
+	def test_rebuild(self):
+		self.mark_ready()
+		self.make_entries()
+
+		frappe.db.set_value("Batch Running Balance", {"batch_no": self.batch_no}, "qty_after_transaction", 0)
+		self.assertTrue(verify_batch_running_balance(self.item))
+
+		rebuild_batch_running_balance(self.item)
+		self.assertFalse(verify_batch_running_balance(self.item))
+		self.assertEqual(self.get_latest_balance().qty_after_transaction, 15)
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_batch_running_balance": 1})
+	def test_not_read_until_ready(self):
+		# maintained, but the rates are summed up from the bundles until the rebuild marks it ready
+		self.assertFalse(is_batch_running_balance_ready())
+		outward = self.make_entries()
+		self.assertEqual(self.get_stock_value_difference(outward.name), -750)
+		self.assertEqual(self.get_latest_balance().qty_after_transaction, 15)
+
+		rebuild_batch_running_balance()
+		self.assertTrue(is_batch_running_balance_ready())
+		self.assertFalse(verify_batch_running_balance(self.item))
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_batch_running_balance": 1})
+	def test_deferred_during_repost(self):
+		self.mark_ready()
+		se = make_stock_entry(
+			item_code=self.item,
+			to_warehouse=self.warehouse,
+			qty=1,
+			rate=100,
+			posting_date=add_days(today(), -30),
+		)
+		self.batch_no = get_batch_from_bundle(se.items[0].serial_and_batch_bundle)
+		bundles = [se.items[0].serial_and_batch_bundle]
+		for days in range(29, 10, -1):
+			se = make_stock_entry(
+				item_code=self.item,
+				to_warehouse=self.warehouse,
+				qty=1,
+				rate=100,
+				batch_no=self.batch_no,
+				posting_date=add_days(today(), -days),
+			)
+			bundles.append(se.items[0].serial_and_batch_bundle)
+
+		# a repost revaluing every bundle of the batch updates each balance once, at the end
+		with deferred_batch_running_balance():
+			for bundle in bundles:
+				frappe.db.set_value(
+					"Serial and Batch Entry", {"parent": bundle}, "stock_value_difference", 300
+				)
+				update_batch_running_balance(bundle)
+
+			self.assertFalse(is_batch_running_balance_ready())
+			self.assertEqual(flt(self.get_latest_balance().stock_value, 2), 2000)
+
+		self.assertTrue(is_batch_running_balance_ready())
+		self.assertEqual(flt(self.get_latest_balance().stock_value, 2), 6000)
+		self.assertFalse(verify_batch_running_balance(self.item))
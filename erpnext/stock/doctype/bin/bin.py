@@ -6,7 +6,7 @@ import frappe
 from frappe.model.document import Document
 from frappe.query_builder import Case, Order
 from frappe.query_builder.functions import Coalesce, CombineDatetime, Sum
-from frappe.utils import flt
+from frappe.utils import flt, now
 
 
 class Bin(Document):
@@ -229,61 +229,108 @@ def get_bin_details(bin_name):
 	)
 
 
+# quantities of the Bin that stock transactions change by a delta, the actual qty is set by the
+# reposting of the current voucher instead
+BIN_DELTA_FIELDS = ("ordered_qty", "reserved_qty", "indented_qty", "planned_qty")
+
+
 def update_qty(bin_name, args):
 	from erpnext.controllers.stock_controller import future_sle_exists
 
-	bin_details = get_bin_details(bin_name)
-	# actual qty is already updated by processing current voucher
-	actual_qty = bin_details.actual_qty or 0.0
+	# actual qty is already updated by processing current voucher,
+	# but is not up to date in case of backdated transaction
+	actual_qty = None
+	if future_sle_exists(args, allow_force_reposting=False):
+		actual_qty = get_last_sle_qty(args.get("item_code"), args.get("warehouse"))
+
+	apply_qty_deltas(bin_name, {field: flt(args.get(field)) for field in BIN_DELTA_FIELDS}, actual_qty)
+
+
+def get_last_sle_qty(item_code, warehouse):
 	sle = frappe.qb.DocType("Stock Ledger Entry")
+	last_sle_qty = (
+		frappe.qb.from_(sle)
+		.select(sle.qty_after_transaction)
+		.where((sle.item_code == item_code) & (sle.warehouse == warehouse) & (sle.is_cancelled == 0))
+		.orderby(CombineDatetime(sle.posting_date, sle.posting_time), order=Order.desc)
+		.orderby(sle.creation, order=Order.desc)
+		.limit(1)
+		.run()
+	)
 
-	# actual qty is not up to date in case of backdated transaction
-	if future_sle_exists(args, allow_force_reposting=False):
-		last_sle_qty = (
-			frappe.qb.from_(sle)
-			.select(sle.qty_after_transaction)
-			.where(
-				(sle.item_code == args.get("item_code"))
-				& (sle.warehouse == args.get("warehouse"))
-				& (sle.is_cancelled == 0)
-			)
-			.orderby(CombineDatetime(sle.posting_date, sle.posting_time), order=Order.desc)
-			.orderby(sle.creation, order=Order.desc)
-			.limit(1)
-			.run()
-		)
+	return flt(last_sle_qty[0][0]) if last_sle_qty else 0.0
 
-		actual_qty = 0.0
-		if last_sle_qty:
-			actual_qty = last_sle_qty[0][0]
 
-	ordered_qty = flt(bin_details.ordered_qty) + flt(args.get("ordered_qty"))
-	reserved_qty = flt(bin_details.reserved_qty) + flt(args.get("reserved_qty"))
-	indented_qty = flt(bin_details.indented_qty) + flt(args.get("indented_qty"))
-	planned_qty = flt(bin_details.planned_qty) + flt(args.get("planned_qty"))
+def apply_qty_deltas(bin_name, deltas, actual_qty=None):
+	"""
+	Add the deltas to the quantities of the Bin and recompute its projected qty with a single
+	update, without reading the Bin first.
+	"""
+	bin = frappe.qb.DocType("Bin")
 
-	# compute projected qty
+	# projected qty is set first and only from the previous values and the deltas, as MariaDB
+	# evaluates the assignments in order while Postgres uses the previous values for all of them
 	projected_qty = (
-		flt(actual_qty)
-		+ flt(ordered_qty)
-		+ flt(indented_qty)
-		+ flt(planned_qty)
-		- flt(reserved_qty)
-		- flt(bin_details.reserved_qty_for_production)
-		- flt(bin_details.reserved_qty_for_sub_contract)
-		- flt(bin_details.reserved_qty_for_production_plan)
+		(bin.actual_qty if actual_qty is None else flt(actual_qty))
+		+ (bin.ordered_qty + flt(deltas.get("ordered_qty")))
+		+ (bin.indented_qty + flt(deltas.get("indented_qty")))
+		+ (bin.planned_qty + flt(deltas.get("planned_qty")))
+		- (bin.reserved_qty + flt(deltas.get("reserved_qty")))
+		- bin.reserved_qty_for_production
+		- bin.reserved_qty_for_sub_contract
+		- bin.reserved_qty_for_production_plan
 	)
 
-	frappe.db.set_value(
-		"Bin",
-		bin_name,
-		{
-			"actual_qty": actual_qty,
-			"ordered_qty": ordered_qty,
-			"reserved_qty": reserved_qty,
-			"indented_qty": indented_qty,
-			"planned_qty": planned_qty,
-			"projected_qty": projected_qty,
-		},
-		update_modified=True,
+	query = frappe.qb.update(bin).set(bin.projected_qty, projected_qty)
+	if actual_qty is not None:
+		query = query.set(bin.actual_qty, flt(actual_qty))
+
+	for field in BIN_DELTA_FIELDS:
+		if flt(deltas.get(field)):
+			query = query.set(bin[field], bin[field] + flt(deltas.get(field)))
+
+	query.set(bin.modified, now()).set(bin.modified_by, frappe.session.user).where(bin.name == bin_name).run()
+
+
+def lock_bins(item_warehouses):
+	"""
+	Create the missing Bins of the (item, warehouse) pairs and lock them in the order of their names,
+	so that transactions updating the same Bins wait for each other instead of deadlocking.
+	"""
+	from erpnext.stock.utils import get_or_make_bin
+
+	bin_names = {key: get_or_make_bin(*key) for key in sorted(set(item_warehouses))}
+	if not bin_names:
+		return {}
+
+	bin = frappe.qb.DocType("Bin")
+	bins = (
+		frappe.qb.from_(bin)
+		.select(bin.name, bin.reserved_stock)
+		.where(bin.name.isin(list(bin_names.values())))
+		.orderby(bin.name)
+		.for_update()
+	).run(as_dict=True)
+
+	bins = {d.name: d for d in bins}
+	return {key: bins.get(name) or frappe._dict(name=name) for key, name in bin_names.items()}
+
+
+def queue_qty_update(pending_updates, bin_name, args):
+	"""
+	Queue the update of the Bin in `pending_updates` until `flush_qty_updates`, merging the deltas of
+	all the updates of the same Bin. The queue belongs to its caller, so updates of a voucher that
+	fails before being flushed are never applied.
+	"""
+	pending_update = pending_updates.get(bin_name) or {}
+
+	# the latest entry decides whether the actual qty is read from the ledger
+	pending_updates[bin_name] = frappe._dict(
+		args, **{field: flt(pending_update.get(field)) + flt(args.get(field)) for field in BIN_DELTA_FIELDS}
 	)
+
+
+def flush_qty_updates(pending_updates):
+	"""Apply the queued updates, one `update_qty` per Bin, in the order of the Bin names"""
+	for bin_name in sorted(pending_updates):
+		update_qty(bin_name, pending_updates.pop(bin_name))
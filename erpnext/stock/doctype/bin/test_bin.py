@@ -4,8 +4,10 @@
 import frappe
 from frappe.tests import IntegrationTestCase, UnitTestCase
 
+from erpnext.stock.doctype.bin.bin import flush_qty_updates, queue_qty_update
 from erpnext.stock.doctype.item.test_item import make_item
-from erpnext.stock.utils import _create_bin
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.utils import _create_bin, get_or_make_bin
 
 
 class UnitTestBin(UnitTestCase):
@@ -41,3 +43,81 @@ class TestBin(IntegrationTestCase):
 		indexes = frappe.db.sql("show index from tabBin where Non_unique = 0", as_dict=1)
 		if not any(index.get("Key_name") == "unique_item_warehouse" for index in indexes):
 			self.fail("Expected unique index on item-warehouse")
+
+	def test_queued_qty_updates(self):
+		item_code = make_item("_Test Bin Queued Update Item", {"is_stock_item": 1}).name
+		warehouse = "_Test Warehouse - _TC"
+		bin_name = get_or_make_bin(item_code, warehouse)
+		before = frappe.db.get_value(
+			"Bin", bin_name, ["ordered_qty", "reserved_qty", "projected_qty"], as_dict=1
+		)
+
+		args = frappe._dict(item_code=item_code, warehouse=warehouse, voucher_type="Test", voucher_no="Test")
+		pending_updates = {}
+		queue_qty_update(pending_updates, bin_name, frappe._dict(args, ordered_qty=5))
+		queue_qty_update(pending_updates, bin_name, frappe._dict(args, ordered_qty=3, reserved_qty=2))
+		self.assertEqual(frappe.db.get_value("Bin", bin_name, "ordered_qty"), before.ordered_qty)
+
+		flush_qty_updates(pending_updates)
+		self.assertFalse(pending_updates)
+		after = frappe.db.get_value(
+			"Bin", bin_name, ["ordered_qty", "reserved_qty", "projected_qty"], as_dict=1
+		)
+		self.assertEqual(after.ordered_qty, before.ordered_qty + 8)
+		self.assertEqual(after.reserved_qty, before.reserved_qty + 2)
+		self.assertEqual(after.projected_qty, before.projected_qty + 6)
+
+	def test_repeated_rows_on_same_bin(self):
+		item_code = make_item("_Test Bin Repeated Rows Item", {"is_stock_item": 1}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		se = make_stock_entry(item_code=item_code, to_warehouse=warehouse, qty=1, rate=100, do_not_save=True)
+		for _i in range(9):
+			se.append("items", {**se.items[0].as_dict(), "name": None, "idx": None})
+		se.insert()
+		se.submit()
+
+		actual_qty, projected_qty = frappe.db.get_value(
+			"Bin", {"item_code": item_code, "warehouse": warehouse}, ["actual_qty", "projected_qty"]
+		)
+		self.assertEqual(actual_qty, 10)
+		self.assertEqual(projected_qty, 10)
+
+	def test_merged_qty_updates(self):
+		"""Bin updates of a voucher with many rows on a few hot Bins, merged into one update per Bin"""
+		warehouse = "_Test Warehouse - _TC"
+		items = [make_item(f"_Test Bin Merged Update Item {i}", {"is_stock_item": 1}).name for i in range(5)]
+
+		se = make_stock_entry(item_code=items[0], to_warehouse=warehouse, qty=1, rate=100, do_not_save=True)
+		for i in range(1, 200):
+			se.append(
+				"items", {**se.items[0].as_dict(), "name": None, "idx": None, "item_code": items[i % 5]}
+			)
+		se.insert()
+		se.submit()
+
+		for item_code in items:
+			bin = frappe.db.get_value(
+				"Bin",
+				{"item_code": item_code, "warehouse": warehouse},
+				["actual_qty", "projected_qty"],
+				as_dict=1,
+			)
+			self.assertEqual(bin.actual_qty, 40)
+			self.assertEqual(bin.projected_qty, 40)
+
+			# the Bin matches the ledger after the last of the 40 rows of the item
+			qty_after_transaction = frappe.db.get_value(
+				"Stock Ledger Entry",
+				{"voucher_no": se.name, "item_code": item_code, "is_cancelled": 0},
+				"qty_after_transaction",
+				order_by="posting_datetime desc, creation desc, name desc",
+			)
+			self.assertEqual(qty_after_transaction, bin.actual_qty)
+
+		# cancelling takes the merged quantities back out of every Bin
+		se.cancel()
+		for item_code in items:
+			self.assertEqual(
+				frappe.db.get_value("Bin", {"item_code": item_code, "warehouse": warehouse}, "actual_qty"), 0
+			)
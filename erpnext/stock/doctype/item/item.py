@@ -32,7 +32,13 @@ from erpnext.controllers.item_variant import (
 	make_variant_item_code,
 	validate_item_variant_attributes,
 )
+from erpnext.manufacturing.doctype.bom.bom_graph import clear_bom_graph
 from erpnext.stock.doctype.item_default.item_default import ItemDefault
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	is_item_search_index_enabled,
+	remove_item_search_index,
+	update_item_search_index,
+)
 
 
 class DuplicateReorderRows(frappe.ValidationError):
@@ -222,6 +228,9 @@ class Item(Document):
 		self.update_variants()
 		self.update_item_price()
 
+		if is_item_search_index_enabled():
+			update_item_search_index([self.name])
+
 	def validate_description(self):
 		"""Clean HTML description if set"""
 		if cint(frappe.db.get_single_value("Stock Settings", "clean_description_html")):
@@ -547,6 +556,8 @@ class Item(Document):
 		for variant_of in frappe.get_all("Item", filters={"variant_of": self.name}):
 			frappe.delete_doc("Item", variant_of.name)
 
+		remove_item_search_index(self.name)
+
 	def before_rename(self, old_name, new_name, merge=False):
 		if self.item_name == old_name:
 			frappe.db.set_value("Item", old_name, "item_name", new_name)
@@ -566,6 +577,10 @@ class Item(Document):
 			)
 
 		frappe.db.set_value("Item", new_name, "item_code", new_name)
+		clear_bom_graph()
+
+		if is_item_search_index_enabled():
+			update_item_search_index([new_name])
 
 		if merge:
 			self.set_last_purchase_rate(new_name)
@@ -707,6 +722,8 @@ class Item(Document):
 				(self.description, self.name),
 			)
 
+			clear_bom_graph()
+
 	def validate_item_defaults(self):
 		companies = {row.company for row in self.item_defaults}
 
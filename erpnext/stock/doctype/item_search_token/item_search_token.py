@@ -0,0 +1,214 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, create_batch, cstr, now, strip_html
+
+# length of the token column, longer values are cut
+MAX_TOKEN_LENGTH = 140
+# only the first words of long descriptions are indexed
+MAX_DESCRIPTION_TOKENS = 200
+# words of the search text beyond these are ignored
+MAX_SEARCH_WORDS = 5
+INDEX_BATCH_SIZE = 1000
+
+TOKEN_FIELDS = ["item_code", "token", "source", "whole_value"]
+
+
+class ItemSearchToken(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		item_code: DF.Link | None
+		source: DF.Literal[
+			"Item Code",
+			"Item Name",
+			"Description",
+			"Barcode",
+			"Supplier Part No",
+			"Attribute",
+			"Search Field",
+		]
+		token: DF.Data | None
+		whole_value: DF.Check
+	# end: auto-generated types
+
+	pass
+
+
+def is_item_search_index_enabled():
+	return cint(frappe.db.get_single_value("Stock Settings", "use_item_search_index", cache=True))
+
+
+def is_item_search_index_ready():
+	"""Whether searches can read the index, which is once it has been built after being enabled"""
+	return is_item_search_index_enabled() and cint(
+		frappe.db.get_single_value("Stock Settings", "item_search_index_ready")
+	)
+
+
+def tokenize(value):
+	"""Lower case words of the value, split on anything that is not a letter or a digit"""
+	return [word[:MAX_TOKEN_LENGTH] for word in re.split(r"[\W_]+", cstr(value).lower()) if word]
+
+
+def get_item_search_condition(txt, item_field="tabItem.name"):
+	"""
+	SQL condition matching the items with a token starting with every word of the search text, so
+	that each word is looked up on the token index instead of scanning the items.
+	"""
+	words = list(dict.fromkeys(tokenize(txt)))[:MAX_SEARCH_WORDS]
+	if not words:
+		return "1=1"
+
+	return " and ".join(
+		f"""{item_field} in (select item_code from `tabItem Search Token`
+			where token like {frappe.db.escape(word + "%")})"""
+		for word in words
+	)
+
+
+def get_item_by_supplier_part_no(value):
+	"""Item with the supplier part number, if only one item has it"""
+	item_codes = frappe.get_all(
+		"Item Search Token",
+		filters={
+			"token": cstr(value).strip().lower()[:MAX_TOKEN_LENGTH],
+			"source": "Supplier Part No",
+			"whole_value": 1,
+		},
+		pluck="item_code",
+		distinct=True,
+		limit=2,
+	)
+
+	if len(item_codes) == 1:
+		return item_codes[0]
+
+
+def get_pos_search_fields():
+	"""Item fields searched by the point of sale, as set in POS Settings"""
+	meta = frappe.get_meta("Item")
+	return [
+		fieldname
+		for fieldname in frappe.get_all("POS Search Fields", pluck="fieldname")
+		if fieldname and meta.has_field(fieldname)
+	]
+
+
+def update_item_search_index(item_codes):
+	"""Replace the tokens of the items with the ones of their current values"""
+	if not item_codes:
+		return
+
+	frappe.db.delete("Item Search Token", {"item_code": ("in", item_codes)})
+	insert_item_search_tokens(item_codes)
+
+
+def update_item_search_index_of_row(doc, method=None):
+	"""Index the item again when one of its barcodes, supplier part numbers or attributes is saved on its own"""
+	if doc.parenttype == "Item" and doc.parent and is_item_search_index_enabled():
+		update_item_search_index([doc.parent])
+
+
+def remove_item_search_index(item_code):
+	frappe.db.delete("Item Search Token", {"item_code": item_code})
+
+
+def rebuild_item_search_index():
+	"""
+	Index every item again, a thousand items at a time. Searches do not read the index while it is
+	rebuilt, it is marked ready once every item is indexed.
+	"""
+	frappe.db.set_single_value("Stock Settings", "item_search_index_ready", 0)
+	frappe.db.delete("Item Search Token")
+
+	for item_codes in create_batch(frappe.get_all("Item", pluck="name", order_by="name"), INDEX_BATCH_SIZE):
+		insert_item_search_tokens(item_codes)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	if is_item_search_index_enabled():
+		frappe.db.set_single_value("Stock Settings", "item_search_index_ready", 1)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def insert_item_search_tokens(item_codes):
+	timestamp = now()
+	values = [
+		[frappe.generate_hash(), *token, timestamp, timestamp, frappe.session.user, frappe.session.user]
+		for token in get_item_search_tokens(item_codes)
+	]
+
+	if values:
+		frappe.db.bulk_insert(
+			"Item Search Token",
+			fields=["name", *TOKEN_FIELDS, "creation", "modified", "owner", "modified_by"],
+			values=values,
+		)
+
+
+def get_item_search_tokens(item_codes):
+	"""(item_code, token, source, whole_value) of the items, read in bulk"""
+	search_fields = [
+		field
+		for field in dict.fromkeys(frappe.get_meta("Item").get_search_fields() + get_pos_search_fields())
+		if field not in ("name", "item_code", "item_name", "description")
+	]
+	items = frappe.get_all(
+		"Item",
+		filters={"name": ("in", item_codes)},
+		fields=["name", "item_name", "description", *search_fields],
+	)
+
+	values = {item.name: [] for item in items}
+	for item in items:
+		values[item.name] += [
+			("Item Code", item.name, True),
+			("Item Name", item.item_name, False),
+			("Description", strip_html(cstr(item.description)), False),
+			*[("Search Field", item.get(field), False) for field in search_fields],
+		]
+
+	for doctype, fieldname, source, whole_value in (
+		("Item Barcode", "barcode", "Barcode", True),
+		("Item Supplier", "supplier_part_no", "Supplier Part No", True),
+		("Item Variant Attribute", "attribute_value", "Attribute", False),
+	):
+		for row in frappe.get_all(
+			doctype,
+			filters={"parent": ("in", item_codes), "parenttype": "Item", fieldname: ("is", "set")},
+			fields=["parent", fieldname],
+		):
+			if row.parent in values:
+				values[row.parent].append((source, row[fieldname], whole_value))
+
+	tokens = []
+	for item_code, item_values in values.items():
+		item_tokens = {}
+		for source, value, whole_value in item_values:
+			if whole_value and (token := cstr(value).strip().lower()[:MAX_TOKEN_LENGTH]):
+				item_tokens[(token, source)] = 1
+
+			words = tokenize(value)
+			if source == "Description":
+				words = list(dict.fromkeys(words))[:MAX_DESCRIPTION_TOKENS]
+
+			for word in words:
+				item_tokens.setdefault((word, source), 0)
+
+		tokens += [
+			(item_code, token, source, whole_value) for (token, source), whole_value in item_tokens.items()
+		]
+
+	return tokens
@@ -0,0 +1,110 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from erpnext.controllers.queries import item_query
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	rebuild_item_search_index,
+	tokenize,
+)
+from erpnext.stock.utils import scan_barcode
+
+
+class UnitTestItemSearchToken(UnitTestCase):
+	"""
+	Unit tests for ItemSearchToken.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_tokenize(self):
+		self.assertEqual(tokenize("_Test Item-001 <b>Hex</b>"), ["test", "item", "001", "b", "hex", "b"])
+
+
+class TestItemSearchToken(IntegrationTestCase):
+	def setUp(self):
+		self.item = make_item(
+			"_Test Item Search Index",
+			properties={
+				"description": "<p>Stainless steel hex bolt</p>",
+				"barcodes": [{"barcode": "8901234500017"}],
+				"supplier_items": [{"supplier": "_Test Supplier", "supplier_part_no": "SSB-M8-40"}],
+			},
+		)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def search(self, txt):
+		return [row[0] for row in item_query("Item", txt, "name", 0, 20, {"is_stock_item": 1}, as_dict=False)]
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_item_search_index": 1})
+	def test_item_query_from_index(self):
+		frappe.db.set_single_value("Stock Settings", "item_search_index_ready", 1)
+		self.item.save()
+
+		self.assertIn(self.item.name, self.search("hex bol"))
+		self.assertIn(self.item.name, self.search("bolt stainless"))
+		self.assertIn(self.item.name, self.search("8901234500"))
+		self.assertIn(self.item.name, self.search("ssb-m8"))
+		self.assertNotIn(self.item.name, self.search("hex nut"))
+
+		self.item.description = "Stainless steel hex nut"
+		self.item.save()
+		self.assertIn(self.item.name, self.search("hex nut"))
+		self.assertNotIn(self.item.name, self.search("bolt"))
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_item_search_index": 1})
+	def test_not_read_until_ready(self):
+		self.assertFalse(frappe.db.get_single_value("Stock Settings", "item_search_index_ready"))
+
+		# searched as before while the index is being built
+		self.assertNotIn(self.item.name, self.search("bolt stainless"))
+		self.assertIn(self.item.name, self.search("hex bolt"))
+
+		rebuild_item_search_index()
+		self.assertTrue(frappe.db.get_single_value("Stock Settings", "item_search_index_ready"))
+		self.assertIn(self.item.name, self.search("bolt stainless"))
+
+		# text inside a word is not in the index, it is still found as before
+		self.assertIn(self.item.name, self.search("ainless"))
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_item_search_index": 1})
+	def test_scan_supplier_part_no(self):
+		rebuild_item_search_index()
+
+		self.assertEqual(scan_barcode("SSB-M8-40").get("item_code"), self.item.name)
+		self.assertEqual(scan_barcode("8901234500017").get("item_code"), self.item.name)
+
+		frappe.delete_doc("Item", self.item.name)
+		self.assertFalse(frappe.db.exists("Item Search Token", {"item_code": self.item.name}))
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_item_search_index": 1})
+	def test_barcode_saved_on_its_own(self):
+		frappe.db.set_single_value("Stock Settings", "item_search_index_ready", 1)
+		self.item.save()
+
+		barcode = frappe.get_doc("Item Barcode", self.item.barcodes[0].name)
+		barcode.barcode = "8901234500024"
+		barcode.save()
+		self.assertIn(self.item.name, self.search("8901234500024"))
+		self.assertNotIn(self.item.name, self.search("8901234500017"))
+
+		barcode.delete()
+		self.assertNotIn(self.item.name, self.search("8901234500024"))
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_item_search_index": 1})
+	def test_pos_search_fields(self):
+		from erpnext.selling.page.point_of_sale.point_of_sale import get_conditions
+
+		self.item.db_set("brand", "Zircon Tools")
+		pos_settings = frappe.get_single("POS Settings")
+		pos_settings.set("pos_search_fields", [{"fieldname": "brand", "field": "Brand"}])
+		pos_settings.save()
+		rebuild_item_search_index()
+
+		condition = get_conditions("zircon")
+		items = frappe.db.sql(f"select item.name from `tabItem` item where {condition}", pluck=True)
+		self.assertIn(self.item.name, items)
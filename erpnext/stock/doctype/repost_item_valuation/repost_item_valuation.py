@@ -1,6 +1,9 @@
 # Copyright (c) 2020, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import os
+import socket
+
 import frappe
 from frappe import _
 from frappe.desk.form.load import get_attachments
@@ -8,20 +11,45 @@ from frappe.exceptions import QueryDeadlockError, QueryTimeoutError
 from frappe.model.document import Document
 from frappe.query_builder import DocType, Interval
 from frappe.query_builder.functions import Max, Now
-from frappe.utils import cint, get_link_to_form, get_weekday, getdate, now, nowtime
+from frappe.utils import (
+	cint,
+	get_link_to_form,
+	get_weekday,
+	getdate,
+	now,
+	now_datetime,
+	nowtime,
+)
+from frappe.utils.background_jobs import is_job_enqueued
 from frappe.utils.user import get_users_with_role
 from rq.timeouts import JobTimeoutException
 
 import erpnext
 from erpnext.accounts.general_ledger import validate_accounting_period
 from erpnext.accounts.utils import get_future_stock_vouchers, repost_gle_for_stock_vouchers
+from erpnext.stock.doctype.batch_running_balance.batch_running_balance import (
+	deferred_batch_running_balance,
+)
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	invalidate_stock_balance_snapshots,
+)
 from erpnext.stock.stock_ledger import (
 	get_affected_transactions,
+	get_distinct_item_warehouse,
 	get_items_to_be_repost,
+	get_repost_throughput,
 	repost_future_sle,
 )
 
-RecoverableErrors = (JobTimeoutException, QueryDeadlockError, QueryTimeoutError)
+
+class RepostItemLockedError(frappe.ValidationError):
+	pass
+
+
+RecoverableErrors = (JobTimeoutException, QueryDeadlockError, QueryTimeoutError, RepostItemLockedError)
+
+# seconds, also used as the timeout of parallel reposting jobs
+REPOST_LOCK_TIMEOUT = 4 * 60 * 60
 
 
 class RepostItemValuation(Document):
@@ -47,6 +75,10 @@ class RepostItemValuation(Document):
 		items_to_be_repost: DF.Code | None
 		posting_date: DF.Date
 		posting_time: DF.Time | None
+		repost_completed_on: DF.Datetime | None
+		repost_started_on: DF.Datetime | None
+		repost_throughput: DF.Float
+		repost_worker: DF.Data | None
 		reposting_data_file: DF.Attach | None
 		status: DF.Literal["Queued", "In Progress", "Completed", "Skipped", "Failed"]
 		total_reposting_count: DF.Int
@@ -189,6 +221,8 @@ class RepostItemValuation(Document):
 		        These flags are useful for asserting real time behaviour like quantity updates.
 		"""
 
+		invalidate_stock_balance_snapshots(self.company, self.posting_date)
+
 		if not frappe.flags.in_test:
 			return
 		if self.flags.dont_run_in_test or frappe.flags.dont_execute_stock_reposts:
@@ -260,14 +294,24 @@ def repost(doc):
 		frappe.db.MAX_WRITES_PER_TRANSACTION *= 4
 
 		doc.set_status("In Progress")
+		if not doc.repost_started_on:
+			doc.db_set("repost_started_on", now_datetime())
 		if not frappe.flags.in_test:
 			frappe.db.commit()
 
-		repost_sl_entries(doc)
+		# the running balances of the batches are recomputed once the ledger is replayed
+		with deferred_batch_running_balance():
+			repost_sl_entries(doc)
 		repost_gl_entries(doc)
 
 		doc.set_status("Completed")
-		doc.db_set("reposting_data_file", None)
+		doc.db_set(
+			{
+				"reposting_data_file": None,
+				"repost_completed_on": now_datetime(),
+				"repost_throughput": get_repost_throughput(doc, doc.total_reposting_count),
+			}
+		)
 		remove_attached_file(doc.name)
 
 	except Exception as e:
@@ -285,8 +329,8 @@ def repost(doc):
 			message = message.get("message")
 
 		status = "Failed"
-		# If failed because of timeout, set status to In Progress
-		if traceback and "timeout" in traceback.lower():
+		# If failed because of timeout or an item locked by another worker, set status to In Progress
+		if (traceback and "timeout" in traceback.lower()) or isinstance(e, RepostItemLockedError):
 			status = "In Progress"
 
 		if traceback:
@@ -433,6 +477,11 @@ def repost_entries():
 
 	riv_entries = get_repost_item_valuation_entries()
 
+	workers = cint(frappe.db.get_single_value("Stock Reposting Settings", "parallel_reposting_workers"))
+	if workers > 1:
+		enqueue_parallel_reposts(riv_entries, workers)
+		return
+
 	for row in riv_entries:
 		doc = frappe.get_doc("Repost Item Valuation", row.name)
 		if doc.status in ("Queued", "In Progress"):
@@ -444,6 +493,215 @@ def repost_entries():
 		return
 
 
+def enqueue_parallel_reposts(riv_entries, workers):
+	"""
+	Split the queue into groups of entries that share no item and
+	repost the groups on up to `workers` background jobs.
+	"""
+	buckets = [[] for _i in range(workers)]
+	for component in sorted(get_repost_components(riv_entries), key=len, reverse=True):
+		min(buckets, key=len).extend(component)
+
+	for idx, names in enumerate(buckets):
+		job_id = f"repost_item_valuation::{idx}"
+		if not names or is_job_enqueued(job_id):
+			continue
+
+		frappe.enqueue(
+			"erpnext.stock.doctype.repost_item_valuation.repost_item_valuation.repost_entries_in_worker",
+			queue="long",
+			timeout=REPOST_LOCK_TIMEOUT,
+			job_id=job_id,
+			names=names,
+		)
+
+
+def get_repost_components(riv_entries):
+	"""
+	Group Repost Item Valuation entries into connected components of the item-sharing graph.
+
+	Entries of different components touch disjoint items (and so disjoint item/warehouse pairs)
+	and can be reposted concurrently. Within a component the queue order is retained.
+	"""
+	parent = {}
+
+	def find(item_code):
+		while parent.setdefault(item_code, item_code) != item_code:
+			parent[item_code] = parent[parent[item_code]]
+			item_code = parent[item_code]
+		return item_code
+
+	entries = frappe.get_all(
+		"Repost Item Valuation",
+		filters={
+			"name": ("in", [row.name for row in riv_entries]),
+			"status": ("in", ("Queued", "In Progress")),
+		},
+		fields=[
+			"name",
+			"based_on",
+			"item_code",
+			"voucher_type",
+			"voucher_no",
+			"distinct_item_and_warehouse",
+			"reposting_data_file",
+		],
+		order_by=None,
+	)
+	voucher_items = get_voucher_items(entries)
+
+	entry_items = {}
+	for entry in entries:
+		items = get_items_for_repost(entry, voucher_items)
+		entry_items[entry.name] = items
+
+		items = list(items)
+		for item_code in items[1:]:
+			parent[find(item_code)] = find(items[0])
+
+	components = {}
+	for row in riv_entries:
+		if row.name not in entry_items:
+			continue
+
+		items = entry_items[row.name]
+		# entries without stock ledger entries have nothing to conflict with
+		key = find(next(iter(items))) if items else row.name
+		components.setdefault(key, []).append(row.name)
+
+	return list(components.values())
+
+
+def get_voucher_items(entries):
+	"""Items of the stock ledger entries of the vouchers of the entries, by voucher"""
+	voucher_nos = [d.voucher_no for d in entries if d.based_on != "Item and Warehouse" and d.voucher_no]
+	if not voucher_nos:
+		return {}
+
+	voucher_items = {}
+	for d in frappe.get_all(
+		"Stock Ledger Entry",
+		filters={"voucher_no": ("in", voucher_nos)},
+		fields=["voucher_type", "voucher_no", "item_code"],
+		distinct=True,
+		order_by=None,
+	):
+		voucher_items.setdefault((d.voucher_type, d.voucher_no), set()).add(d.item_code)
+
+	return voucher_items
+
+
+def get_items_for_repost(doc, voucher_items=None):
+	"""Items already known to be reposted by the entry"""
+	if doc.based_on == "Item and Warehouse":
+		items = {doc.item_code}
+	elif voucher_items is not None:
+		items = set(voucher_items.get((doc.voucher_type, doc.voucher_no), ()))
+	else:
+		items = set(
+			frappe.get_all(
+				"Stock Ledger Entry",
+				filters={"voucher_type": doc.voucher_type, "voucher_no": doc.voucher_no},
+				pluck="item_code",
+				distinct=True,
+			)
+		)
+
+	# dependent items found by an earlier, interrupted run
+	if doc.distinct_item_and_warehouse or doc.reposting_data_file:
+		items.update(item_code for item_code, _warehouse in get_distinct_item_warehouse(doc=doc))
+
+	return items
+
+
+def repost_entries_in_worker(names):
+	"""
+	Repost a share of the queue on a parallel worker.
+
+	Items are locked for the duration of each repost. Entries whose items, dependent items
+	included, are being reposted by another worker are left in the queue for the next run,
+	along with every later entry of those items so that the posting order is retained.
+	"""
+	parallel_repost = frappe.flags.parallel_repost
+	frappe.flags.parallel_repost = True
+	try:
+		repost_worker_entries(names)
+	finally:
+		frappe.flags.parallel_repost = parallel_repost
+
+
+def repost_worker_entries(names):
+	blocked_items = set()
+
+	for name in names:
+		doc = frappe.get_doc("Repost Item Valuation", name)
+		if doc.status not in ("Queued", "In Progress"):
+			continue
+
+		items = get_items_for_repost(doc)
+		if items & blocked_items or not acquire_repost_locks(items):
+			blocked_items.update(items)
+			continue
+
+		try:
+			doc.db_set("repost_worker", f"{socket.gethostname()}:{os.getpid()}")
+			repost(doc)
+		finally:
+			items.update(frappe.flags.get("repost_locks") or {})
+			release_repost_locks()
+
+		if frappe.db.get_value(doc.doctype, doc.name, "status") != "Completed":
+			# left in the queue, as a dependent item was locked elsewhere or the repost failed
+			blocked_items.update(items)
+			continue
+
+		doc.deduplicate_similar_repost()
+
+
+def acquire_repost_locks(item_codes):
+	"""
+	Lock items for the current repost, without waiting. Returns False, holding no new lock, if an
+	item is locked by another worker, so that workers never wait on each other's locks.
+	"""
+	held = frappe.flags.setdefault("repost_locks", {})
+	acquired = []
+
+	for item_code in sorted(set(item_codes) - set(held)):
+		lock = frappe.cache.lock(
+			frappe.cache.make_key(f"repost_item_valuation:{item_code}"), timeout=REPOST_LOCK_TIMEOUT
+		)
+		if not lock.acquire(blocking=False):
+			for acquired_item in acquired:
+				held.pop(acquired_item).release()
+			return False
+
+		held[item_code] = lock
+		acquired.append(item_code)
+
+	return True
+
+
+def lock_item_for_repost(item_code):
+	"""
+	Called for every item/warehouse reposted by a parallel worker. Dependent items are only found
+	while reposting, so if one is locked by another worker the repost stops and stays queued.
+	"""
+	if not frappe.flags.parallel_repost:
+		return
+
+	if not acquire_repost_locks([item_code]):
+		frappe.throw(
+			_("Item {0} is being reposted by another worker").format(frappe.bold(item_code)),
+			RepostItemLockedError,
+		)
+
+
+def release_repost_locks():
+	for lock in (frappe.flags.pop("repost_locks", None) or {}).values():
+		if lock.owned():
+			lock.release()
+
+
 def get_repost_item_valuation_entries():
 	return frappe.db.sql(
 		""" SELECT name from `tabRepost Item Valuation`
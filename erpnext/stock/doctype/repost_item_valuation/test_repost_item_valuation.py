@@ -14,7 +14,13 @@ from erpnext.controllers.stock_controller import create_item_wise_repost_entries
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
 from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+	REPOST_LOCK_TIMEOUT,
+	RepostItemLockedError,
+	get_repost_components,
 	in_configured_timeslot,
+	lock_item_for_repost,
+	release_repost_locks,
+	repost_entries_in_worker,
 )
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 from erpnext.stock.tests.test_utils import StockTestMixin
@@ -454,3 +460,72 @@ class TestRepostItemValuation(IntegrationTestCase, StockTestMixin):
 						"name",
 					)
 				)
+
+	def test_parallel_repost_components(self):
+		item_a = make_item("_Test Parallel Repost Item A", properties={"is_stock_item": 1}).name
+		item_b = make_item("_Test Parallel Repost Item B", properties={"is_stock_item": 1}).name
+
+		def make_riv(item_code, warehouse):
+			return frappe.get_doc(
+				doctype="Repost Item Valuation",
+				based_on="Item and Warehouse",
+				item_code=item_code,
+				warehouse=warehouse,
+				posting_date=today(),
+				posting_time="00:00:01",
+				company="_Test Company",
+			).insert(ignore_permissions=True)
+
+		riv1 = make_riv(item_a, "_Test Warehouse - _TC")
+		riv2 = make_riv(item_b, "_Test Warehouse - _TC")
+		riv3 = make_riv(item_a, "Stores - _TC")
+
+		stock_entry = make_stock_entry(item_code=item_b, to_warehouse="Stores - _TC", qty=1, rate=100)
+		riv4 = frappe.get_doc(
+			doctype="Repost Item Valuation",
+			based_on="Transaction",
+			voucher_type="Stock Entry",
+			voucher_no=stock_entry.name,
+			posting_date=today(),
+			posting_time="00:00:01",
+			company="_Test Company",
+		).insert(ignore_permissions=True)
+
+		components = get_repost_components([riv1, riv2, riv3, riv4])
+
+		# entries of the same item, directly or through their voucher, stay together and in queue order
+		self.assertEqual(len(components), 2)
+		self.assertIn([riv1.name, riv3.name], components)
+		self.assertIn([riv2.name, riv4.name], components)
+
+		# entries no longer queued are left out
+		riv2.db_set("status", "Completed")
+		self.assertIn([riv4.name], get_repost_components([riv1, riv2, riv3, riv4]))
+
+	def test_parallel_repost_flag_restored(self):
+		frappe.flags.parallel_repost = None
+		repost_entries_in_worker([])
+		self.assertIsNone(frappe.flags.parallel_repost)
+
+	def test_dependent_item_locked_by_another_worker(self):
+		item_code = make_item("_Test Parallel Repost Item A", properties={"is_stock_item": 1}).name
+
+		# held by another worker, the repost does not wait for it
+		lock = frappe.cache.lock(
+			frappe.cache.make_key(f"repost_item_valuation:{item_code}"), timeout=REPOST_LOCK_TIMEOUT
+		)
+		self.assertTrue(lock.acquire(blocking=False))
+
+		frappe.flags.parallel_repost = True
+		try:
+			self.assertRaises(RepostItemLockedError, lock_item_for_repost, item_code)
+			self.assertFalse(frappe.flags.repost_locks)
+
+			lock.release()
+			lock_item_for_repost(item_code)
+			self.assertIn(item_code, frappe.flags.repost_locks)
+		finally:
+			frappe.flags.parallel_repost = False
+			release_repost_locks()
+			if lock.owned():
+				lock.release()
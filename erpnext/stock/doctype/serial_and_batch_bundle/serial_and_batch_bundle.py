@@ -22,6 +22,9 @@ from frappe.utils import (
 )
 from frappe.utils.csvutils import build_csv_response
 
+from erpnext.stock.doctype.batch_running_balance.batch_running_balance import (
+	update_batch_running_balance,
+)
 from erpnext.stock.serial_batch_bundle import (
 	BatchNoValuation,
 	SerialNoValuation,
@@ -576,6 +579,9 @@ class SerialandBatchBundle(Document):
 				}
 			)
 
+			if self.docstatus == 1:
+				update_batch_running_balance(self.name)
+
 	def calculate_outgoing_rate(self):
 		if not (self.has_serial_no and self.entries):
 			return
@@ -856,6 +862,7 @@ class SerialandBatchBundle(Document):
 	def on_submit(self):
 		self.validate_batch_inventory()
 		self.validate_serial_nos_inventory()
+		update_batch_running_balance(self.name)
 
 	def set_purchase_document_no(self):
 		if self.flags.ignore_validate_serial_batch:
@@ -927,6 +934,7 @@ class SerialandBatchBundle(Document):
 
 	def on_cancel(self):
 		self.validate_voucher_no_docstatus()
+		update_batch_running_balance(self.name)
 
 	def validate_voucher_no_docstatus(self):
 		if self.voucher_type == "POS Invoice":
@@ -0,0 +1,26 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class StockBalanceRepostBatch(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		error_log: DF.Link | None
+		from_item_code: DF.Data | None
+		item_codes: DF.LongText | None
+		item_count: DF.Int
+		mismatches: DF.Code | None
+		options: DF.Code | None
+		status: DF.Literal["Queued", "Completed", "Failed"]
+		to_item_code: DF.Data | None
+	# end: auto-generated types
+
+	pass
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from frappe.tests import UnitTestCase
+
+
+class UnitTestStockBalanceRepostBatch(UnitTestCase):
+	"""
+	Unit tests for StockBalanceRepostBatch.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
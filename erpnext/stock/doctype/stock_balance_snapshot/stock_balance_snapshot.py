@@ -0,0 +1,228 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Order
+from frappe.utils import add_days, add_months, cint, flt, get_last_day, getdate, now, today
+
+# latest snapshot date of each company, to skip the invalidation of entries posted after it
+LATEST_SNAPSHOT_DATE_KEY = "stock_balance_snapshot_date"
+
+SNAPSHOT_FIELDS = (
+	"item_code",
+	"warehouse",
+	"qty_after_transaction",
+	"valuation_rate",
+	"stock_value",
+	"stock_queue",
+)
+
+
+class StockBalanceSnapshot(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		company: DF.Link | None
+		item_code: DF.Link | None
+		qty_after_transaction: DF.Float
+		snapshot_date: DF.Date | None
+		stock_queue: DF.LongText | None
+		stock_value: DF.Currency
+		valuation_rate: DF.Currency
+		warehouse: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def is_stock_balance_snapshot_enabled():
+	return cint(frappe.db.get_single_value("Stock Settings", "use_stock_balance_snapshots", cache=True))
+
+
+def create_stock_balance_snapshots():
+	"""Scheduled daily, takes the snapshots of the month ends that are not taken yet"""
+	if not is_stock_balance_snapshot_enabled():
+		return
+
+	for company in frappe.get_all("Company", pluck="name"):
+		for snapshot_date in get_pending_snapshot_dates(company):
+			take_stock_balance_snapshot(company, snapshot_date)
+			frappe.db.commit()
+
+
+def get_pending_snapshot_dates(company):
+	"""Month ends after the latest snapshot of the company, up to the last completed month"""
+	upto = getdate(get_last_day(add_months(today(), -1)))
+
+	# balances after a pending repost are not final yet
+	if pending_repost_date := get_pending_repost_date(company):
+		upto = min(upto, getdate(add_days(pending_repost_date, -1)))
+
+	if latest_snapshot_date := get_latest_snapshot_date(company):
+		snapshot_date = get_last_day(add_days(latest_snapshot_date, 1))
+	else:
+		first_posting_date = frappe.db.get_value(
+			"Stock Ledger Entry", {"company": company, "is_cancelled": 0}, "min(posting_date)"
+		)
+		if not first_posting_date:
+			return []
+
+		snapshot_date = get_last_day(first_posting_date)
+
+	snapshot_date = getdate(snapshot_date)
+
+	snapshot_dates = []
+	while snapshot_date <= upto:
+		snapshot_dates.append(snapshot_date)
+		snapshot_date = getdate(get_last_day(add_days(snapshot_date, 1)))
+
+	return snapshot_dates
+
+
+def get_pending_repost_date(company):
+	return frappe.db.get_value(
+		"Repost Item Valuation",
+		{"company": company, "docstatus": 1, "status": ("in", ["Queued", "In Progress"])},
+		"min(posting_date)",
+	)
+
+
+def get_latest_snapshot_date(company, upto=None):
+	"""Date of the latest snapshot of the company, on or before `upto` if given"""
+	filters = {"company": company}
+	if upto:
+		filters["snapshot_date"] = ("<=", upto)
+
+	return frappe.db.get_value("Stock Balance Snapshot", filters, "max(snapshot_date)")
+
+
+def get_cached_latest_snapshot_date(company):
+	latest_snapshot_date = frappe.cache.hget(LATEST_SNAPSHOT_DATE_KEY, company)
+	if latest_snapshot_date is None:
+		latest_snapshot_date = str(get_latest_snapshot_date(company) or "")
+		frappe.cache.hset(LATEST_SNAPSHOT_DATE_KEY, company, latest_snapshot_date)
+
+	return latest_snapshot_date
+
+
+def clear_cached_latest_snapshot_date(company):
+	frappe.cache.hdel(LATEST_SNAPSHOT_DATE_KEY, company)
+
+
+def lock_stock_balance_snapshots(company, shared=False):
+	"""
+	Lock the Company row. Entries invalidating the snapshots of the company take a shared lock, a
+	snapshot being taken an exclusive one, so that no entry is posted into a snapshot while it is taken.
+	"""
+	if not shared:
+		frappe.db.get_value("Company", company, "name", for_update=True)
+		return
+
+	share_mode = "for share" if frappe.db.db_type == "postgres" else "lock in share mode"
+	frappe.db.sql(f"select name from `tabCompany` where name = %s {share_mode}", company)
+
+
+def take_stock_balance_snapshot(company, snapshot_date):
+	"""
+	Balances of all the items and warehouses of the company as of `snapshot_date`.
+
+	Starts from the previous snapshot, so only the ledger entries posted in between are read.
+	"""
+	snapshot_date = getdate(snapshot_date)
+
+	# entries posted on or before the snapshot date from now on invalidate it, and wait for it
+	# to be taken if they are posted while it is
+	frappe.cache.hset(LATEST_SNAPSHOT_DATE_KEY, company, str(snapshot_date))
+	frappe.db.after_commit.add(lambda: clear_cached_latest_snapshot_date(company))
+	frappe.db.after_rollback.add(lambda: clear_cached_latest_snapshot_date(company))
+	lock_stock_balance_snapshots(company)
+
+	previous_snapshot_date = get_latest_snapshot_date(company, add_days(snapshot_date, -1))
+
+	balances = {}
+	if previous_snapshot_date:
+		for row in frappe.get_all(
+			"Stock Balance Snapshot",
+			filters={"company": company, "snapshot_date": previous_snapshot_date},
+			fields=list(SNAPSHOT_FIELDS),
+		):
+			balances[(row.item_code, row.warehouse)] = row
+
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	query = (
+		frappe.qb.from_(sle)
+		.select(*[sle[field] for field in SNAPSHOT_FIELDS])
+		.where((sle.company == company) & (sle.is_cancelled == 0) & (sle.posting_date <= snapshot_date))
+		.orderby(sle.posting_datetime, order=Order.asc)
+		.orderby(sle.creation, order=Order.asc)
+	)
+
+	if previous_snapshot_date:
+		query = query.where(sle.posting_date > previous_snapshot_date)
+
+	with frappe.db.unbuffered_cursor():
+		for entry in query.run(as_dict=True, as_iterator=True):
+			balances[(entry.item_code, entry.warehouse)] = entry
+
+	frappe.db.delete("Stock Balance Snapshot", {"company": company, "snapshot_date": snapshot_date})
+
+	timestamp = now()
+	frappe.db.bulk_insert(
+		"Stock Balance Snapshot",
+		fields=[
+			"name",
+			"company",
+			"snapshot_date",
+			*SNAPSHOT_FIELDS,
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[
+			[
+				frappe.generate_hash(),
+				company,
+				snapshot_date,
+				*[balance[field] for field in SNAPSHOT_FIELDS],
+				timestamp,
+				timestamp,
+				frappe.session.user,
+				frappe.session.user,
+			]
+			for balance in balances.values()
+			# items without stock are left out, a missing row means nothing in stock
+			if flt(balance.qty_after_transaction) or flt(balance.stock_value)
+		],
+	)
+
+
+def invalidate_stock_balance_snapshots(company, posting_date):
+	"""
+	Remove the snapshots of the company on or after `posting_date`, since backdated entries and
+	reposts change the balances of all the later ones. They are taken again by the scheduler.
+	"""
+	if not company or not posting_date:
+		return
+
+	# entries after the latest snapshot do not change it
+	latest_snapshot_date = get_cached_latest_snapshot_date(company)
+	if not latest_snapshot_date or getdate(posting_date) > getdate(latest_snapshot_date):
+		return
+
+	lock_stock_balance_snapshots(company, shared=True)
+
+	filters = {"company": company, "snapshot_date": (">=", getdate(posting_date))}
+	if frappe.db.exists("Stock Balance Snapshot", filters):
+		frappe.db.delete("Stock Balance Snapshot", filters)
+		frappe.db.after_commit.add(lambda: clear_cached_latest_snapshot_date(company))
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Balance Snapshot", ["company", "snapshot_date"])
@@ -0,0 +1,186 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import add_days, add_months, get_first_day, get_last_day, getdate, today
+
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	get_cached_latest_snapshot_date,
+	get_latest_snapshot_date,
+	get_pending_snapshot_dates,
+	invalidate_stock_balance_snapshots,
+	take_stock_balance_snapshot,
+)
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.report.stock_balance.stock_balance import execute
+
+
+class UnitTestStockBalanceSnapshot(UnitTestCase):
+	"""
+	Unit tests for StockBalanceSnapshot.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
+
+
+class TestStockBalanceSnapshot(IntegrationTestCase):
+	def setUp(self):
+		self.item = make_item(properties={"is_stock_item": 1, "valuation_method": "FIFO"}).name
+		self.warehouse = "_Test Warehouse - _TC"
+		self.last_month = getdate(get_first_day(add_months(today(), -1)))
+
+		frappe.db.delete("Stock Balance Snapshot", {"company": "_Test Company"})
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def make_entries(self):
+		make_stock_entry(
+			item_code=self.item,
+			to_warehouse=self.warehouse,
+			qty=10,
+			rate=100,
+			posting_date=add_months(self.last_month, -1),
+		)
+		make_stock_entry(
+			item_code=self.item,
+			to_warehouse=self.warehouse,
+			qty=5,
+			rate=200,
+			posting_date=self.last_month,
+		)
+		make_stock_entry(item_code=self.item, from_warehouse=self.warehouse, qty=3, posting_date=today())
+
+	def get_report_rows(self):
+		filters = frappe._dict(
+			{
+				"company": "_Test Company",
+				"item_code": self.item,
+				"from_date": add_days(get_last_day(self.last_month), 1),
+				"to_date": today(),
+			}
+		)
+		return [frappe._dict(row) for row in execute(filters)[1]]
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_stock_balance_snapshots": 1})
+	def test_snapshot_balances(self):
+		self.make_entries()
+		take_snapshots()
+
+		snapshot_date = get_latest_snapshot_date("_Test Company")
+		self.assertEqual(getdate(snapshot_date), getdate(get_last_day(self.last_month)))
+
+		snapshot = frappe.db.get_value(
+			"Stock Balance Snapshot",
+			{"item_code": self.item, "warehouse": self.warehouse, "snapshot_date": snapshot_date},
+			["qty_after_transaction", "stock_value"],
+			as_dict=True,
+		)
+		self.assertEqual(snapshot.qty_after_transaction, 15)
+		self.assertEqual(snapshot.stock_value, 2000)
+
+	def test_report_from_snapshot(self):
+		self.make_entries()
+
+		expected = self.get_report_rows()
+
+		with self.change_settings("Stock Settings", {"use_stock_balance_snapshots": 1}):
+			take_snapshots()
+			self.assertTrue(get_latest_snapshot_date("_Test Company"))
+			rows = self.get_report_rows()
+
+		self.assertEqual(len(rows), 1)
+		for fieldname in (
+			"opening_qty",
+			"opening_val",
+			"in_qty",
+			"out_qty",
+			"bal_qty",
+			"bal_val",
+			"val_rate",
+		):
+			self.assertAlmostEqual(rows[0][fieldname], expected[0][fieldname], 3)
+
+		self.assertEqual(rows[0].opening_qty, 15)
+		self.assertEqual(rows[0].bal_qty, 12)
+
+	def test_report_from_snapshot_without_later_entries(self):
+		make_stock_entry(
+			item_code=self.item,
+			to_warehouse=self.warehouse,
+			qty=10,
+			rate=100,
+			posting_date=add_months(self.last_month, -1),
+		)
+
+		expected = self.get_report_rows()
+
+		with self.change_settings("Stock Settings", {"use_stock_balance_snapshots": 1}):
+			take_snapshots()
+			rows = self.get_report_rows()
+
+		# the valuation rate of an item only in the snapshot is the one it had in the ledger
+		self.assertEqual(len(rows), 1)
+		self.assertEqual(rows[0].val_rate, 100)
+		self.assertEqual(rows[0].val_rate, expected[0].val_rate)
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_stock_balance_snapshots": 1})
+	def test_backdated_entry_invalidates_snapshots(self):
+		self.make_entries()
+		take_snapshots()
+		self.assertTrue(get_latest_snapshot_date("_Test Company"))
+
+		make_stock_entry(
+			item_code=self.item,
+			to_warehouse=self.warehouse,
+			qty=2,
+			rate=100,
+			posting_date=add_days(self.last_month, 1),
+		)
+		self.assertFalse(
+			frappe.db.exists(
+				"Stock Balance Snapshot",
+				{"company": "_Test Company", "snapshot_date": (">=", add_days(self.last_month, 1))},
+			)
+		)
+
+		take_snapshots()
+		self.assertEqual(
+			frappe.db.get_value(
+				"Stock Balance Snapshot",
+				{
+					"item_code": self.item,
+					"warehouse": self.warehouse,
+					"snapshot_date": get_last_day(self.last_month),
+				},
+				"qty_after_transaction",
+			),
+			17,
+		)
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"use_stock_balance_snapshots": 1})
+	def test_later_entry_skips_invalidation(self):
+		self.make_entries()
+		take_snapshots()
+		latest_snapshot_date = get_latest_snapshot_date("_Test Company")
+		self.assertEqual(get_cached_latest_snapshot_date("_Test Company"), str(latest_snapshot_date))
+
+		with patch.object(frappe.db, "exists", wraps=frappe.db.exists) as exists:
+			invalidate_stock_balance_snapshots("_Test Company", add_days(latest_snapshot_date, 1))
+			self.assertFalse(exists.called)
+
+			invalidate_stock_balance_snapshots("_Test Company", latest_snapshot_date)
+			self.assertTrue(exists.called)
+
+		self.assertNotEqual(get_latest_snapshot_date("_Test Company"), latest_snapshot_date)
+
+
+def take_snapshots(company="_Test Company"):
+	# same as the scheduled job, without committing
+	for snapshot_date in get_pending_snapshot_dates(company):
+		take_stock_balance_snapshot(company, snapshot_date)
@@ -1718,6 +1718,37 @@ class TestStockEntry(IntegrationTestCase):
 			mr.cancel()
 			mr.delete()
 
+	def test_auto_reorder_dry_run(self):
+		from erpnext.stock.reorder_item import reorder_item
+
+		item_doc = make_item(
+			"Test Auto Reorder Dry Run Item",
+			properties={"stock_uom": "Kg", "purchase_uom": "Nos", "is_stock_item": 1},
+			uoms=[{"uom": "Nos", "conversion_factor": 5}],
+		)
+
+		if not frappe.db.exists("Item Reorder", {"parent": item_doc.name}):
+			item_doc.append(
+				"reorder_levels",
+				{
+					"warehouse_reorder_level": 20,
+					"warehouse_reorder_qty": 10,
+					"warehouse": "_Test Warehouse - _TC",
+					"material_request_type": "Purchase",
+				},
+			)
+			item_doc.save(ignore_permissions=True)
+
+		result = reorder_item(dry_run=True)
+		suggestions = [d for d in result.suggestions if d.item_code == item_doc.name]
+
+		self.assertEqual(len(suggestions), 1)
+		self.assertEqual(suggestions[0].reorder_qty, 20)
+		self.assertEqual(suggestions[0].uom, "Nos")
+		self.assertEqual(suggestions[0].qty, 4)
+		self.assertTrue(result.time_taken >= 0)
+		self.assertFalse(frappe.db.exists("Material Request Item", {"item_code": item_doc.name}))
+
 	def test_use_serial_and_batch_fields(self):
 		item = make_item(
 			"Test Use Serial and Batch Item SN Item",
@@ -3,6 +3,7 @@
 
 import json
 import time
+from unittest.mock import patch
 from uuid import uuid4
 
 import frappe
@@ -1253,6 +1254,56 @@ class TestStockLedgerEntry(IntegrationTestCase, StockTestMixin):
 		)
 		self.assertEqual(abs(sles[0].stock_value_difference), sles[1].stock_value_difference)
 
+	def test_batched_ledger_replay(self):
+		"Reposting with batched updates should produce the same ledger as reposting entry by entry."
+		from erpnext.stock.stock_ledger import REPLAY_FIELDS, update_entries_after
+
+		warehouse = "_Test Warehouse - _TC"
+
+		for valuation_method in ("FIFO", "LIFO", "Moving Average"):
+			item = make_item(properties={"valuation_method": valuation_method}).name
+			make_stock_entry(
+				item_code=item, target=warehouse, qty=10, rate=10, posting_date=add_days(today(), -10)
+			)
+			for days in range(1, 6):
+				posting_date = add_days(today(), days - 10)
+				make_stock_entry(
+					item_code=item, target=warehouse, qty=5, rate=10 + days, posting_date=posting_date
+				)
+				make_stock_entry(item_code=item, source=warehouse, qty=3, posting_date=posting_date)
+
+			def repost(batched_ledger_replay):
+				frappe.db.set_single_value(
+					"Stock Reposting Settings", "batched_ledger_replay", batched_ledger_replay
+				)
+				frappe.db.sql(
+					"""update `tabStock Ledger Entry` set qty_after_transaction = 0, valuation_rate = 0,
+					stock_value = 0, stock_value_difference = 0, stock_queue = '[]' where item_code = %s""",
+					item,
+				)
+				update_entries_after(
+					{
+						"item_code": item,
+						"warehouse": warehouse,
+						"posting_date": add_days(today(), -11),
+						"posting_time": "00:00:00",
+					}
+				)
+
+				return frappe.get_all(
+					"Stock Ledger Entry",
+					filters={"item_code": item, "is_cancelled": 0},
+					fields=["name", *REPLAY_FIELDS],
+					order_by="posting_datetime, creation",
+				)
+
+			expected = repost(batched_ledger_replay=0)
+			# small chunks so that several reads and flushes happen
+			with patch("erpnext.stock.stock_ledger.REPLAY_CHUNK_SIZE", 4):
+				actual = repost(batched_ledger_replay=1)
+
+			self.assertEqual(actual, expected)
+
 	@IntegrationTestCase.change_settings("System Settings", {"float_precision": 4})
 	def test_negative_qty_with_precision(self):
 		"Test if system precision is respected while validating negative qty."
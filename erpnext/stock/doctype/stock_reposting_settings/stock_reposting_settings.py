@@ -16,6 +16,7 @@ class StockRepostingSettings(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		batched_ledger_replay: DF.Check
 		do_reposting_for_each_stock_transaction: DF.Check
 		end_time: DF.Time | None
 		item_based_reposting: DF.Check
@@ -24,6 +25,7 @@ class StockRepostingSettings(Document):
 			"", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
 		]
 		notify_reposting_error_to_role: DF.Link | None
+		parallel_reposting_workers: DF.Int
 		start_time: DF.Time | None
 	# end: auto-generated types
 
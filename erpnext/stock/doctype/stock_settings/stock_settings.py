@@ -37,6 +37,7 @@ class StockSettings(Document):
 		auto_insert_price_list_rate_if_missing: DF.Check
 		auto_reserve_serial_and_batch: DF.Check
 		auto_reserve_stock_for_sales_order_on_purchase: DF.Check
+		batch_running_balance_ready: DF.Check
 		clean_description_html: DF.Check
 		default_warehouse: DF.Link | None
 		disable_serial_no_and_batch_selector: DF.Check
@@ -45,6 +46,7 @@ class StockSettings(Document):
 		enable_stock_reservation: DF.Check
 		item_group: DF.Link | None
 		item_naming_by: DF.Literal["Item Code", "Naming Series"]
+		item_search_index_ready: DF.Check
 		mr_qty_allowance: DF.Float
 		naming_series_prefix: DF.Data | None
 		over_delivery_receipt_allowance: DF.Float
@@ -60,8 +62,11 @@ class StockSettings(Document):
 		stock_frozen_upto_days: DF.Int
 		stock_uom: DF.Link | None
 		update_existing_price_list_rate: DF.Check
+		use_batch_running_balance: DF.Check
+		use_item_search_index: DF.Check
 		use_naming_series: DF.Check
 		use_serial_batch_fields: DF.Check
+		use_stock_balance_snapshots: DF.Check
 		valuation_method: DF.Literal["FIFO", "Moving Average", "LIFO"]
 	# end: auto-generated types
 
@@ -103,6 +108,22 @@ class StockSettings(Document):
 		self.change_precision_for_purchase()
 		self.validate_use_batch_wise_valuation()
 
+		# only the rebuild marks the running balances ready
+		if not self.use_batch_running_balance or self.has_value_changed("use_batch_running_balance"):
+			self.batch_running_balance_ready = 0
+		else:
+			self.batch_running_balance_ready = frappe.db.get_single_value(
+				"Stock Settings", "batch_running_balance_ready"
+			)
+
+		# and the item search index
+		if not self.use_item_search_index or self.has_value_changed("use_item_search_index"):
+			self.item_search_index_ready = 0
+		else:
+			self.item_search_index_ready = frappe.db.get_single_value(
+				"Stock Settings", "item_search_index_ready"
+			)
+
 	def validate_use_batch_wise_valuation(self):
 		if not self.do_not_use_batchwise_valuation:
 			return
@@ -228,6 +249,30 @@ class StockSettings(Document):
 	def on_update(self):
 		self.toggle_warehouse_field_for_inter_warehouse_transfer()
 
+		if self.use_batch_running_balance and self.has_value_changed("use_batch_running_balance"):
+			self.rebuild_batch_running_balance()
+
+		if self.use_item_search_index and self.has_value_changed("use_item_search_index"):
+			self.rebuild_item_search_index()
+
+	def rebuild_batch_running_balance(self):
+		frappe.enqueue(
+			"erpnext.stock.doctype.batch_running_balance.batch_running_balance.rebuild_batch_running_balance",
+			queue="long",
+			timeout=3600,
+			enqueue_after_commit=True,
+		)
+		frappe.msgprint(_("Batch Running Balances will be rebuilt in the background."), alert=True)
+
+	def rebuild_item_search_index(self):
+		frappe.enqueue(
+			"erpnext.stock.doctype.item_search_token.item_search_token.rebuild_item_search_index",
+			queue="long",
+			timeout=3600,
+			enqueue_after_commit=True,
+		)
+		frappe.msgprint(_("The item search index will be built in the background."), alert=True)
+
 	def change_precision_for_for_sales(self):
 		doc_before_save = self.get_doc_before_save()
 		if doc_before_save and (
@@ -3,6 +3,8 @@
 
 
 import json
+from contextlib import contextmanager
+from datetime import date
 
 import frappe
 from frappe import _, throw
@@ -129,6 +131,109 @@ def get_item_details(args, doc=None, for_validate=False, overwrite_warehouse=Tru
 	return out
 
 
+@frappe.whitelist()
+def get_item_details_batch(items, doc_args=None, doc=None, for_validate=False, overwrite_warehouse=True):
+	"""
+	`get_item_details` for all the rows of a document, returned in the same order.
+
+	:param items: list of row args, as passed to `get_item_details`
+	:param doc_args: args common to all the rows, e.g. company, party and price list
+	"""
+	items = process_string_args(items)
+	doc_args = process_string_args(doc_args) or {}
+
+	if isinstance(doc, str):
+		doc = json.loads(doc)
+
+	rows = [process_args({**doc_args, **row}) for row in items]
+
+	with item_details_batch([row.item_code for row in rows], [row.price_list for row in rows]):
+		return [get_item_details(row, doc, for_validate, overwrite_warehouse) for row in rows]
+
+
+@contextmanager
+def item_details_batch(item_codes, price_lists=None):
+	"""
+	Share lookups between the rows of a document while their item details are fetched.
+
+	Item Prices and Bins of all the items are read with one query each, and tax maps,
+	conversion factors and child warehouses are computed once per document.
+	"""
+	if getattr(frappe.local, "item_details_batch_cache", None) is not None:
+		# already within a batch, rows not prefetched there fall back to their own queries
+		yield
+		return
+
+	frappe.local.item_details_batch_cache = {}
+	try:
+		prefetch_item_details(item_codes, price_lists)
+		yield
+	finally:
+		frappe.local.item_details_batch_cache = None
+
+
+def prefetch_item_details(item_codes, price_lists=None):
+	item_codes = {item_code for item_code in item_codes if item_code}
+	price_lists = {price_list for price_list in price_lists or [] if price_list}
+	if not item_codes:
+		return
+
+	# prices of templates are used for variants without their own price
+	item_codes.update(
+		frappe.get_all(
+			"Item",
+			filters={"name": ("in", list(item_codes)), "variant_of": ("is", "set")},
+			pluck="variant_of",
+		)
+	)
+
+	if price_lists:
+		item_prices = get_batch_cache("item_prices")
+		for item_code in item_codes:
+			for price_list in price_lists:
+				item_prices[(item_code, price_list)] = []
+
+		for item_price in frappe.get_all(
+			"Item Price",
+			filters={"item_code": ("in", list(item_codes)), "price_list": ("in", list(price_lists))},
+			fields=[
+				"name",
+				"price_list_rate",
+				"uom",
+				"item_code",
+				"price_list",
+				"batch_no",
+				"customer",
+				"supplier",
+				"valid_from",
+				"valid_upto",
+			],
+		):
+			item_prices[(item_price.item_code, item_price.price_list)].append(item_price)
+
+	bins = get_batch_cache("bins")
+	for item_code in item_codes:
+		bins[item_code] = {}
+
+	for bin in frappe.get_all(
+		"Bin",
+		filters={"item_code": ("in", list(item_codes))},
+		fields=["item_code", "warehouse", "projected_qty", "actual_qty", "reserved_qty"],
+	):
+		bins[bin.item_code][bin.warehouse] = bin
+
+
+def get_batch_cache(key):
+	"""Cache shared by the rows of a document within `item_details_batch`, None outside of it"""
+	cache = getattr(frappe.local, "item_details_batch_cache", None)
+	return None if cache is None else cache.setdefault(key, {})
+
+
+def clear_batch_cache(key):
+	if cache := getattr(frappe.local, "item_details_batch_cache", None):
+		cache.pop(key, None)
+
+
 def remove_standard_fields(details):
 	for key in child_table_fields + default_fields:
 		details.pop(key, None)
@@ -655,6 +760,11 @@ def is_within_valid_range(args, tax):
 
 @frappe.whitelist()
 def get_item_tax_map(company, item_tax_template, as_json=True):
+	tax_maps = get_batch_cache("item_tax_maps")
+	if tax_maps is not None and (company, item_tax_template) in tax_maps:
+		item_tax_map = tax_maps[(company, item_tax_template)].copy()
+		return json.dumps(item_tax_map) if as_json else item_tax_map
+
 	item_tax_map = {}
 	if item_tax_template:
 		template = frappe.get_cached_doc("Item Tax Template", item_tax_template)
@@ -662,6 +772,9 @@ def get_item_tax_map(company, item_tax_template, as_json=True):
 			if frappe.get_cached_value("Account", d.tax_type, "company") == company:
 				item_tax_map[d.tax_type] = d.tax_rate
 
+	if tax_maps is not None:
+		tax_maps[(company, item_tax_template)] = item_tax_map.copy()
+
 	return json.dumps(item_tax_map) if as_json else item_tax_map
 
 
@@ -878,6 +991,7 @@ def insert_item_price(args):
 					"Stock Settings", "update_existing_price_list_rate"
 				):
 					frappe.db.set_value("Item Price", item_price.name, "price_list_rate", price_list_rate)
+					clear_batch_cache("item_prices")
 					frappe.msgprint(
 						_("Item Price updated for {0} in Price List {1}").format(
 							args.item_code, args.price_list
@@ -896,6 +1010,7 @@ def insert_item_price(args):
 					}
 				)
 				item_price.insert()
+				clear_batch_cache("item_prices")
 				frappe.msgprint(
 					_("Item Price added for {0} in Price List {1}").format(args.item_code, args.price_list),
 					alert=True,
@@ -911,6 +1026,12 @@ def get_item_price(args, item_code, ignore_party=False, force_batch_no=False) ->
 	:param item_code: str, Item Doctype field item_code
 	"""
 
+	item_prices = get_batch_cache("item_prices")
+	if item_prices and (item_code, args.get("price_list")) in item_prices:
+		return filter_item_prices(
+			item_prices[(item_code, args.get("price_list"))], args, ignore_party, force_batch_no
+		)
+
 	ip = frappe.qb.DocType("Item Price")
 	query = (
 		frappe.qb.from_(ip)
@@ -948,6 +1069,59 @@ def get_item_price(args, item_code, ignore_party=False, force_batch_no=False) ->
 	return query.run(as_dict=True)
 
 
+def filter_item_prices(item_prices, args, ignore_party=False, force_batch_no=False) -> list[dict]:
+	"""Same as the query in `get_item_price`, applied to the prefetched Item Prices of an item"""
+	transaction_date = getdate(args["transaction_date"]) if args.get("transaction_date") else None
+
+	def is_applicable(ip):
+		if cstr(ip.uom) not in ("", args.get("uom")):
+			return False
+
+		if force_batch_no:
+			if ip.batch_no is None or ip.batch_no != args.get("batch_no"):
+				return False
+		elif cstr(ip.batch_no) not in ("", args.get("batch_no")):
+			return False
+
+		if not ignore_party:
+			if args.get("customer"):
+				if ip.customer != args.get("customer"):
+					return False
+			elif args.get("supplier"):
+				if ip.supplier != args.get("supplier"):
+					return False
+			elif cstr(ip.customer) or cstr(ip.supplier):
+				return False
+
+		if transaction_date and not (
+			getdate(ip.valid_from or "2000-01-01")
+			<= transaction_date
+			<= getdate(ip.valid_upto or "2500-12-31")
+		):
+			return False
+
+		return True
+
+	applicable = [ip for ip in item_prices if is_applicable(ip)]
+	if not applicable:
+		return []
+
+	# valid_from desc, ifnull(batch_no, '') desc, uom desc, with nulls last as in the query
+	item_price = max(
+		applicable,
+		key=lambda ip: (
+			getdate(ip.valid_from) if ip.valid_from else date.min,
+			cstr(ip.batch_no),
+			ip.uom is not None,
+			cstr(ip.uom),
+		),
+	)
+
+	return [
+		frappe._dict(name=item_price.name, price_list_rate=item_price.price_list_rate, uom=item_price.uom)
+	]
+
+
 @frappe.whitelist()
 def get_batch_based_item_price(params, item_code) -> float:
 	if isinstance(params, str):
@@ -1161,6 +1335,10 @@ def get_pos_profile(company, pos_profile=None, user=None):
 
 @frappe.whitelist()
 def get_conversion_factor(item_code, uom):
+	conversion_factors = get_batch_cache("conversion_factors")
+	if conversion_factors is not None and (item_code, uom) in conversion_factors:
+		return {"conversion_factor": conversion_factors[(item_code, uom)]}
+
 	variant_of = frappe.db.get_value("Item", item_code, "variant_of", cache=True)
 	filters = {"parent": item_code, "uom": uom}
 
@@ -1171,6 +1349,9 @@ def get_conversion_factor(item_code, uom):
 		stock_uom = frappe.db.get_value("Item", item_code, "stock_uom")
 		conversion_factor = get_uom_conv_factor(uom, stock_uom)
 
+	if conversion_factors is not None:
+		conversion_factors[(item_code, uom)] = conversion_factor or 1.0
+
 	return {"conversion_factor": conversion_factor or 1.0}
 
 
@@ -1192,18 +1373,34 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 
 		from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 
-		warehouses = get_child_warehouses(warehouse) if include_child_warehouses else [warehouse]
-
-		bin = frappe.qb.DocType("Bin")
-		bin_details = (
-			frappe.qb.from_(bin)
-			.select(
-				Coalesce(Sum(bin.projected_qty), 0).as_("projected_qty"),
-				Coalesce(Sum(bin.actual_qty), 0).as_("actual_qty"),
-				Coalesce(Sum(bin.reserved_qty), 0).as_("reserved_qty"),
-			)
-			.where((bin.item_code == item_code) & (bin.warehouse.isin(warehouses)))
-		).run(as_dict=True)[0]
+		child_warehouses = get_batch_cache("child_warehouses")
+		if not include_child_warehouses:
+			warehouses = [warehouse]
+		elif child_warehouses is not None:
+			if warehouse not in child_warehouses:
+				child_warehouses[warehouse] = get_child_warehouses(warehouse)
+			warehouses = child_warehouses[warehouse]
+		else:
+			warehouses = get_child_warehouses(warehouse)
+
+		bins = get_batch_cache("bins")
+		if bins and item_code in bins:
+			item_bins = [bins[item_code][wh] for wh in warehouses if wh in bins[item_code]]
+			bin_details = {
+				fieldname: sum(flt(d.get(fieldname)) for d in item_bins)
+				for fieldname in ("projected_qty", "actual_qty", "reserved_qty")
+			}
+		else:
+			bin = frappe.qb.DocType("Bin")
+			bin_details = (
+				frappe.qb.from_(bin)
+				.select(
+					Coalesce(Sum(bin.projected_qty), 0).as_("projected_qty"),
+					Coalesce(Sum(bin.actual_qty), 0).as_("actual_qty"),
+					Coalesce(Sum(bin.reserved_qty), 0).as_("reserved_qty"),
+				)
+				.where((bin.item_code == item_code) & (bin.warehouse.isin(warehouses)))
+			).run(as_dict=True)[0]
 
 	if company:
 		bin_details["company_total_stock"] = get_company_total_stock(item_code, company)
@@ -3,26 +3,53 @@
 
 
 import json
+import time
 from math import ceil
 
 import frappe
 from frappe import _
-from frappe.utils import add_days, cint, flt, nowdate
+from frappe.utils import add_days, cint, create_batch, flt, nowdate
 
 import erpnext
 
+# Material Requests are created with at most this many items, so that every request is saved and
+# committed in a short transaction instead of one request holding all the items of the company
+MATERIAL_REQUEST_BATCH_SIZE = 500
 
-def reorder_item():
-	"""Reorder item if stock reaches reorder level"""
+
+def reorder_item(dry_run=False):
+	"""Reorder item if stock reaches reorder level
+
+	With `dry_run`, the Material Requests are not created. The suggested quantities are returned
+	along with the seconds taken to compute them, e.g.
+
+	bench execute erpnext.stock.reorder_item.reorder_item --kwargs "{'dry_run': 1}"
+	"""
 	# if initial setup not completed, return
 	if not (frappe.db.a_row_exists("Company") and frappe.db.a_row_exists("Fiscal Year")):
 		return
 
-	if cint(frappe.db.get_single_value("Stock Settings", "auto_indent")):
-		return _reorder_item()
+	if dry_run or cint(frappe.db.get_single_value("Stock Settings", "auto_indent")):
+		return _reorder_item(dry_run=dry_run)
+
+
+def _reorder_item(dry_run=False):
+	start = time.perf_counter()
+	material_requests = get_material_requests_to_create()
+
+	if dry_run:
+		return frappe._dict(
+			{
+				"suggestions": get_reorder_suggestions(material_requests),
+				"time_taken": flt(time.perf_counter() - start, 3),
+			}
+		)
+
+	if material_requests:
+		return create_material_request(material_requests)
 
 
-def _reorder_item():
+def get_material_requests_to_create():
 	material_requests = {"Purchase": {}, "Transfer": {}, "Material Issue": {}, "Manufacture": {}}
 	warehouse_company = frappe._dict(
 		frappe.db.sql(
@@ -72,6 +99,8 @@ def _reorder_item():
 					"item_code": kwargs.item_code,
 					"warehouse": kwargs.warehouse,
 					"reorder_qty": reorder_qty,
+					"projected_qty": projected_qty,
+					"reorder_level": reorder_level,
 					"item_details": kwargs.item_details,
 				}
 			)
@@ -102,8 +131,32 @@ def _reorder_item():
 				),
 			)
 
-	if material_requests:
-		return create_material_request(material_requests)
+	return material_requests
+
+
+def get_reorder_suggestions(material_requests):
+	suggestions = []
+	if not material_requests:
+		return suggestions
+
+	conversion_factors = get_purchase_uom_conversion_factors(material_requests)
+	for request_type, company_wise_items in material_requests.items():
+		for company, items in company_wise_items.items():
+			for d in items:
+				d = frappe._dict(d)
+				row = get_material_request_item(d, request_type, conversion_factors)
+				row.update(
+					{
+						"company": company,
+						"material_request_type": request_type,
+						"projected_qty": d.projected_qty,
+						"reorder_level": d.reorder_level,
+						"reorder_qty": d.reorder_qty,
+					}
+				)
+				suggestions.append(frappe._dict(row))
+
+	return suggestions
 
 
 def get_items_for_reorder() -> dict[str, list]:
@@ -182,36 +235,104 @@ def get_reorder_levels_for_variants(itemwise_reorder):
 
 def get_item_warehouse_projected_qty(items_to_consider):
 	item_warehouse_projected_qty = {}
-	items_to_consider = list(items_to_consider.keys())
-
-	for item_code, warehouse, projected_qty in frappe.db.sql(
-		"""select item_code, warehouse, projected_qty
-		from tabBin where item_code in ({})
-			and (warehouse != '' and warehouse is not null)""".format(
-			", ".join(["%s"] * len(items_to_consider))
-		),
-		items_to_consider,
-	):
-		if item_code not in item_warehouse_projected_qty:
-			item_warehouse_projected_qty.setdefault(item_code, {})
-
-		if warehouse not in item_warehouse_projected_qty.get(item_code):
-			item_warehouse_projected_qty[item_code][warehouse] = flt(projected_qty)
-
-		warehouse_doc = frappe.get_doc("Warehouse", warehouse)
-
-		while warehouse_doc.parent_warehouse:
-			if not item_warehouse_projected_qty.get(item_code, {}).get(warehouse_doc.parent_warehouse):
-				item_warehouse_projected_qty.setdefault(item_code, {})[warehouse_doc.parent_warehouse] = flt(
-					projected_qty
-				)
-			else:
-				item_warehouse_projected_qty[item_code][warehouse_doc.parent_warehouse] += flt(projected_qty)
-			warehouse_doc = frappe.get_doc("Warehouse", warehouse_doc.parent_warehouse)
+	warehouse_ancestors = get_warehouse_ancestors()
+
+	bin = frappe.qb.DocType("Bin")
+	for items in create_batch(list(items_to_consider.keys()), 10000):
+		bins = (
+			frappe.qb.from_(bin)
+			.select(bin.item_code, bin.warehouse, bin.projected_qty)
+			.where((bin.item_code.isin(items)) & (bin.warehouse.isnotnull()) & (bin.warehouse != ""))
+		).run()
+
+		for item_code, warehouse, projected_qty in bins:
+			warehouse_projected_qty = item_warehouse_projected_qty.setdefault(item_code, {})
+
+			if warehouse not in warehouse_projected_qty:
+				warehouse_projected_qty[warehouse] = flt(projected_qty)
+
+			# roll up the projected qty into every warehouse group above the warehouse
+			for parent_warehouse in warehouse_ancestors.get(warehouse, []):
+				warehouse_projected_qty[parent_warehouse] = flt(
+					warehouse_projected_qty.get(parent_warehouse)
+				) + flt(projected_qty)
 
 	return item_warehouse_projected_qty
 
 
+def get_warehouse_ancestors():
+	"""Warehouse wise list of its parent warehouses, nearest first"""
+	parent_warehouse_map = dict(
+		frappe.get_all("Warehouse", fields=["name", "parent_warehouse"], as_list=True)
+	)
+
+	warehouse_ancestors = {}
+	for warehouse in parent_warehouse_map:
+		ancestors = []
+		parent_warehouse = parent_warehouse_map.get(warehouse)
+		while parent_warehouse and parent_warehouse not in ancestors:
+			ancestors.append(parent_warehouse)
+			parent_warehouse = parent_warehouse_map.get(parent_warehouse)
+
+		warehouse_ancestors[warehouse] = ancestors
+
+	return warehouse_ancestors
+
+
+def get_purchase_uom_conversion_factors(material_requests):
+	"""Conversion factors of the purchase UOMs of the items to be purchased, by (item, uom)"""
+	item_uoms = set()
+	for items in material_requests.get("Purchase", {}).values():
+		for d in items:
+			item = d.get("item_details")
+			if item.purchase_uom and item.purchase_uom != item.stock_uom:
+				item_uoms.add((item.name, item.purchase_uom))
+
+	conversion_factors = {}
+	for items in create_batch(list({item_code for item_code, uom in item_uoms}), 10000):
+		for parent, uom, conversion_factor in frappe.get_all(
+			"UOM Conversion Detail",
+			filters={"parent": ("in", items), "parenttype": "Item"},
+			fields=["parent", "uom", "conversion_factor"],
+			as_list=True,
+		):
+			if (parent, uom) in item_uoms:
+				conversion_factors[(parent, uom)] = conversion_factor
+
+	return conversion_factors
+
+
+def get_material_request_item(d, request_type, conversion_factors):
+	item = d.get("item_details")
+	uom = item.stock_uom
+	conversion_factor = 1.0
+
+	if request_type == "Purchase":
+		uom = item.purchase_uom or item.stock_uom
+		if uom != item.stock_uom:
+			conversion_factor = conversion_factors.get((item.name, uom)) or 1.0
+
+	must_be_whole_number = frappe.db.get_value("UOM", uom, "must_be_whole_number", cache=True)
+	qty = d.reorder_qty / conversion_factor
+	if must_be_whole_number:
+		qty = ceil(qty)
+
+	return {
+		"doctype": "Material Request Item",
+		"item_code": d.item_code,
+		"schedule_date": add_days(nowdate(), cint(item.lead_time_days)),
+		"qty": qty,
+		"conversion_factor": conversion_factor,
+		"uom": uom,
+		"stock_uom": item.stock_uom,
+		"warehouse": d.warehouse,
+		"item_name": item.item_name,
+		"description": item.description,
+		"item_group": item.item_group,
+		"brand": item.brand,
+	}
+
+
 def create_material_request(material_requests):
 	"""Create indent on reaching reorder level"""
 	mr_list = []
@@ -227,76 +348,42 @@ def create_material_request(material_requests):
 		mr.log_error("Unable to create material request")
 
 	company_wise_mr = frappe._dict({})
+	conversion_factors = get_purchase_uom_conversion_factors(material_requests)
 	for request_type in material_requests:
 		for company in material_requests[request_type]:
-			try:
-				items = material_requests[request_type][company]
-				if not items:
-					continue
-
-				mr = frappe.new_doc("Material Request")
-				mr.update(
-					{
-						"company": company,
-						"transaction_date": nowdate(),
-						"material_request_type": "Material Transfer"
-						if request_type == "Transfer"
-						else request_type,
-					}
-				)
-
-				for d in items:
-					d = frappe._dict(d)
-					item = d.get("item_details")
-					uom = item.stock_uom
-					conversion_factor = 1.0
-
-					if request_type == "Purchase":
-						uom = item.purchase_uom or item.stock_uom
-						if uom != item.stock_uom:
-							conversion_factor = (
-								frappe.db.get_value(
-									"UOM Conversion Detail",
-									{"parent": item.name, "uom": uom},
-									"conversion_factor",
-								)
-								or 1.0
-							)
-
-					must_be_whole_number = frappe.db.get_value("UOM", uom, "must_be_whole_number", cache=True)
-					qty = d.reorder_qty / conversion_factor
-					if must_be_whole_number:
-						qty = ceil(qty)
-
-					mr.append(
-						"items",
+			for items in create_batch(material_requests[request_type][company], MATERIAL_REQUEST_BATCH_SIZE):
+				try:
+					frappe.db.savepoint("reorder_item")
+					mr = frappe.new_doc("Material Request")
+					mr.update(
 						{
-							"doctype": "Material Request Item",
-							"item_code": d.item_code,
-							"schedule_date": add_days(nowdate(), cint(item.lead_time_days)),
-							"qty": qty,
-							"conversion_factor": conversion_factor,
-							"uom": uom,
-							"stock_uom": item.stock_uom,
-							"warehouse": d.warehouse,
-							"item_name": item.item_name,
-							"description": item.description,
-							"item_group": item.item_group,
-							"brand": item.brand,
-						},
+							"company": company,
+							"transaction_date": nowdate(),
+							"material_request_type": "Material Transfer"
+							if request_type == "Transfer"
+							else request_type,
+						}
 					)
 
-				schedule_dates = [d.schedule_date for d in mr.items]
-				mr.schedule_date = max(schedule_dates or [nowdate()])
-				mr.flags.ignore_mandatory = True
-				mr.insert()
-				mr.submit()
-				mr_list.append(mr)
+					for d in items:
+						d = frappe._dict(d)
+						mr.append("items", get_material_request_item(d, request_type, conversion_factors))
+
+					schedule_dates = [d.schedule_date for d in mr.items]
+					mr.schedule_date = max(schedule_dates or [nowdate()])
+					mr.flags.ignore_mandatory = True
+					mr.insert()
+					mr.submit()
+					mr_list.append(mr)
+
+					company_wise_mr.setdefault(company, []).append(mr)
 
-				company_wise_mr.setdefault(company, []).append(mr)
+					if not frappe.flags.in_test:
+						frappe.db.commit()
 
-			except Exception:
-				_log_exception(mr)
+				except Exception:
+					frappe.db.rollback(save_point="reorder_item")
+					_log_exception(mr)
 
 	if company_wise_mr:
 		if getattr(frappe.local, "reorder_email_notify", None) is None:
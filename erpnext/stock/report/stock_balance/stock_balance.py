@@ -14,6 +14,10 @@ from frappe.utils.nestedset import get_descendants_of
 
 import erpnext
 from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_inventory_dimensions
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	get_latest_snapshot_date,
+	is_stock_balance_snapshot_enabled,
+)
 from erpnext.stock.doctype.warehouse.warehouse import apply_warehouse_filter
 from erpnext.stock.report.stock_ageing.stock_ageing import FIFOSlots, get_average_age
 from erpnext.stock.utils import add_additional_uom_columns
@@ -46,6 +50,7 @@ class StockBalanceReport:
 		self.to_date = getdate(filters.get("to_date"))
 
 		self.start_from = None
+		self.opening_from_snapshot = False
 		self.data = []
 		self.columns = []
 		self.sle_entries: list[SLEntry] = []
@@ -62,6 +67,7 @@ class StockBalanceReport:
 
 		self.inventory_dimensions = self.get_inventory_dimension_fields()
 		self.prepare_opening_data_from_closing_balance()
+		self.prepare_opening_data_from_snapshot()
 		self.prepare_stock_ledger_entries()
 		self.prepare_new_data()
 
@@ -89,6 +95,57 @@ class StockBalanceReport:
 			if group_by_key not in self.opening_data:
 				self.opening_data.setdefault(group_by_key, entry)
 
+	def prepare_opening_data_from_snapshot(self) -> None:
+		"""Start from the latest stock balance snapshot before the from date, if later than the closing balance"""
+		if not self.can_use_snapshot():
+			return
+
+		snapshot_date = get_latest_snapshot_date(self.filters.company, add_days(self.from_date, -1))
+		if not snapshot_date or (self.start_from and getdate(self.start_from) > getdate(snapshot_date)):
+			return
+
+		self.start_from = add_days(snapshot_date, 1)
+		self.opening_from_snapshot = True
+		self.opening_data = frappe._dict({})
+
+		snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+		item_table = frappe.qb.DocType("Item")
+
+		query = (
+			frappe.qb.from_(snapshot)
+			.inner_join(item_table)
+			.on(snapshot.item_code == item_table.name)
+			.select(
+				snapshot.company,
+				snapshot.item_code,
+				snapshot.warehouse,
+				snapshot.qty_after_transaction.as_("bal_qty"),
+				snapshot.stock_value.as_("bal_val"),
+				snapshot.valuation_rate.as_("val_rate"),
+				item_table.item_group,
+				item_table.stock_uom,
+				item_table.item_name,
+			)
+			.where((snapshot.company == self.filters.company) & (snapshot.snapshot_date == snapshot_date))
+		)
+
+		query = self.apply_warehouse_filters(query, snapshot)
+		query = self.apply_items_filters(query, item_table)
+
+		for entry in query.run(as_dict=True):
+			self.opening_data[self.get_group_by_key(entry)] = entry
+
+	def can_use_snapshot(self) -> bool:
+		# snapshots have neither the ageing queue nor the inventory dimensions
+		return bool(
+			self.filters.get("company")
+			and not self.filters.get("ignore_closing_balance")
+			and not self.filters.get("show_stock_ageing_data")
+			and not self.filters.get("show_dimension_wise_stock")
+			and not any(self.filters.get(fieldname) for fieldname in self.inventory_dimensions)
+			and is_stock_balance_snapshot_enabled()
+		)
+
 	def prepare_new_data(self):
 		self.item_warehouse_map = self.get_item_warehouse_map()
 
@@ -244,7 +301,8 @@ class StockBalanceReport:
 				"out_val": 0.0,
 				"bal_qty": opening_data.get("bal_qty") or 0.0,
 				"bal_val": opening_data.get("bal_val") or 0.0,
-				"val_rate": 0.0,
+				# the ledger before a snapshot is not read, so its valuation rate is carried over
+				"val_rate": (opening_data.get("val_rate") or 0.0) if self.opening_from_snapshot else 0.0,
 			}
 		)
 
@@ -11,6 +11,11 @@ from erpnext.stock.deprecated_serial_batch import (
 	DeprecatedBatchNoValuation,
 	DeprecatedSerialNoValuation,
 )
+from erpnext.stock.doctype.batch_running_balance.batch_running_balance import (
+	get_batch_running_balances,
+	is_batch_running_balance_ready,
+	update_batch_running_balance,
+)
 from erpnext.stock.valuation import round_off_if_near_zero
 
 
@@ -637,6 +642,10 @@ class BatchNoValuation(DeprecatedBatchNoValuation):
 		if not self.batchwise_valuation_batches:
 			return []
 
+		# summed up from the Serial and Batch Entries until the running balances are rebuilt
+		if is_batch_running_balance_ready():
+			return get_batch_running_balances(self.sle, self.batchwise_valuation_batches)
+
 		parent = frappe.qb.DocType("Serial and Batch Bundle")
 		child = frappe.qb.DocType("Serial and Batch Entry")
 
@@ -732,6 +741,9 @@ class BatchNoValuation(DeprecatedBatchNoValuation):
 				},
 			)
 
+		if self.sle.get("serial_and_batch_bundle"):
+			update_batch_running_balance(self.sle.serial_and_batch_bundle)
+
 	def calculate_valuation_rate(self):
 		if not hasattr(self, "wh_data"):
 			return
@@ -3,10 +3,16 @@
 
 
 import frappe
-from frappe.utils import cstr, flt, now, nowdate, nowtime
+from frappe.utils import cint, create_batch, cstr, flt, now, nowdate, nowtime
+from frappe.utils.background_jobs import is_job_enqueued
 
 from erpnext.controllers.stock_controller import create_repost_item_valuation_entry
 
+STOCK_BALANCE_REPOST_KEY = "stock_balance_repost"
+# items per batch of the site wide repost, each batch is committed on its own
+REPOST_BATCH_SIZE = 500
+BIN_QTY_FIELDS = ("actual_qty", "reserved_qty", "indented_qty", "ordered_qty", "planned_qty")
+
 
 def repost(only_actual=False, allow_negative_stock=False, allow_zero_rate=False, only_bin=False):
 	"""
@@ -39,6 +45,391 @@ def repost(only_actual=False, allow_negative_stock=False, allow_zero_rate=False,
 	frappe.db.auto_commit_on_many_writes = 0
 
 
+def repost_site(
+	workers=1,
+	only_actual=False,
+	only_bin=False,
+	allow_negative_stock=False,
+	allow_zero_rate=False,
+	verify_only=False,
+	resume=False,
+):
+	"""
+	Repost the stock of every item and warehouse of the site, e.g. after data migrations
+
+	bench execute erpnext.stock.stock_balance.repost_site --kwargs "{'workers': 8, 'only_bin': 1}"
+
+	Items are reposted in batches, with the quantities of all the Bins of a batch computed by one
+	grouped query per quantity. The batches are queued as Stock Balance Repost Batch and taken by up
+	to `workers` background jobs until none is left. Every batch is committed and marked completed on
+	its own, so that with `resume` a failed or interrupted run goes on with the batches not reposted
+	yet. With `verify_only`, Bins that do not match are only listed on their batch.
+
+	Progress is reported by `get_repost_site_progress`.
+	"""
+	if resume:
+		frappe.db.set_value("Stock Balance Repost Batch", {"status": "Failed"}, "status", "Queued")
+	else:
+		clear_repost_site_progress()
+
+	options = frappe._dict(
+		only_actual=cint(only_actual),
+		only_bin=cint(only_bin),
+		allow_negative_stock=cint(allow_negative_stock),
+		allow_zero_rate=cint(allow_zero_rate),
+		verify_only=cint(verify_only),
+	)
+
+	# batches of an earlier call are kept with their own options, only new items are queued
+	batched_items = get_batched_items()
+	item_codes = [d for d in get_items_to_repost() if d and d not in batched_items]
+	for batch in create_batch(item_codes, REPOST_BATCH_SIZE):
+		queue_batch(batch, options)
+
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+	workers = min(max(cint(workers), 1), get_queued_batch_count())
+	if workers <= 1 or frappe.flags.in_test:
+		repost_queued_batches()
+		return get_repost_site_progress()
+
+	for worker in range(workers):
+		job_id = f"{STOCK_BALANCE_REPOST_KEY}::{worker}"
+		# a job still running from an earlier call takes the new batches as well
+		if is_job_enqueued(job_id):
+			continue
+
+		frappe.enqueue(repost_queued_batches, queue="long", timeout=24 * 60 * 60, job_id=job_id)
+
+
+def queue_batch(item_codes, options):
+	frappe.get_doc(
+		{
+			"doctype": "Stock Balance Repost Batch",
+			"status": "Queued",
+			"from_item_code": item_codes[0],
+			"to_item_code": item_codes[-1],
+			"item_count": len(item_codes),
+			"item_codes": frappe.as_json(item_codes, indent=None),
+			"options": frappe.as_json(options, indent=None),
+		}
+	).insert(ignore_permissions=True)
+
+
+def get_queued_batch_count():
+	return frappe.db.count("Stock Balance Repost Batch", {"status": "Queued"})
+
+
+def get_next_batch():
+	"""
+	Oldest queued batch, locked until it is committed. Batches locked by the other jobs are
+	skipped, so that every batch is taken by one job only.
+	"""
+	batch = frappe.db.sql(
+		"""
+		select name, item_codes, options
+		from `tabStock Balance Repost Batch`
+		where status = 'Queued'
+		order by creation, name
+		limit 1
+		for update skip locked""",
+		as_dict=True,
+	)
+
+	return batch[0] if batch else None
+
+
+def repost_queued_batches():
+	"""Repost the batches queued by `repost_site`, along with the other jobs, until none is left"""
+	while batch := get_next_batch():
+		try:
+			mismatches = repost_item_batch(
+				frappe.parse_json(batch.item_codes), frappe._dict(frappe.parse_json(batch.options))
+			)
+			frappe.db.set_value(
+				"Stock Balance Repost Batch",
+				batch.name,
+				{
+					"status": "Completed",
+					"mismatches": frappe.as_json(mismatches) if mismatches else None,
+				},
+			)
+			if not frappe.flags.in_test:
+				frappe.db.commit()
+
+		except Exception:
+			if frappe.flags.in_test:
+				raise
+
+			frappe.db.rollback()
+			error_log = frappe.log_error(f"Stock repost failed for batch {batch.name}")
+			frappe.db.set_value(
+				"Stock Balance Repost Batch",
+				batch.name,
+				{"status": "Failed", "error_log": error_log.name},
+			)
+			frappe.db.commit()
+
+
+def repost_item_batch(item_codes, options):
+	"""Repost the Bins of the items, returns the Bins not matching in verify only mode"""
+	expected_bins = get_expected_bin_qty(item_codes)
+	# actual qty is otherwise set by reposting the stock ledger
+	fields = BIN_QTY_FIELDS if (options.only_bin or options.verify_only) else BIN_QTY_FIELDS[1:]
+	precision = {field: frappe.get_precision("Bin", field) for field in fields}
+
+	current_bins = {
+		(d.item_code, d.warehouse): d
+		for d in frappe.get_all(
+			"Bin",
+			filters={"item_code": ("in", item_codes)},
+			fields=["item_code", "warehouse", *BIN_QTY_FIELDS],
+		)
+	}
+
+	mismatches = {}
+	for item_code, warehouse in sorted(set(expected_bins) | set(current_bins)):
+		if not (item_code and warehouse):
+			continue
+
+		if not options.verify_only and not options.only_bin:
+			repost_actual_qty(item_code, warehouse, options.allow_zero_rate, options.allow_negative_stock)
+
+		if options.only_actual and not options.verify_only:
+			continue
+
+		expected = expected_bins.get((item_code, warehouse)) or {}
+		current = current_bins.get((item_code, warehouse)) or {}
+		qty_dict = {
+			field: flt(expected.get(field), precision[field])
+			for field in fields
+			if flt(expected.get(field), precision[field]) != flt(current.get(field), precision[field])
+		}
+		if not qty_dict:
+			continue
+
+		if options.verify_only:
+			mismatches[f"{item_code}::{warehouse}"] = {
+				field: (flt(current.get(field), precision[field]), qty) for field, qty in qty_dict.items()
+			}
+		else:
+			update_bin_qty(item_code, warehouse, qty_dict)
+
+	return mismatches
+
+
+def get_items_to_repost():
+	return frappe.db.sql_list(
+		"""
+		select item_code from tabBin
+		union
+		select distinct item_code from `tabStock Ledger Entry`
+		order by item_code
+	"""
+	)
+
+
+def get_expected_bin_qty(item_codes):
+	"""Quantities of all the Bins of the items, as computed from the stock ledger and transactions"""
+	item_codes = tuple(item_codes)
+	expected_bins = {}
+	qty_maps = {
+		"actual_qty": get_balance_qty_map(item_codes),
+		"reserved_qty": get_reserved_qty_map(item_codes),
+		"indented_qty": get_indented_qty_map(item_codes),
+		"ordered_qty": get_ordered_qty_map(item_codes),
+		"planned_qty": get_planned_qty_map(item_codes),
+	}
+
+	for field, qty_map in qty_maps.items():
+		for key, qty in qty_map.items():
+			expected_bins.setdefault(key, {})[field] = flt(qty)
+
+	return expected_bins
+
+
+def get_balance_qty_map(item_codes):
+	return {
+		(d[0], d[1]): d[2]
+		for d in frappe.db.sql(
+			"""
+			select item_code, warehouse, qty_after_transaction
+			from (
+				select item_code, warehouse, qty_after_transaction,
+					row_number() over (
+						partition by item_code, warehouse
+						order by posting_date desc, posting_time desc, creation desc
+					) as row_no
+				from `tabStock Ledger Entry`
+				where item_code in %(item_codes)s and is_cancelled = 0
+			) sle
+			where row_no = 1
+		""",
+			{"item_codes": item_codes},
+		)
+	}
+
+
+def get_reserved_qty_map(item_codes):
+	dont_reserve_on_return = frappe.get_cached_value(
+		"Selling Settings", "Selling Settings", "dont_reserve_sales_order_qty_on_sales_return"
+	)
+	reserved_qty = frappe.db.sql(
+		f"""
+		select
+			item_code, warehouse,
+			sum(dnpi_qty * ((so_item_qty - so_item_delivered_qty - if(dont_reserve_qty_on_return, so_item_returned_qty, 0)) / so_item_qty))
+		from
+			(
+				(select
+					item_code, warehouse,
+					qty as dnpi_qty,
+					(
+						select qty from `tabSales Order Item`
+						where name = dnpi.parent_detail_docname
+						and (delivered_by_supplier is null or delivered_by_supplier = 0)
+					) as so_item_qty,
+					(
+						select delivered_qty from `tabSales Order Item`
+						where name = dnpi.parent_detail_docname
+						and delivered_by_supplier = 0
+					) as so_item_delivered_qty,
+					(
+						select returned_qty from `tabSales Order Item`
+						where name = dnpi.parent_detail_docname
+						and delivered_by_supplier = 0
+					) as so_item_returned_qty,
+					{dont_reserve_on_return} as dont_reserve_qty_on_return,
+					parent, name
+				from
+				(
+					select item_code, warehouse, qty, parent_detail_docname, parent, name
+					from `tabPacked Item` dnpi_in
+					where item_code in %(item_codes)s
+					and parenttype='Sales Order'
+					and item_code != parent_item
+					and exists (select * from `tabSales Order` so
+					where name = dnpi_in.parent and docstatus = 1 and status not in ('On Hold', 'Closed'))
+				) dnpi)
+			union
+				(select item_code, warehouse,
+					stock_qty as dnpi_qty, qty as so_item_qty,
+					delivered_qty as so_item_delivered_qty,
+					returned_qty as so_item_returned_qty,
+					{dont_reserve_on_return}, parent, name
+				from `tabSales Order Item` so_item
+				where item_code in %(item_codes)s
+				and (so_item.delivered_by_supplier is null or so_item.delivered_by_supplier = 0)
+				and exists(select * from `tabSales Order` so
+					where so.name = so_item.parent and so.docstatus = 1
+					and so.status not in ('On Hold', 'Closed')))
+			) tab
+		where
+			so_item_qty >= so_item_delivered_qty
+		group by item_code, warehouse
+	""",
+		{"item_codes": item_codes},
+	)
+
+	return {(d[0], d[1]): d[2] for d in reserved_qty}
+
+
+def get_indented_qty_map(item_codes):
+	# Ordered Qty is always maintained in stock UOM
+	indented_qty = frappe.db.sql(
+		"""
+		select mr_item.item_code, mr_item.warehouse,
+			sum(case when mr.material_request_type = 'Material Issue'
+				then mr_item.ordered_qty - mr_item.stock_qty
+				else mr_item.stock_qty - mr_item.ordered_qty end)
+		from `tabMaterial Request Item` mr_item, `tabMaterial Request` mr
+		where mr_item.item_code in %(item_codes)s
+			and mr.material_request_type in
+				('Purchase', 'Manufacture', 'Customer Provided', 'Material Transfer', 'Material Issue')
+			and mr_item.stock_qty > mr_item.ordered_qty and mr_item.parent=mr.name
+			and mr.status!='Stopped' and mr.docstatus=1
+		group by mr_item.item_code, mr_item.warehouse
+	""",
+		{"item_codes": item_codes},
+	)
+
+	return {(d[0], d[1]): d[2] for d in indented_qty}
+
+
+def get_ordered_qty_map(item_codes):
+	ordered_qty = frappe.db.sql(
+		"""
+		select po_item.item_code, po_item.warehouse,
+			sum((po_item.qty - po_item.received_qty)*po_item.conversion_factor)
+		from `tabPurchase Order Item` po_item, `tabPurchase Order` po
+		where po_item.item_code in %(item_codes)s
+		and po_item.qty > po_item.received_qty and po_item.parent=po.name
+		and po.status not in ('Closed', 'Delivered') and po.docstatus=1
+		and po_item.delivered_by_supplier = 0
+		group by po_item.item_code, po_item.warehouse""",
+		{"item_codes": item_codes},
+	)
+
+	return {(d[0], d[1]): d[2] for d in ordered_qty}
+
+
+def get_planned_qty_map(item_codes):
+	planned_qty = frappe.db.sql(
+		"""
+		select production_item, fg_warehouse, sum(qty - produced_qty) from `tabWork Order`
+		where production_item in %(item_codes)s and status not in ('Stopped', 'Completed', 'Closed')
+		and docstatus=1 and qty > produced_qty
+		group by production_item, fg_warehouse""",
+		{"item_codes": item_codes},
+	)
+
+	return {(d[0], d[1]): d[2] for d in planned_qty}
+
+
+def get_batched_items(status=None):
+	filters = {"status": status} if status else {}
+	return {
+		item_code
+		for item_codes in frappe.get_all(
+			"Stock Balance Repost Batch", filters=filters, pluck="item_codes", order_by=None
+		)
+		for item_code in frappe.parse_json(item_codes)
+	}
+
+
+def get_completed_items():
+	return get_batched_items("Completed")
+
+
+def get_repost_site_progress():
+	"""Items reposted so far out of all the items, and the Bins found not to match in verify only mode"""
+	batches = frappe.get_all(
+		"Stock Balance Repost Batch", fields=["status", "item_count", "mismatches"], order_by="creation"
+	)
+	total = sum(cint(d.item_count) for d in batches)
+	completed = sum(cint(d.item_count) for d in batches if d.status == "Completed")
+
+	mismatches = {}
+	for d in batches:
+		if d.mismatches:
+			mismatches.update(frappe.parse_json(d.mismatches))
+
+	return frappe._dict(
+		{
+			"total": total,
+			"completed": completed,
+			"failed": len([d for d in batches if d.status == "Failed"]),
+			"progress": flt(completed * 100 / total, 2) if total else 0.0,
+			"mismatches": mismatches,
+		}
+	)
+
+
+def clear_repost_site_progress():
+	frappe.db.delete("Stock Balance Repost Batch")
+
+
 def repost_stock(
 	item_code,
 	warehouse,
@@ -18,17 +18,24 @@ from frappe.utils import (
 	get_link_to_form,
 	getdate,
 	now,
+	now_datetime,
 	nowdate,
 	nowtime,
 	parse_json,
+	time_diff_in_seconds,
 )
 
 import erpnext
-from erpnext.stock.doctype.bin.bin import update_qty as update_bin_qty
+from erpnext.stock.doctype.bin.bin import flush_qty_updates as flush_bin_qty_updates
+from erpnext.stock.doctype.bin.bin import lock_bins
+from erpnext.stock.doctype.bin.bin import queue_qty_update as queue_bin_qty_update
 from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_inventory_dimensions
 from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
 	get_available_batches,
 )
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	invalidate_stock_balance_snapshots,
+)
 from erpnext.stock.doctype.stock_reservation_entry.stock_reservation_entry import (
 	get_sre_reserved_batch_nos_details,
 	get_sre_reserved_serial_nos_details,
@@ -42,7 +49,23 @@ from erpnext.stock.utils import (
 	get_stock_balance,
 	get_valuation_method,
 )
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	BinWiseValuation,
+	FIFOValuation,
+	LIFOValuation,
+	dump_stock_queue,
+	round_off_if_near_zero,
+)
+
+# fields recomputed for every future entry while reposting
+REPLAY_FIELDS = (
+	"qty_after_transaction",
+	"valuation_rate",
+	"stock_value",
+	"stock_value_difference",
+	"stock_queue",
+)
+REPLAY_CHUNK_SIZE = 1000
 
 
 class NegativeStockError(frappe.ValidationError):
@@ -67,6 +90,10 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 	from erpnext.controllers.stock_controller import future_sle_exists
 
 	if sl_entries:
+		invalidate_stock_balance_snapshots(
+			sl_entries[0].get("company"), min(getdate(sle.get("posting_date")) for sle in sl_entries)
+		)
+
 		cancel = sl_entries[0].get("is_cancelled")
 		if cancel:
 			validate_cancellation(sl_entries)
@@ -75,6 +102,13 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 		args = get_args_for_future_sle(sl_entries[0])
 		future_sle_exists(args, sl_entries)
 
+		bins = lock_bins(
+			(sle.get("item_code"), sle.get("warehouse"))
+			for sle in sl_entries
+			if frappe.get_cached_value("Item", sle.get("item_code"), "is_stock_item")
+		)
+
+		bin_qty_updates = {}
 		for sle in sl_entries:
 			if sle.serial_no and not via_landed_cost_voucher:
 				validate_serial_no(sle)
@@ -106,15 +140,18 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 
 			is_stock_item = frappe.get_cached_value("Item", args.get("item_code"), "is_stock_item")
 			if is_stock_item:
-				bin_name = get_or_make_bin(args.get("item_code"), args.get("warehouse"))
-				args.reserved_stock = flt(frappe.db.get_value("Bin", bin_name, "reserved_stock"))
+				bin = bins[(args.get("item_code"), args.get("warehouse"))]
+				args.reserved_stock = flt(bin.reserved_stock)
 				repost_current_voucher(args, allow_negative_stock, via_landed_cost_voucher)
-				update_bin_qty(bin_name, args)
+				queue_bin_qty_update(bin_qty_updates, bin.name, args)
 			else:
 				frappe.msgprint(
 					_("Item {0} ignored since it is not a stock item").format(args.get("item_code"))
 				)
 
+		# one update per Bin for all the entries of the voucher
+		flush_bin_qty_updates(bin_qty_updates)
+
 
 def repost_current_voucher(args, allow_negative_stock=False, via_landed_cost_voucher=False):
 	if args.get("actual_qty") or args.get("voucher_type") == "Stock Reconciliation":
@@ -260,6 +297,12 @@ def repost_future_sle(
 	i = get_current_index(doc) or 0
 	while i < len(args):
 		validate_item_warehouse(args[i])
+		if frappe.flags.parallel_repost:
+			from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+				lock_item_for_repost,
+			)
+
+			lock_item_for_repost(args[i].get("item_code"))
 
 		obj = update_entries_after(
 			{
@@ -359,6 +402,7 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 				"current_index": index,
 				"total_reposting_count": len(args),
 				"reposting_data_file": doc.reposting_data_file,
+				"repost_throughput": get_repost_throughput(doc, index),
 			}
 		)
 
@@ -371,6 +415,7 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 				),
 				"current_index": index,
 				"affected_transactions": frappe.as_json(affected_transactions),
+				"repost_throughput": get_repost_throughput(doc, index),
 			}
 		)
 
@@ -384,12 +429,22 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 			"items_to_be_repost": json.dumps(args, default=str),
 			"current_index": index,
 			"total_reposting_count": len(args),
+			"repost_throughput": doc.repost_throughput,
 		},
 		doctype=doc.doctype,
 		docname=doc.name,
 	)
 
 
+def get_repost_throughput(doc, reposted_count):
+	"""Item-Warehouse combinations reposted per minute since the repost started"""
+	if not doc.get("repost_started_on"):
+		return 0.0
+
+	elapsed = time_diff_in_seconds(now_datetime(), doc.repost_started_on)
+	return flt(cint(reposted_count) * 60 / elapsed, 2) if elapsed > 0 else 0.0
+
+
 def get_reposting_file_name(dt, dn):
 	return frappe.db.get_value(
 		"File",
@@ -557,6 +612,13 @@ class update_entries_after:
 		self.affected_transactions: set[tuple[str, str]] = set()
 		self.reserved_stock = flt(self.args.reserved_stock)
 
+		# batched replay applies to future entries only, not to the entries of the current voucher
+		self.batched_replay = not self.args.sle_id and cint(
+			frappe.db.get_single_value("Stock Reposting Settings", "batched_ledger_replay")
+		)
+		self.pending_sle_updates = {}
+		self.pending_bin_updates = {}
+
 		self.data = frappe._dict()
 		self.initialize_previous_data(self.args)
 		self.build()
@@ -610,6 +672,8 @@ class update_entries_after:
 			self.process_sle_against_current_timestamp()
 			if not future_sle_exists(self.args):
 				self.update_bin()
+		elif self.batched_replay:
+			self.replay_future_entries()
 		else:
 			entries_to_fix = self.get_future_entries_to_fix()
 
@@ -627,6 +691,94 @@ class update_entries_after:
 		if self.exceptions:
 			self.raise_exceptions()
 
+	def replay_future_entries(self):
+		"""
+		Process future entries chunk by chunk, keeping the running balance in memory
+		and writing the recomputed values back with batched updates.
+		"""
+		for entries_to_fix in self.get_future_entries_in_chunks():
+			for sle in entries_to_fix:
+				self.process_sle(sle)
+				self.update_bin_data(sle)
+
+				if sle.dependant_sle_voucher_detail_no:
+					self.get_dependent_entries_to_fix(entries_to_fix, sle)
+
+		self.flush_replay_updates()
+
+	def get_future_entries_in_chunks(self):
+		args = self.data[self.args.warehouse].previous_sle or frappe._dict(
+			{"item_code": self.item_code, "warehouse": self.args.warehouse}
+		)
+
+		# each chunk starts after the last entry of the previous one, so no row is read twice
+		extra_cond = None
+		while True:
+			entries = get_stock_ledger_entries(
+				args,
+				">",
+				"asc",
+				f"limit {REPLAY_CHUNK_SIZE}",
+				for_update=True,
+				check_serial_no=False,
+				extra_cond=extra_cond,
+			)
+			if not entries:
+				break
+
+			last_sle = entries[-1]
+			yield entries
+
+			args = frappe._dict(
+				args,
+				last_posting_datetime=last_sle.posting_datetime,
+				last_creation=last_sle.creation,
+				last_name=last_sle.name,
+			)
+			extra_cond = """ and (posting_datetime > %(last_posting_datetime)s
+				or (posting_datetime = %(last_posting_datetime)s and (creation > %(last_creation)s
+				or (creation = %(last_creation)s and name > %(last_name)s))))"""
+
+	def is_replayable(self, sle):
+		"""Entries that are valued from the running balance alone, without reading the ledger"""
+		return not (
+			sle.recalculate_rate
+			or sle.serial_no
+			or sle.batch_no
+			or sle.serial_and_batch_bundle
+			or sle.voucher_type == "Stock Reconciliation"
+			or (
+				flt(sle.actual_qty) < 0
+				and sle.voucher_type in ("Purchase Receipt", "Purchase Invoice", "Subcontracting Receipt")
+			)
+		)
+
+	def queue_sle_update(self, sle):
+		self.pending_sle_updates[sle.name] = {fieldname: sle.get(fieldname) for fieldname in REPLAY_FIELDS}
+		if len(self.pending_sle_updates) >= REPLAY_CHUNK_SIZE:
+			self.flush_replay_updates()
+
+	def flush_replay_updates(self):
+		"""Write buffered entry and bin values, before anything reads them from the database"""
+		if self.pending_sle_updates:
+			sle = frappe.qb.DocType("Stock Ledger Entry")
+			query = frappe.qb.update(sle).where(sle.name.isin(list(self.pending_sle_updates)))
+
+			for fieldname in REPLAY_FIELDS:
+				value = frappe.qb.terms.Case()
+				for name, values in self.pending_sle_updates.items():
+					value = value.when(sle.name == name, values[fieldname])
+
+				query = query.set(sle[fieldname], value)
+
+			query.run()
+			self.pending_sle_updates = {}
+
+		for (item_code, warehouse), values in self.pending_bin_updates.items():
+			frappe.db.set_value("Bin", get_or_make_bin(item_code, warehouse), values)
+
+		self.pending_bin_updates = {}
+
 	def process_sle_against_current_timestamp(self):
 		sl_entries = self.get_sle_against_current_voucher()
 		for sle in sl_entries:
@@ -768,6 +920,11 @@ class update_entries_after:
 		# previous sle data for this warehouse
 		self.wh_data = self.data[sle.warehouse]
 
+		replayable = self.batched_replay and self.is_replayable(sle)
+		if self.batched_replay and not replayable:
+			# serial/batch valuation and rate recalculation read the ledger
+			self.flush_replay_updates()
+
 		self.validate_previous_sle_qty(sle)
 		self.affected_transactions.add((sle.voucher_type, sle.voucher_no))
 
@@ -864,13 +1021,16 @@ class update_entries_after:
 		sle.qty_after_transaction = self.wh_data.qty_after_transaction
 		sle.valuation_rate = self.wh_data.valuation_rate
 		sle.stock_value = self.wh_data.stock_value
-		sle.stock_queue = json.dumps(self.wh_data.stock_queue)
+		sle.stock_queue = dump_stock_queue(list(self.wh_data.stock_queue))
 
 		if not sle.is_adjustment_entry:
 			sle.stock_value_difference = stock_value_difference
 
 		sle.doctype = "Stock Ledger Entry"
-		frappe.get_doc(sle).db_update()
+		if replayable:
+			self.queue_sle_update(sle)
+		else:
+			frappe.get_doc(sle).db_update()
 
 		if (
 			sle.serial_and_batch_bundle
@@ -1168,6 +1328,7 @@ class update_entries_after:
 			self.recalculate_amounts_in_stock_entry(sle.voucher_no)
 
 	def recalculate_amounts_in_stock_entry(self, voucher_no):
+		self.flush_replay_updates()
 		stock_entry = frappe.get_doc("Stock Entry", voucher_no, for_update=True)
 		stock_entry.calculate_rate_and_amount(reset_outgoing_rate=False, raise_error_if_no_rate=False)
 		stock_entry.db_update()
@@ -1341,11 +1502,7 @@ class update_entries_after:
 			self.wh_data.qty_after_transaction + actual_qty
 		)
 
-		if self.valuation_method == "LIFO":
-			stock_queue = LIFOValuation(self.wh_data.stock_queue)
-		else:
-			stock_queue = FIFOValuation(self.wh_data.stock_queue)
-
+		stock_queue = self.get_stock_queue()
 		_prev_qty, prev_stock_value = stock_queue.get_total_stock_and_value()
 
 		if actual_qty > 0:
@@ -1369,17 +1526,27 @@ class update_entries_after:
 
 		stock_value_difference = stock_value - prev_stock_value
 
-		self.wh_data.stock_queue = stock_queue.state
 		self.wh_data.stock_value = round_off_if_near_zero(self.wh_data.stock_value + stock_value_difference)
 
-		if not self.wh_data.stock_queue:
-			self.wh_data.stock_queue.append(
-				[0, sle.incoming_rate or sle.outgoing_rate or self.wh_data.valuation_rate]
+		if not stock_queue:
+			self.wh_data.stock_queue = type(stock_queue)(
+				[[0, sle.incoming_rate or sle.outgoing_rate or self.wh_data.valuation_rate]]
 			)
 
 		if self.wh_data.qty_after_transaction:
 			self.wh_data.valuation_rate = self.wh_data.stock_value / self.wh_data.qty_after_transaction
 
+	def get_stock_queue(self):
+		"""
+		The FIFO/LIFO queue of the warehouse, built from its `stock_queue` bins once and then kept
+		in `wh_data` across entries. It is only serialised when an entry is written.
+		"""
+		if not isinstance(self.wh_data.stock_queue, BinWiseValuation):
+			valuation_class = LIFOValuation if self.valuation_method == "LIFO" else FIFOValuation
+			self.wh_data.stock_queue = valuation_class(self.wh_data.stock_queue)
+
+		return self.wh_data.stock_queue
+
 	def update_batched_values(self, sle):
 		from erpnext.stock.serial_batch_bundle import BatchNoValuation
 
@@ -1434,6 +1601,7 @@ class update_entries_after:
 	def get_fallback_rate(self, sle) -> float:
 		"""When exact incoming rate isn't available use any of other "average" rates as fallback.
 		This should only get used for negative stock."""
+		self.flush_replay_updates()
 		return get_valuation_rate(
 			sle.item_code,
 			sle.warehouse,
@@ -1501,7 +1669,6 @@ class update_entries_after:
 				raise NegativeStockError(message)
 
 	def update_bin_data(self, sle):
-		bin_name = get_or_make_bin(sle.item_code, sle.warehouse)
 		values_to_update = {
 			"actual_qty": sle.qty_after_transaction,
 			"stock_value": sle.stock_value,
@@ -1510,6 +1677,12 @@ class update_entries_after:
 		if sle.valuation_rate is not None:
 			values_to_update["valuation_rate"] = sle.valuation_rate
 
+		if self.batched_replay:
+			# only the latest values of each bin are written
+			self.pending_bin_updates.setdefault((sle.item_code, sle.warehouse), {}).update(values_to_update)
+			return
+
+		bin_name = get_or_make_bin(sle.item_code, sle.warehouse)
 		frappe.db.set_value("Bin", bin_name, values_to_update)
 
 	def update_bin(self):
@@ -1647,7 +1820,7 @@ def get_stock_ledger_entries(
 		where item_code = %(item_code)s
 		and is_cancelled = 0
 		{conditions}
-		order by posting_date {order}, posting_time {order}, creation {order}
+		order by posting_date {order}, posting_time {order}, creation {order}, name {order}
 		{limit} {for_update}""".format(
 			conditions=conditions,
 			limit=limit or "",
@@ -1,7 +1,7 @@
 import frappe
 from frappe.tests import IntegrationTestCase
 
-from erpnext.stock.get_item_details import get_item_details
+from erpnext.stock.get_item_details import get_item_details, get_item_details_batch
 
 EXTRA_TEST_RECORD_DEPENDENCIES = ["Customer", "Supplier", "Item", "Price List", "Item Price"]
 
@@ -28,3 +28,32 @@ class TestGetItemDetail(IntegrationTestCase):
 		)
 		details = get_item_details(args)
 		self.assertEqual(details.get("price_list_rate"), 100)
+
+	def test_get_item_details_batch(self):
+		doc_args = {
+			"company": "_Test Company",
+			"conversion_rate": 1.0,
+			"price_list_currency": "USD",
+			"plc_conversion_rate": 1.0,
+			"doctype": "Purchase Order",
+			"name": None,
+			"supplier": "_Test Supplier",
+			"transaction_date": None,
+			"price_list": "_Test Buying Price List",
+			"is_subcontracted": 0,
+			"ignore_pricing_rule": 1,
+		}
+		items = [
+			{"item_code": "_Test Item", "qty": 1},
+			{"item_code": "_Test Item 2", "qty": 5},
+			{"item_code": "_Test Item", "qty": 10, "warehouse": "_Test Warehouse - _TC"},
+		]
+
+		expected = [get_item_details(frappe._dict({**doc_args, **row})) for row in items]
+		details = get_item_details_batch(items, doc_args)
+
+		self.assertEqual(len(details), len(items))
+		for row, expected_row in zip(details, expected, strict=True):
+			self.assertEqual(row, expected_row)
+
+		self.assertEqual(details[0].get("price_list_rate"), 100)
@@ -0,0 +1,126 @@
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from erpnext.buying.doctype.purchase_order.test_purchase_order import create_purchase_order
+from erpnext.selling.doctype.sales_order.test_sales_order import make_sales_order
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.stock_balance import (
+	clear_repost_site_progress,
+	get_completed_items,
+	get_expected_bin_qty,
+	get_ordered_qty,
+	get_repost_site_progress,
+	get_reserved_qty,
+	queue_batch,
+	repost_queued_batches,
+	repost_site,
+)
+
+
+class TestStockBalance(IntegrationTestCase):
+	def setUp(self):
+		self.item_code = make_item("_Test Stock Balance Repost Item", {"is_stock_item": 1}).name
+		self.warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(item_code=self.item_code, to_warehouse=self.warehouse, qty=10, rate=100)
+		create_purchase_order(item_code=self.item_code, warehouse=self.warehouse, qty=4)
+		make_sales_order(item_code=self.item_code, warehouse=self.warehouse, qty=3)
+
+		clear_repost_site_progress()
+
+	def tearDown(self):
+		clear_repost_site_progress()
+		frappe.db.rollback()
+
+	def get_bin(self):
+		return frappe.db.get_value(
+			"Bin",
+			{"item_code": self.item_code, "warehouse": self.warehouse},
+			["actual_qty", "ordered_qty", "reserved_qty", "projected_qty"],
+			as_dict=True,
+		)
+
+	def corrupt_bin(self):
+		frappe.db.set_value(
+			"Bin",
+			{"item_code": self.item_code, "warehouse": self.warehouse},
+			{"actual_qty": 0, "ordered_qty": 0, "reserved_qty": 0},
+		)
+
+	def test_grouped_quantities(self):
+		expected = get_expected_bin_qty([self.item_code])[(self.item_code, self.warehouse)]
+
+		self.assertEqual(expected["actual_qty"], 10)
+		self.assertEqual(expected["ordered_qty"], get_ordered_qty(self.item_code, self.warehouse))
+		self.assertEqual(expected["reserved_qty"], get_reserved_qty(self.item_code, self.warehouse))
+		self.assertEqual(expected["ordered_qty"], 4)
+		self.assertEqual(expected["reserved_qty"], 3)
+
+	def test_verify_only(self):
+		self.corrupt_bin()
+
+		queue_batch([self.item_code], frappe._dict(verify_only=1))
+		repost_queued_batches()
+
+		mismatches = get_repost_site_progress().mismatches
+		mismatch = mismatches[f"{self.item_code}::{self.warehouse}"]
+		self.assertEqual(mismatch["actual_qty"], [0, 10])
+		self.assertEqual(mismatch["ordered_qty"], [0, 4])
+		self.assertEqual(mismatch["reserved_qty"], [0, 3])
+
+		# nothing is written
+		self.assertEqual(self.get_bin().actual_qty, 0)
+
+	def test_repost_bins_with_checkpoint(self):
+		self.corrupt_bin()
+
+		queue_batch([self.item_code], frappe._dict(only_bin=1))
+		repost_queued_batches()
+
+		bin = self.get_bin()
+		self.assertEqual(bin.actual_qty, 10)
+		self.assertEqual(bin.ordered_qty, 4)
+		self.assertEqual(bin.reserved_qty, 3)
+		self.assertEqual(bin.projected_qty, 11)
+		self.assertIn(self.item_code, get_completed_items())
+
+	def test_resume_after_failed_batch(self):
+		self.corrupt_bin()
+
+		queue_batch([self.item_code], frappe._dict(only_bin=1))
+		frappe.db.set_value("Stock Balance Repost Batch", {"status": "Queued"}, "status", "Failed")
+		self.assertEqual(get_repost_site_progress().failed, 1)
+
+		# the failed batch is queued again, along with the items not in any batch
+		progress = repost_site(only_bin=1, resume=True)
+
+		self.assertEqual(self.get_bin().actual_qty, 10)
+		self.assertIn(self.item_code, get_completed_items())
+		self.assertEqual(progress.failed, 0)
+		self.assertEqual(progress.completed, progress.total)
+
+	def test_differences_within_precision(self):
+		precision = frappe.get_precision("Bin", "actual_qty")
+		frappe.db.set_value(
+			"Bin",
+			{"item_code": self.item_code, "warehouse": self.warehouse},
+			"actual_qty",
+			10 + 10 ** -(precision + 2),
+		)
+
+		queue_batch([self.item_code], frappe._dict(verify_only=1))
+		repost_queued_batches()
+
+		self.assertEqual(get_repost_site_progress().mismatches, {})
+
+	def test_queued_batches(self):
+		self.corrupt_bin()
+
+		# batches queued by a later call are taken by the job already running
+		queue_batch([self.item_code], frappe._dict(only_bin=1))
+		repost_queued_batches()
+
+		self.assertEqual(self.get_bin().actual_qty, 10)
+		self.assertIn(self.item_code, get_completed_items())
+		self.assertFalse(frappe.db.exists("Stock Balance Repost Batch", {"status": "Queued"}))
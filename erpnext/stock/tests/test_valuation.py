@@ -1,14 +1,21 @@
 import json
+import random
 import unittest
 
 import frappe
+from frappe.model.meta import get_field_precision
 from frappe.tests import IntegrationTestCase
 from hypothesis import given
 from hypothesis import strategies as st
 
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	FIFOValuation,
+	LIFOValuation,
+	dump_stock_queue,
+	round_off_if_near_zero,
+)
 
 qty_gen = st.floats(min_value=-1e6, max_value=1e6)
 value_gen = st.floats(min_value=1, max_value=1e6)
@@ -317,6 +324,63 @@ class TestLIFOValuation(IntegrationTestCase):
 			self.assertTotalValue(total_value)
 
 
+class TestValuationQueueTotals(IntegrationTestCase):
+	@given(stock_queue_generator, st.sampled_from([FIFOValuation, LIFOValuation]))
+	def test_running_totals(self, stock_queue, valuation_class):
+		currency_precision = get_field_precision(
+			frappe.get_meta("Stock Ledger Entry").get_field("stock_value")
+		)
+		queue = valuation_class([])
+
+		for qty, rate in stock_queue:
+			if qty > 0:
+				queue.add_stock(qty, rate)
+			else:
+				queue.remove_stock(abs(qty))
+
+			total_qty, total_value = queue.get_total_stock_and_value()
+			self.assertAlmostEqual(total_qty, sum(q for q, _ in queue), places=4)
+			self.assertAlmostEqual(total_value, sum(q * r for q, r in queue), places=currency_precision)
+
+	def test_dump_stock_queue(self):
+		stock_queue = [[1.5, 10.0], [2, 20.25]]
+		self.assertEqual(dump_stock_queue(stock_queue), json.dumps(stock_queue))
+		self.assertEqual(json.loads(dump_stock_queue(stock_queue)), stock_queue)
+
+	def test_totals_after_long_random_sequence(self):
+		rng = random.Random(42)
+
+		for valuation_class in (FIFOValuation, LIFOValuation):
+			queue = valuation_class([])
+			for _ in range(10_000):
+				if rng.random() < 0.55:
+					queue.add_stock(rng.uniform(0.001, 100), round(rng.uniform(1, 1000), 2))
+				else:
+					queue.remove_stock(rng.uniform(0.001, 100))
+
+			self.assertEqual(
+				queue.get_total_stock_and_value(),
+				(
+					round_off_if_near_zero(sum(q for q, _ in queue.state)),
+					round_off_if_near_zero(sum(q * r for q, r in queue.state)),
+				),
+			)
+
+	def test_consumption_of_long_queue(self):
+		size = 100_000
+		queue = FIFOValuation([[1, rate] for rate in range(1, size + 1)])
+
+		for _ in range(size // 2):
+			queue.remove_stock(1)
+
+		# the oldest half is consumed, the newest half is left
+		self.assertEqual(len(queue), size - size // 2)
+		self.assertEqual(queue.state[0], [1, size // 2 + 1])
+		self.assertEqual(
+			queue.get_total_stock_and_value(), (size - size // 2, sum(range(size // 2 + 1, size + 1)))
+		)
+
+
 class TestLIFOValuationSLE(IntegrationTestCase):
 	ITEM_CODE = "_Test LIFO item"
 	WAREHOUSE = "_Test Warehouse - _TC"
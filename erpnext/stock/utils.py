@@ -10,6 +10,10 @@ from frappe.query_builder.functions import CombineDatetime, IfNull, Sum
 from frappe.utils import cstr, flt, get_link_to_form, get_time, getdate, nowdate, nowtime
 
 import erpnext
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	get_item_by_supplier_part_no,
+	is_item_search_index_ready,
+)
 from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
 	get_available_serial_nos,
 )
@@ -630,6 +634,13 @@ def scan_barcode(search_value: str) -> BarcodeScanResult:
 		set_cache(batch_no_data)
 		return batch_no_data
 
+	# search supplier part no
+	if is_item_search_index_ready() and (item_code := get_item_by_supplier_part_no(search_value)):
+		supplier_part_no_data = {"item_code": item_code}
+		_update_item_info(supplier_part_no_data)
+		set_cache(supplier_part_no_data)
+		return supplier_part_no_data
+
 	return {}
 
 
@@ -1,4 +1,6 @@
+import json
 from abc import ABC, abstractmethod, abstractproperty
+from collections import deque
 from collections.abc import Callable
 from typing import NewType
 
@@ -54,7 +56,8 @@ class FIFOValuation(BinWiseValuation):
 	New stock is added at end of the queue.
 	Qty consumption happens on First In First Out basis.
 
-	Queue is implemented using "bins" of [qty, rate].
+	Queue is implemented using "bins" of [qty, rate] in a deque,
+	so that consuming from the head of long queues is O(1).
 
 	ref: https://en.wikipedia.org/wiki/FIFO_and_LIFO_accounting
 	"""
@@ -64,12 +67,15 @@ class FIFOValuation(BinWiseValuation):
 	__slots__ = ["queue"]
 
 	def __init__(self, state: list[StockBin] | None):
-		self.queue: list[StockBin] = state if state is not None else []
+		self.queue: deque[StockBin] = deque(state if state is not None else [])
 
 	@property
 	def state(self) -> list[StockBin]:
 		"""Get current state of queue."""
-		return self.queue
+		return list(self.queue)
+
+	def __len__(self):
+		return len(self.queue)
 
 	def add_stock(self, qty: float, rate: float) -> None:
 		"""Update fifo queue with new stock.
@@ -133,7 +139,11 @@ class FIFOValuation(BinWiseValuation):
 			if qty >= fifo_bin[QTY]:
 				# consume current bin
 				qty = round_off_if_near_zero(qty - fifo_bin[QTY])
-				to_consume = self.queue.pop(index)
+				if index == 0:
+					to_consume = self.queue.popleft()
+				else:
+					to_consume = self.queue[index]
+					del self.queue[index]
 				consumed_bins.append(list(to_consume))
 
 				if not self.queue and qty:
@@ -175,6 +185,9 @@ class LIFOValuation(BinWiseValuation):
 		"""Get current state of stack."""
 		return self.stack
 
+	def __len__(self):
+		return len(self.stack)
+
 	def add_stock(self, qty: float, rate: float) -> None:
 		"""Update lifo stack with new stock.
 
@@ -245,6 +258,11 @@ class LIFOValuation(BinWiseValuation):
 		return consumed_bins
 
 
+def dump_stock_queue(stock_queue: list[StockBin]) -> str:
+	"""Serialise a stock queue for `stock_queue`, the same way it has always been stored."""
+	return json.dumps(stock_queue)
+
+
 def round_off_if_near_zero(number: float, precision: int = 7) -> float:
 	"""Rounds off the number to zero only if number is close to zero for decimal
 	specified in precision. Precision defaults to 7.
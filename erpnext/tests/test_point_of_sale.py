@@ -4,9 +4,10 @@ import unittest
 
 import frappe
 from frappe.tests import IntegrationTestCase
+from frappe.utils import add_to_date
 
 from erpnext.accounts.doctype.pos_profile.test_pos_profile import make_pos_profile
-from erpnext.selling.page.point_of_sale.point_of_sale import get_items
+from erpnext.selling.page.point_of_sale.point_of_sale import get_item_catalog, get_items
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 
@@ -53,3 +54,56 @@ class TestPointOfSale(IntegrationTestCase):
 
 		self.assertEqual(len(filtered_items), 1)
 		self.assertEqual(filtered_items[0]["item_code"], item2.item_code)
+
+	def test_item_catalog(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Catalog")
+		item = make_item("Test Catalog Stock Item", {"is_stock_item": 1})
+		make_stock_entry(item_code=item.name, qty=10, to_warehouse="_Test Warehouse - _TC", rate=500)
+
+		catalog = get_item_catalog(pos_profile.name)
+		self.assertTrue(catalog["full"])
+		row = next(d for d in catalog["items"] if d.item_code == item.name)
+		self.assertEqual(row.actual_qty, 10)
+		self.assertEqual(row.uoms, [{"uom": item.stock_uom, "conversion_factor": 1}])
+
+		# only the items changed since the last sync are sent again
+		make_stock_entry(item_code=item.name, qty=5, to_warehouse="_Test Warehouse - _TC", rate=500)
+		delta = get_item_catalog(pos_profile.name, since=catalog["timestamp"])
+		self.assertFalse(delta["full"])
+		row = next(d for d in delta["items"] if d.item_code == item.name)
+		self.assertEqual(row.actual_qty, 15)
+
+		delta = get_item_catalog(pos_profile.name, since=delta["timestamp"])
+		self.assertNotIn(item.name, [d.item_code for d in delta["items"]])
+
+		frappe.db.set_value("Item", item.name, "disabled", 1)
+		delta = get_item_catalog(pos_profile.name, since=delta["timestamp"])
+		self.assertIn(item.name, delta["removed"])
+
+	def test_item_catalog_catches_late_changes(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Catalog")
+		item = make_item("Test Catalog Late Item", {"is_stock_item": 1})
+		catalog = get_item_catalog(pos_profile.name)
+
+		# a change committed after the last sync, by a transaction that started before it
+		frappe.db.set_value(
+			"Item",
+			item.name,
+			{
+				"item_name": "Test Catalog Late Item Renamed",
+				"modified": add_to_date(catalog["timestamp"], seconds=-5),
+			},
+			update_modified=False,
+		)
+		delta = get_item_catalog(pos_profile.name, since=catalog["timestamp"])
+		row = next(d for d in delta["items"] if d.item_code == item.name)
+		self.assertEqual(row.item_name, "Test Catalog Late Item Renamed")
+
+	def test_item_catalog_permission(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Catalog")
+
+		frappe.set_user("Guest")
+		try:
+			self.assertRaises(frappe.PermissionError, get_item_catalog, pos_profile.name)
+		finally:
+			frappe.set_user("Administrator")